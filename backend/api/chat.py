@@ -1,30 +1,76 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse
-from schemas.chat import ChatRequest, ChatResponse, SaveChatHistoryRequest, Message
+from fastapi.concurrency import run_in_threadpool
+from schemas.chat import ChatRequest, ChatResponse, SaveChatHistoryRequest, Message, ChatSession, ChatImage, ChatHistoryPage
 from services.ai_service import AIService
 import config
 from services.image_service import ImageService
+from services.chat_context import ChatContextManager
+from services.chat_session_service import chat_sessions
+from services.image_store import image_store
+from services.answer_cache import answer_cache
+from services.rate_limiter import PRIORITY_INTERACTIVE
+from services.metrics import metrics
+from services.search_index import search_index
+from services.chat_history import chat_history_catalog
 from config import UPLOADS_DIR, CHAT_HISTORY_DIR
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List
 import json
 import base64
-import re
 import shutil
 
 # 创建一个 APIRouter 实例
 router = APIRouter()
 
 # 初始化服务
-ai_service = AIService()
-image_service = ImageService()
+ai_service = AIService(priority=PRIORITY_INTERACTIVE)  # 交互对话优先占用上游额度
+image_service = ImageService(upload_dir=str(UPLOADS_DIR))  # 上传文件放在数据目录的临时目录，不写入程序目录
+chat_context = ChatContextManager(summarizer=ai_service.summarize_chat)
+
+def _message_image_ids(message: dict) -> List[str]:
+    """消息引用的图片ID（image_ids 优先，其次从图片存储地址中解析；base64 图片不再解析）"""
+    image_ids = list(message.get("image_ids") or [])
+    if not image_ids:
+        image_id = image_store.id_from_url(message.get("image_url") or "")
+        if image_id:
+            image_ids.append(image_id)
+    return image_store.existing(image_ids)
+
+async def _store_upload(image: UploadFile) -> str:
+    """把上传的图片存入图片存储并校验，返回图片ID"""
+    image_id = image_store.put(await image.read(), Path(image.filename or "").suffix)
+    if not image_service.validate_image(str(image_store.path(image_id))):
+        image_store.delete(image_id)
+        raise HTTPException(status_code=400, detail="无效的图片文件")
+    return image_id
+
+@router.post("/chat/images", response_model=ChatImage)
+async def upload_chat_image(image: UploadFile = File(...)):
+    """
+    上传对话图片（相同图片只保存一份）
+    之后在 /chat 的 image_ids 和历史记录中以图片ID引用，无需重复上传
+    """
+    image_id = await _store_upload(image)
+    return {"image_id": image_id, "url": image_store.url(image_id)}
+
+@router.get("/chat/images/{image_id}")
+async def get_chat_image(image_id: str):
+    """获取对话图片"""
+    path = image_store.path(image_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="图片不存在")
+    return FileResponse(path)
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat(
     message: str = Form(...),
     image: Optional[UploadFile] = File(None),
-    history: Optional[str] = Form(None)  # JSON字符串形式的历史记录
+    history: Optional[str] = Form(None),  # JSON字符串形式的历史记录
+    session_id: Optional[str] = Form(None),  # 服务端会话ID
+    image_ids: Optional[str] = Form(None),  # 已上传图片的ID，逗号分隔
+    use_cache: bool = Form(True)  # 是否允许使用答案缓存
 ):
     """
     通用AI助手对话接口
@@ -33,7 +79,11 @@ async def chat(
     Args:
         message: 用户输入的文本消息
         image: 可选的图片文件
-        history: 可选的历史对话记录（JSON字符串）
+        history: 可选的历史对话记录（JSON字符串，消息中的图片以 image_ids 或图片地址引用）
+        session_id: 可选的服务端会话ID；提供时使用服务端保存的历史（忽略 history），
+                    并把本轮问答追加到会话中
+        image_ids: 可选的图片ID（通过 /chat/images 上传），可与 image 同时使用
+        use_cache: 无历史的纯文本提问默认复用相似问题之前的回答，传 false 时总是重新生成
     
     Returns:
         ChatResponse: AI的回复（Markdown格式）
@@ -41,34 +91,30 @@ async def chat(
     try:
         # 解析历史记录
         history_list = []
-        if history:
+        if session_id:
+            if not chat_sessions.exists(session_id):
+                raise HTTPException(status_code=404, detail="会话不存在")
+            history_list = chat_sessions.history(session_id)
+        elif history:
             try:
                 history_data = json.loads(history)
                 # 转换为标准格式
                 for msg in history_data:
                     history_list.append({
                         "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
+                        "content": msg.get("content", ""),
+                        "images": _message_image_ids(msg)
                     })
             except json.JSONDecodeError:
                 print("[Chat API] 历史记录JSON解析失败")
         
-        # 处理图片（如果有）
-        image_path = None
+        # 处理图片（如果有）：新上传的图片存入图片存储，与已上传的图片一样以ID引用
+        current_images = image_store.existing([i.strip() for i in (image_ids or "").split(",") if i.strip()])
         if image and image.filename:
             try:
-                # 保存上传的图片
-                image_content = await image.read()
-                timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-                filename = f"chat_{timestamp}_{image.filename}"
-                image_path = image_service.save_upload_file(image_content, filename)
-                
-                # 验证图片
-                if not image_service.validate_image(image_path):
-                    image_service.cleanup_file(image_path)
-                    raise HTTPException(status_code=400, detail="无效的图片文件")
-                
-                print(f"[Chat API] 图片已保存: {image_path}")
+                current_images = image_store.existing(current_images + [await _store_upload(image)])
+            except HTTPException:
+                raise
             except Exception as e:
                 print(f"[Chat API] 图片处理失败: {e}")
                 raise HTTPException(status_code=500, detail=f"图片处理失败: {str(e)}")
@@ -76,37 +122,71 @@ async def chat(
         # 调用AI服务
         print(f"[Chat API] 用户消息: {message[:50]}...")
         print(f"[Chat API] 历史记录数量: {len(history_list)}")
-        print(f"[Chat API] 是否包含图片: {image_path is not None}")
+        print(f"[Chat API] 图片数量: {len(current_images)}")
+        
+        # 按token预算裁剪历史，较早的轮次压缩为摘要（可能调用摘要模型）
+        history_list, context_summary, context_stats = await run_in_threadpool(
+            chat_context.build, history_list
+        )
+        if context_stats["summarized_messages"]:
+            print(f"[Chat API] 上下文裁剪: 保留 {context_stats['kept_messages']} 条，"
+                  f"摘要 {context_stats['summarized_messages']} 条，"
+                  f"节省约 {context_stats['tokens_saved']} tokens")
+        metrics.increment("chat_context_tokens_saved", context_stats["tokens_saved"])
         
         # 根据是否有图片与可用密钥类型选择路线
-        if image_path:
-            # 有图片时必须使用 DashScope
-            response_text = ai_service.chat_with_image(
+        # AI调用含重试等待，放到线程池避免阻塞事件循环
+        hit = None
+        history_has_images = any(m.get("images") for m in history_list)
+        if current_images or (history_has_images and config.DASHSCOPE_API_KEY):
+            # 本轮或保留的历史中有图片时使用 DashScope（历史图片一并发送）
+            response_text = await run_in_threadpool(
+                ai_service.chat_with_image,
                 message=message,
-                image_path=image_path,
-                history=history_list
+                history=history_list,
+                context_summary=context_summary,
+                image_ids=current_images
             )
         else:
             # 无图片：优先使用 ModelScope；若无 ModelScope 但有 DashScope，则走 DashScope 文本对话
             if config.MODELSCOPE_API_KEY:
-                response_text = ai_service.chat(
-                    message=message,
-                    history=history_list
-                )
+                # 没有任何上下文的提问可复用相似问题的回答
+                cacheable = (use_cache and config.ANSWER_CACHE_ENABLED
+                             and not history_list and not context_summary)
+                hit = answer_cache.get(message, ai_service.chat_answer_scope()) if cacheable else None
+                if hit:
+                    response_text = hit["answer"]
+                else:
+                    response_text = await run_in_threadpool(
+                        ai_service.chat,
+                        message=message,
+                        history=history_list,
+                        context_summary=context_summary,
+                        cache_answer=cacheable
+                    )
             elif config.DASHSCOPE_API_KEY:
-                response_text = ai_service.chat_with_image(
+                response_text = await run_in_threadpool(
+                    ai_service.chat_with_image,
                     message=message,
                     image_path=None,
-                    history=history_list
+                    history=history_list,
+                    context_summary=context_summary
                 )
             else:
                 response_text = "抱歉，AI功能未配置。请联系管理员设置MODELSCOPE_API_KEY或DASHSCOPE_API_KEY。"
         
-        # 清理临时图片文件（可选，也可以保留用于回顾）
-        # if image_path:
-        #     image_service.cleanup_file(image_path)
+        # 本轮问答写入服务端会话
+        if session_id:
+            chat_sessions.append(session_id, "user", message, image_ids=current_images)
+            chat_sessions.append(session_id, "assistant", response_text)
         
-        return {"response": response_text}
+        return {
+            "response": response_text,
+            "context": context_stats,
+            "session_id": session_id,
+            "image_ids": current_images,
+            "cached": hit is not None
+        }
         
     except HTTPException:
         raise
@@ -126,119 +206,235 @@ async def save_chat_history(request: SaveChatHistoryRequest):
         保存结果
     """
     try:
-        # 生成文件名和assets文件夹
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"chat_history_{timestamp}"
-        md_filename = f"{filename}.md"
-        assets_folder_name = f"{filename}.assets"
-        
-        file_path = CHAT_HISTORY_DIR / md_filename
-        assets_dir = CHAT_HISTORY_DIR / assets_folder_name
-        
-        # 创建assets文件夹（如果需要）
-        image_counter = 0
-        
-        # 生成Markdown内容
-        md_content = f"""# 学习助手对话记录
+        return _write_chat_markdown(request.messages)
+    except Exception as e:
+        print(f"[Chat API] 保存聊天记录失败: {e}")
+        raise HTTPException(status_code=500, detail=f"保存失败: {str(e)}")
+
+@router.get("/chat/history", response_model=ChatHistoryPage)
+async def list_chat_history(
+    cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    分页列出已保存的聊天记录（从目录表读取，不读取 Markdown 文件和图片目录）
+    """
+    try:
+        items, next_cursor = await run_in_threadpool(chat_history_catalog.page, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"items": items, "next_cursor": next_cursor}
+
+# ==================== 服务端会话 ====================
+
+def _session_message_image_url(message: dict) -> Optional[str]:
+    """消息第一张图片的访问地址"""
+    if message.get("images"):
+        return image_store.url(message["images"][0])
+    return None
+
+def _session_to_response(session: dict) -> dict:
+    """会话转为响应格式（图片给出图片ID和访问地址）"""
+    session_id = session["session_id"]
+    return {
+        "session_id": session_id,
+        "created_at": session["created_at"],
+        "updated_at": session["updated_at"],
+        "messages": [
+            {
+                "role": m["role"],
+                "content": m["content"],
+                "image_url": _session_message_image_url(m),
+                "image_ids": m.get("images") or None
+            }
+            for m in session["messages"]
+        ]
+    }
+
+@router.post("/chat/sessions", response_model=ChatSession)
+async def create_chat_session():
+    """
+    创建服务端会话
+    之后每轮对话只需向 /chat 发送 session_id 和新消息
+    """
+    return _session_to_response(chat_sessions.create())
+
+@router.get("/chat/sessions/{session_id}", response_model=ChatSession)
+async def get_chat_session(session_id: str):
+    """获取会话的完整历史"""
+    session = chat_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="会话不存在")
+    return _session_to_response(session)
+
+@router.post("/chat/sessions/{session_id}/messages", response_model=ChatSession)
+async def append_chat_message(session_id: str, request: Message):
+    """
+    直接向会话追加一条消息（不调用AI，例如导入已有对话）
+    """
+    if not chat_sessions.exists(session_id):
+        raise HTTPException(status_code=404, detail="会话不存在")
+    if request.role not in ("user", "assistant"):
+        raise HTTPException(status_code=400, detail="role 必须是 user 或 assistant")
+    chat_sessions.append(session_id, request.role, request.content,
+                         image_ids=_message_image_ids(request.model_dump()))
+    return _session_to_response(chat_sessions.get(session_id))
+
+@router.post("/chat/sessions/{session_id}/save")
+async def save_chat_session(session_id: str):
+    """
+    将服务端会话保存为Markdown文件（无需客户端再上传历史和图片）
+    """
+    session = chat_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="会话不存在")
+    if not session["messages"]:
+        raise HTTPException(status_code=400, detail="会话中没有消息")
+    
+    messages = [
+        Message(role=m["role"], content=m["content"], image_ids=m.get("images") or None)
+        for m in session["messages"]
+    ]
+    try:
+        return _write_chat_markdown(messages)
+    except Exception as e:
+        print(f"[Chat API] 保存聊天记录失败: {e}")
+        raise HTTPException(status_code=500, detail=f"保存失败: {str(e)}")
+
+@router.delete("/chat/sessions/{session_id}")
+async def delete_chat_session(session_id: str):
+    """删除会话"""
+    if not chat_sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="会话不存在")
+    return {"message": "会话已删除", "session_id": session_id}
+
+def _write_chat_markdown(messages: List[Message]) -> dict:
+    """
+    将对话写成Markdown文件，图片保存到同名 .assets 文件夹
+    
+    Args:
+        messages: 对话消息，图片优先按 image_ids 引用图片存储；
+            image_url 也可以是 base64、http 地址或本地文件路径（旧版客户端）
+    
+    Returns:
+        保存结果
+    """
+    # 生成文件名和assets文件夹
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"chat_history_{timestamp}"
+    md_filename = f"{filename}.md"
+    assets_folder_name = f"{filename}.assets"
+    
+    file_path = CHAT_HISTORY_DIR / md_filename
+    assets_dir = CHAT_HISTORY_DIR / assets_folder_name
+    
+    # 创建assets文件夹（如果需要）
+    image_counter = 0
+    
+    # 生成Markdown内容
+    md_content = f"""# 学习助手对话记录
 
 **保存时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
 ---
 
 """
+    
+    # 添加对话内容
+    for i, msg in enumerate(messages, 1):
+        role_name = "👤 用户" if msg.role == "user" else "🤖 AI助手"
+        md_content += f"## {role_name}\n\n"
+        
+        # 图片存储中的图片：链接到 assets 文件夹（硬链接，不复制内容）
+        stored_images = _message_image_ids(msg.model_dump())
+        for image_id in stored_images:
+            image_counter += 1
+            image_filename = image_store.link_into(image_id, assets_dir, f"image_{image_counter}")
+            md_content += f"![图片](./{assets_folder_name}/{image_filename})\n\n"
         
-        # 添加对话内容
-        for i, msg in enumerate(request.messages, 1):
-            role_name = "👤 用户" if msg.role == "user" else "🤖 AI助手"
-            md_content += f"## {role_name}\n\n"
-            
-            # 处理图片
-            if msg.image_url:
-                # 检查是否是base64编码的图片
-                if msg.image_url.startswith('data:image'):
-                    # 创建assets文件夹（仅在需要时创建）
-                    if not assets_dir.exists():
+        # 处理其他形式的图片（旧版客户端）
+        if msg.image_url and not stored_images:
+            # 检查是否是base64编码的图片
+            if msg.image_url.startswith('data:image'):
+                try:
+                    # 只解析逗号前的头部（data:image/png;base64），不对整段数据做正则匹配
+                    header, _, base64_data = msg.image_url.partition(',')
+                    image_format = header[len('data:image/'):].split(';', 1)[0]
+                    if image_format.isalnum() and header.endswith(';base64') and base64_data:
+                        # 创建assets文件夹（仅在需要时创建）
                         assets_dir.mkdir(parents=True, exist_ok=True)
+                        
+                        # 保存图片
+                        image_counter += 1
+                        image_filename = f"image_{image_counter}.{image_format}"
+                        image_path = assets_dir / image_filename
+                        
+                        with open(image_path, 'wb') as img_file:
+                            img_file.write(base64.b64decode(base64_data))
+                        
+                        # 在Markdown中引用图片（使用相对路径）
+                        md_content += f"![图片](./{assets_folder_name}/{image_filename})\n\n"
+                        print(f"[Chat API] 已保存图片: {image_path}")
+                    else:
+                        md_content += f"*[图片格式不支持]*\n\n"
+                except Exception as e:
+                    print(f"[Chat API] 图片处理失败: {e}")
+                    md_content += f"*[图片保存失败]*\n\n"
                     
-                    # 解析base64图片
-                    try:
-                        # 提取图片格式和数据
-                        match = re.match(r'data:image/(\w+);base64,(.+)', msg.image_url)
-                        if match:
-                            image_format = match.group(1)
-                            base64_data = match.group(2)
-                            
-                            # 解码base64数据
-                            image_data = base64.b64decode(base64_data)
-                            
-                            # 保存图片
-                            image_counter += 1
-                            image_filename = f"image_{image_counter}.{image_format}"
-                            image_path = assets_dir / image_filename
-                            
-                            with open(image_path, 'wb') as img_file:
-                                img_file.write(image_data)
-                            
-                            # 在Markdown中引用图片（使用相对路径）
-                            md_content += f"![图片](./{assets_folder_name}/{image_filename})\n\n"
-                            print(f"[Chat API] 已保存图片: {image_path}")
-                        else:
-                            md_content += f"*[图片格式不支持]*\n\n"
-                    except Exception as e:
-                        print(f"[Chat API] 图片处理失败: {e}")
-                        md_content += f"*[图片保存失败]*\n\n"
+            elif msg.image_url.startswith('http'):
+                # 如果是URL，直接引用
+                md_content += f"![图片]({msg.image_url})\n\n"
+            else:
+                # 如果是本地文件路径，尝试复制
+                try:
+                    source_path = Path(msg.image_url)
+                    if source_path.exists() and source_path.is_file():
+                        # 创建assets文件夹
+                        if not assets_dir.exists():
+                            assets_dir.mkdir(parents=True, exist_ok=True)
                         
-                elif msg.image_url.startswith('http'):
-                    # 如果是URL，直接引用
-                    md_content += f"![图片]({msg.image_url})\n\n"
-                else:
-                    # 如果是本地文件路径，尝试复制
-                    try:
-                        source_path = Path(msg.image_url)
-                        if source_path.exists() and source_path.is_file():
-                            # 创建assets文件夹
-                            if not assets_dir.exists():
-                                assets_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            image_counter += 1
-                            # 保留原文件扩展名
-                            ext = source_path.suffix
-                            image_filename = f"image_{image_counter}{ext}"
-                            image_path = assets_dir / image_filename
-                            
-                            # 复制文件
-                            shutil.copy2(source_path, image_path)
-                            
-                            # 在Markdown中引用图片
-                            md_content += f"![图片](./{assets_folder_name}/{image_filename})\n\n"
-                            print(f"[Chat API] 已复制图片: {image_path}")
-                        else:
-                            md_content += f"*[图片文件不存在: {msg.image_url}]*\n\n"
-                    except Exception as e:
-                        print(f"[Chat API] 复制图片失败: {e}")
-                        md_content += f"*[图片路径: {msg.image_url}]*\n\n"
-            
-            # 添加消息内容
-            md_content += f"{msg.content}\n\n"
-            md_content += "---\n\n"
-        
-        md_content += "*该对话记录由Study Helper自动生成*\n"
-        
-        # 保存文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-        
-        print(f"[Chat API] 聊天记录已保存: {file_path}")
-        if image_counter > 0:
-            print(f"[Chat API] 共保存 {image_counter} 张图片到: {assets_dir}")
-        
-        return {
-            "message": "聊天记录已保存",
-            "file_path": str(file_path),
-            "filename": md_filename,
-            "images_saved": image_counter
-        }
+                        image_counter += 1
+                        # 保留原文件扩展名
+                        ext = source_path.suffix
+                        image_filename = f"image_{image_counter}{ext}"
+                        image_path = assets_dir / image_filename
+                        
+                        # 复制文件
+                        shutil.copy2(source_path, image_path)
+                        
+                        # 在Markdown中引用图片
+                        md_content += f"![图片](./{assets_folder_name}/{image_filename})\n\n"
+                        print(f"[Chat API] 已复制图片: {image_path}")
+                    else:
+                        md_content += f"*[图片文件不存在: {msg.image_url}]*\n\n"
+                except Exception as e:
+                    print(f"[Chat API] 复制图片失败: {e}")
+                    md_content += f"*[图片路径: {msg.image_url}]*\n\n"
         
+        # 添加消息内容
+        md_content += f"{msg.content}\n\n"
+        md_content += "---\n\n"
+    
+    md_content += "*该对话记录由Study Helper自动生成*\n"
+    
+    # 保存文件
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(md_content)
+    
+    print(f"[Chat API] 聊天记录已保存: {file_path}")
+    if image_counter > 0:
+        print(f"[Chat API] 共保存 {image_counter} 张图片到: {assets_dir}")
+    
+    # 登记到聊天记录目录、加入全文检索索引（失败不影响保存，下次启动时按修改时间补齐）
+    try:
+        chat_history_catalog.record_save(file_path, [m.model_dump() for m in messages])
+        search_index.index_chat(file_path)
     except Exception as e:
-        print(f"[Chat API] 保存聊天记录失败: {e}")
-        raise HTTPException(status_code=500, detail=f"保存失败: {str(e)}")
\ No newline at end of file
+        print(f"[Chat API] 聊天记录目录或检索索引更新失败: {e}")
+    
+    return {
+        "message": "聊天记录已保存",
+        "file_path": str(file_path),
+        "filename": md_filename,
+        "images_saved": image_counter
+    }
\ No newline at end of file
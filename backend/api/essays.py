@@ -1,19 +1,52 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body
-from fastapi.responses import FileResponse
-from schemas.essays import EssayAnalysisResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Query, Request
+from fastapi.responses import FileResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from schemas.essays import EssayAnalysisResponse, EssayGradeResponse, EssayHistoryListResponse
+from schemas.jobs import JobSubmitResponse
 from services.excel_service import EssayTopicService
-from services.ai_service import AIService
+from services.ai_service import AIService, TOPIC_MODES, resolve_topic_mode
 from services.image_service import ImageService
-from config import TOPICS_DIR
+from services.topic_asset_service import topic_asset_cache
+from services.batch_service import BatchGradingService
+from services.job_queue import job_queue
+from services.rate_limiter import PRIORITY_BATCH
+from services.metrics import metrics
+from services.speculation import speculative_analyzer, text_key
+from services.similarity_index import essay_similarity
+from services.essay_checker import essay_checker, merge_findings
+from services.analysis_store import analysis_store
+from services.search_index import search_index
+from services.essay_metrics import essay_metrics, FEATURES as METRIC_FEATURES, TEXT_KINDS
+import config
+from config import TOPICS_DIR, JOB_FILES_DIR, UPLOADS_DIR
 from pathlib import Path
+from collections import deque
+import asyncio
 import json
+import time
+import uuid
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Union
 
 router = APIRouter()
 topic_service = EssayTopicService()
 ai_service = AIService()
-image_service = ImageService()
+image_service = ImageService(upload_dir=str(UPLOADS_DIR))  # 上传文件放在数据目录的临时目录，不写入程序目录
+job_image_service = ImageService(upload_dir=str(JOB_FILES_DIR))
+# 批量批改使用最低优先级，避免挤占交互请求的上游额度
+batch_ai_service = AIService(priority=PRIORITY_BATCH)
+batch_service = BatchGradingService(batch_ai_service, image_service, topic_service)
+# 两步流程（OCR、分析）各自最近的成功耗时，用于估算一次性批改节省的时间
+_stage_latencies = {"ocr": deque(maxlen=50), "analyze": deque(maxlen=50)}
+
+def _record_stage(stage: str, elapsed: float):
+    _stage_latencies[stage].append(elapsed)
+
+def _two_stage_baseline() -> Optional[float]:
+    """两步流程的典型耗时（两步耗时中位数之和，未计入第二次上传的往返时间）"""
+    if not all(_stage_latencies.values()):
+        return None
+    return sum(sorted(v)[len(v) // 2] for v in _stage_latencies.values())
 
 @router.get("/essays/topics")
 def get_topics():
@@ -30,9 +63,15 @@ async def add_topic(
     year: int = Form(...),
     essay_type: str = Form(...),
     topic_image: UploadFile = File(...),
-    reference: str = Form(...)
+    reference: str = Form(...),
+    topic_text: Optional[str] = Form(None)
 ):
-    """添加作文题目"""
+    """
+    添加作文题目
+    
+    topic_text 为题目文字（可选）；未填写时从题目图片自动提取一次，
+    之后分析作文默认发送题目文字而不是题目图片
+    """
     try:
         # 保存题目图片
         image_content = await topic_image.read()
@@ -40,18 +79,39 @@ async def add_topic(
         essay_type_short = "small" if essay_type == "小作文" else "large"
         filename = f"topic_{year}_{essay_type_short}_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
         
-        # 保存到topics目录
+        # 保存到topics目录（同一路径被覆盖时，先让旧图片的缓存失效）
         file_path = TOPICS_DIR / filename
+        topic_asset_cache.invalidate(str(file_path))
         with open(file_path, 'wb') as f:
             f.write(image_content)
         
         # 存储相对路径
         relative_path = f"data/topics/{filename}"
         
+        # 预先生成压缩后的题目图片缓存，后续分析直接复用
+        try:
+            await run_in_threadpool(topic_asset_cache.build, str(file_path))
+        except Exception as e:
+            print(f"[API] 题目图片缓存生成失败（分析时会重试）: {e}")
+        
+        # 提取题目文字（失败时留空，分析时使用题目图片，可稍后重新提取）
+        topic_text = (topic_text or '').strip()
+        topic_text_error = None
+        if not topic_text and config.TOPIC_TEXT_EXTRACT_ON_ADD:
+            extraction = await run_in_threadpool(ai_service.extract_topic_text, str(file_path))
+            topic_text, topic_text_error = extraction["text"], extraction["error"]
+        
         # 添加到数据库
-        topic_service.add_topic(year, essay_type, relative_path, reference)
+        topic_service.add_topic(year, essay_type, relative_path, reference, topic_text)
+        essay_similarity.update_reference(year, essay_type, reference)
+        essay_checker.add_text(reference)
         
-        return {"message": "题目添加成功", "image_path": relative_path}
+        return {
+            "message": "题目添加成功",
+            "image_path": relative_path,
+            "topic_text": topic_text,
+            "topic_text_error": topic_text_error
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -86,6 +146,36 @@ def get_topic_image(year: int, essay_type: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.put("/essays/topics/{year}/{essay_type}/text")
+def update_topic_text(year: int, essay_type: str, request_data: Dict[str, Any] = Body(default={})):
+    """
+    修改题目文字
+    
+    请求中带 text 时直接保存（用于修正自动提取的结果，空字符串表示清空、改回图片模式）；
+    不带 text 时从题目图片重新提取
+    """
+    try:
+        topic_data = topic_service.get_topic_by_year_and_type(year, essay_type)
+        if not topic_data:
+            raise HTTPException(status_code=404, detail="未找到题目")
+        
+        # 题目图片可能已在原路径被替换（重新提取文字的常见原因），一并刷新图片缓存
+        topic_asset_cache.invalidate(topic_data.get('题目图片路径', ''))
+        
+        text = request_data.get('text')
+        if text is None:
+            extraction = ai_service.extract_topic_text(topic_data.get('题目图片路径', ''))
+            if extraction["degraded"]:
+                raise HTTPException(status_code=502, detail=extraction["error"])
+            text = extraction["text"]
+        
+        topic_service.update_topic(year, essay_type, topic_text=str(text).strip())
+        return {"message": "题目文字已更新", "topic_text": str(text).strip()}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.delete("/essays/topics/{year}/{essay_type}")
 def delete_topic(year: int, essay_type: str):
     """删除作文题目"""
@@ -93,27 +183,428 @@ def delete_topic(year: int, essay_type: str):
         # 获取题目数据以删除图片
         topic_data = topic_service.get_topic_by_year_and_type(year, essay_type)
         if topic_data:
-            # 删除图片文件
+            # 删除图片文件及其缓存
             image_path = Path(topic_data['题目图片路径'])
+            topic_asset_cache.invalidate(str(image_path))
             if image_path.exists():
                 image_path.unlink()
         
         # 从数据库删除
         topic_service.delete_topic(year, essay_type)
+        essay_similarity.remove_reference(year, essay_type)
         
         return {"message": "题目删除成功"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def prune_topic_assets() -> int:
+    """清理题库中已不存在或已被替换的题目图片缓存（启动时调用）"""
+    try:
+        return topic_asset_cache.prune(topic_service.get_topic_image_paths())
+    except Exception as e:
+        print(f"[API] 清理题目图片缓存失败: {e}")
+        return 0
+
+def _split_pages(pages: List[str], tiled: Optional[bool]) -> Tuple[List[str], List[int]]:
+    """
+    按需把每页切分为重叠的水平段
+    tiled 为 None 时按图片高宽比自动判断，True 强制切分，False 不切分
+    
+    Returns:
+        (各段图片路径, 各段所属的页序号)
+    """
+    segments, page_numbers = [], []
+    for number, page in enumerate(pages):
+        if tiled is not False and (tiled or (config.OCR_TILE_ENABLED and image_service.should_tile(page))):
+            bands = image_service.split_into_bands(page)
+        else:
+            bands = [page]
+        segments.extend(bands)
+        page_numbers.extend([number] * len(bands))
+    return segments, page_numbers
+
+def _run_ocr(
+    image_path: str,
+    year: int,
+    essay_type: str,
+    topic_data: Dict = None,
+    extra_paths: List[str] = None,
+    tiled: Optional[bool] = None,
+    speculate: Optional[bool] = None
+) -> Dict:
+    """
+    预处理作文图片并进行OCR识别（同步执行，供接口线程池和后台任务共用）
+    
+    Args:
+        image_path: 作文图片（多页时为第一页）
+        extra_paths: 其余各页图片
+        tiled: 是否把长图切分为多段并行识别（None 为自动）
+        speculate: 是否在后台预先开始作文分析（None 时取 config.SPECULATIVE_ANALYSIS_ENABLED）
+    
+    Returns:
+        OCR接口的返回内容
+    """
+    if topic_data is None:
+        topic_data = topic_service.get_topic_by_year_and_type(year, essay_type)
+        if not topic_data:
+            raise ValueError(f"未找到{year}年{essay_type}的作文题目")
+    
+    started = time.perf_counter()
+    pages = [image_path] + list(extra_paths or [])
+    segments, page_numbers = _split_pages(pages, tiled)
+    
+    if len(segments) == 1:
+        # 预处理图片（方向校正、缩放、压缩）
+        processed_path = image_service.preprocess_image(image_path)
+        if processed_path != image_path:
+            image_service.cleanup_file(image_path)
+            image_path = processed_path
+        
+        # 使用AI进行OCR识别
+        print(f"[API] 开始OCR识别作文图片")
+        ocr_result = ai_service.image_to_text(image_path)
+        tiles = 1
+    else:
+        # 多段/多页：逐段预处理后并发识别，第一页原图保留供后续优化使用
+        processed = [image_service.preprocess_image(segment) for segment in segments]
+        print(f"[API] 开始分段OCR识别: {len(pages)} 页，{len(segments)} 段")
+        ocr_result = ai_service.image_to_text_tiled(processed, page_numbers)
+        tiles = ocr_result["tiles"]
+        for path in set(segments + processed + pages[1:]) - {image_path}:
+            image_service.cleanup_file(path)
+    
+    if not ocr_result["degraded"] and len(pages) == 1:
+        _record_stage("ocr", time.perf_counter() - started)
+    
+    speculation_id = None
+    if speculate is None:
+        speculate = config.SPECULATIVE_ANALYSIS_ENABLED
+    if speculate and not ocr_result["degraded"]:
+        speculation_id = _start_speculation(
+            year, essay_type, ocr_result["text"], topic_data.get('题目图片路径', ''), topic_data['参考范文'],
+            topic_data.get('题目文字', '')
+        )
+    
+    return {
+        "original_text": ocr_result["text"],
+        "degraded": ocr_result["degraded"],  # True 表示未得到真实识别结果
+        "model": ocr_result["model"],
+        "error": ocr_result["error"],
+        "essay_image_path": image_path,  # 保存路径供后续优化使用
+        "pages": len(pages),
+        "tiles": tiles,
+        "speculation_id": speculation_id,  # 后台预测分析的ID，提交分析时带上
+        "topic": f"{year}年{essay_type}",
+        "topic_image_path": topic_data.get('题目图片路径', ''),
+        "reference_essay": topic_data['参考范文']
+    }
+
+def _start_speculation(
+    year: int,
+    essay_type: str,
+    original_text: str,
+    topic_image_path: Optional[str],
+    reference_essay: str,
+    topic_text: str = ''
+) -> str:
+    """OCR完成后在后台按识别结果开始分析（使用批量优先级，不挤占交互请求的额度）"""
+    topic_mode = resolve_topic_mode(topic_text)
+    key = text_key(str(year), essay_type, original_text, topic_image_path or '', reference_essay, topic_mode)
+    return speculative_analyzer.start(key, lambda: batch_ai_service.optimize_essay(
+        topic_image_path=topic_image_path,
+        reference=reference_essay,
+        original=original_text,
+        essay_type=essay_type,
+        topic_text=topic_text,
+        topic_mode=topic_mode
+    ))
+
+def _topic_text(year: int, essay_type: str, topic_mode: Optional[str] = None) -> str:
+    """文字模式下读取题目文字（图片模式返回空字符串，不必查询题库）"""
+    if (topic_mode or config.ESSAY_TOPIC_MODE) != "text":
+        return ''
+    topic_data = topic_service.get_topic_by_year_and_type(int(year), essay_type)
+    return (topic_data or {}).get('题目文字', '')
+
+def _run_analysis(
+    year: int,
+    essay_type: str,
+    original_text: str,
+    topic_image_path: Optional[str],
+    reference_essay: str,
+    speculation_id: Optional[str] = None,
+    topic_mode: Optional[str] = None,
+    topic_text: Optional[str] = None
+) -> Dict:
+    """
+    优化作文并整理为分析结果（同步执行，供接口线程池和后台任务共用）
+    
+    Args:
+        speculation_id: OCR接口返回的预测分析ID；原文未修改时直接使用后台分析的结果，
+            已修改时取消后台分析
+        topic_mode: 题目提供方式（"text" / "image"，默认 config.ESSAY_TOPIC_MODE）
+        topic_text: 已查到的题目文字（为 None 时按需从题库读取）
+    
+    Returns:
+        符合 EssayAnalysisResponse 结构的字典
+    """
+    if topic_text is None:
+        topic_text = _topic_text(year, essay_type, topic_mode)
+    resolved_mode = resolve_topic_mode(topic_text, topic_mode)
+    
+    if speculation_id or config.SPECULATIVE_ANALYSIS_ENABLED:
+        key = text_key(
+            str(year), essay_type, original_text, topic_image_path or '', reference_essay, resolved_mode
+        )
+        optimization_result = speculative_analyzer.claim(key, speculation_id)
+        if optimization_result is not None:
+            result = _analysis_response(
+                year, essay_type, original_text, topic_image_path, reference_essay, optimization_result
+            )
+            result["speculative"] = True
+            return result
+    
+    print(f"[API] 使用文字版原文 + 题目{'文字' if resolved_mode == 'text' else '图片'}进行优化")
+    started = time.perf_counter()
+    optimization_result = ai_service.optimize_essay(
+        topic_image_path=topic_image_path,
+        reference=reference_essay,
+        original=original_text,
+        essay_type=essay_type,
+        topic_text=topic_text,
+        topic_mode=resolved_mode
+    )
+    elapsed = time.perf_counter() - started
+    if not optimization_result.get('degraded'):
+        _record_stage("analyze", elapsed)
+    
+    result = _analysis_response(year, essay_type, original_text, topic_image_path, reference_essay, optimization_result)
+    result["elapsed"] = round(elapsed, 3)
+    return result
+
+def _analysis_response(
+    year: int,
+    essay_type: str,
+    original_text: str,
+    topic_image_path: Optional[str],
+    reference_essay: str,
+    optimization_result: Dict
+) -> Dict:
+    """把模型返回的优化结果整理为 EssayAnalysisResponse 结构"""
+    # 本地验证结构（解析阶段已完成修复，降级结果无需再验证）
+    if not optimization_result.get('degraded'):
+        is_valid = ai_service.validate_structure(optimization_result)
+        if not is_valid:
+            print("[API] [WARNING] 返回结构验证失败，但继续返回数据")
+    
+    # 确保原文被包含在结果中
+    if 'original_text' not in optimization_result:
+        optimization_result['original_text'] = original_text
+    
+    # 提取评分信息
+    score_info = optimization_result.get('score', {'level': '未评分', 'points': 0})
+    
+    # 本地拼写/语法检查结果并入建议（模型调用失败时也能给出这部分反馈）
+    suggestions, local_check = _local_check(
+        original_text or optimization_result.get('original_text', ''), optimization_result.get('suggestions', {})
+    )
+    
+    return {
+        "topic": f"{year}年{essay_type}",
+        "topic_image_path": topic_image_path,
+        "reference_essay": reference_essay,
+        "original_text": optimization_result.get('original_text', original_text),
+        "score": score_info,
+        "optimized_text": optimization_result.get('optimized_text', ''),
+        "suggestions": suggestions,
+        "local_check": local_check,
+        "model": optimization_result.get('model'),
+        "topic_mode": optimization_result.get('topic_mode'),
+        "degraded": optimization_result.get('degraded', False),
+        "error": optimization_result.get('error')
+    }
+
+def _local_check(original_text: str, suggestions: Dict):
+    """
+    对原文做本地拼写与基础语法检查并并入建议
+    
+    Returns:
+        (合并后的建议, 本地检查的新增条数与耗时)；未启用或检查失败时原样返回建议和None
+    """
+    if not config.ESSAY_LOCAL_CHECK_ENABLED or not original_text:
+        return suggestions, None
+    try:
+        if not essay_checker.loaded:
+            essay_checker.load(topic_service.read_all()['参考范文'].tolist())
+        return merge_findings(suggestions, essay_checker.check(original_text))
+    except Exception as e:
+        print(f"[API] 本地检查失败，仅使用模型建议: {e}")
+        return suggestions, None
+
+def _job_file(path: str) -> str:
+    """
+    校验后台任务的图片路径位于 JOB_FILES_DIR 内（任务文件只能是 /essays/ocr 保存的上传图片）
+    
+    Raises:
+        ValueError: 路径不在任务文件目录内
+    """
+    resolved = Path(path).resolve()
+    if not resolved.is_relative_to(JOB_FILES_DIR.resolve()):
+        raise ValueError(f"任务图片不在任务文件目录内: {path}")
+    return str(resolved)
+
+def _ocr_job(payload: Dict) -> Dict:
+    """后台任务：作文OCR"""
+    return _run_ocr(
+        _job_file(payload['image_path']),
+        int(payload['year']),
+        payload['essay_type'],
+        extra_paths=[_job_file(path) for path in payload.get('extra_paths') or []],
+        tiled=payload.get('tiled'),
+        speculate=payload.get('speculate')
+    )
+
+def _cleanup_ocr_job(payload: Dict):
+    """OCR任务结束后删除上传的图片及预处理、切分生成的文件（同名前缀，只限任务文件目录内）"""
+    for path in [payload['image_path']] + list(payload.get('extra_paths') or []):
+        try:
+            source = Path(_job_file(path))
+        except ValueError as e:
+            print(f"[API] 跳过清理: {e}")
+            continue
+        for generated in source.parent.glob(f"{source.stem}_*"):
+            job_image_service.cleanup_file(str(generated))
+        job_image_service.cleanup_file(str(source))
+
+def _analysis_job(payload: Dict) -> Dict:
+    """后台任务：作文优化"""
+    result = _run_analysis(
+        int(payload['year']),
+        payload['essay_type'],
+        payload['original_text'],
+        payload.get('topic_image_path'),
+        payload['reference_essay'],
+        payload.get('speculation_id'),
+        payload.get('topic_mode')
+    )
+    return EssayAnalysisResponse(**result).model_dump()
+
+job_queue.register("essay_ocr", _ocr_job, cleanup=_cleanup_ocr_job)
+job_queue.register("essay_analyze", _analysis_job)
+
+def _prefetch_topic(year: int, essay_type: str) -> Optional[Dict]:
+    """查找题目并预先编码题目图片（与作文图片的上传并行进行）"""
+    topic_data = topic_service.get_topic_by_year_and_type(year, essay_type)
+    if topic_data:
+        topic_asset_cache.get_data_uri(topic_data.get('题目图片路径', ''))
+    return topic_data
+
+def _fused_failure(result: Dict) -> Optional[str]:
+    """检查一次性批改的结果，不可用时返回原因"""
+    if result.get('degraded'):
+        return result.get('error') or "多模态调用失败"
+    if not ai_service.validate_structure(result):
+        return "返回结构验证失败"
+    if not str(result.get('original_text', '')).strip():
+        return "未识别出作文原文"
+    return None
+
+def _run_grade(
+    image_path: str,
+    year: int,
+    essay_type: str,
+    topic_data: Dict,
+    fused: bool,
+    topic_mode: Optional[str] = None
+) -> Dict:
+    """
+    一次性批改：默认用一次多模态调用同时完成识别与分析，
+    结果不可用时回退到 OCR + 分析的两步流程
+    
+    Returns:
+        符合 EssayGradeResponse 结构的字典
+    """
+    started = time.perf_counter()
+    topic_image_path = topic_data.get('题目图片路径', '')
+    topic_text = topic_data.get('题目文字', '')
+    reference_essay = topic_data['参考范文']
+    
+    processed_path = image_service.preprocess_image(image_path)
+    if processed_path != image_path:
+        image_service.cleanup_file(image_path)
+        image_path = processed_path
+    
+    result = None
+    fallback_reason = None
+    if fused:
+        topic_label = '文字' if resolve_topic_mode(topic_text, topic_mode) == 'text' else '图片'
+        print(f"[API] 一次性批改：题目{topic_label} + 作文图片")
+        optimization_result = ai_service.optimize_essay_with_images(
+            topic_image_path=topic_image_path,
+            essay_image_path=image_path,
+            reference=reference_essay,
+            essay_type=essay_type,
+            topic_text=topic_text,
+            topic_mode=topic_mode
+        )
+        fallback_reason = _fused_failure(optimization_result)
+        if fallback_reason is None:
+            result = _analysis_response(
+                year, essay_type, optimization_result['original_text'],
+                topic_image_path, reference_essay, optimization_result
+            )
+        else:
+            print(f"[API] 一次性批改结果不可用，回退到两步流程: {fallback_reason}")
+    
+    if result is None:
+        ocr_result = ai_service.image_to_text(image_path)
+        if ocr_result["degraded"]:
+            raise RuntimeError(f"OCR识别失败: {ocr_result['error']}")
+        result = _run_analysis(
+            year, essay_type, ocr_result["text"], topic_image_path, reference_essay,
+            topic_mode=topic_mode, topic_text=topic_text
+        )
+    
+    elapsed = time.perf_counter() - started
+    mode = "fused" if fallback_reason is None and fused else "two_stage"
+    baseline = _two_stage_baseline()
+    saved = round(baseline - elapsed, 3) if baseline is not None and mode == "fused" else None
+    metrics.increment("essay_grade_total", mode=mode)
+    metrics.observe("essay_grade_seconds", elapsed, mode=mode)
+    if saved is not None:
+        metrics.increment("essay_grade_latency_saved_seconds", saved)
+    
+    result.update({
+        "essay_image_path": image_path,
+        "grading": {
+            "mode": mode,
+            "fallback_reason": fallback_reason,
+            "elapsed": round(elapsed, 3),
+            "two_stage_baseline": round(baseline, 3) if baseline is not None else None,
+            "latency_saved": saved
+        }
+    })
+    return result
+
 @router.post("/essays/ocr")
 async def ocr_essay(
     year: int = Form(...),
     essay_type: str = Form(...),
-    image: UploadFile = File(...)
+    image: UploadFile = File(...),
+    async_mode: bool = Form(False),
+    pages: List[UploadFile] = File([]),
+    tiled: Optional[bool] = Form(None),
+    speculate: Optional[bool] = Form(None)
 ):
     """
     第一步：OCR识别手写作文
-    返回识别出的文字
+    返回识别出的文字；async_mode=true 时立即返回后台任务ID，结果通过 /jobs/{job_id} 获取
+    
+    多页作文可通过 pages 上传第二页及之后的图片；长图（高宽比较大）会自动切分为
+    重叠的水平段并行识别，tiled 可强制开启（true）或关闭（false）
+    
+    speculate=true（或开启 config.SPECULATIVE_ANALYSIS_ENABLED）时，识别完成后立即在后台
+    开始作文分析，返回的 speculation_id 随 /essays/analyze 提交即可取得结果
     """
     try:
         # 1. 查找题目和范文（用于返回上下文信息）
@@ -121,29 +612,45 @@ async def ocr_essay(
         if not topic_data:
             raise HTTPException(status_code=404, detail=f"未找到{year}年{essay_type}的作文题目")
         
-        # 2. 保存上传的图片
+        # 2. 保存上传的图片（后台任务的图片需跨重启保留）
         image_content = await image.read()
         essay_type_short = "small" if essay_type == "小作文" else "large"
         filename = f"essay_{year}_{essay_type_short}_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
-        image_path = image_service.save_upload_file(image_content, filename)
+        if async_mode:
+            # 任务结束后按文件名前缀清理，加随机后缀避免同一秒提交的任务互相影响
+            filename = filename.replace(".jpg", f"_{uuid.uuid4().hex[:8]}.jpg")
+        target_service = job_image_service if async_mode else image_service
+        image_path = target_service.save_upload_file(image_content, filename)
+        
+        extra_paths = []
+        for index, page in enumerate(pages, start=2):
+            if not page.filename:
+                continue
+            page_filename = filename.replace(".jpg", f"_p{index}.jpg")
+            extra_paths.append(target_service.save_upload_file(await page.read(), page_filename))
         
         # 3. 验证图片
-        if not image_service.validate_image(image_path):
-            image_service.cleanup_file(image_path)
-            raise HTTPException(status_code=400, detail="无效的图片文件")
+        for path in [image_path] + extra_paths:
+            if not image_service.validate_image(path):
+                for saved in [image_path] + extra_paths:
+                    image_service.cleanup_file(saved)
+                raise HTTPException(status_code=400, detail="无效的图片文件")
         
-        # 4. 使用AI进行OCR识别
-        print(f"[API] 开始OCR识别作文图片")
-        original_text = ai_service.image_to_text(image_path)
+        if async_mode:
+            job_id = job_queue.submit("essay_ocr", {
+                "image_path": image_path,
+                "year": year,
+                "essay_type": essay_type,
+                "extra_paths": extra_paths,
+                "tiled": tiled,
+                "speculate": speculate
+            })
+            return {"job_id": job_id, "status": "queued"}
         
-        # 5. 返回识别结果和必要的上下文信息
-        return {
-            "original_text": original_text,
-            "essay_image_path": image_path,  # 保存路径供后续优化使用
-            "topic": f"{year}年{essay_type}",
-            "topic_image_path": topic_data.get('题目图片路径', ''),
-            "reference_essay": topic_data['参考范文']
-        }
+        # 4. 预处理与OCR（CPU密集与网络等待都放到线程池执行）
+        return await run_in_threadpool(
+            _run_ocr, image_path, year, essay_type, topic_data, extra_paths, tiled, speculate
+        )
         
     except HTTPException:
         raise
@@ -151,11 +658,13 @@ async def ocr_essay(
         raise HTTPException(status_code=500, detail=f"OCR识别失败: {str(e)}")
 
 
-@router.post("/essays/analyze", response_model=EssayAnalysisResponse)
+@router.post("/essays/analyze", response_model=Union[EssayAnalysisResponse, JobSubmitResponse])
 async def analyze_essay(request_data: Dict[str, Any] = Body(...)):
     """
     第二步：优化作文
-    接收OCR识别的文字，结合题目图片和范文进行优化
+    接收OCR识别的文字，结合题目图片和范文进行优化；
+    请求中 async_mode 为 true 时立即返回后台任务ID；
+    带上 /essays/ocr 返回的 speculation_id 时，原文未修改则直接使用后台预测分析的结果
     """
     try:
         # 从请求中提取数据
@@ -164,185 +673,430 @@ async def analyze_essay(request_data: Dict[str, Any] = Body(...)):
         original_text = request_data.get('original_text')
         topic_image_path = request_data.get('topic_image_path')
         reference_essay = request_data.get('reference_essay')
+        speculation_id = request_data.get('speculation_id')
+        topic_mode = request_data.get('topic_mode')
         
         if not all([year, essay_type, original_text, reference_essay]):
             raise HTTPException(status_code=400, detail="缺少必需参数")
+        if topic_mode is not None and topic_mode not in TOPIC_MODES:
+            raise HTTPException(status_code=400, detail=f"topic_mode 只能是 {', '.join(TOPIC_MODES)}")
         
-        # 使用optimize_essay方法（带题目图片的优化）
-        print(f"[API] 使用文字版原文 + 题目图片进行优化")
-        optimization_result = ai_service.optimize_essay(
-            topic_image_path=topic_image_path,
-            reference=reference_essay,
-            original=original_text,
-            essay_type=essay_type
+        if request_data.get('async_mode'):
+            job_id = job_queue.submit("essay_analyze", {
+                "year": year,
+                "essay_type": essay_type,
+                "original_text": original_text,
+                "topic_image_path": topic_image_path,
+                "reference_essay": reference_essay,
+                "speculation_id": speculation_id,
+                "topic_mode": topic_mode
+            })
+            return {"job_id": job_id, "status": "queued"}
+        
+        return await run_in_threadpool(
+            _run_analysis, year, essay_type, original_text, topic_image_path, reference_essay, speculation_id,
+            topic_mode
         )
         
-        # 验证结构
-        is_valid = ai_service.validate_structure(optimization_result)
-        if not is_valid:
-            print("[API] [WARNING] 返回结构验证失败，但继续返回数据")
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"优化失败: {str(e)}")
+
+@router.post("/essays/grade", response_model=EssayGradeResponse)
+async def grade_essay(
+    request: Request,
+    year: Optional[int] = Query(None),
+    essay_type: Optional[str] = Query(None)
+):
+    """
+    一次性批改手写作文（识别 + 分析合并为一次多模态调用）
+    
+    表单字段：image（作文图片）、fused（默认 true，false 时直接走两步流程）、
+    topic_mode（"text" / "image"，默认 config.ESSAY_TOPIC_MODE），
+    year/essay_type 也可放在表单中；放在查询参数中时，题目图片会在作文图片
+    上传的同时预先查找并编码。一次性结果验证失败时自动回退到两步流程，
+    响应中的 grading 给出实际路径和相比两步流程节省的时间
+    """
+    try:
+        # 1. 已知题目时先在线程池中预取题目图片，再接收上传的表单
+        prefetch = None
+        if year is not None and essay_type:
+            prefetch = asyncio.ensure_future(run_in_threadpool(_prefetch_topic, year, essay_type))
+        form = await request.form()
         
-        # 确保原文被包含在结果中
-        if 'original_text' not in optimization_result:
-            optimization_result['original_text'] = original_text
+        if prefetch is None:
+            try:
+                year = int(form.get('year'))
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="缺少必需参数: year")
+            essay_type = form.get('essay_type')
+            if not essay_type:
+                raise HTTPException(status_code=400, detail="缺少必需参数: essay_type")
+            prefetch = asyncio.ensure_future(run_in_threadpool(_prefetch_topic, year, essay_type))
         
-        # 提取评分信息
-        score_info = optimization_result.get('score', {'level': '未评分', 'points': 0})
+        image = form.get('image')
+        if image is None or isinstance(image, str):
+            prefetch.cancel()
+            raise HTTPException(status_code=400, detail="缺少作文图片")
+        fused = str(form.get('fused', 'true')).lower() not in ('false', '0', 'no')
+        topic_mode = form.get('topic_mode') or None
+        if topic_mode is not None and topic_mode not in TOPIC_MODES:
+            prefetch.cancel()
+            raise HTTPException(status_code=400, detail=f"topic_mode 只能是 {', '.join(TOPIC_MODES)}")
         
-        # 返回完整结果
-        return {
-            "topic": f"{year}年{essay_type}",
-            "topic_image_path": topic_image_path,
-            "reference_essay": reference_essay,
-            "original_text": optimization_result.get('original_text', original_text),
-            "score": score_info,
-            "optimized_text": optimization_result.get('optimized_text', ''),
-            "suggestions": optimization_result.get('suggestions', {})
-        }
+        # 2. 保存并验证作文图片
+        essay_type_short = "small" if essay_type == "小作文" else "large"
+        filename = f"essay_{year}_{essay_type_short}_{datetime.now().strftime('%Y%m%d%H%M%S')}.jpg"
+        image_path = image_service.save_upload_file(await image.read(), filename)
+        
+        topic_data = await prefetch
+        if not topic_data:
+            image_service.cleanup_file(image_path)
+            raise HTTPException(status_code=404, detail=f"未找到{year}年{essay_type}的作文题目")
+        if not image_service.validate_image(image_path):
+            image_service.cleanup_file(image_path)
+            raise HTTPException(status_code=400, detail="无效的图片文件")
+        
+        # 3. 批改（网络等待放到线程池执行）
+        return await run_in_threadpool(_run_grade, image_path, year, essay_type, topic_data, fused, topic_mode)
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"优化失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"批改失败: {str(e)}")
 
-@router.post("/essays/save")
-def save_analysis(request_data: Dict[str, Any] = Body(...)):
+@router.get("/essays/similar")
+def get_similar_essays(
+    text: Optional[str] = None,
+    year: Optional[int] = None,
+    essay_type: Optional[str] = None,
+    kind: Optional[str] = None,
+    k: int = 5
+):
     """
-    保存分析结果为markdown文件
+    检索相似的参考范文和已保存的作文分析（TF-IDF 余弦相似度）
+    
+    Args:
+        text: 查询文本；为空时以 year/essay_type 对应题目的参考范文作为查询（结果中排除该范文本身）
+        kind: reference（只查参考范文）或 analysis（只查已保存的分析），为空时都查
+        k: 返回的结果数
     """
+    if kind not in (None, "reference", "analysis"):
+        raise HTTPException(status_code=400, detail="kind 必须是 reference 或 analysis")
+    if not 1 <= k <= 50:
+        raise HTTPException(status_code=400, detail="k 必须在 1~50 之间")
     try:
-        year = request_data.get('year')
-        data = request_data.get('data')
-        # 创建输出目录（统一到 data root 下的 study-helper/output/essays）
-        from config import OUTPUT_DIR
-        output_dir = OUTPUT_DIR / "essays"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 生成文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"essay_analysis_{year}_{timestamp}.md"
-        file_path = output_dir / filename
+        essay_similarity.ensure_loaded(
+            None if essay_similarity.loaded else topic_service.read_all().to_dict('records')
+        )
         
-        # 获取打分信息
-        score = data.get('score', {})
-        score_text = ""
-        if score:
-            score_text = f"\n**评分**: {score.get('points', 0)}分 ({score.get('level', '未评分')})\n"
+        exclude = []
+        if not text:
+            if year is None or not essay_type:
+                raise HTTPException(status_code=400, detail="需要提供 text 或 year/essay_type")
+            topic_data = topic_service.get_topic_by_year_and_type(year, essay_type)
+            if not topic_data:
+                raise HTTPException(status_code=404, detail=f"未找到{year}年{essay_type}的作文题目")
+            text = topic_data['参考范文']
+            exclude.append(essay_similarity.reference_id(year, essay_type))
         
-        # 生成markdown内容
-        md_content = f"""# 英语作文分析报告
-
-**年份**: {year}
-**作文类型**: {data.get('essay_type', '')}
-{score_text}**生成时间**: {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-
----
-
-## 📝 题目
-
-{data.get('topic', '')}
-
----
-
-## 📚 参考范文
-
-```
-{data.get('reference_essay', '')}
-```
-
----
-
-## 📊 作文对比
-
-### 原文
-
-```
-{data.get('original_text', '')}
-```
-
-### 优化后
+        started = time.perf_counter()
+        results = essay_similarity.search(text, k=k, kind=kind, exclude=exclude)
+        return {
+            "results": results,
+            "documents": len(essay_similarity.index),
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"检索失败: {str(e)}")
 
-```
-{data.get('optimized_text', '')}
-```
+def _check_text_kind(text_kind: str):
+    if text_kind not in TEXT_KINDS:
+        raise HTTPException(status_code=400, detail=f"text_kind 必须是 {' 或 '.join(TEXT_KINDS)}")
 
----
+@router.get("/essays/metrics")
+def get_writing_metrics(
+    text_kind: str = "original",
+    essay_type: Optional[str] = None,
+    year: Optional[int] = None
+):
+    """
+    获取每篇已保存作文的写作指标（按保存时间排序）
+    
+    Args:
+        text_kind: original（学生原文）或 optimized（优化后文本）
+    """
+    _check_text_kind(text_kind)
+    try:
+        essay_metrics.sync()
+        return {"features": list(METRIC_FEATURES), "records": essay_metrics.history(text_kind, essay_type, year)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取写作指标失败: {str(e)}")
 
-## 💡 修改建议
+@router.get("/essays/metrics/trend")
+def get_writing_trend(
+    features: str = Query(
+        "word_count,mean_sentence_length,type_token_ratio,advanced_ratio,connective_density",
+        alias="metrics"
+    ),
+    text_kind: str = "original",
+    essay_type: Optional[str] = None,
+    window: int = Query(3, ge=1, le=20)
+):
+    """
+    获取写作指标随时间的变化（供图表使用）
+    
+    Args:
+        features: 逗号分隔的指标名（查询参数 metrics）
+        window: 滑动平均的窗口（篇）
+    """
+    _check_text_kind(text_kind)
+    names = [name.strip() for name in features.split(',') if name.strip()]
+    unknown = [name for name in names if name not in METRIC_FEATURES]
+    if not names or unknown:
+        raise HTTPException(status_code=400, detail=f"未知的指标: {', '.join(unknown)}；可选: {', '.join(METRIC_FEATURES)}")
+    try:
+        essay_metrics.sync()
+        return essay_metrics.trend(names, text_kind, essay_type, window)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取指标趋势失败: {str(e)}")
 
-### 1. 题意符合度
+@router.post("/essays/metrics/rebuild")
+def rebuild_writing_metrics():
+    """按已保存的分析结果重新计算全部写作指标"""
+    try:
+        started = time.perf_counter()
+        count = essay_metrics.sync(rebuild=True)
+        return {"analyses": count, "took_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"重新计算失败: {str(e)}")
 
-"""
-        
-        # 兼容 topic_compliance（新）和 topic_relevance（旧）
-        suggestions = data.get('suggestions', {})
-        topic_content = suggestions.get('topic_compliance') or suggestions.get('topic_relevance', [])
-        if isinstance(topic_content, list) and topic_content:
-            for item in topic_content:
-                md_content += f"- {item}\n"
-        elif isinstance(topic_content, str) and topic_content:
-            md_content += f"{topic_content}\n"
-        else:
-            md_content += "无建议\n"
-        
-        md_content += "\n### 2. 拼写错误\n\n"
-        
-        spelling_errors = suggestions.get('spelling_errors', [])
-        if spelling_errors:
-            for error in spelling_errors:
-                md_content += f"- {error}\n"
+@router.post("/essays/batch")
+async def create_batch(
+    images: List[UploadFile] = File(...),
+    year: Optional[int] = Form(None),
+    essay_type: Optional[str] = Form(None),
+    items: Optional[str] = Form(None)
+):
+    """
+    批量批改作文
+    上传多张作文图片，后台以受限并发执行 OCR 与优化，立即返回任务ID
+    
+    Args:
+        images: 作文图片列表
+        year: 所有图片共用的年份（未提供 items 时使用）
+        essay_type: 所有图片共用的作文类型（未提供 items 时使用）
+        items: 可选，JSON数组，按图片顺序给出每篇的 {"year": ..., "essay_type": ...}
+    """
+    try:
+        # 解析每篇作文的元数据
+        if items:
+            try:
+                metadata = json.loads(items)
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=400, detail="items 不是合法的JSON")
+            if not isinstance(metadata, list) or len(metadata) != len(images):
+                raise HTTPException(status_code=400, detail="items 数量必须与图片数量一致")
+        elif year and essay_type:
+            metadata = [{"year": year, "essay_type": essay_type}] * len(images)
         else:
-            md_content += "无拼写错误\n"
+            raise HTTPException(status_code=400, detail="缺少年份或作文类型")
         
-        md_content += "\n### 3. 语法错误\n\n"
+        # 预先查找题目，避免任务跑到一半才发现题目不存在
+        topics = {}
+        for meta in metadata:
+            key = (int(meta.get("year", 0)), meta.get("essay_type", ""))
+            if key not in topics:
+                topic_data = topic_service.get_topic_by_year_and_type(*key)
+                if not topic_data:
+                    raise HTTPException(status_code=404, detail=f"未找到{key[0]}年{key[1]}的作文题目")
+                topics[key] = topic_data
         
-        grammar_errors = suggestions.get('grammar_errors', [])
-        if grammar_errors:
-            for error in grammar_errors:
-                md_content += f"- {error}\n"
-        else:
-            md_content += "无语法错误\n"
+        # 保存并验证图片
+        job_items = []
+        for image, meta in zip(images, metadata):
+            key = (int(meta["year"]), meta["essay_type"])
+            essay_type_short = "small" if key[1] == "小作文" else "large"
+            filename = f"batch_{key[0]}_{essay_type_short}_{uuid.uuid4().hex[:8]}.jpg"
+            image_path = image_service.save_upload_file(await image.read(), filename)
+            if not image_service.validate_image(image_path):
+                image_service.cleanup_file(image_path)
+                for job_item in job_items:
+                    image_service.cleanup_file(job_item["image_path"])
+                raise HTTPException(status_code=400, detail=f"无效的图片文件: {image.filename}")
+            
+            job_items.append({
+                "filename": image.filename,
+                "image_path": image_path,
+                "year": key[0],
+                "essay_type": key[1],
+                "topic_image_path": topics[key].get('题目图片路径', ''),
+                "topic_text": topics[key].get('题目文字', ''),
+                "reference_essay": topics[key]['参考范文']
+            })
         
-        md_content += "\n### 4. 单词优化\n\n"
+        job = batch_service.create_job(job_items)
+        batch_service.start_job(job["job_id"])
         
-        word_opts = suggestions.get('word_optimization', [])
-        if word_opts:
-            for opt in word_opts:
-                md_content += f"- {opt}\n"
-        else:
-            md_content += "无需优化\n"
+        return {"job_id": job["job_id"], "total": len(job_items)}
         
-        md_content += "\n### 5. 句式优化\n\n"
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"创建批量任务失败: {str(e)}")
+
+@router.get("/essays/batch/{job_id}")
+def get_batch(job_id: str, include_results: bool = False):
+    """获取批量任务进度（include_results=true 时附带每篇的完整结果）"""
+    job = batch_service.get_job(job_id, include_results=include_results)
+    if job is None:
+        raise HTTPException(status_code=404, detail="未找到批量任务")
+    return job
+
+@router.get("/essays/batch/{job_id}/report")
+def get_batch_report(job_id: str):
+    """获取批量批改汇总报告（统计数据 + Markdown）"""
+    report = batch_service.build_report(job_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="未找到批量任务")
+    return report
+
+@router.post("/essays/save")
+def save_analysis(request_data: Dict[str, Any] = Body(...)):
+    """
+    保存分析结果
+    
+    结果以结构化记录存入分析结果表（可通过 /essays/history 查询和导出），
+    config.ESSAY_SAVE_MARKDOWN 为 True 时同时导出为 markdown 文件
+    """
+    try:
+        year = request_data.get('year')
+        data = request_data.get('data') or {}
+        score = data.get('score') or {}
+        local_check = data.get('local_check') or {}
         
-        sentence_opts = suggestions.get('sentence_optimization', [])
-        if sentence_opts:
-            for opt in sentence_opts:
-                md_content += f"- {opt}\n"
-        else:
-            md_content += "无需优化\n"
+        record = analysis_store.save({
+            "year": int(year) if str(year).isdigit() else None,
+            "essay_type": data.get('essay_type'),
+            "score_level": score.get('level'),
+            "score_points": score.get('points'),
+            "topic": data.get('topic', ''),
+            "reference_essay": data.get('reference_essay', ''),
+            "original_text": data.get('original_text', ''),
+            "optimized_text": data.get('optimized_text', ''),
+            "suggestions": data.get('suggestions') or {},
+            "model": data.get('model'),
+            "topic_mode": data.get('topic_mode'),
+            "timings": {
+                "analysis_seconds": data.get('elapsed'),
+                "grading": data.get('grading'),
+                "local_check_ms": local_check.get('elapsed_ms')
+            }
+        })
         
-        md_content += "\n### 6. 结构优化\n\n"
+        file_path = None
+        if config.ESSAY_SAVE_MARKDOWN:
+            _, file_path = analysis_store.export_markdown(record, write=True)
         
-        structure_opt = suggestions.get('structure_optimization', [])
-        if isinstance(structure_opt, list) and structure_opt:
-            for opt in structure_opt:
-                md_content += f"- {opt}\n"
-        elif isinstance(structure_opt, str) and structure_opt:
-            md_content += f"{structure_opt}\n"
-        else:
-            md_content += "无需优化\n"
+        # 加入相似度索引（失败不影响保存，下次检索前按记录ID补齐）
+        try:
+            essay_similarity.add_analysis(record)
+        except Exception as e:
+            print(f"[Similarity] 相似度索引更新失败: {e}")
         
-        md_content += "\n\n---\n\n*该报告由Study Helper自动生成*\n"
+        # 加入全文检索索引（失败不影响保存，下次启动时按记录ID补齐）
+        try:
+            search_index.index_analysis(record)
+        except Exception as e:
+            print(f"[API] 检索索引更新失败: {e}")
         
-        # 保存文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(md_content)
+        # 记录写作指标（失败不影响结果保存）
+        writing_metrics = None
+        try:
+            writing_metrics = essay_metrics.record(
+                record['source'],
+                record['original_text'],
+                record['optimized_text'],
+                year=record['year'],
+                essay_type=record['essay_type'],
+                points=record['score_points'],
+                created_at=record['created_at']
+            )
+        except Exception as e:
+            print(f"[API] 写作指标记录失败: {e}")
         
         return {
-            "message": "分析报告已保存",
-            "file_path": str(file_path)
+            "message": "分析结果已保存",
+            "id": record['id'],
+            "file_path": str(file_path) if file_path else None,
+            "metrics": writing_metrics
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"保存失败: {str(e)}")
 
+@router.get("/essays/history", response_model=EssayHistoryListResponse)
+def get_analysis_history(
+    year: Optional[int] = None,
+    essay_type: Optional[str] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100)
+):
+    """查询已保存的分析结果，支持按年份、作文类型、分数范围筛选和分页（新到旧）"""
+    try:
+        records, total = analysis_store.query(
+            year=year,
+            essay_type=essay_type,
+            min_points=min_score,
+            max_points=max_score,
+            page=page,
+            page_size=page_size
+        )
+        return {
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "data": records
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/essays/history/{analysis_id}")
+def get_analysis_detail(analysis_id: int):
+    """获取一条已保存的分析结果（评分、全部建议、原文与优化后文本、模型与耗时）"""
+    record = analysis_store.get(analysis_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="未找到分析结果")
+    return record
+
+@router.get("/essays/history/{analysis_id}/export")
+def export_analysis(analysis_id: int, format: str = "markdown"):
+    """
+    导出一条已保存的分析结果
+    
+    Args:
+        format: markdown（分析报告）或 json（完整记录）
+    """
+    if format not in ("markdown", "json"):
+        raise HTTPException(status_code=400, detail="format 只能是 markdown 或 json")
+    record = analysis_store.get(analysis_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="未找到分析结果")
+    
+    if format == "json":
+        content = json.dumps(record, ensure_ascii=False, indent=2)
+        media_type, filename = "application/json", f"{Path(record['source']).stem}.json"
+    else:
+        content, _ = analysis_store.export_markdown(record)
+        media_type, filename = "text/markdown; charset=utf-8", record['source']
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
@@ -0,0 +1,72 @@
+"""
+后台任务API
+任务由对应的业务接口提交（如 /essays/ocr、/essays/analyze 的 async_mode），这里提供查询、取消和状态订阅
+"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from schemas.jobs import JobStatus
+from services.job_queue import job_queue, TERMINAL_STATUSES
+from typing import List, Optional
+import asyncio
+import json
+
+router = APIRouter()
+
+@router.get("/jobs", response_model=List[JobStatus])
+def list_jobs(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500)
+):
+    """列出最近的任务"""
+    return job_queue.list(status=status, kind=kind, limit=limit)
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+def get_job(job_id: str):
+    """获取任务状态"""
+    job = job_queue.get(job_id, include_result=False)
+    if job is None:
+        raise HTTPException(status_code=404, detail="未找到任务")
+    return job
+
+@router.get("/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    """获取任务结果（任务未完成时返回409）"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="未找到任务")
+    if job["status"] not in TERMINAL_STATUSES:
+        raise HTTPException(status_code=409, detail=f"任务尚未完成，当前状态: {job['status']}")
+    return job
+
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+def cancel_job(job_id: str):
+    """取消任务"""
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="未找到任务")
+    return job
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    订阅任务状态（Server-Sent Events）
+    状态变化时推送一条事件，任务结束后推送结果并关闭连接
+    """
+    if job_queue.get(job_id, include_result=False) is None:
+        raise HTTPException(status_code=404, detail="未找到任务")
+    
+    async def event_stream():
+        last_status = None
+        while True:
+            job = await asyncio.to_thread(job_queue.get, job_id)
+            if job is None:
+                break
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield f"event: status\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if job["status"] in TERMINAL_STATUSES:
+                break
+            await asyncio.sleep(0.5)
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
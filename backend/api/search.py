@@ -0,0 +1,32 @@
+"""
+全文检索API
+"""
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from schemas.search import SearchResponse
+from services.search_index import search_index, KINDS
+from typing import Optional
+import time
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, description="查询文本（中英文均可）"),
+    kind: Optional[str] = Query(None, description="只检索 chat（聊天记录）或 essay（作文分析）"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    检索已保存的聊天记录和作文分析，按相关度返回命中片段
+    """
+    if kind is not None and kind not in KINDS:
+        raise HTTPException(status_code=400, detail=f"kind 必须是 {' 或 '.join(KINDS)}")
+    started = time.perf_counter()
+    results = await run_in_threadpool(search_index.search, q, kind, limit)
+    return {
+        "query": q,
+        "total": len(results),
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results
+    }
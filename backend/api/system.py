@@ -6,6 +6,13 @@ from pydantic import BaseModel
 import shutil
 from pathlib import Path
 import config
+from services.metrics import metrics
+from services.single_flight import request_coalescer
+from services.rate_limiter import rate_limiters
+from services.telemetry import telemetry
+from services.hedging import hedger
+from services.speculation import speculative_analyzer
+from services.answer_cache import answer_cache
 
 router = APIRouter()
 
@@ -109,3 +116,28 @@ async def cleanup_temp():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"清理临时文件失败: {str(e)}")
 
+
+
+@router.get("/system/metrics")
+async def get_metrics():
+    """
+    获取运行指标（计数器快照）
+    """
+    return {
+        "counters": metrics.snapshot(),
+        "histograms": metrics.histogram_snapshot(),
+        "in_flight_requests": request_coalescer.in_flight(),
+        "rate_limits": rate_limiters.snapshot(),
+        "hedging": hedger.snapshot(),
+        "speculation": speculative_analyzer.snapshot(),
+        "answer_cache": answer_cache.snapshot()
+    }
+
+
+@router.get("/system/telemetry")
+async def get_telemetry():
+    """
+    获取最近一段时间模型调用的滚动汇总（供设置页面展示）
+    按接口、模型分组统计调用次数、错误率、token用量、估算费用与延迟分位数
+    """
+    return telemetry.summary()
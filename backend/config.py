@@ -137,11 +137,15 @@ def reload_api_keys():
 # 初始加载
 MODELSCOPE_API_KEY, DASHSCOPE_API_KEY = get_api_keys()
 
-# ModelScope API基础URL（经过测试验证的端点）
-MODELSCOPE_API_BASE = "https://api-inference.modelscope.cn/v1/chat/completions"
+# ModelScope API基础URL（经过测试验证的端点，可通过环境变量指向本地模拟服务）
+MODELSCOPE_API_BASE = os.getenv(
+    "MODELSCOPE_API_BASE", "https://api-inference.modelscope.cn/v1/chat/completions"
+)
 
 # 阿里云百炼 DashScope API配置（用于Chat功能）
-DASHSCOPE_API_BASE = "https://dashscope.aliyuncs.com/compatible-mode/v1"
+DASHSCOPE_API_BASE = os.getenv(
+    "DASHSCOPE_API_BASE", "https://dashscope.aliyuncs.com/compatible-mode/v1"
+)
 
 # 模型配置（使用ModelScope平台的模型）
 # 使用 Qwen3-VL-30B-A3B-Thinking - ModelScope API 推理服务支持的多模态思考模型
@@ -153,6 +157,87 @@ VALIDATE_MODEL = "Qwen/Qwen3-30B-A3B-Instruct-2507"  # 结构验证模型
 # Chat功能使用的模型（阿里云百炼）
 CHAT_MODEL = "qwen-vl-plus"  # 支持多模态（文本+图片）的对话模型
 
+# 主模型不可用（熔断或重试耗尽）时依次尝试的备用模型
+MODEL_FALLBACKS = {
+    VISION_MODEL: [OCR_MODEL, OPTIMIZE_MODEL],
+}
+# 纯文本模型：降级到这些模型时会去掉消息中的图片
+TEXT_ONLY_MODELS = {OPTIMIZE_MODEL, VALIDATE_MODEL}
+
+# 上游调用容错配置
+AI_REQUEST_TIMEOUT = 120  # 单次请求超时（秒）
+AI_MAX_RETRIES = 2  # 可重试错误（超时、429、5xx）的最大重试次数
+AI_RETRY_BASE_DELAY = 1.0  # 指数退避基准时长（秒）
+AI_RETRY_MAX_DELAY = 8.0  # 单次退避上限（秒）
+CIRCUIT_FAILURE_THRESHOLD = 3  # 连续失败多少次后熔断
+CIRCUIT_RECOVERY_TIMEOUT = 60  # 熔断后多久放行探测请求（秒）
+
+# 上游限流（令牌桶）：requests_per_second/burst 限制请求频率，
+# tokens_per_minute 按本地估算的提示词token数限制用量（None 表示不限制）
+RATE_LIMITS = {
+    "modelscope": {"requests_per_second": 2, "burst": 4, "tokens_per_minute": None},
+    "dashscope": {"requests_per_second": 5, "burst": 10, "tokens_per_minute": None},
+}
+# 单个模型的额外限额，格式: {服务商: {模型名: 限额}}
+MODEL_RATE_LIMITS = {
+    "modelscope": {},
+    "dashscope": {},
+}
+RATE_LIMIT_MAX_WAIT = 60  # 排队等待上限（秒）
+RATE_LIMIT_AGING_SECONDS = 30  # 每等待多少秒优先级提升一级，防止批量任务饿死
+
+# 对冲请求：OCR主请求（ModelScope）超过近期延迟高分位数仍未返回时，
+# 向 DashScope 发送同样的请求，先返回有效结果者胜出（需同时配置两个密钥）
+HEDGE_ENABLED = False  # 默认关闭，开启后会产生少量额外调用费用
+HEDGE_OCR_MODEL = CHAT_MODEL  # 对冲使用的 DashScope 视觉模型
+HEDGE_PERCENTILE = 90  # 对冲阈值取主服务商近期延迟的分位数
+HEDGE_INITIAL_DELAY = 20.0  # 样本不足时的对冲阈值（秒）
+HEDGE_MIN_DELAY = 3.0  # 对冲阈值下限（秒）
+HEDGE_MAX_DELAY = 60.0  # 对冲阈值上限（秒）
+HEDGE_MIN_SAMPLES = 10  # 使用分位数阈值所需的最少样本数
+HEDGE_WINDOW = 200  # 统计阈值和对冲比例的最近调用数
+HEDGE_MAX_RATE = 0.1  # 对冲请求占调用总数的比例上限
+HEDGE_BURST = 1  # 允许超出比例上限的突发对冲次数
+HEDGE_MAX_WORKERS = 8  # 对冲调用线程池大小
+
+# 模型调用遥测
+TELEMETRY_WINDOW_SECONDS = 3600  # 滚动汇总覆盖的时间窗口（秒）
+TELEMETRY_MAX_RECORDS = 5000  # 内存中保留的调用明细上限
+# 模型单价估算（元/千token，(输入, 输出)），未列出的模型按0计；请按实际计费调整
+MODEL_PRICES = {
+    CHAT_MODEL: (0.0015, 0.0045),
+}
+
+# 批量批改：每个服务商同时进行的模型调用上限
+BATCH_PROVIDER_CONCURRENCY = {
+    "modelscope": 3,
+    "dashscope": 2,
+}
+BATCH_MAX_JOBS = 50  # 内存中保留的批量任务数量上限
+
+# 对话上下文管理：最近几轮原样发送，更早的轮次压缩为摘要
+CHAT_CONTEXT_TOKEN_BUDGET = 3000  # 原样保留的历史消息token预算（本地估算）
+CHAT_CONTEXT_MAX_TURNS = 6  # 最多原样保留的轮数（一问一答为一轮）
+CHAT_SUMMARY_MAX_TOKENS = 400  # 滚动摘要的token上限
+CHAT_SUMMARY_CACHE_SIZE = 256  # 缓存的摘要数量
+CHAT_IMAGE_TOKEN_ESTIMATE = 1000  # 单张图片按多少token估算
+
+# 对话答案缓存：无上下文的纯文本提问按问题相似度复用之前的回答
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_THRESHOLD = 0.8  # 判定为同一问题的相似度下限（0~1）
+ANSWER_CACHE_NUM_PERM = 128  # MinHash 签名长度
+ANSWER_CACHE_SHINGLE_SIZE = 3  # 字符 shingle 长度（规范化后的文本）
+ANSWER_CACHE_TTL_SECONDS = 24 * 3600  # 答案有效期（秒）
+ANSWER_CACHE_MAX_ENTRIES = 500  # 最多缓存的答案数
+
+# 作文本地检查：OCR原文先做本地拼写与基础语法检查，结果并入模型给出的建议
+ESSAY_LOCAL_CHECK_ENABLED = True
+ESSAY_SPELL_MAX_DISTANCE = 2  # 拼写纠错的最大编辑距离
+ESSAY_LOCAL_SPELLING_ONLY = False  # 为 True 时拼写错误完全由本地检查给出，提示词中不再要求模型列出
+
+# 作文分析结果：保存在本地数据库的分析结果表中，markdown 报告为导出格式
+ESSAY_SAVE_MARKDOWN = True  # 保存时同时在 output/essays 下导出 markdown 报告
+
 # 文件路径配置（使用函数确保正确初始化）
 def _init_dirs():
     """初始化所有目录"""
@@ -180,3 +265,62 @@ DATA_DIR, TEMP_DIR, OUTPUT_DIR, TOPICS_DIR, CHAT_HISTORY_DIR = _init_dirs()
 BASE_DIR = get_app_base_dir()
 UPLOADS_DIR = TEMP_DIR
 
+# 本地数据库（任务队列等结构化数据，不放在通过 /data 对外提供的目录下）
+DATABASE_PATH = get_data_root_dir() / "study_helper.db"
+
+# 后台任务使用的上传文件目录（需跨重启保留，不能放在 temp 下）
+JOB_FILES_DIR = get_data_root_dir() / "jobs"
+JOB_FILES_DIR.mkdir(parents=True, exist_ok=True)
+JOB_WORKERS = 2  # 后台任务工作协程数量
+
+# 服务端对话会话（历史按行追加保存，客户端每轮只发送新消息）
+CHAT_SESSION_DIR = get_data_root_dir() / "chat_sessions"
+CHAT_SESSION_DIR.mkdir(parents=True, exist_ok=True)
+CHAT_SESSION_CACHE_SIZE = 32  # 内存中保留的活跃会话数量
+
+# 对话图片按内容哈希存储，历史、会话与保存的聊天记录只引用图片ID
+CHAT_IMAGE_DIR = get_data_root_dir() / "chat_images"
+CHAT_IMAGE_DIR.mkdir(parents=True, exist_ok=True)
+CHAT_IMAGE_URI_CACHE_SIZE = 16  # 内存中缓存的图片 data URI 数量
+CHAT_MAX_CONTEXT_IMAGES = 4  # 一次请求最多发送的图片数（当前消息优先，其次是最近的历史图片）
+
+# 缓存目录（可随时删除，会按需重建）
+CACHE_DIR = get_data_root_dir() / "cache"
+TOPIC_ASSET_DIR = CACHE_DIR / "topics"
+TOPIC_ASSET_DIR.mkdir(parents=True, exist_ok=True)
+
+# 题目图片预处理配置（题目图片只需看清印刷文字，无需原始分辨率）
+TOPIC_IMAGE_MAX_EDGE = 1600  # 最长边像素
+TOPIC_IMAGE_QUALITY = 80  # JPEG压缩质量
+
+# 作文分析时题目的提供方式：
+# "text"  发送添加题目时从题目图片提取的文字，不发送图片（省去视觉token，延迟更低）
+# "image" 发送题目图片（保真度更高，适合图画、图表类题目）
+# 题目文字尚未提取时总是使用图片；分析接口可按请求用 topic_mode 覆盖
+ESSAY_TOPIC_MODE = "text"
+TOPIC_TEXT_EXTRACT_ON_ADD = True  # 添加题目且未手动填写题目文字时，自动从图片提取
+
+# 作文图片OCR预处理配置（手机拍摄的手写作文通常有4-12MB）
+OCR_IMAGE_MAX_EDGE = 2048  # 最长边像素，兼顾手写识别精度与上传体积
+OCR_IMAGE_GRAYSCALE = True  # 转为灰度图（手写作文无需颜色信息）
+OCR_IMAGE_AUTOCONTRAST = True  # 自动对比度拉伸，改善阴影与纸张泛黄
+OCR_IMAGE_FORMAT = "JPEG"  # 输出格式：JPEG 或 WEBP
+OCR_IMAGE_TARGET_BYTES = 600 * 1024  # 目标文件大小上限（字节）
+OCR_IMAGE_MAX_QUALITY = 90  # 压缩质量搜索上限
+OCR_IMAGE_MIN_QUALITY = 45  # 压缩质量搜索下限，低于此值时改为继续缩小尺寸
+
+# 分段并行OCR：高宽比很大的图片（长截图、多页拼接）切成重叠的水平段并发识别
+OCR_TILE_ENABLED = True  # 是否自动分段
+OCR_TILE_MIN_ASPECT = 1.8  # 高/宽达到该值时分段（A4 纸约为 1.41）
+OCR_TILE_BAND_ASPECT = 0.8  # 每段的目标高度（相对图片宽度）
+OCR_TILE_MAX_BANDS = 6  # 单张图片最多切分的段数
+OCR_TILE_OVERLAP = 0.12  # 相邻段的重叠比例（相对段高）
+OCR_TILE_CONCURRENCY = 4  # 同时识别的段数
+
+
+# 预测性分析：OCR完成后立即在后台开始作文分析，用户提交未修改的原文时直接返回结果
+SPECULATIVE_ANALYSIS_ENABLED = False  # 默认关闭（会为最终未提交的作文产生额外调用），可按请求开启
+SPECULATIVE_MAX_WORKERS = 2  # 同时进行的后台分析数
+SPECULATIVE_TTL_SECONDS = 30 * 60  # 结果保留时长（秒）
+SPECULATIVE_MAX_ENTRIES = 16  # 最多保留的后台分析数
+SPECULATIVE_WAIT_TIMEOUT = 300  # 提交分析时等待进行中的后台分析的最长时间（秒）
@@ -3,17 +3,35 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from api import chat as chat_api, scores as scores_api, essays as essays_api, tasks as tasks_api, system as system_api
+from api import jobs as jobs_api, search as search_api
+from services.job_queue import job_queue
+from services.search_index import search_index
+from services.chat_history import chat_history_catalog
+from services.telemetry import current_endpoint
+from contextlib import asynccontextmanager
 from pathlib import Path
 import config
 import shutil
 import atexit
 
+# --- 生命周期：启动/停止后台任务工作协程，启动时同步聊天记录目录和检索索引、清理过期的题目图片缓存 ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    await run_in_threadpool(chat_history_catalog.ensure_synced)
+    await run_in_threadpool(search_index.ensure_synced)
+    await run_in_threadpool(essays_api.prune_topic_assets)
+    yield
+    await job_queue.stop()
+
 # --- 应用创建 ---
 app = FastAPI(
     title="Study Helper API",
     description="个人学习助手后端API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # --- CORS 中间件配置 ---
@@ -31,12 +49,24 @@ app.add_middleware(
     allow_headers=["*"],  # 允许所有请求头
 )
 
+# --- 遥测：记录请求所属接口，供模型调用统计分组 ---
+@app.middleware("http")
+async def telemetry_endpoint_context(request, call_next):
+    path = request.url.path
+    token = current_endpoint.set(path[len("/api/v1"):] if path.startswith("/api/v1") else path)
+    try:
+        return await call_next(request)
+    finally:
+        current_endpoint.reset(token)
+
 # --- 路由包含 ---
 app.include_router(chat_api.router, prefix="/api/v1", tags=["Chat"])
 app.include_router(scores_api.router, prefix="/api/v1", tags=["Scores"])
 app.include_router(essays_api.router, prefix="/api/v1", tags=["Essays"])
 app.include_router(tasks_api.router, prefix="/api/v1", tags=["Tasks"])
 app.include_router(system_api.router, prefix="/api/v1", tags=["System"])
+app.include_router(jobs_api.router, prefix="/api/v1", tags=["Jobs"])
+app.include_router(search_api.router, prefix="/api/v1", tags=["Search"])
 
 # --- 静态文件服务 ---
 # 挂载 data 目录，使前端可以直接访问图片等静态资源
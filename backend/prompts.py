@@ -20,6 +20,26 @@ OCR_PROMPT = """你是一位对识别手写英文文本具有丰富经验的专
 请直接输出识别结果："""
 
 
+# 分段OCR提示词 - 长图切分后逐段识别（在OCR提示词基础上补充说明）
+OCR_TILE_PROMPT = OCR_PROMPT.rsplit("请直接输出识别结果：", 1)[0].rstrip() + """
+10. 这张图片是整篇作文自上而下切分后的第{index}/{total}部分，与相邻部分有少量重叠，顶部或底部可能有被切断的行：请照常识别其中能辨认的文字，不要补写被切掉的内容，也不要因为内容不完整而省略。
+
+请直接输出识别结果："""
+
+
+# 题目文字提取提示词 - 添加题目时把题目图片转写为文字，分析时代替题目图片发送
+TOPIC_TEXT_PROMPT = """你将看到一张考研英语作文题目的图片，请把题目完整转写为文字，供之后批改作文时代替图片使用。
+
+要求：
+1. 逐字转写题目中的所有英文内容，包括 Directions、写作情境、写作要点、字数要求和署名要求等，保留原有的分点与换行；
+2. 如果题目包含图画，用1~3句英文客观描述画面内容、人物动作和画中文字，以“[Picture] ”开头单独成段；
+3. 如果题目包含图表，写明图表类型、标题、横纵轴或分类，并列出图中全部数据，以“[Chart] ”开头单独成段；
+4. 忽略页码、题号、水印和答题区域；
+5. 只输出题目内容，不要添加解释、评论或前缀。
+
+请直接输出题目内容："""
+
+
 # 作文优化提示词 - 用于优化作文并生成建议（通用版本）
 ESSAY_OPTIMIZATION_PROMPT = """你是一位资深的英语作文批改老师。请根据以下信息分析和优化这篇英语作文。
 
@@ -186,10 +206,10 @@ JSON 结构：
 错误：["建议1建议2建议3"]"""
 
 
-# 结构验证提示词 - 用于验证JSON结构
-STRUCTURE_VALIDATION_PROMPT = """请检查以下JSON数据是否符合要求的结构。
+# 结构修复提示词 - 仅在本地JSON修复失败时使用
+STRUCTURE_REPAIR_PROMPT = """下面是一段作文批改结果，原本应为JSON，但格式有误（可能缺少括号、引号，被截断，或字段类型不对）。请将其修复为严格合法的JSON。
 
-要求的完整结构（作文优化返回）：
+要求的完整结构：
 {{
     "original_text": "字符串类型，识别出的学生原文（保留所有错误）",
     "score": {{
@@ -208,17 +228,14 @@ STRUCTURE_VALIDATION_PROMPT = """请检查以下JSON数据是否符合要求的
 }}
 
 注意事项：
-1. 所有suggestions的子字段必须是数组类型
-2. score必须包含level（字符串）和points（数字）两个字段
-3. original_text、optimized_text必须是字符串类型
-4. 所有字段都是必需的，不能缺少
+1. 只修复格式，不要改写、增删原有内容；
+2. suggestions 的子字段必须是数组，原来是一整段文字的请按条拆分；
+3. 被截断而缺失的内容用空字符串或空数组补齐。
 
-待验证的JSON：
-{json_data}
+待修复的内容：
+{raw_output}
 
-请回复：
-- 如果结构正确，只回复：YES
-- 如果结构错误，回复：NO，并简要说明缺少或错误的字段"""
+请只输出修复后的JSON，不要包含任何额外的文字说明。"""
 
 
 # 通用对话提示词 - 用于通用AI助手
@@ -346,3 +363,24 @@ $$
 
 # 你可以在这里添加更多提示词配置...
 
+
+# 对话摘要提示词 - 用于压缩较早的对话历史
+CHAT_SUMMARY_PROMPT = """请将以下考研辅导对话压缩为一段简洁的中文摘要，供后续对话参考。
+
+要求：
+1. 保留学生的问题、已给出的关键结论、公式和数值结果，以及学生的薄弱点和偏好；
+2. 省略寒暄和重复内容，不要添加对话中没有的信息；
+3. 如果提供了已有摘要，请将新对话合并进去，输出一份完整的新摘要；
+4. 摘要不超过{max_chars}字，直接输出摘要正文，不要任何前缀。
+
+【已有摘要】
+{previous_summary}
+
+【新对话】
+{conversation}"""
+
+
+# 本地拼写检查说明 - 拼写错误交给本地检查时追加在作文优化提示词末尾
+LOCAL_SPELLING_NOTE = """
+
+拼写错误由系统另行检查，无需输出。"""
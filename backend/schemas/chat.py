@@ -7,6 +7,7 @@ class Message(BaseModel):
     role: str  # 'user' 或 'assistant'
     content: str  # 消息内容
     image_url: Optional[str] = None  # 可选的图片URL（如果消息包含图片）
+    image_ids: Optional[List[str]] = None  # 图片存储中的图片ID（优先于 image_url，可以有多张）
 
 # 定义 ChatRequest 数据模型，用于验证进入的数据
 class ChatRequest(BaseModel):
@@ -17,12 +18,55 @@ class ChatRequest(BaseModel):
     message: str  # 用户当前输入的消息
     history: Optional[List[Message]] = []  # 历史对话记录
 
+# 上下文裁剪统计
+class ChatContextStats(BaseModel):
+    """本次请求的上下文裁剪情况（token数为本地估算值）"""
+    history_messages: int  # 客户端提供的历史消息数
+    kept_messages: int  # 原样发送的历史消息数
+    summarized_messages: int  # 压缩进摘要的历史消息数
+    summary_cached: bool  # 摘要是否直接命中缓存
+    original_tokens: int  # 完整历史的token数
+    sent_tokens: int  # 实际发送的历史（含摘要）token数
+    tokens_saved: int  # 节省的token数
+
 # 定义 ChatResponse 数据模型，用于规范返回的数据
 class ChatResponse(BaseModel):
     """聊天响应"""
     response: str  # AI的回复内容（Markdown格式）
+    context: Optional[ChatContextStats] = None  # 上下文裁剪统计
+    session_id: Optional[str] = None  # 使用服务端会话时的会话ID
+    image_ids: List[str] = []  # 本轮消息的图片ID，后续轮次和保存聊天记录时引用
+    cached: bool = False  # True 表示回答来自答案缓存（相似问题之前的回答）
+
+class ChatImage(BaseModel):
+    """已上传的对话图片"""
+    image_id: str
+    url: str
+
+# 服务端会话
+class ChatSession(BaseModel):
+    """对话会话"""
+    session_id: str
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    messages: List[Message] = []  # 图片以图片ID和访问地址的形式给出
     
 # 保存聊天记录的请求
 class SaveChatHistoryRequest(BaseModel):
     """保存聊天记录请求"""
-    messages: List[Message]  # 完整的对话历史
\ No newline at end of file
+    messages: List[Message]  # 完整的对话历史
+
+# 已保存聊天记录的目录
+class ChatHistoryItem(BaseModel):
+    """一份已保存的聊天记录"""
+    filename: str  # Markdown 文件名
+    saved_at: float  # 保存时间（时间戳）
+    message_count: int  # 消息数
+    first_user_message: str  # 第一条用户消息（截取前200字）
+    asset_count: int  # 图片数
+    asset_bytes: int  # 图片总大小（字节）
+
+class ChatHistoryPage(BaseModel):
+    """聊天记录分页列表（按保存时间从新到旧）"""
+    items: List[ChatHistoryItem]
+    next_cursor: Optional[str] = None  # 下一页游标，没有更多时为空
@@ -1,10 +1,27 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import List, Dict, Any, Optional
+import re
 
 class EssayScore(BaseModel):
     """作文评分"""
     level: str  # 档位，如"第三档"
     points: int  # 具体分数
+    
+    @field_validator('level', mode='before')
+    @classmethod
+    def _coerce_level(cls, value):
+        return value if isinstance(value, str) else str(value)
+    
+    @field_validator('points', mode='before')
+    @classmethod
+    def _coerce_points(cls, value):
+        # 模型偶尔返回 "6分"、"6.5" 这类字符串
+        if isinstance(value, str):
+            match = re.search(r'\d+(\.\d+)?', value)
+            if not match:
+                raise ValueError(f"无法解析分数: {value}")
+            value = match.group(0)
+        return int(round(float(value)))
 
 class EssayAnalysisResponse(BaseModel):
     """作文分析响应"""
@@ -15,15 +32,75 @@ class EssayAnalysisResponse(BaseModel):
     score: EssayScore  # 评分信息
     optimized_text: str  # 优化后的作文
     suggestions: Dict[str, Any]  # 建议
+    model: Optional[str] = None  # 实际使用的模型（可能是降级后的备用模型）
+    topic_mode: Optional[str] = None  # 题目提供方式：text（题目文字）或 image（题目图片）
+    elapsed: Optional[float] = None  # 模型分析耗时（秒），使用预测分析结果时为空
+    degraded: bool = False  # True 表示模型调用失败，结果不是真实分析
+    error: Optional[str] = None  # 降级原因
+    speculative: bool = False  # True 表示直接使用了OCR后台预测分析的结果
+    local_check: Optional[Dict[str, Any]] = None  # 本地拼写/语法检查并入的条数、耗时与未并入的可能拼写错误
+
+class GradeTiming(BaseModel):
+    """一次性批改的耗时统计"""
+    mode: str  # fused（单次多模态调用）或 two_stage（OCR + 分析）
+    fallback_reason: Optional[str] = None  # 回退到两步流程的原因
+    elapsed: float  # 本次批改的服务端耗时（秒）
+    two_stage_baseline: Optional[float] = None  # 近期两步流程的典型耗时（秒），样本不足时为空
+    latency_saved: Optional[float] = None  # 相比两步流程节省的时间（秒）
+
+class EssayGradeResponse(EssayAnalysisResponse):
+    """一次性批改响应"""
+    essay_image_path: str  # 作文图片路径
+    grading: GradeTiming
+
+class EssayHistoryItem(BaseModel):
+    """已保存分析结果的摘要"""
+    id: int
+    source: str  # 报告文件名（导出 markdown 时使用）
+    year: Optional[int] = None
+    essay_type: Optional[str] = None
+    score_level: Optional[str] = None
+    score_points: Optional[float] = None
+    model: Optional[str] = None
+    topic_mode: Optional[str] = None
+    created_at: float  # 保存时间（时间戳）
+
+class EssayHistoryListResponse(BaseModel):
+    """已保存分析结果的分页列表"""
+    total: int
+    page: int
+    page_size: int
+    data: List[EssayHistoryItem]
 
 class EssaySuggestions(BaseModel):
-    """作文建议"""
-    topic_compliance: List[str]  # 主题贴合度
-    spelling_errors: List[str]  # 拼写错误
-    grammar_errors: List[str]  # 语法错误
-    word_optimization: List[str]  # 词汇优化
-    sentence_optimization: List[str]  # 句式优化
-    structure_optimization: List[str]  # 结构优化
+    """作文建议（缺失的类别视为无建议）"""
+    topic_compliance: List[str] = []  # 主题贴合度
+    spelling_errors: List[str] = []  # 拼写错误
+    grammar_errors: List[str] = []  # 语法错误
+    word_optimization: List[str] = []  # 词汇优化
+    sentence_optimization: List[str] = []  # 句式优化
+    structure_optimization: List[str] = []  # 结构优化
+    
+    @field_validator('*', mode='before')
+    @classmethod
+    def _coerce_list(cls, value):
+        # 模型偶尔把多条建议合并成一个字符串，按行/编号拆开
+        if value is None:
+            return []
+        if isinstance(value, str):
+            items = re.split(r'\n+|(?:^|\s)(?=\d+[.、)）]\s*)', value)
+            items = [re.sub(r'^\s*(?:[-*•]|\d+[.、)）])\s*', '', item).strip() for item in items]
+            return [item for item in items if item]
+        if isinstance(value, list):
+            return [item if isinstance(item, str) else str(item) for item in value if item is not None]
+        return value
+
+class EssayOptimizationResult(BaseModel):
+    """模型返回的作文优化结果（用于本地结构校验与修复）"""
+    original_text: str = ""  # 识别出的学生原文（通用提示词下可能缺失，由调用方补齐）
+    score: EssayScore  # 评分信息
+    optimized_text: str  # 优化后的作文
+    suggestions: EssaySuggestions  # 建议
 
 class TopicInfo(BaseModel):
     """题目信息"""
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class JobSubmitResponse(BaseModel):
+    """任务提交结果"""
+    job_id: str
+    status: str
+
+class JobStatus(BaseModel):
+    """任务状态"""
+    job_id: str
+    kind: str
+    status: str  # queued / running / succeeded / failed / cancelled
+    priority: int
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
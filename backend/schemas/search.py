@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class SearchHit(BaseModel):
+    """一条检索结果"""
+    kind: str  # chat（聊天记录）或 essay（作文分析）
+    source: str  # 聊天记录文件名或作文分析报告文件名
+    analysis_id: Optional[int] = None  # 作文分析记录ID（可通过 /essays/history/{id} 查看）
+    title: str  # 聊天记录为第一条用户消息，作文分析为年份、类型和分数
+    snippet: str  # 命中片段
+    matched_terms: List[str]  # 文档中出现的查询词
+    score: float  # BM25 得分
+    created_at: float  # 保存时间（时间戳）
+
+class SearchResponse(BaseModel):
+    """检索结果"""
+    query: str
+    total: int
+    elapsed_ms: float  # 服务端检索耗时（毫秒）
+    results: List[SearchHit]
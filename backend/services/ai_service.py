@@ -3,31 +3,77 @@ AI服务模块 - 基于ModelScope API
 参考文档: https://modelscope.cn/docs/model-service/API-Inference/intro
 """
 import requests
-import json
 import base64
+import contextvars
+import hashlib
+import json
+import mimetypes
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 import config
+from services.topic_asset_service import topic_asset_cache
+from services.image_store import image_store
+from services.answer_cache import answer_cache
+from services.resilience import (
+    UpstreamError, RequestCancelled, RetryPolicy, circuit_breakers, is_retryable_status,
+    cancel_token, is_cancelled, cancellable_sleep
+)
+from services.hedging import hedger, SECONDARY
+from services.ocr_stitcher import stitch_ocr_texts
+from services.essay_result_parser import parse_essay_result, validate_essay_result
+from services.single_flight import request_coalescer
+from services.metrics import metrics
+from services.rate_limiter import rate_limiters, RateLimitTimeout, PRIORITY_ANALYSIS
+from services.chat_context import estimate_message_tokens
+from services.telemetry import (
+    telemetry, OUTCOME_SUCCESS, OUTCOME_ERROR, OUTCOME_CIRCUIT_OPEN, OUTCOME_RATE_LIMITED,
+    OUTCOME_CANCELLED
+)
 from prompts import (
     OCR_PROMPT,
+    OCR_TILE_PROMPT,
+    TOPIC_TEXT_PROMPT,
     ESSAY_OPTIMIZATION_PROMPT,
     SMALL_ESSAY_OPTIMIZATION_PROMPT,
     LARGE_ESSAY_OPTIMIZATION_PROMPT,
-    STRUCTURE_VALIDATION_PROMPT,
-    CHAT_SYSTEM_PROMPT
+    STRUCTURE_REPAIR_PROMPT,
+    CHAT_SYSTEM_PROMPT,
+    CHAT_SUMMARY_PROMPT,
+    LOCAL_SPELLING_NOTE
 )
 
+
+# 作文分析时题目的提供方式（见 config.ESSAY_TOPIC_MODE）
+TOPIC_MODES = ("text", "image")
+
+
+def resolve_topic_mode(topic_text: str, topic_mode: str = None) -> str:
+    """实际使用的题目提供方式：文字模式下题目文字为空时改用图片"""
+    mode = topic_mode or config.ESSAY_TOPIC_MODE
+    return "text" if mode == "text" and topic_text else "image"
+
+
+def _without_spelling_field(prompt_text: str) -> str:
+    """拼写错误交给本地检查时，去掉提示词中要求模型输出 spelling_errors 的行"""
+    lines = [line for line in prompt_text.split("\n") if '"spelling_errors"' not in line]
+    return "\n".join(lines) + LOCAL_SPELLING_NOTE
+
+
 class AIService:
     """AI服务类，使用ModelScope API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, priority: int = PRIORITY_ANALYSIS):
         """
         初始化AI服务
         
         Args:
             api_key: ModelScope API密钥
+            priority: 上游限流排队时的优先级（见 services.rate_limiter）
         """
         self.api_key = api_key or config.MODELSCOPE_API_KEY
+        self.priority = priority
         # 使用配置中的端点，避免在代码中硬编码 URL
         self.api_url = config.MODELSCOPE_API_BASE
         
@@ -42,29 +88,28 @@ class AIService:
         """获取最新的DashScope密钥（优先全局配置，其次实例自带）"""
         return config.DASHSCOPE_API_KEY or self.api_key
     
-    def _call_modelscope_api(
-        self, 
-        model: str, 
-        messages: list, 
-        temperature: float = 0.7,
-        max_tokens: int = 2000
-    ) -> Optional[str]:
+    def _post_chat_completion(
+        self,
+        url: str,
+        api_key: str,
+        model: str,
+        messages: list,
+        temperature: float,
+        max_tokens: int,
+        stats: Dict = None
+    ) -> str:
         """
-        调用ModelScope API的通用方法
+        发送一次 OpenAI 兼容的 chat/completions 请求（不重试）
         
         Args:
-            model: 模型名称
-            messages: 消息列表
-            temperature: 温度参数
-            max_tokens: 最大token数
-            
+            stats: 可选的统计字典，会累加 bytes_sent，并写入 ttfb 与 usage
+        
         Returns:
-            模型返回的文本内容，失败返回None
+            模型返回的文本内容
+            
+        Raises:
+            UpstreamError: 网络错误、非200状态码或响应格式异常
         """
-        api_key = self._get_modelscope_key()
-        if not api_key:
-            return None
-        
         headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {api_key}'  # 使用Bearer认证
@@ -77,58 +122,304 @@ class AIService:
             "max_tokens": max_tokens
         }
         
+        body = json.dumps(payload).encode('utf-8')
+        if stats is not None:
+            stats["bytes_sent"] = stats.get("bytes_sent", 0) + len(body)
+        
         try:
-            print(f"[AI Service] 调用模型: {model}")
             response = requests.post(
-                self.api_url,
+                url,
                 headers=headers,
-                json=payload,
-                timeout=120
+                data=body,
+                timeout=config.AI_REQUEST_TIMEOUT
             )
+        except requests.exceptions.Timeout:
+            raise UpstreamError("API调用超时", retryable=True)
+        except requests.exceptions.ConnectionError as e:
+            raise UpstreamError(f"API连接失败: {e}", retryable=True)
+        except requests.exceptions.RequestException as e:
+            # 其他请求异常（读取响应中断、SSL错误、重定向过多等）同样可以重试或降级
+            raise UpstreamError(f"API请求失败: {type(e).__name__}: {e}", retryable=True)
+        
+        if stats is not None:
+            # elapsed 为发出请求到解析完响应头的时间，即首字节时间
+            stats["ttfb"] = response.elapsed.total_seconds()
+        
+        if response.status_code != 200:
+            retry_after = response.headers.get('Retry-After')
+            raise UpstreamError(
+                f"API返回错误: {response.status_code} {response.text[:200]}",
+                status_code=response.status_code,
+                retryable=is_retryable_status(response.status_code),
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        
+        try:
+            result = response.json()
+        except ValueError:
+            raise UpstreamError("API响应不是合法的JSON", retryable=True)
+        
+        if stats is not None:
+            stats["usage"] = result.get('usage') or {}
+        
+        # 提取返回内容
+        if 'choices' in result and len(result['choices']) > 0:
+            content = result['choices'][0].get('message', {}).get('content', '')
+            if content:
+                return content
+        raise UpstreamError(f"响应格式异常: {str(result)[:200]}", retryable=True)
+    
+    @staticmethod
+    def _request_key(url: str, model: str, messages: list, temperature: float, max_tokens: int) -> str:
+        """请求的规范化哈希（相同地址、模型、消息与参数得到相同的键）"""
+        canonical = json.dumps(
+            {"url": url, "model": model, "messages": messages,
+             "temperature": temperature, "max_tokens": max_tokens},
+            sort_keys=True, ensure_ascii=False, separators=(',', ':')
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def _request_with_retry(
+        self,
+        model: str,
+        messages: list,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        url: str = None,
+        api_key: str = None
+    ) -> str:
+        """
+        模型调用入口：相同请求并发到达时合并为一次上游调用（如重复点击、前端重复渲染）
+        
+        带有自己取消信号的调用（如对冲请求中的主请求）不参与合并，
+        否则该调用落败被放弃时，合并到同一请求上的其他调用方也会收到 RequestCancelled
+        
+        参数与返回值同 _execute_with_retry
+        """
+        url = url or self.api_url
+        if cancel_token.get() is not None:
+            return self._execute_with_retry(model, messages, temperature, max_tokens, url, api_key)
+        key = self._request_key(url, model, messages, temperature, max_tokens)
+        content, shared = request_coalescer.do(
+            key,
+            lambda: self._execute_with_retry(model, messages, temperature, max_tokens, url, api_key)
+        )
+        if shared:
+            print(f"[AI Service] 合并重复请求: {model}")
+            metrics.increment("ai_singleflight_deduplicated", model=model)
+        else:
+            metrics.increment("ai_singleflight_upstream", model=model)
+        return content
+    
+    def _execute_with_retry(
+        self,
+        model: str,
+        messages: list,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        url: str = None,
+        api_key: str = None
+    ) -> str:
+        """
+        带熔断和指数退避重试的模型调用
+        
+        Args:
+            model: 模型名称
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大token数
+            url: 接口地址（默认ModelScope）
+            api_key: 接口密钥（默认ModelScope密钥）
             
-            if response.status_code != 200:
-                print(f"[AI Service] API返回错误: {response.status_code}")
-                print(f"[AI Service] 错误详情: {response.text}")
-                return None
+        Returns:
+            模型返回的文本内容
             
-            result = response.json()
+        Raises:
+            UpstreamError: 熔断中或重试耗尽
+        """
+        url = url or self.api_url
+        api_key = api_key or self._get_modelscope_key()
+        if not api_key:
+            raise UpstreamError("未配置API密钥")
+        
+        breaker = circuit_breakers.get(model)
+        if not breaker.allow_request():
+            telemetry.record(model, OUTCOME_CIRCUIT_OPEN, latency=0.0, attempts=0)
+            raise UpstreamError(f"模型 {model} 处于熔断状态")
+        
+        scheduler = rate_limiters.get(self._provider_for(url))
+        cost_tokens = sum(estimate_message_tokens(m) for m in messages)
+        
+        started = time.perf_counter()
+        stats: Dict = {}
+        attempts = 0
+        outcome = OUTCOME_ERROR
+        policy = RetryPolicy()
+        last_error = None
+        concluded = False
+        try:
+            for attempt in range(policy.max_retries + 1):
+                if is_cancelled():
+                    last_error = RequestCancelled()
+                    outcome = OUTCOME_CANCELLED
+                    break
+                try:
+                    # 每次尝试都占用一次服务商额度，按优先级排队
+                    try:
+                        waited = scheduler.acquire(model, self.priority, cost_tokens)
+                    except RateLimitTimeout as e:
+                        outcome = OUTCOME_RATE_LIMITED
+                        raise UpstreamError(str(e), retryable=False)
+                    if waited > 0.1:
+                        print(f"[AI Service] {model} 限流排队 {waited:.2f}s")
+                    print(f"[AI Service] 调用模型: {model}" + (f"（第{attempt + 1}次尝试）" if attempt else ""))
+                    attempts += 1
+                    content = self._post_chat_completion(url, api_key, model, messages, temperature, max_tokens, stats)
+                    breaker.record_success()
+                    concluded = True
+                    self._record_telemetry(model, OUTCOME_SUCCESS, started, attempts, stats)
+                    return content
+                except UpstreamError as e:
+                    last_error = e
+                    print(f"[AI Service] {model} 调用失败: {e}")
+                    if not e.retryable or attempt >= policy.max_retries:
+                        break
+                    cancellable_sleep(policy.backoff(attempt, e.retry_after))
             
-            # 提取返回内容
-            if 'choices' in result and len(result['choices']) > 0:
-                content = result['choices'][0].get('message', {}).get('content', '')
-                return content
+            # 只有服务端问题才计入熔断；4xx说明模型本身可用，释放探测名额
+            if isinstance(last_error, RequestCancelled):
+                breaker.release()
+            elif last_error.retryable:
+                breaker.record_failure()
             else:
-                print(f"[AI Service] 响应格式异常: {result}")
-                return None
-                
-        except requests.exceptions.Timeout:
-            print(f"[AI Service] API调用超时")
+                breaker.record_success()
+            concluded = True
+            self._record_telemetry(model, outcome, started, attempts, stats)
+            raise last_error
+        finally:
+            if not concluded:
+                # 意外异常：释放半开状态的探测名额并记录遥测，避免该模型的熔断器一直拒绝调用
+                print(f"[AI Service] {model} 调用出现意外异常，已释放熔断器探测名额")
+                breaker.release()
+                self._record_telemetry(model, OUTCOME_ERROR, started, attempts, stats)
+    
+    @staticmethod
+    def _record_telemetry(model: str, outcome: str, started: float, attempts: int, stats: Dict):
+        """记录一次模型调用的遥测数据"""
+        usage = stats.get("usage") or {}
+        telemetry.record(
+            model,
+            outcome,
+            latency=time.perf_counter() - started,
+            ttfb=stats.get("ttfb"),
+            attempts=attempts,
+            bytes_sent=stats.get("bytes_sent", 0),
+            prompt_tokens=int(usage.get("prompt_tokens") or 0),
+            completion_tokens=int(usage.get("completion_tokens") or 0)
+        )
+    
+    def _call_with_fallback(
+        self,
+        model: str,
+        messages: list,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        fallbacks: List[str] = None,
+        text_messages: list = None
+    ) -> Tuple[str, str]:
+        """
+        调用主模型，失败时按顺序降级到备用模型
+        
+        Args:
+            model: 主模型名称
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大token数
+            fallbacks: 备用模型列表（默认读取 config.MODEL_FALLBACKS）
+            text_messages: 降级到纯文本模型时使用的消息（为空时去掉 messages 中的图片）
+            
+        Returns:
+            (模型返回的文本内容, 实际使用的模型)
+            
+        Raises:
+            UpstreamError: 所有模型均不可用
+        """
+        if fallbacks is None:
+            fallbacks = config.MODEL_FALLBACKS.get(model, [])
+        
+        errors = []
+        for candidate in [model] + list(fallbacks):
+            candidate_messages = messages
+            if candidate in config.TEXT_ONLY_MODELS:
+                candidate_messages = text_messages or self._strip_images(messages)
+            try:
+                content = self._request_with_retry(candidate, candidate_messages, temperature, max_tokens)
+                if candidate != model:
+                    print(f"[AI Service] {model} 不可用，已降级到: {candidate}")
+                return content, candidate
+            except RequestCancelled:
+                # 调用已被取消，不再尝试备用模型
+                raise
+            except UpstreamError as e:
+                errors.append(f"{candidate}: {e}")
+        
+        raise UpstreamError("；".join(errors))
+    
+    def _call_modelscope_api(
+        self, 
+        model: str, 
+        messages: list, 
+        temperature: float = 0.7,
+        max_tokens: int = 2000
+    ) -> Optional[str]:
+        """
+        调用ModelScope API的通用方法（含重试与熔断，不做模型降级）
+        
+        Args:
+            model: 模型名称
+            messages: 消息列表
+            temperature: 温度参数
+            max_tokens: 最大token数
+            
+        Returns:
+            模型返回的文本内容，失败返回None
+        """
+        if not self._get_modelscope_key():
             return None
-        except Exception as e:
-            print(f"[AI Service] API调用异常: {e}")
+        
+        try:
+            return self._request_with_retry(model, messages, temperature, max_tokens)
+        except UpstreamError as e:
+            print(f"[AI Service] API调用失败: {e}")
             return None
     
-    def image_to_text(self, image_path: str, prompt: str = "") -> str:
+    def image_to_text(self, image_path: str, prompt: str = "") -> Dict:
         """
         将图像转换为文本（OCR）
         
-        使用 Qwen3-VL-Thinking 多模态思考模型进行图像识别
+        使用 Qwen3-VL-Thinking 多模态思考模型进行图像识别，
+        主模型不可用时降级到 OCR_MODEL
         
         Args:
             image_path: 图像文件路径
             prompt: 自定义提示词（可选）
             
         Returns:
-            识别出的文本内容
+            {"text": 识别出的文本, "model": 实际使用的模型,
+             "degraded": 是否未能得到真实识别结果, "error": 失败原因}
         """
         if not self._get_modelscope_key():
             print("[AI Service] 使用占位符 - OCR识别")
-            return self._get_placeholder_ocr_result()
+            return {
+                "text": self._get_placeholder_ocr_result(),
+                "model": None,
+                "degraded": True,
+                "error": "未配置MODELSCOPE_API_KEY，返回的是示例文本"
+            }
         
         try:
-            # 读取图片并转换为base64
-            with open(image_path, 'rb') as f:
-                image_data = base64.b64encode(f.read()).decode('utf-8')
+            # 读取图片并转换为 data URI
+            image_url = self._image_to_data_uri(image_path)
             
             # 使用配置文件中的提示词
             if not prompt:
@@ -142,30 +433,133 @@ class AIService:
                         {"type": "text", "text": prompt},
                         {
                             "type": "image_url", 
-                            "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}
+                            "image_url": {"url": image_url}
                         }
                     ]
                 }
             ]
             
-            # 调用 Qwen3-VL-Thinking 多模态思考模型
-            result = self._call_modelscope_api(
-                model=config.VISION_MODEL,
-                messages=messages,
-                temperature=0.1,  # 低温度，更准确的识别
-                max_tokens=2000
-            )
+            # 调用 Qwen3-VL-Thinking 多模态思考模型（OCR只能降级到视觉模型）
+            def call_primary():
+                return self._call_with_fallback(
+                    model=config.VISION_MODEL,
+                    messages=messages,
+                    temperature=0.1,  # 低温度，更准确的识别
+                    max_tokens=2000,
+                    fallbacks=[config.OCR_MODEL]
+                )
             
-            if result:
-                print(f"[AI Service] OCR识别成功，文本长度: {len(result)}")
-                return result
+            if self._hedging_enabled():
+                # 主请求过慢时对冲到 DashScope，先返回有效结果者胜出
+                (result, model), source = hedger.run(
+                    "ocr",
+                    call_primary,
+                    lambda: self._call_dashscope_vision(messages, temperature=0.1, max_tokens=2000),
+                    is_valid=lambda value: bool(value[0].strip())
+                )
+                if source == SECONDARY:
+                    print(f"[AI Service] OCR由对冲请求完成: {model}")
             else:
-                print("[AI Service] OCR识别失败，使用占位符")
-                return self._get_placeholder_ocr_result()
+                result, model = call_primary()
+            
+            print(f"[AI Service] OCR识别成功，文本长度: {len(result)}")
+            return {"text": result, "model": model, "degraded": False, "error": None}
                 
         except Exception as e:
-            print(f"[AI Service] OCR处理异常: {e}")
-            return self._get_placeholder_ocr_result()
+            print(f"[AI Service] OCR识别失败: {e}")
+            return {"text": "", "model": None, "degraded": True, "error": f"OCR识别失败: {e}"}
+    
+    def image_to_text_tiled(self, image_paths: List[str], pages: List[int] = None) -> Dict:
+        """
+        分段并行OCR：并发识别多段图片（长图切分出的水平段或多页作文），再拼接并去掉重叠部分
+        
+        Args:
+            image_paths: 自上而下（按页序）排列的图片路径
+            pages: 各段所属的页序号（为空时视为同一页的各段）；只在同一页的相邻段之间去重
+            
+        Returns:
+            与 image_to_text 相同的结构，另含 tiles（段数）
+        """
+        if len(image_paths) == 1 or not self._get_modelscope_key():
+            return {**self.image_to_text(image_paths[0]), "tiles": 1}
+        
+        total = len(image_paths)
+        workers = min(config.OCR_TILE_CONCURRENCY, total)
+        print(f"[AI Service] 分段OCR: {total} 段，并发 {workers}")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # 每段在复制的上下文中执行，保留遥测与取消信号
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self.image_to_text,
+                    path,
+                    OCR_TILE_PROMPT.format(index=index + 1, total=total)
+                )
+                for index, path in enumerate(image_paths)
+            ]
+            results = [future.result() for future in futures]
+        
+        failed = [index + 1 for index, r in enumerate(results) if r["degraded"]]
+        pages = pages or [0] * total
+        succeeded = [index for index, r in enumerate(results) if not r["degraded"]]
+        text = stitch_ocr_texts([results[i]["text"] for i in succeeded], [pages[i] for i in succeeded])
+        models = sorted({r["model"] for r in results if r["model"]})
+        error = None
+        if failed:
+            error = f"第 {', '.join(map(str, failed))} 段识别失败（共 {total} 段）: {results[failed[0] - 1]['error']}"
+            print(f"[AI Service] {error}")
+        return {
+            "text": text,
+            "model": ", ".join(models) or None,
+            "degraded": bool(failed),
+            "error": error,
+            "tiles": total
+        }
+    
+    def extract_topic_text(self, topic_image_path: str) -> Dict:
+        """
+        把题目图片转写为文字（添加题目时调用一次，之后分析作文时代替题目图片发送）
+        
+        Args:
+            topic_image_path: 题目图片路径
+            
+        Returns:
+            {"text": 题目文字, "model": 实际使用的模型,
+             "degraded": 是否未能得到真实结果, "error": 失败原因}
+        """
+        if not self._get_modelscope_key():
+            print("[AI Service] 未配置MODELSCOPE_API_KEY，跳过题目文字提取")
+            return {"text": "", "model": None, "degraded": True, "error": "未配置MODELSCOPE_API_KEY"}
+        
+        try:
+            # 使用预处理并缓存好的题目图片，与题目图片模式发送的内容一致
+            image_url = topic_asset_cache.get_data_uri(topic_image_path)
+            if not image_url:
+                raise FileNotFoundError(f"题目图片不存在: {topic_image_path}")
+            
+            messages = [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": TOPIC_TEXT_PROMPT},
+                        {"type": "image_url", "image_url": {"url": image_url}}
+                    ]
+                }
+            ]
+            result, model = self._call_with_fallback(
+                model=config.VISION_MODEL,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=2000,
+                fallbacks=[config.OCR_MODEL]
+            )
+            text = result.strip()
+            print(f"[AI Service] 题目文字提取成功，文本长度: {len(text)}")
+            return {"text": text, "model": model, "degraded": False, "error": None}
+        
+        except Exception as e:
+            print(f"[AI Service] 题目文字提取失败: {e}")
+            return {"text": "", "model": None, "degraded": True, "error": f"题目文字提取失败: {e}"}
     
     def optimize_essay(
         self, 
@@ -173,7 +567,9 @@ class AIService:
         reference: str, 
         original: str,
         essay_type: str = "",
-        prompt: str = ""
+        prompt: str = "",
+        topic_text: str = "",
+        topic_mode: str = None
     ) -> Dict:
         """
         优化作文并生成建议
@@ -184,20 +580,26 @@ class AIService:
             original: 学生原文
             essay_type: 作文类型（'小作文' 或 '大作文'）
             prompt: 自定义提示词（可选）
+            topic_text: 添加题目时提取的题目文字（可选）
+            topic_mode: "text" 发送题目文字、"image" 发送题目图片（默认 config.ESSAY_TOPIC_MODE）
             
         Returns:
-            包含优化文本和建议的字典
+            包含优化文本和建议的字典（topic_mode 为实际使用的题目提供方式）
         """
         if not self._get_modelscope_key():
             print("[AI Service] 使用占位符 - 作文优化")
-            return self._get_placeholder_optimization()
+            return self._get_placeholder_optimization(degraded_reason="未配置MODELSCOPE_API_KEY，返回的是示例结果")
         
         try:
-            # 读取题目图片并转换为base64
-            topic_image_base64 = None
-            if topic_image_path and Path(topic_image_path).exists():
-                with open(topic_image_path, 'rb') as f:
-                    topic_image_base64 = base64.b64encode(f.read()).decode('utf-8')
+            # 文字模式不发送题目图片；图片模式获取预处理并缓存好的题目图片 data URI
+            # （自定义提示词中没有题目文字，保持发送图片）
+            topic_mode = resolve_topic_mode("" if prompt else topic_text, topic_mode)
+            topic_image_url = None
+            if topic_mode == "image":
+                topic_image_url = topic_asset_cache.get_data_uri(topic_image_path)
+                if not topic_image_url and topic_text and not prompt:
+                    # 题目图片不可用时改用题目文字
+                    topic_mode = "text"
             
             # 使用配置文件中的提示词，并填充变量
             if not prompt:
@@ -209,11 +611,11 @@ class AIService:
                 else:
                     prompt_template = ESSAY_OPTIMIZATION_PROMPT
                 
-                # 不再在提示词中填充topic（因为是图片），只填充其他变量
-                prompt_text = f"""{prompt_template.split('【作文题目】')[0]}
+                def build_prompt(topic_section: str) -> str:
+                    prompt_text = f"""{prompt_template.split('【作文题目】')[0]}
 
 【作文题目】
-见上方题目图片
+{topic_section}
 
 【参考范文】
 {reference}
@@ -222,11 +624,18 @@ class AIService:
 {original}
 
 {prompt_template.split('【学生原文】')[1].split('{original}')[1] if '{original}' in prompt_template else ''}"""
+                    if config.ESSAY_LOCAL_SPELLING_ONLY:
+                        prompt_text = _without_spelling_field(prompt_text)
+                    return prompt_text
+                
+                # 图片模式下题目见图片，文字模式下直接填入题目文字
+                prompt_text = build_prompt(topic_text if topic_mode == "text" else "见上方题目图片")
             else:
                 prompt_text = prompt
             
             # 构建消息（使用 Qwen3-VL-Thinking 多模态思考模型）
-            if topic_image_base64:
+            text_messages = None
+            if topic_image_url:
                 # 多模态输入：题目图片 + 文字说明
                 messages = [
                     {
@@ -238,7 +647,7 @@ class AIService:
                             },
                             {
                                 "type": "image_url",
-                                "image_url": {"url": f"data:image/jpeg;base64,{topic_image_base64}"}
+                                "image_url": {"url": topic_image_url}
                             },
                             {
                                 "type": "text",
@@ -247,61 +656,54 @@ class AIService:
                         ]
                     }
                 ]
+                if topic_text and not prompt:
+                    # 降级到纯文本模型时看不到题目图片，改为在提示词中给出题目文字
+                    text_messages = [{"role": "user", "content": build_prompt(topic_text)}]
             else:
-                # 纯文本输入（兼容没有题目图片的情况）
+                # 纯文本输入（题目文字模式，或没有题目图片的情况）
                 messages = [
                     {"role": "user", "content": prompt_text}
                 ]
             
             # 统一使用 Qwen3-VL-Thinking 多模态思考模型
             # 这个模型结合了视觉理解和深度思考能力，非常适合作文优化任务
-            result = self._call_modelscope_api(
+            # 不可用时依次降级到 OCR_MODEL（视觉）和 OPTIMIZE_MODEL（纯文本）
+            result, model = self._call_with_fallback(
                 model=config.VISION_MODEL,
                 messages=messages,
                 temperature=0.5,  # 适中温度，平衡准确性和创造性
-                max_tokens=4000   # 增加token限制，给模型更多思考和输出空间
+                max_tokens=4000,  # 增加token限制，给模型更多思考和输出空间
+                text_messages=text_messages
             )
             
-            if not result:
-                print("[AI Service] 作文优化失败，使用占位符")
-                return self._get_placeholder_optimization()
-            
-            # 解析JSON返回
-            try:
-                # 提取JSON（有时模型会在前后加说明文字）
-                json_start = result.find('{')
-                json_end = result.rfind('}') + 1
-                
-                if json_start >= 0 and json_end > json_start:
-                    json_str = result[json_start:json_end]
-                    parsed_result = json.loads(json_str)
-                    
-                    # 验证结构
-                    if self._validate_optimization_structure(parsed_result):
-                        print("[AI Service] 作文优化成功")
-                        return parsed_result
-                    else:
-                        print("[AI Service] 返回结构不完整，使用占位符")
-                        return self._get_placeholder_optimization()
+            degraded, error = False, None
+            if topic_image_url and model in config.TEXT_ONLY_MODELS:
+                if text_messages:
+                    topic_mode = "text"
                 else:
-                    print("[AI Service] 无法提取JSON，使用占位符")
-                    return self._get_placeholder_optimization()
-                    
-            except json.JSONDecodeError as e:
-                print(f"[AI Service] JSON解析失败: {e}")
-                print(f"[AI Service] 原始返回: {result[:200]}...")
-                return self._get_placeholder_optimization()
+                    # 纯文本模型收不到题目图片，又没有题目文字：结果未参照题目，不能当作正常结果
+                    degraded = True
+                    error = f"已降级到纯文本模型 {model}，题目图片未能发送且没有题目文字，评分未参照题目要求"
+                    print(f"[AI Service] {error}")
+            
+            parsed_result = self._parse_optimization_result(result, original)
+            parsed_result.update({"model": model, "degraded": degraded, "error": error, "topic_mode": topic_mode})
+            print(f"[AI Service] 作文优化{'完成（结果不完整）' if degraded else '成功'}"
+                  f"（题目{'文字' if topic_mode == 'text' else '图片'}模式）")
+            return parsed_result
                 
         except Exception as e:
-            print(f"[AI Service] 作文优化异常: {e}")
-            return self._get_placeholder_optimization()
+            print(f"[AI Service] 作文优化失败: {e}")
+            return self._get_degraded_optimization(original, f"作文优化失败: {e}")
     
     def optimize_essay_with_images(
         self,
         topic_image_path: str,
         essay_image_path: str,
         reference: str,
-        essay_type: str = ""
+        essay_type: str = "",
+        topic_text: str = "",
+        topic_mode: str = None
     ) -> Dict:
         """
         使用 Qwen3-VL-Thinking 一次性处理题目图片和作文图片
@@ -314,26 +716,27 @@ class AIService:
             essay_image_path: 学生作文图片路径
             reference: 参考范文
             essay_type: 作文类型（'小作文' 或 '大作文'）
+            topic_text: 添加题目时提取的题目文字（可选）
+            topic_mode: "text" 发送题目文字、"image" 发送题目图片（默认 config.ESSAY_TOPIC_MODE）
             
         Returns:
-            包含优化文本和建议的字典
+            包含优化文本和建议的字典（topic_mode 为实际使用的题目提供方式）
         """
         if not self._get_modelscope_key():
             print("[AI Service] 使用占位符 - 多模态作文优化")
-            return self._get_placeholder_optimization()
+            return self._get_placeholder_optimization(degraded_reason="未配置MODELSCOPE_API_KEY，返回的是示例结果")
         
         try:
-            # 读取题目图片
-            topic_image_base64 = None
-            if topic_image_path and Path(topic_image_path).exists():
-                with open(topic_image_path, 'rb') as f:
-                    topic_image_base64 = base64.b64encode(f.read()).decode('utf-8')
+            # 文字模式只发送作文图片；图片模式获取预处理并缓存好的题目图片 data URI
+            topic_mode = resolve_topic_mode(topic_text, topic_mode)
+            topic_image_url = None
+            if topic_mode == "image":
+                topic_image_url = topic_asset_cache.get_data_uri(topic_image_path)
             
             # 读取作文图片
-            essay_image_base64 = None
+            essay_image_url = None
             if essay_image_path and Path(essay_image_path).exists():
-                with open(essay_image_path, 'rb') as f:
-                    essay_image_base64 = base64.b64encode(f.read()).decode('utf-8')
+                essay_image_url = self._image_to_data_uri(essay_image_path)
             
             # 根据作文类型选择提示词
             if essay_type == "小作文":
@@ -347,14 +750,21 @@ class AIService:
             base_prompt = prompt_template.split('【学生原文】')[0]
             instruction = prompt_template.split('【学生原文】')[1] if '【学生原文】' in prompt_template else ''
             
+            if topic_mode == "text":
+                topic_section = f"【作文题目】\n{topic_text}\n\n以下是学生手写作文图片"
+                topic_step = "**仔细阅读作文题目**"
+            else:
+                topic_section = "以下是题目图片和学生手写作文图片"
+                topic_step = "**仔细查看题目图片**"
+            
             prompt_text = f"""{base_prompt}
 
 【参考范文】
 {reference}
 
-以下是题目图片和学生手写作文图片，请按以下步骤分析：
+{topic_section}，请按以下步骤分析：
 
-1. **仔细查看题目图片**，理解题目要求、格式和评分标准
+1. {topic_step}，理解题目要求、格式和评分标准
 2. **识别学生手写作文**的所有内容（严格保留原文中的所有拼写和语法错误，不要修正）
 3. **对照题目和参考范文**进行深度分析
 4. **提供优化建议**
@@ -376,73 +786,52 @@ class AIService:
 {instruction}
 
 请确保返回的是有效的JSON格式，不要包含任何额外的文字说明。"""
+            if config.ESSAY_LOCAL_SPELLING_ONLY:
+                prompt_text = _without_spelling_field(prompt_text)
             
             # 构建多模态消息
-            content = [
-                {"type": "text", "text": "【题目图片】请先查看作文题目："}
-            ]
-            
-            if topic_image_base64:
+            content = []
+            if topic_image_url:
+                content.append({"type": "text", "text": "【题目图片】请先查看作文题目："})
                 content.append({
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{topic_image_base64}"}
+                    "image_url": {"url": topic_image_url}
                 })
             
             content.append({"type": "text", "text": "\n【学生作文图片】以下是学生的手写作文："})
             
-            if essay_image_base64:
+            if essay_image_url:
                 content.append({
                     "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{essay_image_base64}"}
+                    "image_url": {"url": essay_image_url}
                 })
             
             content.append({"type": "text", "text": f"\n{prompt_text}"})
             
             messages = [{"role": "user", "content": content}]
             
-            # 调用 Qwen3-VL-Thinking 多模态思考模型
+            # 调用 Qwen3-VL-Thinking 多模态思考模型（需要看到作文图片，只能降级到视觉模型）
             print(f"[AI Service] 使用 Qwen3-VL-Thinking 进行多模态分析")
-            result = self._call_modelscope_api(
+            result, model = self._call_with_fallback(
                 model=config.VISION_MODEL,
                 messages=messages,
                 temperature=0.5,
-                max_tokens=5000  # 更大的输出空间
+                max_tokens=5000,  # 更大的输出空间
+                fallbacks=[config.OCR_MODEL]
             )
             
-            if not result:
-                print("[AI Service] 多模态优化失败，使用占位符")
-                return self._get_placeholder_optimization()
-            
-            # 解析JSON返回
-            try:
-                json_start = result.find('{')
-                json_end = result.rfind('}') + 1
-                
-                if json_start >= 0 and json_end > json_start:
-                    json_str = result[json_start:json_end]
-                    parsed_result = json.loads(json_str)
-                    
-                    if self._validate_optimization_structure(parsed_result):
-                        print("[AI Service] 多模态作文优化成功")
-                        return parsed_result
-                    else:
-                        print("[AI Service] 返回结构不完整，使用占位符")
-                        return self._get_placeholder_optimization()
-                else:
-                    print("[AI Service] 无法提取JSON，使用占位符")
-                    return self._get_placeholder_optimization()
-                    
-            except json.JSONDecodeError as e:
-                print(f"[AI Service] JSON解析失败: {e}")
-                return self._get_placeholder_optimization()
+            parsed_result = self._parse_optimization_result(result)
+            parsed_result.update({"model": model, "degraded": False, "error": None, "topic_mode": topic_mode})
+            print(f"[AI Service] 多模态作文优化成功（题目{'文字' if topic_mode == 'text' else '图片'}模式）")
+            return parsed_result
                 
         except Exception as e:
-            print(f"[AI Service] 多模态优化异常: {e}")
-            return self._get_placeholder_optimization()
+            print(f"[AI Service] 多模态优化失败: {e}")
+            return self._get_degraded_optimization("", f"多模态优化失败: {e}")
     
     def validate_structure(self, data: Dict) -> bool:
         """
-        使用AI验证数据结构
+        本地验证作文优化结果的结构（不再调用模型）
         
         Args:
             data: 待验证的数据
@@ -450,48 +839,28 @@ class AIService:
         Returns:
             True表示结构有效，False表示无效
         """
-        if not self._get_modelscope_key():
-            # 没有API时，本地简单验证
-            return self._validate_optimization_structure(data)
-        
-        try:
-            # 使用配置文件中的提示词
-            prompt = STRUCTURE_VALIDATION_PROMPT.format(
-                json_data=json.dumps(data, ensure_ascii=False, indent=2)
-            )
-            
-            # 构建消息
-            messages = [
-                {"role": "user", "content": prompt}
-            ]
-            
-            # 调用API
-            result = self._call_modelscope_api(
-                model=config.VALIDATE_MODEL,
-                messages=messages,
-                temperature=0.1,
-                max_tokens=500
-            )
-            
-            if result and 'YES' in result.upper():
-                print("[AI Service] 结构验证通过")
-                return True
-            else:
-                print(f"[AI Service] 结构验证失败: {result}")
-                return False
-                
-        except Exception as e:
-            print(f"[AI Service] 结构验证异常: {e}")
-            # 异常时回退到本地验证
-            return self._validate_optimization_structure(data)
+        return self._validate_optimization_structure(data)
     
-    def chat(self, message: str, history: list = None) -> str:
+    @staticmethod
+    def chat_answer_scope() -> str:
+        """纯文本对话答案的缓存作用域（对话模型或系统提示词变化后不再复用旧答案）"""
+        return answer_cache.scope(config.OPTIMIZE_MODEL, CHAT_SYSTEM_PROMPT)
+    
+    def chat(
+        self,
+        message: str,
+        history: list = None,
+        context_summary: str = None,
+        cache_answer: bool = False
+    ) -> str:
         """
         通用对话功能（纯文本）
         
         Args:
             message: 用户消息
             history: 历史对话列表，格式: [{"role": "user", "content": "..."}, ...]
+            context_summary: 可选的早期对话摘要（附加在系统提示词之后）
+            cache_answer: 是否把成功的回答写入答案缓存（仅适用于无上下文的提问）
             
         Returns:
             AI的回复
@@ -506,12 +875,12 @@ class AIService:
             # 添加系统提示词
             messages.append({
                 "role": "system",
-                "content": CHAT_SYSTEM_PROMPT
+                "content": self._chat_system_prompt(context_summary)
             })
             
-            # 添加历史对话
+            # 添加历史对话（纯文本模型，去掉图片引用等额外字段）
             if history:
-                messages.extend(history)
+                messages.extend({"role": m.get("role", "user"), "content": m.get("content", "")} for m in history)
             
             # 添加当前消息
             messages.append({
@@ -528,6 +897,8 @@ class AIService:
             )
             
             if result:
+                if cache_answer:
+                    answer_cache.put(message, result, self.chat_answer_scope())
                 return result
             else:
                 return "抱歉，我现在无法回答。请稍后再试。"
@@ -536,7 +907,14 @@ class AIService:
             print(f"[AI Service] 对话异常: {e}")
             return "抱歉，处理您的请求时出现了问题。"
     
-    def chat_with_image(self, message: str, image_path: str = None, history: list = None) -> str:
+    def chat_with_image(
+        self,
+        message: str,
+        image_path: str = None,
+        history: list = None,
+        context_summary: str = None,
+        image_ids: List[str] = None
+    ) -> str:
         """
         支持图片的对话功能（多模态）
         使用阿里云百炼的qwen-vl-plus模型
@@ -544,7 +922,9 @@ class AIService:
         Args:
             message: 用户消息文本
             image_path: 可选的图片路径
-            history: 历史对话列表，格式: [{"role": "user/assistant", "content": "..."}, ...]
+            history: 历史对话列表，格式: [{"role": "user/assistant", "content": "...", "images": [图片ID, ...]}, ...]
+            context_summary: 可选的早期对话摘要（附加在系统提示词之后）
+            image_ids: 当前消息附带的图片ID（图片存储中的图片，可以有多张）
             
         Returns:
             AI的回复（Markdown格式）
@@ -560,37 +940,47 @@ class AIService:
             # 添加系统提示词
             messages.append({
                 "role": "system",
-                "content": CHAT_SYSTEM_PROMPT
+                "content": self._chat_system_prompt(context_summary)
             })
             
-            # 添加历史对话（只添加文本部分，保持简洁）
+            # 图片数量有上限：当前消息的图片优先，其余名额留给最近的历史图片
+            image_urls = []
+            if image_path and Path(image_path).exists():
+                image_urls.append(self._image_to_data_uri(image_path))
+            image_urls += [uri for uri in map(image_store.data_uri, image_ids or []) if uri]
+            remaining = max(config.CHAT_MAX_CONTEXT_IMAGES - len(image_urls), 0)
+            allowed_history_images = set()
+            for msg in reversed(history or []):
+                for image_id in reversed(msg.get("images") or []):
+                    if len(allowed_history_images) < remaining:
+                        allowed_history_images.add(image_id)
+            
+            # 添加历史对话（附带的图片按ID引用，超出名额的以文字占位）
             if history:
                 for msg in history:
-                    # 只保留role和content，移除image_url等额外字段
-                    messages.append({
-                        "role": msg.get("role", "user"),
-                        "content": msg.get("content", "")
-                    })
+                    history_images = msg.get("images") or []
+                    if not history_images:
+                        messages.append({
+                            "role": msg.get("role", "user"),
+                            "content": msg.get("content", "")
+                        })
+                        continue
+                    parts = [{"type": "text", "text": msg.get("content", "")}]
+                    for image_id in history_images:
+                        uri = image_store.data_uri(image_id) if image_id in allowed_history_images else None
+                        if uri:
+                            parts.append({"type": "image_url", "image_url": {"url": uri}})
+                        else:
+                            parts.append({"type": "text", "text": "[图片已省略]"})
+                    messages.append({"role": msg.get("role", "user"), "content": parts})
             
             # 构建当前用户消息
-            if image_path and Path(image_path).exists():
+            if image_urls:
                 # 多模态输入：文本 + 图片
-                with open(image_path, 'rb') as f:
-                    image_data = base64.b64encode(f.read()).decode('utf-8')
-                
                 user_message = {
                     "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": message
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_data}"
-                            }
-                        }
+                    "content": [{"type": "text", "text": message}] + [
+                        {"type": "image_url", "image_url": {"url": url}} for url in image_urls
                     ]
                 }
             else:
@@ -602,95 +992,160 @@ class AIService:
             
             messages.append(user_message)
             
-            # 调用阿里云百炼API
+            # 调用阿里云百炼API（含重试与熔断）
             print(f"[AI Service] 调用阿里云百炼 {config.CHAT_MODEL} 进行对话")
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f'Bearer {dashscope_key}'
-            }
-            
-            payload = {
-                "model": config.CHAT_MODEL,
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 2000
-            }
-            
-            response = requests.post(
-                f"{config.DASHSCOPE_API_BASE}/chat/completions",
-                headers=headers,
-                json=payload,
-                timeout=120
+            content = self._request_with_retry(
+                model=config.CHAT_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=2000,
+                url=f"{config.DASHSCOPE_API_BASE}/chat/completions",
+                api_key=dashscope_key
             )
-            
-            if response.status_code != 200:
-                print(f"[AI Service] API返回错误: {response.status_code}")
-                print(f"[AI Service] 错误详情: {response.text}")
-                return "抱歉，调用AI服务时出现错误。请稍后再试。"
-            
-            result = response.json()
-            
-            # 提取返回内容
-            if 'choices' in result and len(result['choices']) > 0:
-                content = result['choices'][0].get('message', {}).get('content', '')
-                if content:
-                    print(f"[AI Service] 对话成功，返回内容长度: {len(content)}")
-                    return content
-                else:
-                    return "抱歉，AI没有返回有效内容。"
-            else:
-                print(f"[AI Service] 响应格式异常: {result}")
-                return "抱歉，AI响应格式异常。"
+            print(f"[AI Service] 对话成功，返回内容长度: {len(content)}")
+            return content
                 
-        except requests.exceptions.Timeout:
-            print(f"[AI Service] API调用超时")
-            return "抱歉，请求超时。请稍后再试。"
+        except UpstreamError as e:
+            print(f"[AI Service] 对话失败: {e}")
+            return "抱歉，调用AI服务时出现错误。请稍后再试。"
         except Exception as e:
             print(f"[AI Service] 对话异常: {e}")
             return f"抱歉，处理您的请求时出现了问题：{str(e)}"
     
+    def summarize_chat(self, previous_summary: str, messages: list) -> Optional[str]:
+        """
+        将滑出上下文窗口的对话压缩为摘要（与已有摘要合并）
+        
+        Args:
+            previous_summary: 已有摘要，没有时为空字符串
+            messages: 新滑出窗口的消息列表
+            
+        Returns:
+            新的摘要，失败返回None
+        """
+        conversation = "\n".join(
+            f"{'学生' if msg.get('role') == 'user' else '助教'}: {msg.get('content', '')}"
+            for msg in messages
+        )
+        prompt = CHAT_SUMMARY_PROMPT.format(
+            max_chars=config.CHAT_SUMMARY_MAX_TOKENS,
+            previous_summary=previous_summary or "（无）",
+            conversation=conversation
+        )
+        request_messages = [{"role": "user", "content": prompt}]
+        
+        try:
+            # 优先使用 ModelScope 的非思考模型，仅有 DashScope 密钥时改用对话模型
+            if self._get_modelscope_key():
+                summary = self._request_with_retry(
+                    config.VALIDATE_MODEL, request_messages, temperature=0.3,
+                    max_tokens=config.CHAT_SUMMARY_MAX_TOKENS * 2
+                )
+            elif self._get_dashscope_key():
+                summary = self._request_with_retry(
+                    config.CHAT_MODEL, request_messages, temperature=0.3,
+                    max_tokens=config.CHAT_SUMMARY_MAX_TOKENS * 2,
+                    url=f"{config.DASHSCOPE_API_BASE}/chat/completions",
+                    api_key=self._get_dashscope_key()
+                )
+            else:
+                return None
+        except UpstreamError as e:
+            print(f"[AI Service] 对话摘要失败: {e}")
+            return None
+        
+        summary = summary.strip()
+        print(f"[AI Service] 对话摘要完成: {len(messages)} 条消息 -> {len(summary)} 字")
+        return summary or None
+    
     # ==================== 辅助方法 ====================
     
-    def _validate_optimization_structure(self, data: Dict) -> bool:
-        """本地验证优化结果的结构"""
-        # 必需的顶层字段
-        required_fields = ['original_text', 'score', 'optimized_text', 'suggestions']
-        
-        # suggestions 必需的子字段
-        required_suggestion_fields = [
-            'topic_compliance',
-            'spelling_errors',
-            'grammar_errors',
-            'word_optimization',
-            'sentence_optimization',
-            'structure_optimization'
-        ]
-        
-        # 检查顶层字段
-        for field in required_fields:
-            if field not in data:
-                print(f"[验证] 缺少字段: {field}")
-                return False
-        
-        # 检查 score 结构
-        score = data.get('score', {})
-        if not isinstance(score, dict):
-            print(f"[验证] score 不是字典类型")
-            return False
-        if 'level' not in score or 'points' not in score:
-            print(f"[验证] score 缺少 level 或 points 字段")
-            return False
+    def _hedging_enabled(self) -> bool:
+        """是否启用对冲请求（需同时配置两个服务商的密钥）"""
+        return config.HEDGE_ENABLED and bool(self._get_modelscope_key()) and bool(self._get_dashscope_key())
+    
+    def _call_dashscope_vision(self, messages: list, temperature: float, max_tokens: int) -> Tuple[str, str]:
+        """调用 DashScope 视觉模型（对冲请求使用）"""
+        content = self._request_with_retry(
+            model=config.HEDGE_OCR_MODEL,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            url=f"{config.DASHSCOPE_API_BASE}/chat/completions",
+            api_key=self._get_dashscope_key()
+        )
+        return content, config.HEDGE_OCR_MODEL
+    
+    @staticmethod
+    def _provider_for(url: str) -> str:
+        """根据接口地址判断服务商（用于限流）"""
+        return "dashscope" if url.startswith(config.DASHSCOPE_API_BASE) else "modelscope"
+    
+    @staticmethod
+    def _chat_system_prompt(context_summary: str = None) -> str:
+        """对话系统提示词（有早期对话摘要时附在末尾）"""
+        if not context_summary:
+            return CHAT_SYSTEM_PROMPT
+        return f"{CHAT_SYSTEM_PROMPT}\n\n## 之前的对话摘要\n\n{context_summary}"
+    
+    @staticmethod
+    def _strip_images(messages: list) -> list:
+        """去掉消息中的图片部分，供降级到纯文本模型时使用"""
+        stripped = []
+        for msg in messages:
+            content = msg.get("content")
+            if isinstance(content, list):
+                texts = [part.get("text", "") for part in content if part.get("type") == "text"]
+                msg = {**msg, "content": "\n".join(texts)}
+            stripped.append(msg)
+        return stripped
+    
+    def _parse_optimization_result(self, result: str, original: str = "") -> Dict:
+        """
+        从模型返回中提取、修复并校验作文优化JSON
+        本地修复（代码块、尾逗号、截断、字符串形式的建议）失败时，才请求 VALIDATE_MODEL 修复
+        
+        Args:
+            result: 模型原始输出
+            original: 学生原文（结果中缺失时补齐）
+            
+        Raises:
+            ValueError: 本地与模型修复均失败
+        """
+        parsed_result, error = parse_essay_result(result, original)
+        if parsed_result is not None:
+            return parsed_result
         
-        # 检查 suggestions 的子字段
-        suggestions = data.get('suggestions', {})
-        for field in required_suggestion_fields:
-            if field not in suggestions:
-                print(f"[验证] suggestions 缺少字段: {field}")
-                return False
-            if not isinstance(suggestions[field], list):
-                print(f"[验证] suggestions.{field} 不是列表类型")
-                return False
+        print(f"[AI Service] 本地修复失败（{error}），请求模型修复JSON")
+        print(f"[AI Service] 原始返回: {result[:200]}...")
+        repaired = self._call_modelscope_api(
+            model=config.VALIDATE_MODEL,
+            messages=[{"role": "user", "content": STRUCTURE_REPAIR_PROMPT.format(raw_output=result)}],
+            temperature=0.1,
+            max_tokens=5000
+        )
+        if repaired:
+            parsed_result, error = parse_essay_result(repaired, original)
+            if parsed_result is not None:
+                print("[AI Service] 模型修复JSON成功")
+                return parsed_result
         
+        raise ValueError(f"返回结构无效: {error}")
+    
+    @staticmethod
+    def _image_to_data_uri(image_path: str) -> str:
+        """读取图片文件并编码为 data URI（按扩展名确定MIME类型，预处理后可能是WEBP）"""
+        mime_type = mimetypes.guess_type(str(image_path))[0] or 'image/jpeg'
+        with open(image_path, 'rb') as f:
+            image_data = base64.b64encode(f.read()).decode('utf-8')
+        return f"data:{mime_type};base64,{image_data}"
+    
+    def _validate_optimization_structure(self, data: Dict) -> bool:
+        """本地验证优化结果的结构（允许可修复的差异，如字符串形式的建议列表）"""
+        _, error = validate_essay_result(data)
+        if error:
+            print(f"[验证] 结构无效: {error}")
+            return False
         return True
     
     def _get_placeholder_ocr_result(self) -> str:
@@ -708,9 +1163,37 @@ I look forward to hearing from you soon.
 Yours sincerely,
 Li Hua"""
     
-    def _get_placeholder_optimization(self) -> Dict:
-        """获取占位符优化结果"""
+    def _get_degraded_optimization(self, original: str, reason: str) -> Dict:
+        """
+        获取降级结果：保留学生原文，其余字段留空，并明确标记 degraded
+        
+        Args:
+            original: 学生原文
+            reason: 降级原因
+        """
+        return {
+            "original_text": original,
+            "score": {"level": "未评分", "points": 0},
+            "optimized_text": "",
+            "suggestions": {
+                "topic_compliance": [],
+                "spelling_errors": [],
+                "grammar_errors": [],
+                "word_optimization": [],
+                "sentence_optimization": [],
+                "structure_optimization": []
+            },
+            "model": None,
+            "degraded": True,
+            "error": reason
+        }
+    
+    def _get_placeholder_optimization(self, degraded_reason: str = None) -> Dict:
+        """获取占位符优化结果（仅用于未配置密钥时的演示，始终标记为 degraded）"""
         return {
+            "model": None,
+            "degraded": True,
+            "error": degraded_reason or "示例结果",
             "original_text": """Dear Sir,
 
 I want join your camp. I like English very much. Please tell me more information.
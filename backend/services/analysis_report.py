@@ -0,0 +1,156 @@
+"""
+作文分析报告模块
+把作文分析结果渲染为 Markdown 报告（导出格式），以及解析旧版 /essays/save 保存的 Markdown 报告
+（导入到分析结果表）
+"""
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+# 建议类别：(字段名, 报告中的小标题, 无内容时的说明)
+SUGGESTION_SECTIONS = (
+    ("topic_compliance", "题意符合度", "无建议"),
+    ("spelling_errors", "拼写错误", "无拼写错误"),
+    ("grammar_errors", "语法错误", "无语法错误"),
+    ("word_optimization", "单词优化", "无需优化"),
+    ("sentence_optimization", "句式优化", "无需优化"),
+    ("structure_optimization", "结构优化", "无需优化"),
+)
+
+
+def render_analysis_markdown(record: Dict) -> str:
+    """
+    把一条分析结果渲染为 Markdown 报告
+
+    Args:
+        record: 分析结果，包含 year、essay_type、score_level、score_points、topic、reference_essay、
+                original_text、optimized_text、suggestions、created_at（时间戳）
+
+    Returns:
+        Markdown 文本
+    """
+    score_text = ""
+    if record.get("score_level") is not None or record.get("score_points") is not None:
+        points = record.get("score_points") or 0
+        points = int(points) if float(points).is_integer() else points
+        score_text = f"\n**评分**: {points}分 ({record.get('score_level') or '未评分'})\n"
+    created_at = datetime.fromtimestamp(record.get("created_at") or datetime.now().timestamp())
+
+    md_content = f"""# 英语作文分析报告
+
+**年份**: {record.get('year') or ''}
+**作文类型**: {record.get('essay_type') or ''}
+{score_text}**生成时间**: {created_at.strftime("%Y-%m-%d %H:%M:%S")}
+
+---
+
+## 📝 题目
+
+{record.get('topic') or ''}
+
+---
+
+## 📚 参考范文
+
+```
+{record.get('reference_essay') or ''}
+```
+
+---
+
+## 📊 作文对比
+
+### 原文
+
+```
+{record.get('original_text') or ''}
+```
+
+### 优化后
+
+```
+{record.get('optimized_text') or ''}
+```
+
+---
+
+## 💡 修改建议
+"""
+
+    suggestions = record.get("suggestions") or {}
+    for number, (field, title, empty_text) in enumerate(SUGGESTION_SECTIONS, 1):
+        md_content += f"\n### {number}. {title}\n\n"
+        content = suggestions.get(field)
+        # 兼容 topic_compliance（新）和 topic_relevance（旧）
+        if field == "topic_compliance" and not content:
+            content = suggestions.get("topic_relevance")
+        if isinstance(content, list) and content:
+            for item in content:
+                md_content += f"- {item}\n"
+        elif isinstance(content, str) and content:
+            md_content += f"{content}\n"
+        else:
+            md_content += f"{empty_text}\n"
+
+    md_content += "\n\n---\n\n*该报告由Study Helper自动生成*\n"
+    return md_content
+
+
+def parse_analysis_markdown(path: Path) -> Optional[Dict]:
+    """
+    从已保存的分析报告中提取年份、作文类型、评分、生成时间、题目、范文、原文/优化后文本和各类建议
+
+    Returns:
+        解析结果字典，文件无法读取时返回None
+    """
+    try:
+        content = Path(path).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+    def field(name: str) -> str:
+        match = re.search(rf"\*\*{name}\*\*:\s*(.*)", content)
+        return match.group(1).strip() if match else ""
+
+    def block(title: str) -> str:
+        match = re.search(rf"### {title}\s*\n+```\n(.*?)\n```", content, re.S)
+        return match.group(1).strip() if match else ""
+
+    def section(title: str) -> str:
+        match = re.search(rf"## [^\n]*{title}\s*\n(.*?)\n---", content, re.S)
+        return match.group(1).strip() if match else ""
+
+    suggestions = {}
+    for number, (name, title, empty_text) in enumerate(SUGGESTION_SECTIONS, 1):
+        match = re.search(rf"### {number}\. {title}\n\n(.*?)(?=\n### |\n---|\Z)", content, re.S)
+        body = match.group(1).strip() if match else ""
+        lines = [line[2:].strip() for line in body.splitlines() if line.startswith("- ")]
+        if lines:
+            suggestions[name] = lines
+        elif body and body != empty_text:
+            # 旧版题意符合度、结构优化可能是一段文字而不是列表
+            suggestions[name] = body
+        else:
+            suggestions[name] = []
+
+    score = re.match(r"(\d+(?:\.\d+)?)分\s*\((.*)\)", field("评分"))
+    year = field("年份")
+    try:
+        generated_at = datetime.strptime(field("生成时间"), "%Y-%m-%d %H:%M:%S").timestamp()
+    except ValueError:
+        generated_at = None
+    reference = re.search(r"```\n(.*?)\n```", section("参考范文"), re.S)
+    points = float(score.group(1)) if score else None
+    return {
+        "year": int(year) if year.isdigit() else None,
+        "essay_type": field("作文类型") or None,
+        "points": int(points) if points is not None and points.is_integer() else points,
+        "score_level": score.group(2) if score else None,
+        "generated_at": generated_at,
+        "topic": section("题目"),
+        "reference_essay": reference.group(1).strip() if reference else "",
+        "original_text": block("原文"),
+        "optimized_text": block("优化后"),
+        "suggestions": suggestions,
+    }
@@ -0,0 +1,246 @@
+"""
+作文分析结果存储模块
+/essays/save 保存的分析结果以结构化记录存入本地SQLite（评分、各类建议、原文与优化后文本、模型、耗时），
+按年份、作文类型、分数建有索引，查看历史分析只需一次本地查询；Markdown 报告由记录渲染，作为导出格式。
+旧版只保存为 Markdown 文件的报告在首次使用时导入
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import config
+from services.analysis_report import parse_analysis_markdown, render_analysis_markdown
+from services.database import get_connection
+
+# 记录的全部列（id、created_at 之外按写入顺序）
+COLUMNS = (
+    "source", "year", "essay_type", "score_level", "score_points", "topic", "reference_essay",
+    "original_text", "optimized_text", "suggestions", "model", "topic_mode", "timings", "created_at",
+)
+# 历史列表返回的列（不含正文和建议，查看详情时再读取）
+SUMMARY_COLUMNS = (
+    "id", "source", "year", "essay_type", "score_level", "score_points", "model", "topic_mode", "created_at",
+)
+# 以JSON文本保存的列
+_JSON_COLUMNS = ("suggestions", "timings")
+
+
+def _decode(row) -> Dict:
+    record = dict(row)
+    for name in _JSON_COLUMNS:
+        if name in record:
+            record[name] = json.loads(record[name] or "{}")
+    return record
+
+
+class EssayAnalysisStore:
+    """作文分析结果表（SQLite）"""
+
+    def __init__(self, analyses_dir: Path = None):
+        """
+        Args:
+            analyses_dir: Markdown 报告目录（导出报告的位置，也是旧版报告的导入来源）
+        """
+        self.analyses_dir = Path(analyses_dir or config.OUTPUT_DIR / "essays")
+        self._lock = threading.Lock()
+        self._import_lock = threading.Lock()
+        self._imported = False
+        self._init_table()
+
+    def _init_table(self):
+        """初始化分析结果表（source 为报告文件名，也是相似度索引和写作指标表使用的来源标识）"""
+        with get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS essay_analyses (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT NOT NULL UNIQUE,
+                    year INTEGER,
+                    essay_type TEXT,
+                    score_level TEXT,
+                    score_points REAL,
+                    topic TEXT,
+                    reference_essay TEXT,
+                    original_text TEXT NOT NULL DEFAULT '',
+                    optimized_text TEXT NOT NULL DEFAULT '',
+                    suggestions TEXT NOT NULL DEFAULT '{}',
+                    model TEXT,
+                    topic_mode TEXT,
+                    timings TEXT NOT NULL DEFAULT '{}',
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_essay_analyses_filter ON essay_analyses (year, essay_type, created_at)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_essay_analyses_score ON essay_analyses (score_points)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_essay_analyses_time ON essay_analyses (created_at)")
+
+    def _source_name(self, conn, year, created_at: float) -> str:
+        """按年份和时间生成报告文件名（同一秒内多次保存时追加序号）"""
+        base = f"essay_analysis_{year}_{datetime.fromtimestamp(created_at).strftime('%Y%m%d_%H%M%S')}"
+        name, number = f"{base}.md", 1
+        while (conn.execute("SELECT 1 FROM essay_analyses WHERE source = ?", (name,)).fetchone()
+               or (self.analyses_dir / name).exists()):
+            number += 1
+            name = f"{base}_{number}.md"
+        return name
+
+    @staticmethod
+    def _row(record: Dict) -> Tuple:
+        values = dict(record)
+        for name in _JSON_COLUMNS:
+            values[name] = json.dumps(values.get(name) or {}, ensure_ascii=False)
+        for name in ("original_text", "optimized_text"):
+            values[name] = values.get(name) or ""
+        return tuple(values.get(name) for name in COLUMNS)
+
+    def save(self, record: Dict) -> Dict:
+        """
+        保存一条分析结果
+
+        Args:
+            record: year、essay_type、score_level、score_points、topic、reference_essay、original_text、
+                    optimized_text、suggestions、model、topic_mode、timings，以及可选的 created_at、
+                    source（默认按年份和时间生成报告文件名）
+
+        Returns:
+            保存后的完整记录（含 id 和 source）
+        """
+        self.ensure_imported()
+        record = {**record, "created_at": record.get("created_at") or time.time()}
+        with self._lock, get_connection() as conn:
+            if not record.get("source"):
+                record["source"] = self._source_name(conn, record.get("year"), record["created_at"])
+            cursor = conn.execute(
+                f"INSERT INTO essay_analyses ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                self._row(record)
+            )
+            analysis_id = cursor.lastrowid
+        return self.get(analysis_id)
+
+    def get(self, analysis_id: int) -> Optional[Dict]:
+        """按ID读取完整记录"""
+        self.ensure_imported()
+        with get_connection() as conn:
+            row = conn.execute("SELECT * FROM essay_analyses WHERE id = ?", (analysis_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def query(
+        self,
+        year: Optional[int] = None,
+        essay_type: Optional[str] = None,
+        min_points: Optional[float] = None,
+        max_points: Optional[float] = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Tuple[List[Dict], int]:
+        """
+        按条件分页查询历史分析（新到旧）
+
+        Returns:
+            (当前页的记录摘要, 符合条件的总数)
+        """
+        self.ensure_imported()
+        conditions, params = [], []
+        if year is not None:
+            conditions.append("year = ?")
+            params.append(year)
+        if essay_type:
+            conditions.append("essay_type = ?")
+            params.append(essay_type)
+        if min_points is not None:
+            conditions.append("score_points >= ?")
+            params.append(min_points)
+        if max_points is not None:
+            conditions.append("score_points <= ?")
+            params.append(max_points)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        with get_connection() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM essay_analyses{where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM essay_analyses{where} "
+                f"ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def records_after(self, last_id: int = 0, columns: Sequence[str] = None) -> List[Dict]:
+        """
+        ID 大于 last_id 的记录（按ID递增），供相似度索引和写作指标增量同步
+
+        Args:
+            columns: 需要的列（默认全部）
+        """
+        self.ensure_imported()
+        selected = ", ".join(columns) if columns else "*"
+        with get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT {selected} FROM essay_analyses WHERE id > ? ORDER BY id", (last_id,)
+            ).fetchall()
+        return [_decode(row) for row in rows]
+
+    def export_markdown(self, record: Dict, write: bool = False) -> Tuple[str, Optional[Path]]:
+        """
+        把记录渲染为 Markdown 报告
+
+        Args:
+            write: 是否同时写入报告目录（文件名为记录的 source）
+
+        Returns:
+            (Markdown 文本, 写入的文件路径或None)
+        """
+        content = render_analysis_markdown(record)
+        if not write:
+            return content, None
+        self.analyses_dir.mkdir(parents=True, exist_ok=True)
+        path = self.analyses_dir / record["source"]
+        path.write_text(content, encoding="utf-8")
+        return content, path
+
+    def ensure_imported(self) -> int:
+        """
+        导入报告目录中尚未入表的旧版 Markdown 报告（每个进程只在首次使用时检查一次）
+
+        Returns:
+            本次导入的报告数
+        """
+        with self._import_lock:
+            if self._imported:
+                return 0
+            self._imported = True
+            if not self.analyses_dir.exists():
+                return 0
+
+            started = time.perf_counter()
+            with get_connection() as conn:
+                known = {row[0] for row in conn.execute("SELECT source FROM essay_analyses")}
+            rows = []
+            for path in sorted(self.analyses_dir.glob("*.md")):
+                if path.name in known:
+                    continue
+                parsed = parse_analysis_markdown(path)
+                if parsed is None or not (parsed["original_text"] or parsed["optimized_text"]):
+                    continue
+                rows.append(self._row({
+                    **parsed,
+                    "source": path.name,
+                    "score_points": parsed["points"],
+                    "created_at": parsed["generated_at"] or path.stat().st_mtime,
+                }))
+            if rows:
+                with get_connection() as conn:
+                    conn.executemany(
+                        f"INSERT OR IGNORE INTO essay_analyses ({', '.join(COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                        rows
+                    )
+                print(f"[Analysis Store] 已导入 {len(rows)} 份旧版分析报告，"
+                      f"耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+            return len(rows)
+
+
+# 全局共享实例
+analysis_store = EssayAnalysisStore()
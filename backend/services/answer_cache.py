@@ -0,0 +1,210 @@
+"""
+对话答案缓存模块
+备考同一门课的学生经常问相同的问题，无上下文的纯文本提问可直接复用之前的回答。
+问题先做规范化（全半角、大小写、空白与标点），再用字符 shingle 的 MinHash 签名
+估算相似度（NumPy 本地计算，无需外部向量服务），相似度达到阈值且数字、变量和公式符号
+完全一致时才视为同一问题（精确命中同样检查）（只差一个数字的两道题 MinHash 相似度也很高，但答案不同）
+"""
+import hashlib
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+import config
+from services.metrics import metrics
+
+# MinHash 使用的大素数（2^31 - 1），保证 a * h + b 不超出 uint64
+_PRIME = (1 << 31) - 1
+# 运算与比较符号（规范化时保留，e^{-2t} 与 e^{2t}、x>0 与 x<0 不能视为同一问题）
+_MATH_SYMBOLS = r'+\-*/^=<>≤≥≠±×÷∫∑∏√∞′'
+# 规范化时去掉的空白、标点和其他符号
+_STRIP_PATTERN = re.compile(rf'(?:[^\w{_MATH_SYMBOLS}]|_)+')
+# 数字、拉丁/希腊字母串（变量与函数名）和运算符号
+_MATH_TOKEN_PATTERN = re.compile(rf'\d+(?:\.\d+)?|[a-zα-ω]+|[{_MATH_SYMBOLS}]')
+
+
+def normalize_question(text: str) -> str:
+    """规范化问题文本：全角转半角、转小写、去掉空白与标点（保留运算与比较符号）"""
+    return _STRIP_PATTERN.sub('', unicodedata.normalize('NFKC', text or '').lower())
+
+
+def math_tokens(text: str) -> Tuple:
+    """
+    问题中的数字、变量和公式符号（多重集，排序后的 (词, 次数) 元组）
+    命中时要求两者完全一致，避免把 e^{-2t} 的问题当成 e^{-5t} 的问题
+    """
+    tokens = Counter(_MATH_TOKEN_PATTERN.findall(unicodedata.normalize('NFKC', text or '').lower()))
+    return tuple(sorted(tokens.items()))
+
+
+class _Entry:
+    def __init__(self, scope: str, question: str, signature: np.ndarray, answer: str):
+        self.scope = scope
+        self.question = question
+        self.signature = signature
+        self.math_tokens = math_tokens(question)
+        self.answer = answer
+        self.created = time.time()
+        self.hits = 0
+
+
+class AnswerCache:
+    """基于 MinHash 近似匹配的问答缓存（线程安全）"""
+
+    def __init__(
+        self,
+        threshold: float = None,
+        num_perm: int = None,
+        shingle_size: int = None,
+        ttl: float = None,
+        max_entries: int = None,
+        seed: int = 858
+    ):
+        """
+        Args:
+            threshold: 判定为同一问题的相似度下限（MinHash 估计的 Jaccard 相似度）
+            num_perm: 签名长度（越长估计越准）
+            shingle_size: 字符 shingle 长度
+            ttl: 答案有效期（秒）
+            max_entries: 最多缓存的答案数（超出时淘汰最久未使用的）
+            seed: 哈希函数的随机种子（固定以便结果可复现）
+        """
+        self.threshold = threshold or config.ANSWER_CACHE_THRESHOLD
+        self.num_perm = num_perm or config.ANSWER_CACHE_NUM_PERM
+        self.shingle_size = shingle_size or config.ANSWER_CACHE_SHINGLE_SIZE
+        self.ttl = ttl or config.ANSWER_CACHE_TTL_SECONDS
+        self.max_entries = max_entries or config.ANSWER_CACHE_MAX_ENTRIES
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=self.num_perm, dtype=np.uint64)
+
+        # (作用域, 规范化问题) -> 缓存项，按最近使用排序
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        # 各作用域的签名矩阵（每行一个问题），缓存变化后重建
+        self._matrices: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def scope(model: str, system_prompt: str = "") -> str:
+        """缓存作用域：模型或系统提示词变化后不再复用旧答案"""
+        digest = hashlib.sha1((system_prompt or "").encode('utf-8')).hexdigest()[:8]
+        return f"{model}:{digest}"
+
+    def signature(self, question: str) -> np.ndarray:
+        """规范化问题的 MinHash 签名"""
+        n = self.shingle_size
+        shingles = {question[i:i + n] for i in range(max(len(question) - n + 1, 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles)
+        )
+        values = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _PRIME
+        return values.min(axis=1).astype(np.uint32)
+
+    def _expire(self, now: float):
+        """清理过期项（调用方持有锁）"""
+        expired = [key for key, entry in self._entries.items() if now - entry.created > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        if expired:
+            self._matrices.clear()
+
+    def _matrix(self, scope: str):
+        """作用域内全部问题的签名矩阵与对应的键（调用方持有锁）"""
+        if scope not in self._matrices:
+            keys = [key for key, entry in self._entries.items() if entry.scope == scope]
+            matrix = (np.stack([self._entries[key].signature for key in keys])
+                      if keys else np.empty((0, self.num_perm), dtype=np.uint32))
+            self._matrices[scope] = (keys, matrix)
+        return self._matrices[scope]
+
+    def get(self, question: str, scope: str) -> Optional[Dict]:
+        """
+        查找相同或足够相似的问题的答案
+
+        Args:
+            question: 用户问题
+            scope: 缓存作用域
+
+        Returns:
+            {"answer": 答案, "question": 匹配到的原问题, "similarity": 相似度}，未命中返回None
+        """
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+
+        with self._lock:
+            self._expire(time.time())
+            key = (scope, normalized)
+            similarity = 1.0
+            tokens = math_tokens(question)
+            # 规范化后相同的问题同样要求数字、变量和公式符号一致
+            if key not in self._entries or self._entries[key].math_tokens != tokens:
+                key = None
+                # 太短的问题只做精确匹配
+                if len(normalized) >= self.shingle_size:
+                    keys, matrix = self._matrix(scope)
+                    if len(keys):
+                        scores = (matrix == self.signature(normalized)).mean(axis=1)
+                        # 从最相似的开始，取第一个数字、变量和公式符号完全一致的问题
+                        for index in np.argsort(-scores):
+                            if scores[index] < self.threshold:
+                                break
+                            if self._entries[keys[index]].math_tokens == tokens:
+                                key, similarity = keys[index], float(scores[index])
+                                break
+            if key is None:
+                metrics.increment("answer_cache_lookups", result="miss")
+                return None
+
+            entry = self._entries[key]
+            entry.hits += 1
+            self._entries.move_to_end(key)
+
+        metrics.increment("answer_cache_lookups", result="hit")
+        print(f"[Answer Cache] 命中缓存答案（相似度 {similarity:.2f}）: {entry.question[:30]}")
+        return {"answer": entry.answer, "question": entry.question, "similarity": round(similarity, 3)}
+
+    def put(self, question: str, answer: str, scope: str):
+        """
+        缓存问题的答案
+
+        Args:
+            question: 用户问题
+            answer: 模型回答
+            scope: 缓存作用域
+        """
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+        entry = _Entry(scope, question, self.signature(normalized), answer)
+        with self._lock:
+            self._entries[(scope, normalized)] = entry
+            self._entries.move_to_end((scope, normalized))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrices.clear()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._matrices.clear()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "entries": len(entries),
+            "hits": sum(entry.hits for entry in entries),
+            "threshold": self.threshold
+        }
+
+
+# 全局共享实例
+answer_cache = AnswerCache()
@@ -0,0 +1,252 @@
+"""
+批量作文批改服务
+将多篇作文的 OCR 与优化任务放入受限并发的工作池中执行，
+吞吐量取决于允许的并发数而不是作文数量
+"""
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import config
+
+
+class BatchGradingService:
+    """批量批改任务管理（任务保存在内存中）"""
+
+    # 作文批改全部走 ModelScope
+    PROVIDER = "modelscope"
+
+    def __init__(self, ai_service, image_service, topic_service):
+        """
+        Args:
+            ai_service: AIService 实例
+            image_service: ImageService 实例
+            topic_service: EssayTopicService 实例
+        """
+        self.ai_service = ai_service
+        self.image_service = image_service
+        self.topic_service = topic_service
+        self.jobs: "OrderedDict[str, Dict]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def _semaphore(self, provider: str) -> asyncio.Semaphore:
+        """获取服务商对应的并发限制（在事件循环内惰性创建）"""
+        if provider not in self._semaphores:
+            limit = config.BATCH_PROVIDER_CONCURRENCY.get(provider, 1)
+            self._semaphores[provider] = asyncio.Semaphore(limit)
+        return self._semaphores[provider]
+
+    def create_job(self, items: List[Dict]) -> Dict:
+        """
+        创建批量任务
+
+        Args:
+            items: 每篇作文的信息，包含 filename、image_path、year、essay_type、
+                   topic_image_path、topic_text（可选）、reference_essay
+
+        Returns:
+            任务字典
+        """
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "job_id": job_id,
+            "status": "queued",
+            "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "finished_at": None,
+            "items": [
+                {
+                    **item,
+                    "index": index,
+                    "status": "queued",
+                    "result": None,
+                    "error": None
+                }
+                for index, item in enumerate(items)
+            ]
+        }
+        self.jobs[job_id] = job
+
+        # 超出上限时丢弃最早且已结束的任务
+        while len(self.jobs) > config.BATCH_MAX_JOBS:
+            oldest_id = next(iter(self.jobs))
+            if self.jobs[oldest_id]["status"] not in ("completed", "failed"):
+                break
+            self.jobs.pop(oldest_id)
+        return job
+
+    def start_job(self, job_id: str):
+        """在后台启动任务（需在事件循环中调用）"""
+        task = asyncio.create_task(self._run_job(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+
+    async def _run_job(self, job_id: str):
+        job = self.jobs[job_id]
+        job["status"] = "running"
+        print(f"[Batch] 任务 {job_id} 开始，共 {len(job['items'])} 篇")
+
+        await asyncio.gather(*(self._process_item(item) for item in job["items"]))
+
+        failed = sum(1 for item in job["items"] if item["status"] == "failed")
+        job["status"] = "failed" if failed == len(job["items"]) else "completed"
+        job["finished_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"[Batch] 任务 {job_id} 结束，失败 {failed} 篇")
+
+    async def _process_item(self, item: Dict):
+        """处理单篇作文：预处理 -> OCR -> 优化"""
+        semaphore = self._semaphore(self.PROVIDER)
+        image_path = item["image_path"]
+        try:
+            image_path = await asyncio.to_thread(self.image_service.preprocess_image, image_path)
+
+            item["status"] = "ocr"
+            async with semaphore:
+                ocr_result = await asyncio.to_thread(self.ai_service.image_to_text, image_path)
+            if ocr_result["degraded"]:
+                raise RuntimeError(ocr_result["error"] or "OCR识别失败")
+
+            item["status"] = "analyzing"
+            async with semaphore:
+                result = await asyncio.to_thread(
+                    self.ai_service.optimize_essay,
+                    topic_image_path=item["topic_image_path"],
+                    reference=item["reference_essay"],
+                    original=ocr_result["text"],
+                    essay_type=item["essay_type"],
+                    topic_text=item.get("topic_text", "")
+                )
+            if result.get("degraded"):
+                raise RuntimeError(result.get("error") or "作文优化失败")
+
+            item["result"] = result
+            item["status"] = "done"
+        except Exception as e:
+            print(f"[Batch] 第 {item['index'] + 1} 篇处理失败: {e}")
+            item["status"] = "failed"
+            item["error"] = str(e)
+        finally:
+            self.image_service.cleanup_file(item["image_path"])
+            if image_path != item["image_path"]:
+                self.image_service.cleanup_file(image_path)
+
+    def get_job(self, job_id: str, include_results: bool = False) -> Optional[Dict]:
+        """
+        获取任务进度
+
+        Args:
+            job_id: 任务ID
+            include_results: 是否附带每篇作文的完整分析结果
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+
+        counts = {"queued": 0, "ocr": 0, "analyzing": 0, "done": 0, "failed": 0}
+        items = []
+        for item in job["items"]:
+            counts[item["status"]] += 1
+            result = item["result"] or {}
+            summary = {
+                "index": item["index"],
+                "filename": item["filename"],
+                "year": item["year"],
+                "essay_type": item["essay_type"],
+                "status": item["status"],
+                "score": result.get("score"),
+                "error": item["error"]
+            }
+            if include_results:
+                summary["result"] = item["result"]
+            items.append(summary)
+
+        total = len(job["items"])
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "created_at": job["created_at"],
+            "finished_at": job["finished_at"],
+            "total": total,
+            "completed": counts["done"],
+            "failed": counts["failed"],
+            "in_progress": counts["ocr"] + counts["analyzing"],
+            "progress": round((counts["done"] + counts["failed"]) / total * 100, 1) if total else 100.0,
+            "items": items
+        }
+
+    def build_report(self, job_id: str) -> Optional[Dict]:
+        """
+        生成批量批改汇总报告
+
+        Returns:
+            包含统计数据和 Markdown 文本的字典
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+
+        done_items = [item for item in job["items"] if item["status"] == "done"]
+        stats = {}
+        for essay_type in ("小作文", "大作文"):
+            points = [item["result"]["score"]["points"] for item in done_items
+                      if item["essay_type"] == essay_type]
+            if points:
+                stats[essay_type] = {
+                    "count": len(points),
+                    "average": round(sum(points) / len(points), 2),
+                    "max": max(points),
+                    "min": min(points)
+                }
+
+        error_counts = {"spelling_errors": 0, "grammar_errors": 0}
+        for item in done_items:
+            suggestions = item["result"].get("suggestions", {})
+            for key in error_counts:
+                error_counts[key] += len(suggestions.get(key, []))
+
+        md_content = f"""# 批量作文批改报告
+
+**任务ID**: {job_id}
+**创建时间**: {job['created_at']}
+**完成时间**: {job['finished_at'] or '进行中'}
+**完成/总数**: {len(done_items)}/{len(job['items'])}
+
+---
+
+## 📊 评分汇总
+
+| 作文类型 | 篇数 | 平均分 | 最高分 | 最低分 |
+| --- | --- | --- | --- | --- |
+"""
+        for essay_type, stat in stats.items():
+            md_content += (f"| {essay_type} | {stat['count']} | {stat['average']} "
+                           f"| {stat['max']} | {stat['min']} |\n")
+
+        md_content += f"""
+拼写错误共 {error_counts['spelling_errors']} 处，语法错误共 {error_counts['grammar_errors']} 处。
+
+---
+
+## 📝 各篇结果
+
+| # | 文件 | 年份 | 类型 | 档位 | 分数 | 状态 |
+| --- | --- | --- | --- | --- | --- | --- |
+"""
+        for item in job["items"]:
+            score = (item["result"] or {}).get("score") or {}
+            status = "完成" if item["status"] == "done" else (item["error"] or item["status"])
+            md_content += (f"| {item['index'] + 1} | {item['filename']} | {item['year']} "
+                           f"| {item['essay_type']} | {score.get('level', '-')} "
+                           f"| {score.get('points', '-')} | {status} |\n")
+
+        md_content += "\n\n---\n\n*该报告由Study Helper自动生成*\n"
+
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "score_stats": stats,
+            "error_counts": error_counts,
+            "markdown": md_content
+        }
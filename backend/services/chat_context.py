@@ -0,0 +1,197 @@
+"""
+对话上下文管理模块
+按本地估算的token数裁剪历史：最近若干轮原样保留，更早的轮次压缩为滚动摘要。
+摘要按被压缩的历史前缀缓存，只有新的轮次滑出窗口时才重新计算
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import config
+
+# 中日韩字符（含全角标点），大致每个字符对应一个token
+_CJK_PATTERN = re.compile(r'[　-〿㐀-䶿一-鿿＀-￯]')
+# 每条消息的角色、分隔符等固定开销
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    本地估算文本的token数（无需调用分词器）
+    中文按每字1个token，其余字符按每4个字符1个token估算
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_message_tokens(message: Dict) -> int:
+    """估算单条消息的token数（多模态内容中的图片按固定值计）"""
+    content = message.get("content", "")
+    if isinstance(content, list):
+        tokens = 0
+        for part in content:
+            if part.get("type") == "text":
+                tokens += estimate_tokens(part.get("text", ""))
+            else:
+                tokens += config.CHAT_IMAGE_TOKEN_ESTIMATE
+    else:
+        tokens = estimate_tokens(content)
+    # 以图片ID引用的历史图片
+    tokens += len(message.get("images") or []) * config.CHAT_IMAGE_TOKEN_ESTIMATE
+    return tokens + _MESSAGE_OVERHEAD_TOKENS
+
+
+def _split_turns(history: List[Dict]) -> List[List[Dict]]:
+    """按用户消息切分为轮次（一轮 = 一条用户消息及其后的回复）"""
+    turns: List[List[Dict]] = []
+    for message in history:
+        if message.get("role") == "user" or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _fallback_summary(messages: List[Dict], previous: str = "", max_tokens: int = 400) -> str:
+    """摘要模型不可用时的本地兜底：保留每条消息的开头部分"""
+    lines = [previous] if previous else []
+    for message in messages:
+        role = "学生" if message.get("role") == "user" else "助教"
+        lines.append(f"{role}: {message.get('content', '')[:80]}")
+    summary = "\n".join(lines)
+    # 超出预算时保留最近的内容
+    while estimate_tokens(summary) > max_tokens and "\n" in summary:
+        summary = summary.split("\n", 1)[1]
+    return summary
+
+
+class ChatContextManager:
+    """对话上下文裁剪与滚动摘要"""
+
+    def __init__(
+        self,
+        summarizer: Callable[[str, List[Dict]], Optional[str]] = None,
+        token_budget: int = None,
+        max_turns: int = None,
+        summary_max_tokens: int = None,
+        cache_size: int = None
+    ):
+        """
+        Args:
+            summarizer: 摘要函数，接收 (已有摘要, 新滑出窗口的消息)，返回新摘要，失败返回None
+            token_budget: 原样保留的历史消息的token预算
+            max_turns: 最多原样保留的轮数
+            summary_max_tokens: 摘要的token上限
+            cache_size: 缓存的摘要数量
+        """
+        self.summarizer = summarizer
+        self.token_budget = token_budget or config.CHAT_CONTEXT_TOKEN_BUDGET
+        self.max_turns = max_turns or config.CHAT_CONTEXT_MAX_TURNS
+        self.summary_max_tokens = summary_max_tokens or config.CHAT_SUMMARY_MAX_TOKENS
+        self.cache_size = cache_size or config.CHAT_SUMMARY_CACHE_SIZE
+        # 历史前缀哈希 -> 该前缀的摘要
+        self._summaries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _prefix_hashes(messages: List[Dict]) -> List[str]:
+        """逐条累积的前缀哈希，hashes[i] 对应 messages[:i + 1]"""
+        hashes = []
+        digest = b""
+        for message in messages:
+            h = hashlib.sha256(digest)
+            h.update(f"{message.get('role', '')}\x00{message.get('content', '')}\x01".encode("utf-8"))
+            digest = h.digest()
+            hashes.append(h.hexdigest())
+        return hashes
+
+    def _cached_summary(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is not None:
+                self._summaries.move_to_end(key)
+            return summary
+
+    def _store_summary(self, key: str, summary: str):
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.cache_size:
+                self._summaries.popitem(last=False)
+
+    def _summarize(self, older: List[Dict]) -> Tuple[str, bool]:
+        """
+        获取被压缩历史的摘要，优先复用缓存
+
+        Returns:
+            (摘要, 是否完全命中缓存)
+        """
+        hashes = self._prefix_hashes(older)
+        summary = self._cached_summary(hashes[-1])
+        if summary is not None:
+            return summary, True
+
+        # 找到已缓存的最长前缀，只对之后新滑出窗口的消息增量摘要
+        previous, start = "", 0
+        for index in range(len(hashes) - 2, -1, -1):
+            cached = self._cached_summary(hashes[index])
+            if cached is not None:
+                previous, start = cached, index + 1
+                break
+
+        new_messages = older[start:]
+        summary = self.summarizer(previous, new_messages) if self.summarizer else None
+        if summary:
+            self._store_summary(hashes[-1], summary)
+        else:
+            # 兜底摘要不缓存，下次仍尝试模型摘要
+            summary = _fallback_summary(new_messages, previous, self.summary_max_tokens)
+        return summary, False
+
+    def build(self, history: List[Dict]) -> Tuple[List[Dict], Optional[str], Dict]:
+        """
+        裁剪对话历史
+
+        Args:
+            history: 完整历史，格式: [{"role": "user/assistant", "content": "..."}, ...]
+
+        Returns:
+            (原样保留的历史, 更早轮次的摘要（无则为None）, 统计信息)
+        """
+        history = history or []
+        turns = _split_turns(history)
+
+        kept_turns: List[List[Dict]] = []
+        kept_tokens = 0
+        for turn in reversed(turns):
+            turn_tokens = sum(estimate_message_tokens(m) for m in turn)
+            if len(kept_turns) >= self.max_turns or kept_tokens + turn_tokens > self.token_budget:
+                break
+            kept_turns.insert(0, turn)
+            kept_tokens += turn_tokens
+
+        kept = [message for turn in kept_turns for message in turn]
+        older = history[:len(history) - len(kept)]
+        original_tokens = sum(estimate_message_tokens(m) for m in history)
+
+        summary, summary_cached = None, False
+        summary_tokens = 0
+        if older:
+            summary, summary_cached = self._summarize(older)
+            summary_tokens = estimate_tokens(summary) + _MESSAGE_OVERHEAD_TOKENS
+
+        sent_tokens = kept_tokens + summary_tokens
+        stats = {
+            "history_messages": len(history),
+            "kept_messages": len(kept),
+            "summarized_messages": len(older),
+            "summary_cached": summary_cached,
+            "original_tokens": original_tokens,
+            "sent_tokens": sent_tokens,
+            "tokens_saved": max(original_tokens - sent_tokens, 0)
+        }
+        return kept, summary, stats
@@ -0,0 +1,269 @@
+"""
+聊天记录目录模块
+/chat/save 保存的每份聊天记录在本地SQLite中有一条目录记录（文件名、保存时间、消息数、第一条用户消息、
+图片数量与总大小），列出聊天记录只需查询目录表，不读取 Markdown 文件，也不遍历 .assets 图片目录。
+保存时直接用已知的消息写入目录；启动时与目录对齐，只重新读取修改时间变化的文件
+"""
+import base64
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import config
+from services.database import get_connection
+
+# 聊天记录 Markdown 中的角色标题
+_ROLE_HEADINGS = {"## 👤 用户": "user", "## 🤖 AI助手": "assistant"}
+# 图片引用或图片占位行
+_IMAGE_LINE = re.compile(r"^(!\[[^\]]*\]\([^)]*\)|\*\[图片[^\]]*\]\*)$")
+_FOOTER = "*该对话记录由Study Helper自动生成*"
+_FILENAME_TIME = re.compile(r"chat_history_(\d{8}_\d{6})")
+# 目录中保留的第一条用户消息长度
+PREVIEW_CHARS = 200
+
+
+def parse_chat_markdown(text: str) -> List[Dict]:
+    """
+    解析 /chat/save 生成的聊天记录 Markdown
+
+    Returns:
+        消息列表，每条包含 role、content（不含图片引用）、images（图片数）
+    """
+    messages, current = [], None
+    for line in text.splitlines():
+        stripped = line.strip()
+        role = _ROLE_HEADINGS.get(stripped)
+        if role:
+            current = {"role": role, "lines": [], "images": 0}
+            messages.append(current)
+        elif current is None or stripped in ("---", _FOOTER):
+            continue
+        elif _IMAGE_LINE.match(stripped):
+            current["images"] += 1
+        else:
+            current["lines"].append(line)
+    return [
+        {"role": m["role"], "content": "\n".join(m["lines"]).strip(), "images": m["images"]}
+        for m in messages
+    ]
+
+
+def chat_saved_at(path: Path, mtime: float) -> float:
+    """聊天记录的保存时间（取自文件名，无法解析时使用修改时间）"""
+    match = _FILENAME_TIME.match(Path(path).name)
+    if match:
+        try:
+            return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").timestamp()
+        except ValueError:
+            pass
+    return mtime
+
+
+def _first_user_message(messages: List[Dict]) -> str:
+    content = next((m["content"].strip() for m in messages if m["role"] == "user" and m["content"].strip()), "")
+    return content[:PREVIEW_CHARS]
+
+
+def _assets_usage(assets_dir: Path) -> Tuple[int, int]:
+    """图片目录中的文件数与总大小（字节），目录不存在时为 (0, 0)"""
+    count = size = 0
+    try:
+        with os.scandir(assets_dir) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    count += 1
+                    size += entry.stat().st_size
+    except FileNotFoundError:
+        pass
+    return count, size
+
+
+def encode_cursor(saved_at: float, filename: str) -> str:
+    """分页游标：上一页最后一条的 (保存时间, 文件名)"""
+    return base64.urlsafe_b64encode(f"{saved_at!r}|{filename}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    解析分页游标
+
+    Raises:
+        ValueError: 游标格式不正确
+    """
+    try:
+        saved_at, filename = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return float(saved_at), filename
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"无效的分页游标: {cursor}") from e
+
+
+class ChatHistoryCatalog:
+    """已保存聊天记录的目录表（SQLite）"""
+
+    def __init__(self, chat_dir: Path = None):
+        """
+        Args:
+            chat_dir: 聊天记录目录（默认 config.CHAT_HISTORY_DIR）
+        """
+        self.chat_dir = Path(chat_dir or config.CHAT_HISTORY_DIR)
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced = False
+        self._init_table()
+
+    def _init_table(self):
+        """初始化目录表（记录文件和图片目录的修改时间，启动对齐时据此判断是否需要重新读取）"""
+        with get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chat_histories (
+                    filename TEXT PRIMARY KEY,
+                    saved_at REAL NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    first_user_message TEXT NOT NULL DEFAULT '',
+                    asset_count INTEGER NOT NULL DEFAULT 0,
+                    asset_bytes INTEGER NOT NULL DEFAULT 0,
+                    mtime REAL NOT NULL,
+                    assets_mtime REAL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_chat_histories_saved ON chat_histories (saved_at, filename)"
+            )
+
+    @staticmethod
+    def _upsert(conn, row: Dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO chat_histories (filename, saved_at, message_count, first_user_message, "
+            "asset_count, asset_bytes, mtime, assets_mtime) VALUES (:filename, :saved_at, :message_count, "
+            ":first_user_message, :asset_count, :asset_bytes, :mtime, :assets_mtime)",
+            row
+        )
+
+    def _entry(self, path: Path, messages: List[Dict], mtime: float, assets_mtime: Optional[float]) -> Dict:
+        asset_count, asset_bytes = _assets_usage(path.with_suffix(".assets"))
+        return {
+            "filename": path.name,
+            "saved_at": chat_saved_at(path, mtime),
+            "message_count": len(messages),
+            "first_user_message": _first_user_message(messages),
+            "asset_count": asset_count,
+            "asset_bytes": asset_bytes,
+            "mtime": mtime,
+            "assets_mtime": assets_mtime,
+        }
+
+    @staticmethod
+    def _assets_mtime(path: Path) -> Optional[float]:
+        try:
+            return path.with_suffix(".assets").stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def record_save(self, path: Path, messages: List[Dict]) -> Dict:
+        """
+        /chat/save 写入文件后登记（消息来自请求本身，不重新读取文件）
+
+        Args:
+            path: 聊天记录文件路径
+            messages: 保存的消息（包含 role、content）
+
+        Returns:
+            目录记录
+        """
+        path = Path(path)
+        entry = self._entry(path, messages, path.stat().st_mtime, self._assets_mtime(path))
+        with self._lock, get_connection() as conn:
+            self._upsert(conn, entry)
+        return entry
+
+    def sync(self) -> Dict[str, int]:
+        """
+        与聊天记录目录对齐：只读取新增或修改时间变化的文件（及其图片目录），删除已不存在的记录
+
+        Returns:
+            新增/更新与删除的记录数
+        """
+        started = time.perf_counter()
+        with get_connection() as conn:
+            known = {row["filename"]: (row["mtime"], row["assets_mtime"]) for row in conn.execute(
+                "SELECT filename, mtime, assets_mtime FROM chat_histories"
+            )}
+
+        files, assets = {}, {}
+        if self.chat_dir.exists():
+            with os.scandir(self.chat_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.is_file():
+                        files[entry.name] = entry.stat().st_mtime
+                    elif entry.name.endswith(".assets") and entry.is_dir():
+                        assets[entry.name[:-len(".assets")] + ".md"] = entry.stat().st_mtime
+
+        changed, failed = [], 0
+        for name, mtime in files.items():
+            if known.get(name) == (mtime, assets.get(name)):
+                continue
+            path = self.chat_dir / name
+            try:
+                messages = parse_chat_markdown(path.read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"[Chat History] 读取聊天记录失败 {name}: {e}")
+                failed += 1
+                continue
+            changed.append(self._entry(path, messages, mtime, assets.get(name)))
+        removed = [name for name in known if name not in files]
+
+        with self._lock, get_connection() as conn:
+            for entry in changed:
+                self._upsert(conn, entry)
+            conn.executemany("DELETE FROM chat_histories WHERE filename = ?", [(name,) for name in removed])
+
+        if changed or removed:
+            print(f"[Chat History] 目录已同步: 更新 {len(changed)}，删除 {len(removed)}，"
+                  f"耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+        return {"updated": len(changed), "removed": len(removed), "failed": failed}
+
+    def ensure_synced(self):
+        """每个进程首次使用时同步一次（启动时调用，列表查询前兜底）"""
+        with self._sync_lock:
+            if not self._synced:
+                self.sync()
+                self._synced = True
+
+    def page(self, cursor: Optional[str] = None, limit: int = 20) -> Tuple[List[Dict], Optional[str]]:
+        """
+        按保存时间从新到旧分页列出聊天记录
+
+        Args:
+            cursor: 上一页返回的游标，为空时从最新一条开始
+
+        Returns:
+            (当前页的目录记录, 下一页游标；没有更多时为None)
+
+        Raises:
+            ValueError: 游标格式不正确
+        """
+        self.ensure_synced()
+        conditions, params = "", []
+        if cursor:
+            saved_at, filename = decode_cursor(cursor)
+            conditions = "WHERE (saved_at, filename) < (?, ?)"
+            params = [saved_at, filename]
+        with get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT filename, saved_at, message_count, first_user_message, asset_count, asset_bytes "
+                f"FROM chat_histories {conditions} ORDER BY saved_at DESC, filename DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+        items = [dict(row) for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_cursor(items[-1]["saved_at"], items[-1]["filename"])
+        return items, next_cursor
+
+
+# 全局共享实例
+chat_history_catalog = ChatHistoryCatalog()
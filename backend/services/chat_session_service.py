@@ -0,0 +1,156 @@
+"""
+服务端对话会话模块
+会话历史以 JSON Lines 追加写入磁盘（每条消息一行，图片以图片存储中的ID引用），
+活跃会话保存在内存LRU中，客户端每轮只需发送会话ID和新消息
+"""
+import json
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+
+# 会话ID格式（同时防止路径穿越）
+_SESSION_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+
+class ChatSessionStore:
+    """对话会话存储"""
+
+    def __init__(self, root: Path = None, cache_size: int = None):
+        """
+        Args:
+            root: 会话文件目录
+            cache_size: 内存中保留的活跃会话数量
+        """
+        self.root = Path(root or config.CHAT_SESSION_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size or config.CHAT_SESSION_CACHE_SIZE
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ==================== 文件路径 ====================
+
+    def _log_path(self, session_id: str) -> Path:
+        return self.root / f"{session_id}.jsonl"
+
+    # ==================== 会话操作 ====================
+
+    def exists(self, session_id: str) -> bool:
+        return bool(_SESSION_ID_PATTERN.match(session_id or "")) and (
+            session_id in self._sessions or self._log_path(session_id).exists()
+        )
+
+    def create(self) -> Dict:
+        """创建新会话"""
+        session_id = uuid.uuid4().hex
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        session = {"session_id": session_id, "created_at": now, "updated_at": now, "messages": []}
+        with self._lock:
+            with open(self._log_path(session_id), 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"type": "meta", "created_at": now}, ensure_ascii=False) + "\n")
+            self._remember(session)
+        print(f"[Chat Session] 已创建会话: {session_id}")
+        return session
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        """获取会话（不在内存中时从磁盘加载）"""
+        if not self.exists(session_id):
+            return None
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                return session
+            session = self._load(session_id)
+            self._remember(session)
+            return session
+
+    def append(self, session_id: str, role: str, content: str, image_ids: List[str] = None) -> Dict:
+        """
+        追加一条消息
+
+        Args:
+            session_id: 会话ID
+            role: 'user' 或 'assistant'
+            content: 消息内容
+            image_ids: 可选的图片ID列表（图片存储中的图片）
+
+        Returns:
+            追加的消息
+        """
+        with self._lock:
+            session = self.get(session_id)
+            if session is None:
+                raise KeyError(session_id)
+
+            message = {
+                "role": role,
+                "content": content,
+                "images": list(image_ids or []),
+                "ts": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+
+            with open(self._log_path(session_id), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(message, ensure_ascii=False) + "\n")
+            session["messages"].append(message)
+            session["updated_at"] = message["ts"]
+            return message
+
+    def history(self, session_id: str) -> List[Dict]:
+        """供模型使用的历史（图片以ID引用）"""
+        session = self.get(session_id)
+        if session is None:
+            return []
+        return [
+            {"role": m["role"], "content": m["content"], "images": m.get("images") or []}
+            for m in session["messages"]
+        ]
+
+    def delete(self, session_id: str) -> bool:
+        """删除会话（图片属于图片存储，不随会话删除）"""
+        if not self.exists(session_id):
+            return False
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._log_path(session_id).unlink(missing_ok=True)
+        print(f"[Chat Session] 已删除会话: {session_id}")
+        return True
+
+    # ==================== 内部方法 ====================
+
+    def _remember(self, session: Dict):
+        """放入LRU，超出上限时淘汰最久未使用的会话（磁盘上的数据保留）"""
+        self._sessions[session["session_id"]] = session
+        self._sessions.move_to_end(session["session_id"])
+        while len(self._sessions) > self.cache_size:
+            self._sessions.popitem(last=False)
+
+    def _load(self, session_id: str) -> Dict:
+        session = {"session_id": session_id, "created_at": None, "updated_at": None, "messages": []}
+        with open(self._log_path(session_id), 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 写入中断留下的半行，跳过
+                    print(f"[Chat Session] 跳过损坏的记录: {session_id}")
+                    continue
+                if record.get("type") == "meta":
+                    session["created_at"] = record.get("created_at")
+                else:
+                    session["messages"].append(record)
+                    session["updated_at"] = record.get("ts")
+        session["updated_at"] = session["updated_at"] or session["created_at"]
+        return session
+
+
+# 全局共享实例
+chat_sessions = ChatSessionStore()
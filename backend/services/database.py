@@ -0,0 +1,32 @@
+"""
+本地SQLite数据库连接模块
+每次操作使用独立连接，可在线程池和事件循环中安全调用
+"""
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+import config
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    """
+    获取数据库连接，退出时自动提交（异常时回滚）并关闭
+
+    用法：
+        with get_connection() as conn:
+            conn.execute(...)
+    """
+    conn = sqlite3.connect(str(config.DATABASE_PATH), timeout=30)
+    conn.row_factory = sqlite3.Row
+    try:
+        # WAL 模式下读写互不阻塞
+        conn.execute("PRAGMA journal_mode=WAL")
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
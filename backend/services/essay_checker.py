@@ -0,0 +1,609 @@
+"""
+作文本地检查模块
+拼写错误和一部分语法错误（主谓一致、冠词、情态动词后接不定式等）是机械性的，
+在本地用词典和规则几毫秒即可查出，结果并入模型给出的建议，也可让提示词不再要求模型列出拼写错误。
+
+拼写检查采用 SymSpell 的思路：预先计算词典中每个词（前缀）在编辑距离内的全部删除变体，
+变体的 CRC32 哈希排序后与所属词的编号一起保存在两个 NumPy 数组中；
+查询时对输入词的删除变体做二分查找得到候选词，再用编辑距离精确验证。
+
+词典只有基础词表和范文用词，干净文章中的生僻词也会被当成拼写错误。只有把握较大的结果
+（含有词典中从未出现的字母组合、且与建议拼写只差一处编辑）才并入建议，
+其余作为“可能的拼写错误”单独返回，由界面标注为本地检查结果
+"""
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import config
+from services.metrics import metrics
+from services.wordlist import COMMON_WORDS
+
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+(?:['’][A-Za-z]+)?")
+_SENTENCE_PATTERN = re.compile(r"[^.!?\n]+[.!?]*")
+
+# 词形变化规则：(后缀, 替换)，用于识别词典中原形的规则变化形式
+_SUFFIX_RULES = (
+    ("ies", "y"), ("ied", "y"), ("ier", "y"), ("iest", "y"), ("ily", "y"), ("iness", "y"),
+    ("es", ""), ("s", ""), ("ed", ""), ("ed", "e"), ("ing", ""), ("ing", "e"),
+    ("er", ""), ("er", "e"), ("est", ""), ("est", "e"), ("ly", ""), ("ally", ""),
+    ("ness", ""), ("ment", ""), ("ful", ""), ("less", ""), ("able", ""), ("able", "e"),
+    ("ity", ""), ("ity", "e"), ("al", ""), ("al", "e"), ("ation", "e"), ("ation", ""), ("ation", "ate"),
+    ("ion", ""), ("ion", "e"), ("ive", ""), ("ive", "e"), ("ance", "ant"), ("ence", "ent"), ("ancy", "ant"),
+    ("ency", "ent"), ("eer", ""), ("y", ""), ("ist", ""), ("ism", ""),
+)
+_PREFIXES = ("un", "in", "im", "ir", "il", "re", "dis", "mis", "non", "over", "under", "inter", "self", "co",
+             "post", "pre")
+
+# 不可数名词的错误复数形式
+_UNCOUNTABLE_PLURALS = {
+    "informations": "information", "advices": "advice", "furnitures": "furniture",
+    "equipments": "equipment", "homeworks": "homework", "knowledges": "knowledge",
+    "luggages": "luggage", "baggages": "baggage", "sceneries": "scenery", "machineries": "machinery",
+}
+# 元音字母开头但读辅音的词（前面用 a）
+_CONSONANT_SOUND_PREFIXES = ("univers", "uniq", "unit", "union", "uniform", "use", "usu", "usa", "uti", "eu",
+                             "one", "once", "ubiq")
+# 辅音字母开头但读元音的词（前面用 an）
+_VOWEL_SOUND_PREFIXES = ("hour", "honest", "honor", "honour", "heir")
+_MODALS = {"can", "could", "will", "would", "shall", "should", "may", "might", "must"}
+_AUXILIARIES = _MODALS | {"do", "does", "did", "why", "what", "how", "where", "when", "which"}
+# 常见动词原形（主谓一致与情态动词规则只检查这些词，避免把名词误判为动词）
+_BASE_VERBS = {
+    "agree", "become", "believe", "bring", "come", "enjoy", "feel", "find", "get", "give", "go", "help",
+    "hope", "keep", "know", "learn", "like", "live", "look", "love", "make", "need", "play", "say", "seem",
+    "take", "think", "try", "want", "work", "write", "spend", "study", "prefer", "encourage", "improve",
+}
+_THIRD_PERSON = {"he", "she", "it"}
+_NON_THIRD_PERSON = {"i", "you", "we", "they"}
+_PLURAL_SUBJECTS = {"people", "children", "men", "women"}
+_INDEFINITE_SUBJECTS = {"everyone", "everybody", "someone", "somebody", "nobody", "anyone", "anybody"}
+# 虚拟语气触发词（that 从句中动词用原形）
+_SUBJUNCTIVE_TRIGGERS = ("suggest", "insist", "demand", "recommend", "require", "request", "propose", "advise",
+                         "urge", "essential", "important", "necessary", "vital")
+# 对 it 使用原形动词是正确的结构（let it go / make it work）
+_CAUSATIVE_VERBS = {"let", "lets", "make", "makes", "made", "help", "helps", "see", "saw", "watch", "hear",
+                    "have", "has", "had"}
+_COMPARATIVES = {"better", "worse", "easier", "bigger", "larger", "smaller", "faster", "higher", "lower",
+                 "greater", "harder", "happier", "cheaper", "richer", "stronger", "healthier", "busier"}
+_SUPERLATIVES = {"best", "worst", "easiest", "biggest", "largest", "smallest", "highest", "greatest"}
+# 多余的介词：(动词, 介词)
+_REDUNDANT_PREPOSITIONS = {("despite", "of"), ("discuss", "about"), ("emphasize", "on"), ("emphasise", "on"),
+                           ("mention", "about"), ("reach", "to"), ("enter", "into"), ("consider", "about")}
+# 重复出现是正常用法的词
+_REPEAT_ALLOWED = {"that", "had", "very", "bye", "ha", "no", "so", "many", "much", "more", "far"}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """相邻换位也计为一次编辑的编辑距离（OSA）；超过 limit 时提前返回 limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _inflections(word: str) -> List[str]:
+    """词的常见规则变化（只用作纠错候选，不参与判断词是否存在）"""
+    if word.endswith("y") and len(word) > 2 and word[-2] not in "aeiou":
+        forms = [word[:-1] + "ies", word[:-1] + "ied"]
+    elif word.endswith(("s", "x", "ch", "sh")):
+        forms = [word + "es", word + "ed"]
+    elif word.endswith("e"):
+        forms = [word + "s", word + "d"]
+    else:
+        forms = [word + "s", word + "ed"]
+    forms.append((word[:-1] if word.endswith("e") and not word.endswith("ee") else word) + "ing")
+    return forms
+
+
+class SymSpellIndex:
+    """SymSpell 风格的拼写纠错索引（构建后只读）"""
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        """
+        Args:
+            max_distance: 最大编辑距离
+            prefix_length: 只对词的前若干个字母生成删除变体（控制索引大小）
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._words: List[str] = []
+        self._freqs = np.empty(0, dtype=np.int32)
+        self._hashes = np.empty(0, dtype=np.uint32)
+        self._owners = np.empty(0, dtype=np.int32)
+        # 删除变体相对原词删除的字母数（先只用一次删除的变体查找编辑距离为1的候选）
+        self._depths = np.empty(0, dtype=np.uint8)
+        self._lengths = np.empty(0, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    @property
+    def nbytes(self) -> int:
+        """删除变体数组占用的内存（字节）"""
+        return self._hashes.nbytes + self._owners.nbytes + self._depths.nbytes
+
+    def _deletes(self, word: str) -> Dict[str, int]:
+        """词（前缀）在最大编辑距离内的全部删除变体（含自身） -> 删除的字母数"""
+        word = word[:self.prefix_length]
+        result = {word: 0}
+        frontier = {word}
+        for depth in range(1, self.max_distance + 1):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))} - result.keys()
+            result.update(dict.fromkeys(frontier, depth))
+        return result
+
+    def build(self, frequencies: Dict[str, int]):
+        """
+        根据词频表构建索引
+
+        Args:
+            frequencies: 词 -> 词频（用于在同等编辑距离的候选中排序）
+        """
+        words = sorted(frequencies)
+        hashes, owners, depths = [], [], []
+        for index, word in enumerate(words):
+            deletes = self._deletes(word)
+            hashes.extend(zlib.crc32(d.encode("utf-8")) for d in deletes)
+            depths.extend(deletes.values())
+            owners.extend([index] * len(deletes))
+        hashes = np.array(hashes, dtype=np.uint32)
+        order = np.argsort(hashes, kind="stable")
+        self._hashes = hashes[order]
+        self._owners = np.array(owners, dtype=np.int32)[order]
+        self._depths = np.array(depths, dtype=np.uint8)[order]
+        self._lengths = np.array([len(w) for w in words], dtype=np.int16)
+        self._freqs = np.array([frequencies[w] for w in words], dtype=np.int32)
+        self._words = words
+
+    def lookup(self, word: str, max_distance: int = None) -> List[Tuple[str, int, int]]:
+        """
+        查找编辑距离内的词典词
+
+        Returns:
+            [(候选词, 编辑距离, 词频), ...]，按编辑距离从小到大、词频从高到低排序
+        """
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if not self._words:
+            return []
+        deletes = self._deletes(word)
+        queries = np.fromiter((zlib.crc32(d.encode("utf-8")) for d in deletes), dtype=np.uint32, count=len(deletes))
+        query_depths = np.fromiter(deletes.values(), dtype=np.uint8, count=len(deletes))
+        starts = np.searchsorted(self._hashes, queries, side="left")
+        ends = np.searchsorted(self._hashes, queries, side="right")
+        matched = ends > starts
+        if not matched.any():
+            return []
+        positions = np.concatenate([np.arange(s, e) for s, e in zip(starts[matched], ends[matched])])
+        pair_depths = np.repeat(query_depths[matched], (ends - starts)[matched])
+
+        # 由近到远逐级验证：找到编辑距离为 d 的候选就不再验证更远的候选
+        for distance_limit in range(1, limit + 1):
+            near = (pair_depths <= distance_limit) & (self._depths[positions] <= distance_limit)
+            owners = np.unique(self._owners[positions[near]])
+            owners = owners[np.abs(self._lengths[owners] - len(word)) <= distance_limit]
+            results = []
+            for owner in owners:
+                candidate = self._words[owner]
+                distance = edit_distance(word, candidate, distance_limit)
+                if distance <= distance_limit:
+                    results.append((candidate, distance, int(self._freqs[owner])))
+            if results:
+                results.sort(key=lambda item: (item[1], -item[2]))
+                return results
+        return []
+
+
+class _Token:
+    __slots__ = ("text", "lower", "start", "end")
+
+    def __init__(self, match: re.Match, offset: int):
+        self.text = match.group(0)
+        self.lower = self.text.lower().replace("’", "'")
+        self.start = match.start() + offset
+        self.end = match.end() + offset
+
+
+def _trigrams(word: str) -> List[str]:
+    """词的三字母组合（首尾加 ^、$）"""
+    marked = f"^{word}$"
+    return [marked[i:i + 3] for i in range(len(marked) - 2)]
+
+
+def _third_person(verb: str) -> str:
+    if verb == "have":
+        return "has"
+    if verb.endswith("y") and verb[-2] not in "aeiou":
+        return verb[:-1] + "ies"
+    if verb.endswith(("s", "x", "ch", "sh", "o")):
+        return verb + "es"
+    return verb + "s"
+
+
+def _base_form(verb: str) -> Optional[str]:
+    """第三人称单数形式对应的常见动词原形（不是常见动词时返回None）"""
+    irregular = {"has": "have", "is": "be", "are": "be", "was": "be", "does": "do", "goes": "go"}
+    if verb in irregular:
+        return irregular[verb]
+    for base in _BASE_VERBS:
+        if _third_person(base) == verb:
+            return base
+    return None
+
+
+def _match_case(original: str, replacement: str) -> str:
+    """替换词沿用原词的首字母大小写"""
+    if original[:1].isupper() and replacement:
+        return replacement[0].upper() + replacement[1:]
+    return replacement
+
+
+class EssayChecker:
+    """作文本地拼写与基础语法检查（线程安全）"""
+
+    def __init__(self, max_distance: int = None):
+        """
+        Args:
+            max_distance: 拼写纠错的最大编辑距离
+        """
+        self.max_distance = max_distance or config.ESSAY_SPELL_MAX_DISTANCE
+        self.index = SymSpellIndex(max_distance=self.max_distance)
+        self._known: set = set()
+        self._known_cache: Dict[str, bool] = {}
+        # 词典词（含规则变化形式）中出现过的三字母组合（^、$ 表示词首词尾）
+        self._trigrams: set = set()
+        self._frequencies: Dict[str, int] = {}
+        self._loaded = False
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def _count(self, text: str, weight: int = 1):
+        for match in _TOKEN_PATTERN.finditer(text):
+            word = match.group(0).lower()
+            if "'" not in word and "’" not in word:
+                self._frequencies[word] = self._frequencies.get(word, 0) + weight
+                self._known.add(word)
+
+    def load(self, texts: Iterable[str] = ()):
+        """
+        建立词典：基础词表 + 给定文本（通常是题库中的参考范文）中的全部词
+
+        Args:
+            texts: 用于补充词典的英文文本
+        """
+        with self._lock:
+            started = time.perf_counter()
+            self._frequencies = {}
+            self._known = set()
+            self._count(COMMON_WORDS, weight=2)
+            self._known.update(w for w in COMMON_WORDS.split() if "'" in w)
+            for text in texts:
+                if isinstance(text, str):
+                    self._count(text)
+            self._build()
+            self._loaded = True
+            print(f"[Essay Checker] 词典已建立: {len(self._known)} 词，索引 {len(self.index)} 项，"
+                  f"{self.index.nbytes // 1024}KB，耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def _build(self):
+        """重建纠错索引（调用方持有锁）；词典词的规则变化以词频0加入候选"""
+        candidates = dict(self._frequencies)
+        for word in self._frequencies:
+            for form in _inflections(word):
+                candidates.setdefault(form, 0)
+        index = SymSpellIndex(max_distance=self.max_distance)
+        index.build(candidates)
+        self.index = index
+        self._trigrams = {trigram for word in candidates for trigram in _trigrams(word)}
+        self._known_cache = {}
+        self._dirty = False
+
+    def add_text(self, text: str):
+        """把新文本（如新增题目的参考范文）中的词加入词典，下次检查前重建索引"""
+        if not isinstance(text, str) or not text:
+            return
+        with self._lock:
+            self._count(text)
+            self._dirty = True
+
+    def is_known(self, word: str, depth: int = 2) -> bool:
+        """词（小写）是否在词典中，或是词典中某个词的规则变化/加前缀形式"""
+        if word in self._known:
+            return True
+        if depth == 0 or len(word) < 4:
+            return False
+        cache = self._known_cache
+        if word in cache:
+            return cache[word]
+
+        known = False
+        for suffix, replacement in _SUFFIX_RULES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                stem = word[:-len(suffix)] + replacement
+                if self.is_known(stem, depth - 1) or (
+                    not replacement and len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in "aeiou"
+                    and stem[:-1] in self._known
+                ):
+                    known = True
+                    break
+        if not known:
+            known = any(word.startswith(p) and self.is_known(word[len(p):], depth - 1)
+                        for p in _PREFIXES if len(word) - len(p) >= 3)
+        if depth == 2:
+            cache[word] = known
+        return known
+
+    def suggest(self, word: str) -> Optional[str]:
+        """拼写错误的词（小写）最可能的正确拼写；没有把握时返回None"""
+        limit = 1 if len(word) <= 4 else self.max_distance
+        candidates = self.index.lookup(word, limit)
+        if not candidates:
+            return self._suggest_inflected(word)
+        # 短词的拼写错误很少出在首字母上，首字母不同的候选多半是另一个正确的词
+        if len(word) <= 5:
+            candidates = [c for c in candidates if c[0][0] == word[0]]
+            if not candidates:
+                return None
+        best, distance, frequency = candidates[0]
+        # 编辑距离为2的候选只在没有其他同等候选时采用；按规则生成的变化形式（词频0）可能不是真实的词，
+        # 只在编辑距离为1时采用
+        if distance == 2 and (frequency == 0 or (len(candidates) > 1 and candidates[1][1:] == (2, frequency))):
+            return self._suggest_inflected(word)
+        return best
+
+    def _suggest_inflected(self, word: str) -> Optional[str]:
+        """词典中没有相近的词时，按“原形 + 词尾”纠正（freinds -> friends）"""
+        for suffix in ("ing", "ed", "es", "s"):
+            stem = word[:-len(suffix)]
+            if word.endswith(suffix) and len(stem) >= 4 and not self.is_known(stem):
+                candidates = self.index.lookup(stem, 1)
+                if candidates and candidates[0][0][0] == stem[0] and self.is_known(candidates[0][0] + suffix):
+                    return candidates[0][0] + suffix
+        return None
+
+    def is_confident(self, word: str, suggestion: str) -> bool:
+        """
+        拼写错误是否有把握：词中含有词典里从未出现的字母组合（真实的生僻词很少如此），
+        且建议拼写只差一处编辑
+        """
+        return (edit_distance(word, suggestion, 1) == 1
+                and any(trigram not in self._trigrams for trigram in _trigrams(word)))
+
+    def check_spelling(self, text: str) -> List[Tuple[str, str, bool]]:
+        """
+        检查拼写
+
+        Returns:
+            [(原词, 建议拼写, 是否有把握), ...]，同一个词只报告一次
+        """
+        findings = []
+        seen = set()
+        for sentence in _SENTENCE_PATTERN.finditer(text):
+            for position, match in enumerate(_TOKEN_PATTERN.finditer(sentence.group(0))):
+                original = match.group(0)
+                word = original.lower().replace("’", "'")
+                start = sentence.start() + match.start()
+                end = sentence.start() + match.end()
+                # 缩写（don't）和所有格不检查
+                if len(word) < 3 or "'" in word or word in seen:
+                    continue
+                # 专有名词、缩写和 OCR 未识别字符 [?] 旁边的残词不检查
+                if (original[0].isupper() and position > 0) or (original.isupper() and len(original) > 1):
+                    continue
+                # 带非英文字母的词（cliché）被切断的部分也不检查
+                before, after = text[max(start - 1, 0):start], text[end:end + 1]
+                if after == "[" or before == "]" or (after.isalpha() and not after.isascii()) \
+                        or (before.isalpha() and not before.isascii()):
+                    continue
+                if self.is_known(word):
+                    continue
+                seen.add(word)
+                suggestion = self.suggest(word)
+                if suggestion and suggestion != word:
+                    findings.append((original, _match_case(original, suggestion), self.is_confident(word, suggestion)))
+        return findings
+
+    def check_grammar(self, text: str) -> List[Tuple[str, str]]:
+        """
+        按规则检查常见的基础语法错误
+
+        Returns:
+            [(原短语, 修正后的短语), ...]
+        """
+        findings = []
+        for sentence in _SENTENCE_PATTERN.finditer(text):
+            sentence_text = sentence.group(0)
+            tokens = [_Token(m, sentence.start()) for m in _TOKEN_PATTERN.finditer(sentence_text)]
+            findings.extend(self._sentence_findings(text, sentence_text.strip(), tokens))
+        # 去重并保持顺序
+        return list(dict.fromkeys(findings))
+
+    def _sentence_findings(self, text: str, sentence: str, tokens: List[_Token]) -> List[Tuple[str, str]]:
+        findings = []
+        words = [t.lower for t in tokens]
+
+        def span(i: int, j: int) -> str:
+            return text[tokens[i].start:tokens[j].end]
+
+        def replace(i: int, j: int, *replacements: str) -> Tuple[str, str]:
+            """把第 i..j 个词替换为给定的词（保留中间的标点和空白）"""
+            parts = [_match_case(tokens[i].text, replacements[0]) if replacements[0] else ""]
+            for k, replacement in enumerate(replacements[1:], start=1):
+                gap = text[tokens[i + k - 1].end:tokens[i + k].start]
+                parts.append(gap + replacement if replacement else "")
+            return span(i, j), "".join(parts).strip()
+
+        for i, word in enumerate(words):
+            nxt = words[i + 1] if i + 1 < len(words) else None
+            prev = words[i - 1] if i > 0 else None
+            if nxt is None:
+                break
+
+            # 重复的词：the the
+            if word == nxt and word not in _REPEAT_ALLOWED:
+                findings.append((span(i, i + 1), tokens[i].text))
+                continue
+
+            # 冠词：a apple / an university / an book
+            if word in ("a", "an") and (tokens[i].text != "A" or i == 0) and not tokens[i + 1].text.isupper():
+                vowel_sound = (nxt[0] in "aeiou" and not nxt.startswith(_CONSONANT_SOUND_PREFIXES)) \
+                    or nxt.startswith(_VOWEL_SOUND_PREFIXES)
+                expected = "an" if vowel_sound else "a"
+                if word != expected:
+                    findings.append(replace(i, i + 1, expected, tokens[i + 1].text))
+                continue
+
+            # 不可数名词的复数：informations
+            if word in _UNCOUNTABLE_PLURALS:
+                findings.append((tokens[i].text, _match_case(tokens[i].text, _UNCOUNTABLE_PLURALS[word])))
+
+            # 多余的介词：despite of / discuss about
+            if (word, nxt) in _REDUNDANT_PREPOSITIONS:
+                findings.append(replace(i, i + 1, tokens[i].text, ""))
+                continue
+
+            # 比较级重复：more better / most best
+            if (word == "more" and nxt in _COMPARATIVES) or (word == "most" and nxt in _SUPERLATIVES):
+                findings.append(replace(i, i + 1, tokens[i + 1].text, ""))
+                continue
+
+            # 情态动词后接 to 或第三人称单数：must to do / can goes
+            if word in _MODALS:
+                if nxt == "to" and i + 2 < len(words):
+                    findings.append(replace(i, i + 2, tokens[i].text, "", tokens[i + 2].text))
+                else:
+                    base = _base_form(nxt)
+                    if base:
+                        findings.append(replace(i, i + 1, tokens[i].text, base))
+                continue
+
+            # 主谓一致
+            inverted = any(w in _AUXILIARIES for w in words[max(i - 2, 0):i])
+            subjunctive = prev == "that" and i >= 2 and any(
+                w.startswith(_SUBJUNCTIVE_TRIGGERS) for w in words[max(i - 4, 0):i - 1]
+            )
+            correction = None
+            if word in _THIRD_PERSON and not inverted and not subjunctive \
+                    and not (word == "it" and prev in _CAUSATIVE_VERBS):
+                if nxt in ("have", "do", "are"):
+                    correction = {"have": "has", "do": "does", "are": "is"}[nxt]
+                elif nxt == "don't":
+                    correction = "doesn't"
+                elif nxt == "were" and not any(w in ("if", "wish", "though") for w in words[max(i - 3, 0):i]):
+                    correction = "was"
+                elif nxt in _BASE_VERBS and word != "it":
+                    correction = _third_person(nxt)
+            elif word in _NON_THIRD_PERSON and not inverted:
+                if nxt == "has":
+                    correction = "have"
+                elif nxt == "does":
+                    correction = "do"
+                elif nxt == "doesn't":
+                    correction = "don't"
+                elif nxt == "is":
+                    correction = "am" if word == "i" else "are"
+                elif nxt == "are" and word == "i":
+                    correction = "am"
+                elif nxt == "was" and word != "i":
+                    correction = "were"
+            elif word in _PLURAL_SUBJECTS and "of" not in words[max(i - 2, 0):i]:
+                correction = {"is": "are", "was": "were", "has": "have"}.get(nxt)
+            elif word in _INDEFINITE_SUBJECTS:
+                correction = {"are": "is", "have": "has", "were": "was"}.get(nxt)
+            if correction:
+                findings.append(replace(i, i + 1, tokens[i].text, correction))
+
+        # Although ..., but ...
+        if words and words[0] in ("although", "though") and "but" in words[1:]:
+            but = tokens[words.index("but", 1)]
+            fixed = text[tokens[0].start:but.start].rstrip(" ,") + ", " + text[but.end:tokens[-1].end].lstrip(" ,")
+            findings.append((text[tokens[0].start:tokens[-1].end], fixed))
+        return findings
+
+    def check(self, text: str) -> Dict:
+        """
+        检查作文的拼写和基础语法
+
+        Returns:
+            {"spelling_errors": ["错误 -> 正确", ...], "possible_spelling_errors": 没有把握的拼写错误,
+             "grammar_errors": ["问题短语 -> 修正短语", ...], "elapsed_ms": 耗时}
+        """
+        started = time.perf_counter()
+        with self._lock:
+            if not self._loaded:
+                raise RuntimeError("词典尚未建立")
+            if self._dirty:
+                self._build()
+        text = text or ""
+        spelling, possible = [], []
+        for wrong, right, confident in self.check_spelling(text):
+            (spelling if confident else possible).append(f"{wrong} -> {right}")
+        grammar = [f"{wrong} -> {right}" for wrong, right in self.check_grammar(text)]
+        elapsed = time.perf_counter() - started
+        metrics.observe("essay_local_check_seconds", elapsed)
+        return {"spelling_errors": spelling, "possible_spelling_errors": possible, "grammar_errors": grammar,
+                "elapsed_ms": round(elapsed * 1000, 2)}
+
+
+def _left_side(item: str) -> str:
+    return item.split("->", 1)[0].strip().lower()
+
+
+def _unreported(items: List[str], existing: List[str]) -> List[str]:
+    """本地检查结果中模型尚未指出的条目（按错误原文匹配）"""
+    reported = " | ".join(_left_side(item) for item in existing)
+    return [
+        item for item in items
+        if not re.search(rf"(?<![a-z']){re.escape(_left_side(item))}(?![a-z'])", reported)
+    ]
+
+
+def merge_findings(suggestions: Dict, findings: Dict) -> Tuple[Dict, Dict]:
+    """
+    把本地检查结果并入模型给出的建议（模型已指出的错误不重复添加）；
+    没有把握的拼写错误不并入，放在返回的本地检查结果中，由界面单独标注
+
+    Args:
+        suggestions: 模型返回的 suggestions
+        findings: EssayChecker.check 的结果
+
+    Returns:
+        (合并后的 suggestions, {"spelling_errors": 新增条数, "grammar_errors": 新增条数,
+         "possible_spelling_errors": 模型未指出的、没有把握的拼写错误, "elapsed_ms": 耗时})
+    """
+    merged = dict(suggestions or {})
+    added = {"elapsed_ms": findings.get("elapsed_ms")}
+    for key in ("spelling_errors", "grammar_errors"):
+        existing = [item for item in (merged.get(key) or []) if isinstance(item, str)]
+        new_items = _unreported(findings.get(key, []), existing)
+        merged[key] = existing + new_items
+        added[key] = len(new_items)
+    added["possible_spelling_errors"] = _unreported(
+        findings.get("possible_spelling_errors", []), merged.get("spelling_errors", [])
+    )
+    return merged, added
+
+
+# 全局共享实例
+essay_checker = EssayChecker()
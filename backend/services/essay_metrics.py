@@ -0,0 +1,351 @@
+"""
+作文写作指标模块
+从原文/优化后文本中提取量化指标（字数、句长分布、词汇多样性、高级词汇比例、连接词使用），
+保存在本地SQLite的指标表中，用于观察写作水平随时间的变化。
+
+特征提取对一批作文一次完成：全部作文连接后一次分词，得到词编号、所属作文、所属句子的一维数组，
+各项指标用 bincount / unique 等数组运算按作文分组统计，不逐篇循环计算
+"""
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.analysis_store import EssayAnalysisStore, analysis_store
+from services.database import get_connection
+from services.wordlist import BASIC_WORDS
+
+# 记号：词（小写后匹配）、句子边界（句末标点或空行）、作文分隔符
+_TOKEN_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?|[.!?]+|\n\s*\n|\x00")
+_WORD, _BOUNDARY, _SEPARATOR = 0, 1, 2
+_BASIC = frozenset(BASIC_WORDS.split())
+_BASIC_SUFFIXES = (("ies", "y"), ("ied", "y"), ("es", ""), ("s", ""), ("ed", ""), ("ed", "e"), ("ing", ""),
+                   ("ing", "e"), ("ly", ""), ("er", ""), ("est", ""))
+# 不计入高级词汇的虚词（BASIC_WORDS 以实词为主）
+_FUNCTION_WORDS = frozenset("""
+about above after again against all although am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having he
+her here hers herself him himself his how i if in into is it its itself me more most my myself no nor not of
+off on once only or other ought our ours ourselves out over own same she should so some such than that the
+their theirs them themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+# 连接词与过渡短语
+CONNECTIVES = (
+    "however", "therefore", "moreover", "furthermore", "besides", "nevertheless", "nonetheless", "meanwhile",
+    "consequently", "accordingly", "additionally", "similarly", "likewise", "otherwise", "instead", "thus",
+    "hence", "although", "whereas", "firstly", "secondly", "thirdly", "finally", "lastly",
+    "in addition", "in conclusion", "in a word", "in short", "in summary", "to sum up", "all in all",
+    "for example", "for instance", "such as", "as a result", "on the other hand", "on the contrary",
+    "in contrast", "what is more", "last but not least", "to begin with", "first of all", "in other words",
+    "in my opinion", "as far as i am concerned", "above all", "after all",
+)
+
+# 指标列（顺序即数据库列和 extract_features 返回的顺序）
+FEATURES = (
+    "word_count",            # 词数
+    "sentence_count",        # 句数
+    "mean_sentence_length",  # 平均句长（词）
+    "sentence_length_std",   # 句长标准差
+    "short_sentence_ratio",  # 短句（少于 SHORT_SENTENCE 词）占比
+    "long_sentence_ratio",   # 长句（多于 LONG_SENTENCE 词）占比
+    "type_token_ratio",      # 词汇多样性：不同词数 / 总词数
+    "advanced_ratio",        # 高级词汇（基础词表以外的实词）占比
+    "connective_count",      # 连接词使用次数
+    "connective_density",    # 每百词连接词数
+    "distinct_connectives",  # 使用过的不同连接词数
+)
+SHORT_SENTENCE = 8
+LONG_SENTENCE = 25
+TEXT_KINDS = ("original", "optimized")
+
+
+def _is_advanced(word: str) -> bool:
+    """不在基础词表中的实词（规则变化形式按原形判断）"""
+    if len(word) < 3 or "'" in word or word in _BASIC or word in _FUNCTION_WORDS:
+        return False
+    for suffix, replacement in _BASIC_SUFFIXES:
+        if word.endswith(suffix) and word[:-len(suffix)] + replacement in _BASIC:
+            return False
+    return True
+
+
+def _token_kind(token: str) -> int:
+    if token == "\x00":
+        return _SEPARATOR
+    return _WORD if token[0].isalpha() else _BOUNDARY
+
+
+def _safe_divide(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.divide(a, b, out=np.zeros(len(a), dtype=np.float64), where=b > 0)
+
+
+def extract_features(texts: Sequence[str]) -> Dict[str, np.ndarray]:
+    """
+    批量提取写作指标
+
+    Args:
+        texts: 作文文本列表
+
+    Returns:
+        {指标名: 长度为 len(texts) 的数组}，指标见 FEATURES
+    """
+    n = len(texts)
+    features = {name: np.zeros(n, dtype=np.float64) for name in FEATURES}
+    if n == 0:
+        return features
+
+    # 全部作文用 \x00 连接后一次分词，得到词、句子边界和作文分隔符组成的记号流
+    corpus = "\x00".join((text or "").lower().replace("’", "'") for text in texts)
+    tokens = _TOKEN_PATTERN.findall(corpus)
+    if not tokens:
+        return features
+    codes, uniques = pd.factorize(np.array(tokens, dtype=object))
+    unique_kinds = np.array([_token_kind(token) for token in uniques], dtype=np.int8)
+    kinds = unique_kinds[codes]
+    # 作文编号 = 之前出现的分隔符数；句子编号 = 之前出现的分隔符与句子边界数
+    essays = np.cumsum(kinds == _SEPARATOR)
+    sentences = np.cumsum(kinds != _WORD)
+    is_word = kinds == _WORD
+    if not is_word.any():
+        return features
+    words = codes[is_word]
+    essays = essays[is_word]
+    sentences = sentences[is_word]
+    vocab = {token: code for code, token in enumerate(uniques)}
+
+    word_count = np.bincount(essays, minlength=n).astype(np.float64)
+    features["word_count"] = word_count
+
+    # 句长分布：去掉空句后按句统计长度，再按作文汇总
+    _, first_token, lengths = np.unique(sentences, return_index=True, return_counts=True)
+    sentence_essays = essays[first_token]
+    lengths = lengths.astype(np.float64)
+    sentence_count = np.bincount(sentence_essays, minlength=n).astype(np.float64)
+    mean_length = _safe_divide(np.bincount(sentence_essays, weights=lengths, minlength=n), sentence_count)
+    mean_square = _safe_divide(np.bincount(sentence_essays, weights=lengths ** 2, minlength=n), sentence_count)
+    features["sentence_count"] = sentence_count
+    features["mean_sentence_length"] = mean_length
+    features["sentence_length_std"] = np.sqrt(np.maximum(mean_square - mean_length ** 2, 0))
+    features["short_sentence_ratio"] = _safe_divide(
+        np.bincount(sentence_essays, weights=(lengths < SHORT_SENTENCE).astype(np.float64), minlength=n),
+        sentence_count
+    )
+    features["long_sentence_ratio"] = _safe_divide(
+        np.bincount(sentence_essays, weights=(lengths > LONG_SENTENCE).astype(np.float64), minlength=n),
+        sentence_count
+    )
+
+    # 词汇多样性：(作文, 词) 去重后按作文计数
+    vocab_size = len(uniques)
+    distinct = np.unique(essays * vocab_size + words) // vocab_size
+    features["type_token_ratio"] = _safe_divide(np.bincount(distinct, minlength=n).astype(np.float64), word_count)
+
+    # 高级词汇：先按词表判断每个不同的词，再按词编号取值
+    advanced = np.fromiter(
+        (kind == _WORD and _is_advanced(token) for token, kind in zip(uniques, unique_kinds)),
+        dtype=bool, count=vocab_size
+    )
+    features["advanced_ratio"] = _safe_divide(
+        np.bincount(essays, weights=advanced[words].astype(np.float64), minlength=n), word_count
+    )
+
+    # 连接词：对每个短语用错位比较找出所有出现位置（不跨越作文边界）
+    used = np.zeros((n, len(CONNECTIVES)), dtype=bool)
+    counts = np.zeros(n, dtype=np.float64)
+    for column, phrase in enumerate(CONNECTIVES):
+        parts = phrase.split()
+        if any(part not in vocab for part in parts) or len(parts) > len(words):
+            continue
+        span = len(words) - len(parts) + 1
+        mask = essays[:span] == essays[len(parts) - 1:]
+        for offset, part in enumerate(parts):
+            mask &= words[offset:offset + span] == vocab[part]
+        hits = np.bincount(essays[:span][mask], minlength=n)
+        counts += hits
+        used[:, column] = hits > 0
+    features["connective_count"] = counts
+    features["connective_density"] = _safe_divide(counts * 100, word_count)
+    features["distinct_connectives"] = used.sum(axis=1).astype(np.float64)
+    return features
+
+
+class EssayMetricsStore:
+    """作文写作指标表（SQLite）"""
+
+    def __init__(self, store: EssayAnalysisStore = None):
+        """
+        Args:
+            store: 作文分析结果表（查询前补算其中尚未计算指标的记录）
+        """
+        self.store = store or analysis_store
+        self._lock = threading.Lock()
+        # 已检查过的最大分析记录ID（之后只需读取新增的记录）
+        self._synced_id = 0
+        self._init_table()
+
+    def _init_table(self):
+        """初始化指标表（每篇分析的原文和优化后文本各一行）"""
+        columns = ",\n".join(f"{name} REAL NOT NULL" for name in FEATURES)
+        with get_connection() as conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS essay_metrics (
+                    source TEXT NOT NULL,
+                    text_kind TEXT NOT NULL,
+                    year INTEGER,
+                    essay_type TEXT,
+                    points REAL,
+                    created_at REAL NOT NULL,
+                    {columns},
+                    PRIMARY KEY (source, text_kind)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_essay_metrics_time ON essay_metrics (text_kind, created_at)"
+            )
+
+    def record_many(self, analyses: List[Dict]) -> Dict[str, np.ndarray]:
+        """
+        批量计算并保存指标（同一来源已存在时覆盖）
+
+        Args:
+            analyses: [{"source": 来源标识, "year", "essay_type", "points", "created_at",
+                        "original_text", "optimized_text"}, ...]
+
+        Returns:
+            extract_features 的结果，每篇分析依次对应原文、优化后两项
+        """
+        texts = [a.get(f"{kind}_text") or "" for a in analyses for kind in TEXT_KINDS]
+        features = extract_features(texts)
+        rows = []
+        for i, analysis in enumerate(analyses):
+            for j, kind in enumerate(TEXT_KINDS):
+                row = i * len(TEXT_KINDS) + j
+                rows.append((
+                    analysis["source"], kind, analysis.get("year"), analysis.get("essay_type"),
+                    analysis.get("points"), analysis.get("created_at") or time.time(),
+                    *(float(features[name][row]) for name in FEATURES)
+                ))
+        placeholders = ", ".join("?" * (6 + len(FEATURES)))
+        with get_connection() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO essay_metrics "
+                f"(source, text_kind, year, essay_type, points, created_at, {', '.join(FEATURES)}) "
+                f"VALUES ({placeholders})",
+                rows
+            )
+        return features
+
+    def record(self, source: str, original_text: str, optimized_text: str, **info) -> Dict:
+        """
+        计算并保存一篇分析的指标
+
+        Returns:
+            {"original": {指标...}, "optimized": {指标...}}
+        """
+        analysis = {"source": source, "original_text": original_text, "optimized_text": optimized_text, **info}
+        features = self.record_many([analysis])
+        return {
+            kind: {name: round(float(features[name][j]), 4) for name in FEATURES}
+            for j, kind in enumerate(TEXT_KINDS)
+        }
+
+    def sync(self, rebuild: bool = False) -> int:
+        """
+        补算分析结果表中尚未计算指标的记录
+
+        Args:
+            rebuild: 为 True 时重新计算全部记录（指标算法调整后使用）
+
+        Returns:
+            本次计算的分析数
+        """
+        with self._lock:
+            records = self.store.records_after(
+                0 if rebuild else self._synced_id,
+                columns=("id", "source", "year", "essay_type", "score_points", "created_at",
+                         "original_text", "optimized_text")
+            )
+            if not records:
+                return 0
+            self._synced_id = max(self._synced_id, records[-1]["id"])
+            if not rebuild:
+                with get_connection() as conn:
+                    recorded = {row[0] for row in conn.execute("SELECT DISTINCT source FROM essay_metrics")}
+                records = [r for r in records if r["source"] not in recorded]
+            if records:
+                started = time.perf_counter()
+                self.record_many([{**r, "points": r["score_points"]} for r in records])
+                print(f"[Essay Metrics] 已计算 {len(records)} 篇分析的指标，"
+                      f"耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+            return len(records)
+
+    def history(
+        self,
+        text_kind: str = "original",
+        essay_type: Optional[str] = None,
+        year: Optional[int] = None
+    ) -> List[Dict]:
+        """按时间顺序返回指标记录"""
+        sql = "SELECT * FROM essay_metrics WHERE text_kind = ?"
+        params: list = [text_kind]
+        if essay_type:
+            sql += " AND essay_type = ?"
+            params.append(essay_type)
+        if year is not None:
+            sql += " AND year = ?"
+            params.append(year)
+        with get_connection() as conn:
+            rows = conn.execute(sql + " ORDER BY created_at", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def trend(
+        self,
+        metrics: Sequence[str],
+        text_kind: str = "original",
+        essay_type: Optional[str] = None,
+        window: int = 3
+    ) -> Dict:
+        """
+        指标随时间的变化
+
+        Args:
+            metrics: 指标名列表
+            window: 滑动平均的窗口（篇）
+
+        Returns:
+            {"dates": [...], "series": {指标: [...]}, "moving_average": {指标: [...]},
+             "summary": {指标: {"first", "last", "mean", "change"}}}
+        """
+        rows = self.history(text_kind, essay_type)
+        result = {"dates": [datetime.fromtimestamp(r["created_at"]).strftime("%Y-%m-%d %H:%M") for r in rows],
+                  "series": {}, "moving_average": {}, "summary": {}}
+        for name in metrics:
+            values = np.array([r[name] for r in rows], dtype=np.float64)
+            result["series"][name] = np.round(values, 4).tolist()
+            if len(values) == 0:
+                result["moving_average"][name] = []
+                result["summary"][name] = None
+                continue
+            # 前 window-1 篇按已有篇数平均
+            size = max(1, min(window, len(values)))
+            cumulative = np.cumsum(np.insert(values, 0, 0))
+            counts = np.minimum(np.arange(1, len(values) + 1), size)
+            averages = (cumulative[1:] - cumulative[np.arange(1, len(values) + 1) - counts]) / counts
+            result["moving_average"][name] = np.round(averages, 4).tolist()
+            result["summary"][name] = {
+                "first": round(float(values[0]), 4),
+                "last": round(float(values[-1]), 4),
+                "mean": round(float(values.mean()), 4),
+                "change": round(float(averages[-1] - averages[size - 1]), 4),
+            }
+        return result
+
+
+# 全局共享实例
+essay_metrics = EssayMetricsStore()
@@ -0,0 +1,175 @@
+"""
+作文优化结果解析模块
+在本地完成JSON提取、容错修复与结构校验，替代额外的模型验证调用
+"""
+import json
+import re
+from typing import Dict, Optional, Tuple
+
+from pydantic import ValidationError
+
+from schemas.essays import EssayOptimizationResult
+
+# 代码块围栏，例如 ```json ... ```
+_FENCE_PATTERN = re.compile(r'```(?:json|JSON)?\s*(.*?)```', re.S)
+# 对象/数组结束符前多余的逗号
+_TRAILING_COMMA_PATTERN = re.compile(r',(\s*[}\]])')
+# 修复截断时最多回退的逗号数量
+_MAX_TRUNCATION_BACKTRACK = 30
+
+
+def extract_json_text(raw: str) -> Optional[str]:
+    """
+    从模型输出中提取JSON主体
+    去掉代码块围栏和前后的说明文字，截断的输出保留到末尾
+    """
+    if not raw:
+        return None
+    fenced = _FENCE_PATTERN.search(raw)
+    if fenced and '{' in fenced.group(1):
+        raw = fenced.group(1)
+    elif '```' in raw:
+        # 只有起始围栏（输出被截断）
+        raw = raw.split('```', 1)[1]
+        raw = raw[raw.find('{'):] if '{' in raw else raw
+
+    start = raw.find('{')
+    if start < 0:
+        return None
+    end = raw.rfind('}')
+    if end > start:
+        # 括号完整闭合时去掉末尾的说明文字；否则视为截断，保留到末尾
+        candidate = raw[start:end + 1]
+        stack, in_string, _ = _scan(candidate)
+        if not stack and not in_string:
+            return candidate
+    return raw[start:]
+
+
+def _scan(text: str) -> Tuple[list, bool, list]:
+    """
+    扫描JSON文本
+
+    Returns:
+        (未闭合的括号栈, 是否停在字符串内部, 字符串外逗号的位置列表)
+    """
+    stack = []
+    in_string = False
+    escape = False
+    commas = []
+    for index, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+        elif ch == ',':
+            commas.append(index)
+    return stack, in_string, commas
+
+
+def _close_truncated(text: str) -> str:
+    """补齐被截断的字符串和括号"""
+    stack, in_string, _ = _scan(text)
+    if in_string:
+        if text.endswith('\\'):
+            text = text[:-1]
+        text += '"'
+    text = re.sub(r'[,:\s]+$', '', text)
+    if stack and stack[-1] == '}':
+        # 对象中只剩键名、没有值时，去掉这个键
+        text = re.sub(r'([{,])\s*"(?:[^"\\]|\\.)*"$', r'\1', text)
+        text = re.sub(r',$', '', text)
+    return text + ''.join(reversed(stack))
+
+
+def _try_load(text: str) -> Optional[Dict]:
+    try:
+        data = json.loads(text, strict=False)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def repair_json(raw: str) -> Optional[Dict]:
+    """
+    容错解析近似合法的JSON
+
+    处理：代码块围栏、前后说明文字、多余的尾逗号、输出被截断（未闭合的字符串/列表/对象）
+
+    Returns:
+        解析出的字典，无法修复时返回None
+    """
+    text = extract_json_text(raw)
+    if text is None:
+        return None
+
+    data = _try_load(text)
+    if data is not None:
+        return data
+
+    text = _TRAILING_COMMA_PATTERN.sub(r'\1', text)
+    data = _try_load(text) or _try_load(_TRAILING_COMMA_PATTERN.sub(r'\1', _close_truncated(text)))
+    if data is not None:
+        return data
+
+    # 截断点落在键名或值中间时，逐个回退到前一个逗号再补齐
+    commas = _scan(text)[2]
+    for position in reversed(commas[-_MAX_TRUNCATION_BACKTRACK:]):
+        candidate = _TRAILING_COMMA_PATTERN.sub(r'\1', _close_truncated(text[:position]))
+        data = _try_load(candidate)
+        if data is not None:
+            return data
+    return None
+
+
+def validate_essay_result(data: Dict, original: str = "") -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    校验并规范化作文优化结果
+
+    Args:
+        data: 解析后的字典
+        original: 学生原文，结果中缺失时用于补齐
+
+    Returns:
+        (规范化后的字典, 错误信息)，校验失败时字典为None
+    """
+    try:
+        result = EssayOptimizationResult.model_validate(data)
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+        return None, errors
+
+    normalized = result.model_dump()
+    if not normalized['original_text']:
+        normalized['original_text'] = original
+    return normalized, None
+
+
+def parse_essay_result(raw: str, original: str = "") -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    从模型原始输出解析作文优化结果（提取 + 修复 + 校验）
+
+    Args:
+        raw: 模型原始输出
+        original: 学生原文
+
+    Returns:
+        (规范化后的字典, 错误信息)
+    """
+    data = repair_json(raw)
+    if data is None:
+        return None, "无法提取或修复JSON"
+    return validate_essay_result(data, original)
@@ -153,10 +153,14 @@ class EssayTopicService(ExcelService):
         """初始化表头"""
         df = self.read_all()
         if df.empty or '年份' not in df.columns:
-            df = pd.DataFrame(columns=['年份', '作文类型', '题目图片路径', '参考范文'])
+            df = pd.DataFrame(columns=['年份', '作文类型', '题目图片路径', '题目文字', '参考范文'])
+            df.to_excel(self.file_path, index=False)
+        elif '题目文字' not in df.columns:
+            # 旧版题库没有题目文字列，补上空列（分析时这些题目继续使用题目图片）
+            df.insert(df.columns.get_loc('题目图片路径') + 1, '题目文字', '')
             df.to_excel(self.file_path, index=False)
     
-    def add_topic(self, year: int, essay_type: str, topic_image_path: str, reference: str):
+    def add_topic(self, year: int, essay_type: str, topic_image_path: str, reference: str, topic_text: str = ''):
         """
         添加作文题目
         
@@ -165,16 +169,25 @@ class EssayTopicService(ExcelService):
             essay_type: 作文类型（'小作文' 或 '大作文'）
             topic_image_path: 题目图片路径
             reference: 参考范文
+            topic_text: 从题目图片提取的题目文字（可选）
         """
         data = {
             '年份': year,
             '作文类型': essay_type,
             '题目图片路径': topic_image_path,
+            '题目文字': topic_text,
             '参考范文': reference
         }
         self.append_row(data)
     
-    def update_topic(self, year: int, essay_type: str, topic_image_path: str = None, reference: str = None):
+    def update_topic(
+        self,
+        year: int,
+        essay_type: str,
+        topic_image_path: str = None,
+        reference: str = None,
+        topic_text: str = None
+    ):
         """
         更新作文题目
         
@@ -183,6 +196,7 @@ class EssayTopicService(ExcelService):
             essay_type: 作文类型
             topic_image_path: 题目图片路径（可选）
             reference: 参考范文（可选）
+            topic_text: 题目文字（可选，传入空字符串表示清空）
         """
         df = self.read_all()
         mask = (df['年份'] == year) & (df['作文类型'] == essay_type)
@@ -191,6 +205,10 @@ class EssayTopicService(ExcelService):
             df.loc[mask, '题目图片路径'] = topic_image_path
         if reference:
             df.loc[mask, '参考范文'] = reference
+        if topic_text is not None:
+            # 全为空的列读出来是浮点类型，先转为文本列再写入
+            df['题目文字'] = df['题目文字'].astype(object)
+            df.loc[mask, '题目文字'] = topic_text
         
         df.to_excel(self.file_path, index=False)
     
@@ -230,7 +248,18 @@ class EssayTopicService(ExcelService):
         if result.empty:
             return None
         
-        return result.iloc[0].to_dict()
+        topic = result.iloc[0].to_dict()
+        # 未提取题目文字的空单元格读出来是 NaN，统一为空字符串
+        if pd.isna(topic.get('题目文字', '')):
+            topic['题目文字'] = ''
+        return topic
+    
+    def get_topic_image_paths(self) -> List[str]:
+        """获取所有题目的图片路径"""
+        df = self.read_all()
+        if df.empty:
+            return []
+        return [str(p) for p in df['题目图片路径'].dropna() if str(p).strip()]
     
     def get_all_years(self) -> List[int]:
         """获取所有可用的年份"""
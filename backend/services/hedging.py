@@ -0,0 +1,179 @@
+"""
+对冲请求模块
+主服务商在自适应阈值（近期延迟的高分位数）内没有返回时，向备用服务商发送同样的请求，
+先返回有效结果的一方胜出；对冲比例受上限约束以控制额外费用。
+落败方只会停止后续的重试与降级，已发出的HTTP请求无法中断，会在后台线程中自然结束
+"""
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Tuple, TypeVar
+
+import numpy as np
+
+import config
+from services.metrics import metrics
+from services.resilience import UpstreamError, cancel_token
+
+T = TypeVar("T")
+
+PRIMARY = "primary"
+SECONDARY = "secondary"
+
+
+class HedgePolicy:
+    """单类请求的对冲阈值与对冲预算"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._latencies = deque(maxlen=config.HEDGE_WINDOW)
+        # 近期每次调用是否发出了对冲请求
+        self._hedged = deque(maxlen=config.HEDGE_WINDOW)
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        """等待主请求多久后发出对冲请求（样本不足时使用初始值）"""
+        with self._lock:
+            samples = list(self._latencies)
+        if len(samples) < config.HEDGE_MIN_SAMPLES:
+            return config.HEDGE_INITIAL_DELAY
+        threshold = float(np.percentile(samples, config.HEDGE_PERCENTILE))
+        return min(max(threshold, config.HEDGE_MIN_DELAY), config.HEDGE_MAX_DELAY)
+
+    def record_latency(self, latency: float):
+        """记录主服务商的耗时（主请求落败时记录的是已等待时长，作为下限）"""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def try_hedge(self) -> bool:
+        """在对冲比例上限内时登记一次对冲并返回True"""
+        with self._lock:
+            hedged = sum(self._hedged)
+            allowed = hedged < config.HEDGE_MAX_RATE * len(self._hedged) + config.HEDGE_BURST
+            self._hedged.append(allowed)
+            return allowed
+
+    def record_unhedged(self):
+        with self._lock:
+            self._hedged.append(False)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            calls = len(self._hedged)
+            hedged = sum(self._hedged)
+            samples = len(self._latencies)
+        return {
+            "delay": round(self.delay(), 3),
+            "samples": samples,
+            "recent_calls": calls,
+            "recent_hedge_rate": round(hedged / calls, 4) if calls else 0.0
+        }
+
+
+class Hedger:
+    """执行可对冲的调用"""
+
+    def __init__(self, max_workers: int = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.HEDGE_MAX_WORKERS, thread_name_prefix="hedge"
+        )
+        self._policies: Dict[str, HedgePolicy] = {}
+        self._lock = threading.Lock()
+
+    def policy(self, name: str) -> HedgePolicy:
+        with self._lock:
+            if name not in self._policies:
+                self._policies[name] = HedgePolicy(name)
+            return self._policies[name]
+
+    def _submit(self, fn: Callable[[], T], token: threading.Event):
+        """在复制的上下文中执行调用（保留遥测标签，并设置取消信号）"""
+        context = contextvars.copy_context()
+
+        def run():
+            cancel_token.set(token)
+            return fn()
+
+        return self._executor.submit(context.run, run)
+
+    def run(
+        self,
+        name: str,
+        primary: Callable[[], T],
+        secondary: Callable[[], T],
+        is_valid: Callable[[T], bool]
+    ) -> Tuple[T, str]:
+        """
+        执行主调用，超过阈值仍未返回时发出对冲调用
+
+        Args:
+            name: 请求类别（各类别独立统计阈值与对冲比例）
+            primary: 主服务商调用
+            secondary: 备用服务商调用
+            is_valid: 判断结果是否有效
+
+        Returns:
+            (胜出的结果, 来源 primary/secondary)
+
+        Raises:
+            UpstreamError: 两方均失败（或都没有有效结果）
+        """
+        policy = self.policy(name)
+        started = time.perf_counter()
+        tokens = {PRIMARY: threading.Event(), SECONDARY: threading.Event()}
+        futures = {self._submit(primary, tokens[PRIMARY]): PRIMARY}
+
+        done, _ = wait(list(futures), timeout=policy.delay())
+        if not done:
+            if policy.try_hedge():
+                print(f"[Hedge] {name} 主请求超过 {policy.delay():.1f}s 未返回，发出对冲请求")
+                metrics.increment("hedge_sent", kind=name)
+                futures[self._submit(secondary, tokens[SECONDARY])] = SECONDARY
+            else:
+                metrics.increment("hedge_budget_exhausted", kind=name)
+        else:
+            policy.record_unhedged()
+
+        errors = []
+        invalid = None
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = futures[future]
+                try:
+                    value = future.result()
+                except Exception as e:
+                    errors.append(f"{source}: {e}")
+                    continue
+                if not is_valid(value):
+                    invalid = invalid or (value, source)
+                    errors.append(f"{source}: 结果无效")
+                    continue
+
+                # 胜出：通知另一方放弃（不再重试或降级，进行中的请求在后台结束，结果丢弃）
+                for other_future, other in futures.items():
+                    if other != source:
+                        tokens[other].set()
+                        if not other_future.done():
+                            print(f"[Hedge] {name} 由{source}胜出，放弃{other}的结果（请求在后台结束）")
+                            metrics.increment("hedge_abandoned", kind=name, source=other)
+                policy.record_latency(time.perf_counter() - started)
+                if len(futures) > 1:
+                    metrics.increment("hedge_wins", kind=name, source=source)
+                return value, source
+
+        if invalid is not None:
+            return invalid
+        raise UpstreamError("；".join(errors))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            policies = dict(self._policies)
+        return {name: policy.snapshot() for name, policy in policies.items()}
+
+
+# 全局共享实例
+hedger = Hedger()
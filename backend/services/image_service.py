@@ -1,23 +1,46 @@
 """
 图像处理服务模块
 """
-from PIL import Image
+from PIL import Image, ImageOps
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+import io
+import math
 import os
+import numpy as np
+import config
 
 class ImageService:
     """图像处理服务类"""
     
-    def __init__(self, upload_dir: str = "uploads"):
+    def __init__(
+        self,
+        upload_dir: str = "uploads",
+        max_edge: int = None,
+        grayscale: bool = None,
+        autocontrast: bool = None,
+        output_format: str = None,
+        target_bytes: int = None
+    ):
         """
         初始化图像服务
         
         Args:
             upload_dir: 上传文件保存目录
+            max_edge: 预处理后的最长边像素（默认读取配置）
+            grayscale: 是否转为灰度图（默认读取配置）
+            autocontrast: 是否自动拉伸对比度（默认读取配置）
+            output_format: 预处理输出格式，JPEG 或 WEBP（默认读取配置）
+            target_bytes: 预处理输出的目标大小上限（默认读取配置）
         """
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.max_edge = max_edge or config.OCR_IMAGE_MAX_EDGE
+        self.grayscale = config.OCR_IMAGE_GRAYSCALE if grayscale is None else grayscale
+        self.autocontrast = config.OCR_IMAGE_AUTOCONTRAST if autocontrast is None else autocontrast
+        self.output_format = (output_format or config.OCR_IMAGE_FORMAT).upper()
+        self.target_bytes = target_bytes or config.OCR_IMAGE_TARGET_BYTES
     
     def save_upload_file(self, file_content: bytes, filename: str) -> str:
         """
@@ -55,18 +78,171 @@ class ImageService:
     
     def preprocess_image(self, file_path: str) -> Optional[str]:
         """
-        预处理图像（可选）
-        例如：调整大小、增强对比度等
+        预处理图像，减小上传体积并提升手写识别效果
+        流程：EXIF方向校正 -> 缩放到最长边 -> 灰度化与对比度拉伸 -> 按目标大小重新编码
+        
+        该方法为CPU密集型操作，在异步接口中应通过线程池调用
         
         Args:
             file_path: 原始图像路径
             
         Returns:
-            处理后的图像路径
+            处理后的图像路径；处理失败或无收益时返回原路径
+        """
+        try:
+            source = Path(file_path)
+            original_size = source.stat().st_size
+            
+            with Image.open(source) as img:
+                img = self._normalize_image(img)
+                data, quality = self._encode_within_budget(img)
+            
+            # 原图本身已足够小时，保留原图
+            if len(data) >= original_size:
+                print(f"[Image Service] 预处理无收益，保留原图: {source.name}")
+                return file_path
+            
+            suffix = ".webp" if self.output_format == "WEBP" else ".jpg"
+            output_path = source.with_name(f"{source.stem}_ocr{suffix}")
+            with open(output_path, 'wb') as f:
+                f.write(data)
+            
+            print(f"[Image Service] 预处理完成: {original_size} -> {len(data)} 字节 "
+                  f"(质量 {quality}, {self.output_format})")
+            return str(output_path)
+        except Exception as e:
+            print(f"[Image Service] 图像预处理失败，使用原图: {e}")
+            return file_path
+    
+    def should_tile(self, file_path: str) -> bool:
+        """
+        判断作文图片是否需要分段识别（长截图、多页拼接等高宽比很大的图片）
         """
-        # TODO: 实现图像预处理逻辑
-        # 目前直接返回原路径
-        return file_path
+        try:
+            with Image.open(file_path) as img:
+                width, height = ImageOps.exif_transpose(img).size
+            return height / width >= config.OCR_TILE_MIN_ASPECT
+        except Exception as e:
+            print(f"[Image Service] 读取图片尺寸失败: {e}")
+            return False
+    
+    def split_into_bands(self, file_path: str, max_bands: int = None, overlap: float = None) -> List[str]:
+        """
+        将高图按水平方向切分为相互重叠的若干段
+        切分位置优先落在附近墨迹最少的行（行间空白），减少把一行字切成两半
+        
+        Args:
+            file_path: 原始图像路径
+            max_bands: 最多切分的段数（默认读取配置）
+            overlap: 相邻两段的重叠比例（相对段高，默认读取配置）
+            
+        Returns:
+            各段图片路径（自上而下）；无需切分或失败时返回 [file_path]
+        """
+        max_bands = max_bands or config.OCR_TILE_MAX_BANDS
+        overlap = config.OCR_TILE_OVERLAP if overlap is None else overlap
+        try:
+            source = Path(file_path)
+            with Image.open(source) as img:
+                img = ImageOps.exif_transpose(img).convert('RGB')
+            width, height = img.size
+            
+            band_height = width * config.OCR_TILE_BAND_ASPECT
+            count = min(max_bands, math.ceil(height / band_height))
+            if count <= 1:
+                return [file_path]
+            
+            cuts = self._band_cuts(img, count)
+            margin = int(height / count * overlap / 2)
+            paths = []
+            for index in range(count):
+                top = max(cuts[index] - margin, 0)
+                bottom = min(cuts[index + 1] + margin, height)
+                band_path = source.with_name(f"{source.stem}_band{index + 1}.jpg")
+                img.crop((0, top, width, bottom)).save(band_path, format='JPEG', quality=95)
+                paths.append(str(band_path))
+            
+            print(f"[Image Service] 图片已切分为 {count} 段: {width}x{height}")
+            return paths
+        except Exception as e:
+            print(f"[Image Service] 图片分段失败，按整图识别: {e}")
+            return [file_path]
+    
+    @staticmethod
+    def _band_cuts(img: Image.Image, count: int) -> List[int]:
+        """计算切分位置（含首尾），在等分点附近寻找墨迹最少的行"""
+        width, height = img.size
+        # 在缩小的灰度图上统计每行的墨迹量
+        scale = min(1.0, 1000 / height)
+        small = img.convert('L').resize((max(int(width * scale), 1), max(int(height * scale), 1)))
+        darkness = 255 - np.asarray(small, dtype=np.float32).mean(axis=1)
+        
+        step = len(darkness) / count
+        window = max(int(step * 0.15), 1)
+        cuts = [0]
+        for index in range(1, count):
+            target = int(step * index)
+            low, high = max(target - window, 1), min(target + window, len(darkness) - 1)
+            row = low + int(np.argmin(darkness[low:high])) if high > low else target
+            cuts.append(int(row / scale))
+        cuts.append(height)
+        return cuts
+    
+    def _normalize_image(self, img: Image.Image) -> Image.Image:
+        """方向校正、缩放、灰度化与对比度拉伸"""
+        if img.format == 'JPEG':
+            # JPEG 可在解码阶段直接降采样，大幅减少大图的解码耗时
+            img.draft('RGB', (self.max_edge, self.max_edge))
+        img = ImageOps.exif_transpose(img)
+        
+        if self.grayscale:
+            img = img.convert('L')
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        img.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+        
+        if self.autocontrast:
+            # 裁掉两端1%的极值，避免阴影或反光影响拉伸效果
+            img = ImageOps.autocontrast(img, cutoff=1)
+        return img
+    
+    def _encode_within_budget(self, img: Image.Image) -> Tuple[bytes, int]:
+        """
+        在目标大小内以尽可能高的质量编码图像
+        先二分查找压缩质量，最低质量仍超出预算时继续缩小尺寸
+        
+        Returns:
+            (编码后的字节, 使用的压缩质量)
+        """
+        for _ in range(4):
+            low, high = config.OCR_IMAGE_MIN_QUALITY, config.OCR_IMAGE_MAX_QUALITY
+            best = None
+            while low <= high:
+                quality = (low + high) // 2
+                data = self._encode(img, quality)
+                if len(data) <= self.target_bytes:
+                    best = (data, quality)
+                    low = quality + 1
+                else:
+                    high = quality - 1
+            if best:
+                return best
+            
+            width, height = img.size
+            img = img.resize((int(width * 0.8), int(height * 0.8)), Image.LANCZOS)
+        
+        quality = config.OCR_IMAGE_MIN_QUALITY
+        return self._encode(img, quality), quality
+    
+    def _encode(self, img: Image.Image, quality: int) -> bytes:
+        """按指定格式与质量编码图像"""
+        buffer = io.BytesIO()
+        if self.output_format == "WEBP":
+            img.save(buffer, format='WEBP', quality=quality, method=4)
+        else:
+            img.save(buffer, format='JPEG', quality=quality, optimize=True)
+        return buffer.getvalue()
     
     def cleanup_file(self, file_path: str):
         """
@@ -0,0 +1,170 @@
+"""
+对话图片存储模块
+图片按内容哈希存储（相同图片只保存一份），对话历史、会话记录和保存的聊天记录
+都只引用图片ID；发送给模型时再按ID编码为 data URI（编码结果有少量缓存）
+"""
+import base64
+import hashlib
+import mimetypes
+import os
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import config
+
+# 图片ID：内容 SHA-256 的前32位十六进制（同时防止路径穿越）
+_IMAGE_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+# 图片地址中的ID（/api/v1/chat/images/<id>）
+_IMAGE_URL_PATTERN = re.compile(r'/chat/images/([0-9a-f]{32})(?:[/?#]|$)')
+_ALLOWED_SUFFIXES = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+
+
+class ImageStore:
+    """按内容寻址的图片存储"""
+
+    def __init__(self, root: Path = None, uri_cache_size: int = None):
+        """
+        Args:
+            root: 存储目录
+            uri_cache_size: 缓存的 data URI 数量
+        """
+        self.root = Path(root or config.CHAT_IMAGE_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.uri_cache_size = uri_cache_size or config.CHAT_IMAGE_URI_CACHE_SIZE
+        self._uris: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_valid_id(image_id: str) -> bool:
+        return bool(_IMAGE_ID_PATTERN.match(image_id or ""))
+
+    @staticmethod
+    def id_from_url(url: str) -> Optional[str]:
+        """从图片地址中解析图片ID（不是本存储的地址时返回None）"""
+        if not url or url.startswith('data:'):
+            return None
+        match = _IMAGE_URL_PATTERN.search(url)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def url(image_id: str) -> str:
+        """图片的访问地址"""
+        return f"/api/v1/chat/images/{image_id}"
+
+    def _shard(self, image_id: str) -> Path:
+        return self.root / image_id[:2]
+
+    def put(self, data: bytes, suffix: str = ".jpg") -> str:
+        """
+        保存图片（已存在相同内容时直接返回ID）
+
+        Args:
+            data: 图片内容
+            suffix: 文件扩展名
+
+        Returns:
+            图片ID
+        """
+        image_id = hashlib.sha256(data).hexdigest()[:32]
+        if self.path(image_id) is not None:
+            return image_id
+
+        suffix = suffix.lower() if suffix.lower() in _ALLOWED_SUFFIXES else ".jpg"
+        shard = self._shard(image_id)
+        shard.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再改名，避免并发读取到写了一半的图片
+        tmp_path = shard / f".{image_id}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, shard / f"{image_id}{suffix}")
+        print(f"[Image Store] 已保存图片: {image_id} ({len(data)} 字节)")
+        return image_id
+
+    def put_file(self, file_path: str) -> str:
+        """保存本地图片文件，返回图片ID"""
+        path = Path(file_path)
+        return self.put(path.read_bytes(), path.suffix)
+
+    def path(self, image_id: str) -> Optional[Path]:
+        """图片的本地路径（不存在或ID非法时返回None）"""
+        if not self.is_valid_id(image_id):
+            return None
+        shard = self._shard(image_id)
+        if not shard.exists():
+            return None
+        for candidate in shard.glob(f"{image_id}.*"):
+            if candidate.suffix.lower() in _ALLOWED_SUFFIXES:
+                return candidate
+        return None
+
+    def delete(self, image_id: str):
+        """删除图片（仅用于丢弃校验失败的上传）"""
+        path = self.path(image_id)
+        if path is not None:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._uris.pop(image_id, None)
+
+    def data_uri(self, image_id: str) -> Optional[str]:
+        """
+        图片的 data URI（同一张图片在多轮对话中反复发送，编码结果缓存在内存中）
+
+        Returns:
+            data URI，图片不存在时返回None
+        """
+        with self._lock:
+            uri = self._uris.get(image_id)
+            if uri is not None:
+                self._uris.move_to_end(image_id)
+                return uri
+
+        path = self.path(image_id)
+        if path is None:
+            return None
+        mime_type = mimetypes.guess_type(str(path))[0] or 'image/jpeg'
+        uri = f"data:{mime_type};base64,{base64.b64encode(path.read_bytes()).decode('utf-8')}"
+
+        with self._lock:
+            self._uris[image_id] = uri
+            while len(self._uris) > self.uri_cache_size:
+                self._uris.popitem(last=False)
+        return uri
+
+    def link_into(self, image_id: str, target_dir: Path, name: str) -> Optional[str]:
+        """
+        把图片放进指定目录（优先使用硬链接，不占额外空间；跨文件系统时复制）
+
+        Args:
+            image_id: 图片ID
+            target_dir: 目标目录
+            name: 目标文件名（不含扩展名）
+
+        Returns:
+            目标文件名（含扩展名），图片不存在时返回None
+        """
+        source = self.path(image_id)
+        if source is None:
+            return None
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / f"{name}{source.suffix}"
+        target.unlink(missing_ok=True)
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+        return target.name
+
+    def existing(self, image_ids: List[str]) -> List[str]:
+        """过滤掉非法或不存在的图片ID（保持顺序并去重）"""
+        seen = []
+        for image_id in image_ids:
+            if image_id not in seen and self.path(image_id) is not None:
+                seen.append(image_id)
+        return seen
+
+
+# 全局共享实例
+image_store = ImageStore()
@@ -0,0 +1,255 @@
+"""
+持久化后台任务队列
+任务保存在本地SQLite中，工作协程随 FastAPI 生命周期启动；
+关闭窗口或重启后端都不会丢失已排队或已完成的任务
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+import config
+from services.database import get_connection
+from services.telemetry import current_endpoint
+
+# 任务状态
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TERMINAL_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobQueue:
+    """基于SQLite的后台任务队列"""
+
+    def __init__(self):
+        self._handlers: Dict[str, Callable[[Dict], Dict]] = {}
+        # 任务结束（成功、失败或取消）后清理任务文件的函数
+        self._cleanups: Dict[str, Callable[[Dict], None]] = {}
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._init_table()
+
+    def _init_table(self):
+        """初始化任务表"""
+        with get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, priority, created_at)")
+
+    def register(
+        self,
+        kind: str,
+        handler: Callable[[Dict], Dict],
+        cleanup: Callable[[Dict], None] = None
+    ):
+        """
+        注册任务处理函数（任务只能由对应的业务接口提交，payload 可能包含服务器文件路径）
+
+        Args:
+            kind: 任务类型
+            handler: 同步处理函数，接收 payload 字典，返回可JSON序列化的结果字典；
+                     会在线程池中执行
+            cleanup: 任务结束后调用的清理函数，接收 payload 字典（例如删除任务图片）
+        """
+        self._handlers[kind] = handler
+        if cleanup:
+            self._cleanups[kind] = cleanup
+
+    def _cleanup(self, kind: str, payload: Dict):
+        """执行任务的清理函数（失败只记录日志）"""
+        cleanup = self._cleanups.get(kind)
+        if cleanup is None:
+            return
+        try:
+            cleanup(payload)
+        except Exception as e:
+            print(f"[Job Queue] 清理任务文件失败 ({kind}): {e}")
+
+    def submit(self, kind: str, payload: Dict, priority: int = 0) -> str:
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型（必须已注册）
+            payload: 任务参数
+            priority: 优先级，数值越小越先执行
+
+        Returns:
+            任务ID
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"未知的任务类型: {kind}")
+
+        job_id = uuid.uuid4().hex
+        with get_connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, priority, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, priority, json.dumps(payload, ensure_ascii=False), time.time())
+            )
+        if self._wakeup and self._loop:
+            # 提交可能发生在线程池中（同步接口），asyncio.Event 只能在事件循环线程中设置
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        print(f"[Job Queue] 已提交任务 {kind}: {job_id}")
+        return job_id
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict]:
+        """获取任务状态（可选附带结果）"""
+        with get_connection() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_to_dict(row, include_result)
+
+    def list(self, status: str = None, kind: str = None, limit: int = 50) -> List[Dict]:
+        """按创建时间倒序列出任务（不含结果）"""
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        with get_connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [self._row_to_dict(row, include_result=False) for row in rows]
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """
+        取消任务
+        排队中的任务不会再执行（立即清理任务文件）；执行中的任务无法中断，
+        但完成后结果会被丢弃，任务文件在处理函数返回后清理
+        """
+        with get_connection() as conn:
+            row = conn.execute("SELECT kind, status, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)
+            ).rowcount
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, RUNNING)
+            )
+        if row is not None and cancelled:
+            self._cleanup(row["kind"], json.loads(row["payload"]))
+        return self.get(job_id, include_result=False)
+
+    @staticmethod
+    def _row_to_dict(row, include_result: bool) -> Dict:
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "priority": row["priority"],
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
+        if include_result:
+            job["result"] = json.loads(row["result"]) if row["result"] else None
+        return job
+
+    # ==================== 工作协程 ====================
+
+    def _claim_next(self) -> Optional[Dict]:
+        """原子地领取下一个排队中的任务"""
+        with get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY priority, created_at LIMIT 1",
+                (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row["id"])
+            )
+        return {"id": row["id"], "kind": row["kind"], "payload": json.loads(row["payload"])}
+
+    def _finish(self, job_id: str, status: str, result: Dict = None, error: str = None):
+        """记录任务结果（已被取消的任务不覆盖）"""
+        with get_connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id, RUNNING)
+            )
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await asyncio.to_thread(self._claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    # 定期轮询，兜底其他进程写入的任务
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            handler = self._handlers.get(job["kind"])
+            if handler is None:
+                await asyncio.to_thread(self._finish, job["id"], FAILED, None, f"未知的任务类型: {job['kind']}")
+                continue
+
+            print(f"[Job Queue] worker-{worker_id} 执行任务 {job['kind']}: {job['id']}")
+            current_endpoint.set(f"job:{job['kind']}")
+            try:
+                result = await asyncio.to_thread(handler, job["payload"])
+                await asyncio.to_thread(self._finish, job["id"], SUCCEEDED, result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[Job Queue] 任务失败 {job['id']}: {e}")
+                await asyncio.to_thread(self._finish, job["id"], FAILED, None, str(e))
+            # 任务已结束（包括执行期间被取消），清理任务文件
+            await asyncio.to_thread(self._cleanup, job["kind"], job["payload"])
+
+    async def start(self, workers: int = None):
+        """启动工作协程（在 FastAPI lifespan 中调用）"""
+        # 上次退出时执行到一半的任务重新排队
+        with get_connection() as conn:
+            reset = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+            ).rowcount
+        if reset:
+            print(f"[Job Queue] {reset} 个中断的任务已重新排队")
+
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(workers or config.JOB_WORKERS)
+        ]
+
+    async def stop(self):
+        """停止工作协程"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+
+# 全局共享实例
+job_queue = JobQueue()
@@ -0,0 +1,114 @@
+"""
+进程内指标统计模块
+以 (指标名, 标签) 为键累计计数和直方图，供 /system/metrics 接口读取
+"""
+import bisect
+import threading
+from typing import Dict, Sequence, Tuple
+
+# 默认直方图分桶上界（秒），适用于模型调用耗时
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+
+class Histogram:
+    """固定分桶的直方图（调用方负责加锁）"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # 最后一个桶对应 +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+class MetricsRegistry:
+    """线程安全的计数器与直方图集合"""
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels):
+        """
+        累加计数器
+
+        Args:
+            name: 指标名称
+            value: 增量
+            labels: 标签，如 model="xxx"
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = DEFAULT_BUCKETS, **labels):
+        """
+        记录一次观测值到直方图
+
+        Args:
+            name: 指标名称
+            value: 观测值
+            buckets: 分桶上界（仅在首次创建该直方图时生效）
+            labels: 标签
+        """
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def get(self, name: str, **labels) -> float:
+        """读取单个计数器的当前值"""
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def snapshot(self) -> Dict[str, list]:
+        """
+        导出全部计数器
+
+        Returns:
+            {指标名: [{"labels": {...}, "value": ...}, ...]}
+        """
+        with self._lock:
+            items = list(self._counters.items())
+        result: Dict[str, list] = {}
+        for (name, labels), value in sorted(items):
+            result.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return result
+
+    def histogram_snapshot(self) -> Dict[str, list]:
+        """
+        导出全部直方图（分桶为累计计数）
+
+        Returns:
+            {指标名: [{"labels": {...}, "count": ..., "sum": ..., "buckets": {...}}, ...]}
+        """
+        with self._lock:
+            items = [(key, histogram.to_dict()) for key, histogram in self._histograms.items()]
+        result: Dict[str, list] = {}
+        for (name, labels), data in sorted(items, key=lambda item: item[0]):
+            result.setdefault(name, []).append({"labels": dict(labels), **data})
+        return result
+
+
+# 全局共享实例
+metrics = MetricsRegistry()
@@ -0,0 +1,95 @@
+"""
+分段OCR结果拼接模块
+同一页切分出的相邻两段图片有重叠区域，识别结果的首尾会出现重复的文字；
+按单词对齐找到接缝处的重复部分，只保留一份。不同页之间没有重叠，直接换行拼接
+"""
+import re
+from typing import List, Optional, Tuple
+
+# 单词（保留位置用于截取原文）
+_TOKEN_PATTERN = re.compile(r'\S+')
+# 比较时忽略大小写和首尾标点
+_STRIP_PATTERN = re.compile(r'^\W+|\W+$')
+# 只在上一段末尾/下一段开头的这些单词内寻找重叠
+_OVERLAP_WINDOW = 60
+# 至少连续匹配这么多个单词才视为重叠
+_MIN_OVERLAP_WORDS = 3
+# 下一段开头允许跳过的单词数（被切断的半行识别出的残片）
+_MAX_LOWER_OFFSET = 3
+
+
+def _tokens(text: str) -> List[Tuple[str, int, int]]:
+    """(规范化单词, 起始位置, 结束位置)"""
+    tokens = []
+    for match in _TOKEN_PATTERN.finditer(text):
+        word = _STRIP_PATTERN.sub('', match.group()).lower()
+        if word:
+            tokens.append((word, match.start(), match.end()))
+    return tokens
+
+
+def merge_overlap(upper: str, lower: str) -> str:
+    """
+    拼接上下相邻两段的识别结果，去掉重叠部分
+
+    Args:
+        upper: 上一段文字
+        lower: 下一段文字
+
+    Returns:
+        拼接后的文字
+    """
+    upper = upper.rstrip()
+    lower = lower.strip()
+    if not upper:
+        return lower
+    if not lower:
+        return upper
+
+    upper_tokens = _tokens(upper)[-_OVERLAP_WINDOW:]
+    lower_tokens = _tokens(lower)[:_OVERLAP_WINDOW]
+    upper_words = [t[0] for t in upper_tokens]
+    lower_words = [t[0] for t in lower_tokens]
+
+    # 重叠必须位于接缝处：以上一段的最后一个单词结束，并从下一段开头（允许跳过少量残片）开始；
+    # 取满足条件的最长匹配
+    match = None
+    for size in range(min(len(upper_words), len(lower_words)), _MIN_OVERLAP_WORDS - 1, -1):
+        tail = upper_words[-size:]
+        for offset in range(min(_MAX_LOWER_OFFSET, len(lower_words) - size) + 1):
+            if lower_words[offset:offset + size] == tail:
+                match = (len(upper_words) - size, offset)
+                break
+        if match:
+            break
+
+    if match is None:
+        # 没有可靠的重叠（例如分段正好落在行间空白处），直接换行拼接
+        return f"{upper}\n{lower}"
+
+    # 上一段保留到重叠开始之前，下一段从重叠开始处接上（下一段开头被切断的残片随之丢弃）
+    upper_cut = upper_tokens[match[0]][1]
+    lower_cut = lower_tokens[match[1]][1]
+    return upper[:upper_cut] + lower[lower_cut:]
+
+
+def stitch_ocr_texts(texts: List[str], pages: Optional[List[int]] = None) -> str:
+    """
+    按自上而下的顺序拼接多段识别结果
+
+    Args:
+        texts: 各段的识别文字
+        pages: 各段所属的页序号（为空时视为同一页）；只在同一页的相邻段之间去重，不同页直接换行拼接
+
+    Returns:
+        完整文字
+    """
+    pages = pages or [0] * len(texts)
+    result, previous_page = "", None
+    for text, page in zip(texts, pages):
+        if page == previous_page:
+            result = merge_overlap(result, text or "")
+        else:
+            result = "\n".join(part for part in (result.rstrip(), (text or "").strip()) if part)
+        previous_page = page
+    return result
@@ -0,0 +1,248 @@
+"""
+上游调用限流与优先级调度模块
+每个服务商（以及可选的单个模型）对应一组令牌桶（请求数/分钟token数），
+请求按优先级排队：交互对话 > 作文分析 > 批量/后台任务，
+等待时间越长优先级逐渐提高，避免低优先级请求饿死
+"""
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+import config
+from services.metrics import metrics
+
+# 优先级（数值越小越优先）
+PRIORITY_INTERACTIVE = 0
+PRIORITY_ANALYSIS = 1
+PRIORITY_BATCH = 2
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_ANALYSIS: "analysis",
+    PRIORITY_BATCH: "batch",
+}
+
+
+class RateLimitTimeout(Exception):
+    """排队等待超时"""
+
+
+class TokenBucket:
+    """令牌桶（调用方负责加锁）"""
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量）
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """距离令牌足够还需等待的秒数（0 表示立即可用）"""
+        self._refill(now)
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def consume(self, cost: float):
+        self.tokens -= min(cost, self.capacity)
+
+
+def _build_buckets(limits: Optional[Dict]) -> Dict[str, TokenBucket]:
+    """根据配置创建令牌桶：requests 按请求计数，tokens 按估算的token数计数"""
+    buckets = {}
+    if not limits:
+        return buckets
+    if limits.get("requests_per_second"):
+        rate = limits["requests_per_second"]
+        buckets["requests"] = TokenBucket(rate, limits.get("burst") or max(rate, 1))
+    if limits.get("tokens_per_minute"):
+        tpm = limits["tokens_per_minute"]
+        buckets["tokens"] = TokenBucket(tpm / 60, tpm)
+    return buckets
+
+
+class _Waiter:
+    def __init__(self, seq: int, priority: int, model: str, cost_tokens: int):
+        self.seq = seq
+        self.priority = priority
+        self.model = model
+        self.cost_tokens = cost_tokens
+        self.enqueued = time.monotonic()
+
+
+class ProviderScheduler:
+    """单个服务商的限流队列"""
+
+    def __init__(self, provider: str, limits: Dict = None, model_limits: Dict[str, Dict] = None,
+                 aging_seconds: float = None):
+        """
+        Args:
+            provider: 服务商名称
+            limits: 服务商级限额，如 {"requests_per_second": 2, "burst": 4, "tokens_per_minute": 60000}
+            model_limits: 模型级限额 {模型名: 限额}
+            aging_seconds: 每等待多少秒优先级提升一级
+        """
+        self.provider = provider
+        self.aging_seconds = aging_seconds or config.RATE_LIMIT_AGING_SECONDS
+        self._buckets = _build_buckets(limits)
+        self._model_buckets = {model: _build_buckets(l) for model, l in (model_limits or {}).items()}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {name: {"acquired": 0, "wait_total": 0.0, "wait_max": 0.0}
+                       for name in PRIORITY_NAMES.values()}
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> float:
+        return waiter.priority - (now - waiter.enqueued) / self.aging_seconds
+
+    @staticmethod
+    def _wait_for(buckets: Dict[str, TokenBucket], cost_tokens: int, now: float) -> float:
+        wait = 0.0
+        for name, bucket in buckets.items():
+            wait = max(wait, bucket.wait_time(1 if name == "requests" else cost_tokens, now))
+        return wait
+
+    def _select(self, now: float):
+        """
+        选出当前可以放行的请求
+
+        Returns:
+            (可放行的请求或None, 建议的下次检查间隔)
+        """
+        ordered = sorted(self._waiters, key=lambda w: (self._effective_priority(w, now), w.seq))
+        delay = 1.0
+        for waiter in ordered:
+            provider_wait = self._wait_for(self._buckets, waiter.cost_tokens, now)
+            if provider_wait > 0:
+                # 服务商额度不足：更低优先级的请求也不能越过它
+                return None, provider_wait
+            model_wait = self._wait_for(self._model_buckets.get(waiter.model, {}), waiter.cost_tokens, now)
+            if model_wait == 0:
+                return waiter, 0.0
+            # 仅该模型额度不足，允许其他模型的请求先走
+            delay = min(delay, model_wait)
+        return None, delay
+
+    def acquire(self, model: str, priority: int = PRIORITY_ANALYSIS, cost_tokens: int = 0,
+                timeout: float = None) -> float:
+        """
+        排队获取调用额度（阻塞当前线程）
+
+        Args:
+            model: 模型名称
+            priority: 优先级
+            cost_tokens: 本次请求估算的token数（用于分钟token额度）
+            timeout: 最长等待秒数
+
+        Returns:
+            实际等待的秒数
+
+        Raises:
+            RateLimitTimeout: 等待超时
+        """
+        if not self._buckets and model not in self._model_buckets:
+            return 0.0
+
+        timeout = config.RATE_LIMIT_MAX_WAIT if timeout is None else timeout
+        with self._cond:
+            waiter = _Waiter(next(self._seq), priority, model, cost_tokens)
+            self._waiters.append(waiter)
+            deadline = waiter.enqueued + timeout
+            try:
+                while True:
+                    now = time.monotonic()
+                    selected, delay = self._select(now)
+                    if selected is waiter:
+                        break
+                    if selected is not None:
+                        # 轮到其他请求，唤醒它们
+                        self._cond.notify_all()
+                    if now >= deadline:
+                        raise RateLimitTimeout(
+                            f"{self.provider} 限流排队超过 {timeout:.0f} 秒"
+                        )
+                    self._cond.wait(min(max(delay, 0.005), deadline - now))
+
+                for name, bucket in list(self._buckets.items()) + list(self._model_buckets.get(model, {}).items()):
+                    bucket.consume(1 if name == "requests" else cost_tokens)
+            finally:
+                self._waiters.remove(waiter)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - waiter.enqueued
+            stats = self._stats[PRIORITY_NAMES.get(priority, str(priority))]
+            stats["acquired"] += 1
+            stats["wait_total"] += waited
+            stats["wait_max"] = max(stats["wait_max"], waited)
+
+        priority_name = PRIORITY_NAMES.get(priority, str(priority))
+        metrics.increment("ratelimit_acquired", provider=self.provider, priority=priority_name)
+        metrics.increment("ratelimit_wait_seconds", waited, provider=self.provider, priority=priority_name)
+        return waited
+
+    def snapshot(self) -> Dict:
+        """队列深度、各优先级的等待时间统计与剩余额度"""
+        with self._cond:
+            now = time.monotonic()
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            oldest_wait = 0.0
+            for waiter in self._waiters:
+                depth[PRIORITY_NAMES.get(waiter.priority, str(waiter.priority))] += 1
+                oldest_wait = max(oldest_wait, now - waiter.enqueued)
+            for bucket in self._buckets.values():
+                bucket.wait_time(0, now)
+            return {
+                "queue_depth": depth,
+                "oldest_wait": round(oldest_wait, 3),
+                "available": {name: round(b.tokens, 2) for name, b in self._buckets.items()},
+                "priorities": {
+                    name: {
+                        "acquired": s["acquired"],
+                        "avg_wait": round(s["wait_total"] / s["acquired"], 3) if s["acquired"] else 0.0,
+                        "max_wait": round(s["wait_max"], 3)
+                    }
+                    for name, s in self._stats.items()
+                }
+            }
+
+
+class RateLimiterRegistry:
+    """按服务商管理限流队列"""
+
+    def __init__(self):
+        self._schedulers: Dict[str, ProviderScheduler] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> ProviderScheduler:
+        with self._lock:
+            if provider not in self._schedulers:
+                self._schedulers[provider] = ProviderScheduler(
+                    provider,
+                    config.RATE_LIMITS.get(provider),
+                    config.MODEL_RATE_LIMITS.get(provider)
+                )
+            return self._schedulers[provider]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            schedulers = dict(self._schedulers)
+        return {name: scheduler.snapshot() for name, scheduler in schedulers.items()}
+
+    def reset(self):
+        """丢弃全部队列状态（配置修改后重建）"""
+        with self._lock:
+            self._schedulers.clear()
+
+
+# 全局共享实例
+rate_limiters = RateLimiterRegistry()
@@ -0,0 +1,199 @@
+"""
+上游AI调用容错模块
+提供可重试错误判定、带抖动的指数退避重试策略、按模型划分的熔断器以及调用取消信号
+"""
+import random
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import config
+
+# 当前调用的取消信号（例如对冲请求中落败的一方），由调用方在上下文中设置
+cancel_token: ContextVar[Optional[threading.Event]] = ContextVar("cancel_token", default=None)
+
+
+def is_cancelled() -> bool:
+    """当前调用是否已被取消"""
+    token = cancel_token.get()
+    return token is not None and token.is_set()
+
+
+def cancellable_sleep(seconds: float):
+    """可被取消信号提前打断的等待"""
+    token = cancel_token.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.wait(seconds)
+
+
+class UpstreamError(Exception):
+    """上游模型调用失败"""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None
+    ):
+        """
+        Args:
+            message: 错误描述
+            status_code: HTTP状态码（网络层错误时为None）
+            retryable: 是否值得重试（超时、连接错误、429、5xx）
+            retry_after: 服务端通过 Retry-After 建议的等待秒数
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class RequestCancelled(UpstreamError):
+    """调用在完成前被取消"""
+
+    def __init__(self, message: str = "请求已取消"):
+        super().__init__(message, retryable=False)
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """429（限流）和5xx（服务端错误）可以重试，其余4xx属于请求本身的问题"""
+    return status_code == 429 or status_code >= 500
+
+
+class RetryPolicy:
+    """带完全抖动（full jitter）的指数退避重试策略"""
+
+    def __init__(self, max_retries: int = None, base_delay: float = None, max_delay: float = None):
+        """
+        Args:
+            max_retries: 首次调用之外的最大重试次数
+            base_delay: 退避基准时长（秒）
+            max_delay: 单次退避上限（秒）
+        """
+        self.max_retries = config.AI_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = config.AI_RETRY_BASE_DELAY if base_delay is None else base_delay
+        self.max_delay = config.AI_RETRY_MAX_DELAY if max_delay is None else max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        计算第 attempt 次重试前的等待时长
+
+        Args:
+            attempt: 已失败的次数（从0开始）
+            retry_after: 服务端建议的等待时长，优先采用
+
+        Returns:
+            等待秒数
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    - closed: 正常放行，连续失败达到阈值后进入 open
+    - open: 直接拒绝，冷却时间过后进入 half_open
+    - half_open: 只放行一个探测请求，成功则恢复 closed，失败则重新 open
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = None, recovery_timeout: float = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.recovery_timeout = recovery_timeout or config.CIRCUIT_RECOVERY_TIMEOUT
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """当前是否允许发起请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.recovery_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # half_open：只放行一个探测请求
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """记录一次成功调用"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                print(f"[Circuit] {self.name} 已恢复")
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """调用被取消、未得出结论时释放探测名额（不计成功或失败）"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败调用"""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"[Circuit] {self.name} 熔断（连续失败 {self.failures} 次）")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        """熔断器状态快照"""
+        with self._lock:
+            return {"state": self.state, "failures": self.failures}
+
+
+class CircuitBreakerRegistry:
+    """按名称（模型）管理熔断器"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name)
+                self._breakers[name] = breaker
+            return breaker
+
+    def is_healthy(self, name: str) -> bool:
+        """模型熔断器是否处于 closed 状态"""
+        with self._lock:
+            breaker = self._breakers.get(name)
+        return breaker is None or breaker.snapshot()["state"] == CircuitBreaker.CLOSED
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {name: breaker.snapshot() for name, breaker in breakers.items()}
+
+    def reset(self):
+        with self._lock:
+            self._breakers.clear()
+
+
+# 全局共享实例（各路由模块的AIService实例共用熔断状态）
+circuit_breakers = CircuitBreakerRegistry()
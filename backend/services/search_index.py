@@ -0,0 +1,313 @@
+"""
+全文检索模块
+对已保存的聊天记录（CHAT_HISTORY_DIR 下的 Markdown 文件）和作文分析结果（分析结果表）建立倒排索引，
+索引保存在本地SQLite中：中文按相邻两字切分（bigram），英文按单词切分，按 BM25 排序并返回命中片段。
+/chat/save 和 /essays/save 保存后立即增量更新；启动时按文件修改时间只重建有变化的聊天记录，
+作文分析按记录ID增量同步。检索只读取查询词的倒排记录，不扫描文件（也不触及 .assets 图片目录）
+"""
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import config
+from services.analysis_report import SUGGESTION_SECTIONS
+from services.analysis_store import EssayAnalysisStore, analysis_store
+from services.chat_history import chat_saved_at, parse_chat_markdown
+from services.database import get_connection
+
+# 英文单词/数字，或连续的中文字符
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[㐀-䶿一-鿿]+")
+# BM25 参数
+_K1 = 1.2
+_B = 0.75
+# 片段长度（命中位置前后的字符数）
+_SNIPPET_BEFORE = 30
+_SNIPPET_AFTER = 90
+
+KINDS = ("chat", "essay")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    检索分词：英文按单词（小写），中文按相邻两字切分，单独出现的一个汉字保留为一个词
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.findall((text or "").lower()):
+        if match[0] >= "㐀":
+            if len(match) == 1:
+                tokens.append(match)
+            else:
+                tokens.extend(match[i:i + 2] for i in range(len(match) - 1))
+        elif len(match) > 1 or match.isdigit():
+            tokens.append(match)
+    return tokens
+
+
+def _chat_document(path: Path) -> Tuple[str, str]:
+    """
+    从聊天记录 Markdown 中提取检索文本
+
+    Returns:
+        (标题：第一条用户消息的首行, 去掉模板行和图片后的对话文本)
+    """
+    messages = parse_chat_markdown(path.read_text(encoding="utf-8"))
+    title = next((m["content"].splitlines()[0][:60] for m in messages if m["role"] == "user" and m["content"]), "")
+    lines = [line.strip() for m in messages for line in m["content"].splitlines() if line.strip()]
+    return title or path.stem, "\n".join(lines)
+
+
+def _essay_document(record: Dict) -> Tuple[str, str]:
+    """作文分析记录的标题与检索文本（题目、原文、优化后文本和各类建议）"""
+    points = record.get("score_points")
+    score = f"（{int(points) if float(points).is_integer() else points}分）" if points is not None else ""
+    title = f"{record.get('year') or ''}年{record.get('essay_type') or '作文'}分析{score}"
+    parts = [record.get("topic"), record.get("original_text"), record.get("optimized_text")]
+    suggestions = record.get("suggestions") or {}
+    for field, _, _ in SUGGESTION_SECTIONS:
+        content = suggestions.get(field)
+        parts.extend(content if isinstance(content, list) else [content])
+    return title, "\n".join(str(part).strip() for part in parts if part)
+
+
+def _snippet(content: str, terms: List[str]) -> Tuple[str, List[str]]:
+    """
+    截取命中片段：以 terms 中第一个在文档里出现的查询词为中心（调用方按稀有程度排序）
+
+    Returns:
+        (片段文本, 文档中出现的查询词)
+    """
+    lowered = content.lower()
+    positions = {}
+    for term in terms:
+        if term[0] >= "㐀":
+            index = lowered.find(term)
+        else:
+            match = re.search(rf"(?<![a-z0-9]){re.escape(term)}(?![a-z0-9])", lowered)
+            index = match.start() if match else -1
+        if index >= 0:
+            positions[term] = index
+    first = next(iter(positions.values()), 0)
+    start = max(0, first - _SNIPPET_BEFORE)
+    end = min(len(content), first + _SNIPPET_AFTER)
+    snippet = " ".join(content[start:end].split())
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(content) else ""), list(positions)
+
+
+class SearchIndex:
+    """聊天记录与作文分析的全文倒排索引（SQLite）"""
+
+    def __init__(self, chat_dir: Path = None, store: EssayAnalysisStore = None):
+        """
+        Args:
+            chat_dir: 聊天记录目录（默认 config.CHAT_HISTORY_DIR）
+            store: 作文分析结果表（默认使用全局共享实例）
+        """
+        self.chat_dir = Path(chat_dir or config.CHAT_HISTORY_DIR)
+        self.store = store or analysis_store
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._synced = False
+        self._init_table()
+
+    def _init_table(self):
+        """初始化文档表和倒排表（倒排表按 (词, 文档) 聚簇，查询一个词只读取一段连续记录）"""
+        with get_connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_documents (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    ref_id INTEGER,
+                    title TEXT NOT NULL DEFAULT '',
+                    content TEXT NOT NULL DEFAULT '',
+                    length INTEGER NOT NULL,
+                    mtime REAL,
+                    created_at REAL NOT NULL,
+                    UNIQUE (kind, source)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_postings (
+                    term TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_postings_doc ON search_postings (doc_id)")
+
+    @staticmethod
+    def _remove(conn, kind: str, source: str):
+        row = conn.execute(
+            "SELECT id FROM search_documents WHERE kind = ? AND source = ?", (kind, source)
+        ).fetchone()
+        if row:
+            conn.execute("DELETE FROM search_postings WHERE doc_id = ?", (row[0],))
+            conn.execute("DELETE FROM search_documents WHERE id = ?", (row[0],))
+
+    def _write(self, conn, kind: str, source: str, title: str, content: str,
+               created_at: float, mtime: float = None, ref_id: int = None):
+        """写入（或替换）一个文档及其倒排记录"""
+        self._remove(conn, kind, source)
+        counts = Counter(tokenize(title + "\n" + content))
+        cursor = conn.execute(
+            "INSERT INTO search_documents (kind, source, ref_id, title, content, length, mtime, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (kind, source, ref_id, title, content, sum(counts.values()), mtime, created_at)
+        )
+        conn.executemany(
+            "INSERT INTO search_postings (term, doc_id, tf) VALUES (?, ?, ?)",
+            [(term, cursor.lastrowid, tf) for term, tf in counts.items()]
+        )
+
+    def index_chat(self, path: Path):
+        """索引（或重新索引）一份聊天记录，/chat/save 写入文件后调用"""
+        path = Path(path)
+        mtime = path.stat().st_mtime
+        title, content = _chat_document(path)
+        with self._lock, get_connection() as conn:
+            self._write(conn, "chat", path.name, title, content,
+                        chat_saved_at(path, mtime), mtime=mtime)
+
+    def index_analysis(self, record: Dict):
+        """索引一条作文分析记录，/essays/save 保存后调用"""
+        title, content = _essay_document(record)
+        with self._lock, get_connection() as conn:
+            self._write(conn, "essay", record["source"], title, content,
+                        record["created_at"], ref_id=record["id"])
+
+    def sync(self) -> Dict[str, int]:
+        """
+        与聊天记录目录和分析结果表对齐：
+        只读取修改时间变化或新增的聊天记录，删除已不存在的；作文分析只同步ID更大的新记录
+
+        Returns:
+            各类变化的文档数
+        """
+        started = time.perf_counter()
+        changes = {"chat_indexed": 0, "chat_removed": 0, "essay_indexed": 0}
+        with get_connection() as conn:
+            known = {row["source"]: row["mtime"] for row in conn.execute(
+                "SELECT source, mtime FROM search_documents WHERE kind = 'chat'"
+            )}
+            last_id = conn.execute(
+                "SELECT COALESCE(MAX(ref_id), 0) FROM search_documents WHERE kind = 'essay'"
+            ).fetchone()[0]
+
+        current = {}
+        if self.chat_dir.exists():
+            with os.scandir(self.chat_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".md") and entry.is_file():
+                        current[entry.name] = entry.stat().st_mtime
+
+        changed = [name for name, mtime in current.items() if known.get(name) != mtime]
+        removed = [name for name in known if name not in current]
+        records = self.store.records_after(last_id)
+        # 变化的文档在一个事务中写入
+        with self._lock, get_connection() as conn:
+            for name in changed:
+                path = self.chat_dir / name
+                try:
+                    title, content = _chat_document(path)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"[Search] 聊天记录索引失败 {name}: {e}")
+                    continue
+                self._write(conn, "chat", name, title, content,
+                            chat_saved_at(path, current[name]), mtime=current[name])
+                changes["chat_indexed"] += 1
+            for name in removed:
+                self._remove(conn, "chat", name)
+            changes["chat_removed"] = len(removed)
+            for record in records:
+                title, content = _essay_document(record)
+                self._write(conn, "essay", record["source"], title, content,
+                            record["created_at"], ref_id=record["id"])
+            changes["essay_indexed"] = len(records)
+
+        if any(changes.values()):
+            print(f"[Search] 索引已同步: 聊天记录 +{changes['chat_indexed']} -{changes['chat_removed']}，"
+                  f"作文分析 +{changes['essay_indexed']}，耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+        return changes
+
+    def ensure_synced(self):
+        """每个进程首次使用时同步一次（启动时调用，检索前兜底）"""
+        with self._sync_lock:
+            if not self._synced:
+                self.sync()
+                self._synced = True
+
+    def search(self, query: str, kind: Optional[str] = None, limit: int = 10) -> List[Dict]:
+        """
+        检索聊天记录和作文分析
+
+        Args:
+            query: 查询文本（中英文均可）
+            kind: 只检索 'chat' 或 'essay'，为空时检索全部
+            limit: 返回的结果数
+
+        Returns:
+            按 BM25 得分从高到低的结果（含标题、命中片段、命中的查询词）
+        """
+        self.ensure_synced()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        kind_filter, kind_params = ("AND d.kind = ?", [kind]) if kind else ("", [])
+        placeholders = ", ".join("?" * len(terms))
+        with get_connection() as conn:
+            total_docs, avg_length = conn.execute(
+                f"SELECT COUNT(*), AVG(length) FROM search_documents d WHERE 1 = 1 {kind_filter}", kind_params
+            ).fetchone()
+            postings = conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM search_postings p "
+                f"JOIN search_documents d ON d.id = p.doc_id "
+                f"WHERE p.term IN ({placeholders}) {kind_filter}",
+                terms + kind_params
+            ).fetchall()
+        if not postings:
+            return []
+
+        df = Counter(row["term"] for row in postings)
+        avg_length = avg_length or 1
+        scores: Dict[int, float] = {}
+        for term, doc_id, tf, length in postings:
+            idf = math.log(1 + (total_docs - df[term] + 0.5) / (df[term] + 0.5))
+            norm = tf + _K1 * (1 - _B + _B * length / avg_length)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (_K1 + 1) / norm
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+
+        with get_connection() as conn:
+            rows = {row["id"]: row for row in conn.execute(
+                f"SELECT id, kind, source, ref_id, title, content, created_at FROM search_documents "
+                f"WHERE id IN ({', '.join('?' * len(top))})",
+                [doc_id for doc_id, _ in top]
+            )}
+        # 片段以文档中最稀有的查询词为中心
+        by_rarity = sorted(terms, key=lambda term: df.get(term, total_docs))
+        results = []
+        for doc_id, score in top:
+            row = rows[doc_id]
+            snippet, matched = _snippet(row["content"], by_rarity)
+            results.append({
+                "kind": row["kind"],
+                "source": row["source"],
+                "analysis_id": row["ref_id"],
+                "title": row["title"],
+                "snippet": snippet,
+                "matched_terms": matched,
+                "score": round(score, 4),
+                "created_at": row["created_at"],
+            })
+        return results
+
+
+# 全局共享实例
+search_index = SearchIndex()
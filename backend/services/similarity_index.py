@@ -0,0 +1,268 @@
+"""
+作文相似度检索模块
+在进程内对全部参考范文和已保存的作文分析建立 TF-IDF 索引，按余弦相似度返回最相近的文档。
+索引以类似 CSC 的稀疏结构（按词排序的倒排数组）保存在 NumPy 数组中：
+新增/删除文档只记录变化，查询前按需重建数组，查询只访问查询词对应的倒排片段
+"""
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from services.analysis_store import EssayAnalysisStore, analysis_store
+
+_WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+# 常见虚词（不参与相似度计算）
+_STOPWORDS = frozenset("""
+a an the and or but if of to in on at by for with from as is are was were be been being am
+i you he she it we they me him her us them my your his its our their this that these those
+do does did have has had not no so than too very can could will would shall should may might
+must there here what which who whom when where why how all any each some such only own same
+just also into about over again then once
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """英文分词（小写、去掉虚词和单字母）"""
+    return [w for w in _WORD_PATTERN.findall((text or "").lower()) if len(w) > 1 and w not in _STOPWORDS]
+
+
+class TfidfIndex:
+    """可增量更新的 TF-IDF 余弦相似度索引（线程安全）"""
+
+    def __init__(self):
+        self._vocab: Dict[str, int] = {}
+        self._df: List[int] = []
+        # 文档ID -> 行号；行号对应的 (词ID数组, 词频数组) 与元数据，删除的行置为None
+        self._rows: Dict[str, int] = {}
+        self._terms: List[Optional[np.ndarray]] = []
+        self._counts: List[Optional[np.ndarray]] = []
+        self._meta: List[Optional[Dict]] = []
+        self._alive = 0
+        self._dirty = True
+        self._lock = threading.Lock()
+        # 查询用的稀疏结构（重建后有效）
+        self._term_ptr = np.zeros(1, dtype=np.int64)
+        self._post_docs = np.empty(0, dtype=np.int32)
+        self._post_weights = np.empty(0, dtype=np.float32)
+        self._idf = np.empty(0, dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self._alive
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._rows
+
+    def add(self, doc_id: str, text: str, meta: Dict = None):
+        """
+        添加或替换文档
+
+        Args:
+            doc_id: 文档ID
+            text: 文档文本
+            meta: 随检索结果返回的元数据
+        """
+        tokens = tokenize(text)
+        with self._lock:
+            self._remove_locked(doc_id)
+            ids = []
+            for token in tokens:
+                term = self._vocab.get(token)
+                if term is None:
+                    term = self._vocab[token] = len(self._df)
+                    self._df.append(0)
+                ids.append(term)
+            terms, counts = np.unique(np.array(ids, dtype=np.int32), return_counts=True)
+            for term in terms:
+                self._df[term] += 1
+            self._rows[doc_id] = len(self._terms)
+            self._terms.append(terms)
+            self._counts.append(counts.astype(np.float32))
+            self._meta.append({**(meta or {}), "id": doc_id})
+            self._alive += 1
+            self._dirty = True
+
+    def remove(self, doc_id: str):
+        """删除文档（不存在时忽略）"""
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str):
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return
+        for term in self._terms[row]:
+            self._df[term] -= 1
+        self._terms[row] = self._counts[row] = self._meta[row] = None
+        self._alive -= 1
+        self._dirty = True
+
+    def _rebuild(self):
+        """重建按词排序的倒排数组、IDF与文档向量长度（调用方持有锁）"""
+        rows = [row for row, terms in enumerate(self._terms) if terms is not None and len(terms)]
+        n_docs = max(self._alive, 1)
+        df = np.array(self._df, dtype=np.float32)
+        self._idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32)
+
+        if rows:
+            terms = np.concatenate([self._terms[row] for row in rows])
+            docs = np.concatenate([np.full(len(self._terms[row]), row, dtype=np.int32) for row in rows])
+            # 次线性词频
+            tf = 1 + np.log(np.concatenate([self._counts[row] for row in rows]))
+        else:
+            terms = np.empty(0, dtype=np.int32)
+            docs = np.empty(0, dtype=np.int32)
+            tf = np.empty(0, dtype=np.float32)
+
+        weights = (tf * self._idf[terms]).astype(np.float32)
+        self._norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=len(self._terms))).astype(np.float32)
+
+        order = np.argsort(terms, kind="stable")
+        self._post_docs = docs[order]
+        self._post_weights = weights[order]
+        self._term_ptr = np.searchsorted(terms[order], np.arange(len(self._df) + 1)).astype(np.int64)
+        self._dirty = False
+
+    def search(self, text: str, k: int = 5, kinds: Iterable[str] = None, exclude: Iterable[str] = ()) -> List[Dict]:
+        """
+        按余弦相似度检索最相近的文档
+
+        Args:
+            text: 查询文本
+            k: 返回的文档数
+            kinds: 只返回元数据中 kind 属于这些类别的文档（None 为不限）
+            exclude: 排除的文档ID
+
+        Returns:
+            [{...元数据, "similarity": 余弦相似度}, ...]，按相似度从高到低
+        """
+        with self._lock:
+            if self._dirty:
+                self._rebuild()
+            query = {}
+            for token in tokenize(text):
+                term = self._vocab.get(token)
+                if term is not None:
+                    query[term] = query.get(term, 0) + 1
+            if not query:
+                return []
+
+            terms = np.fromiter(query.keys(), dtype=np.int64, count=len(query))
+            q_weights = (1 + np.log(np.fromiter(query.values(), dtype=np.float32, count=len(query)))) * self._idf[terms]
+            q_norm = float(np.sqrt((q_weights ** 2).sum()))
+            if q_norm == 0:
+                return []
+
+            starts, ends = self._term_ptr[terms], self._term_ptr[terms + 1]
+            slices = [np.arange(s, e) for s, e in zip(starts, ends)]
+            positions = np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+            contributions = self._post_weights[positions] * np.repeat(q_weights, ends - starts)
+            scores = np.bincount(self._post_docs[positions], weights=contributions, minlength=len(self._terms))
+            candidates = np.nonzero(scores)[0]
+            scores = scores[candidates] / (self._norms[candidates] * q_norm)
+
+            kinds = set(kinds) if kinds else None
+            exclude = set(exclude)
+            results = []
+            for index in np.argsort(-scores):
+                meta = self._meta[candidates[index]]
+                if meta is None or meta["id"] in exclude or (kinds and meta.get("kind") not in kinds):
+                    continue
+                results.append({**meta, "similarity": round(float(scores[index]), 4)})
+                if len(results) >= k:
+                    break
+            return results
+
+
+def _snippet(text: str, length: int = 160) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= length else text[:length] + "..."
+
+
+class EssaySimilarityIndex:
+    """参考范文与已保存作文分析的相似度检索"""
+
+    def __init__(self, store: EssayAnalysisStore = None):
+        """
+        Args:
+            store: 作文分析结果表
+        """
+        self.store = store or analysis_store
+        self.index = TfidfIndex()
+        self._loaded = False
+        # 已索引的最大分析记录ID（之后只需读取新增的记录）
+        self._indexed_id = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def reference_id(year: int, essay_type: str) -> str:
+        return f"reference:{year}:{essay_type}"
+
+    def update_reference(self, year: int, essay_type: str, reference: str):
+        """添加或更新题目的参考范文"""
+        self.index.add(self.reference_id(year, essay_type), reference or "", {
+            "kind": "reference",
+            "year": int(year),
+            "essay_type": essay_type,
+            "snippet": _snippet(reference)
+        })
+
+    def remove_reference(self, year: int, essay_type: str):
+        self.index.remove(self.reference_id(year, essay_type))
+
+    def add_analysis(self, record: Dict):
+        """添加一条已保存的作文分析（分析结果表中的记录）"""
+        text = f"{record.get('original_text') or ''}\n{record.get('optimized_text') or ''}"
+        self.index.add(f"analysis:{record['source']}", text, {
+            "kind": "analysis",
+            "analysis_id": record.get("id"),
+            "year": record.get("year"),
+            "essay_type": record.get("essay_type"),
+            "points": record.get("score_points"),
+            "snippet": _snippet(record.get("original_text"))
+        })
+
+    def _sync_analyses(self):
+        """只读取上次同步之后新增的分析记录"""
+        records = self.store.records_after(
+            self._indexed_id,
+            columns=("id", "source", "year", "essay_type", "score_points", "original_text", "optimized_text")
+        )
+        for record in records:
+            self.add_analysis(record)
+        if records:
+            self._indexed_id = records[-1]["id"]
+
+    def ensure_loaded(self, topics: List[Dict] = None):
+        """
+        首次使用时建立索引；之后每次只同步新增的分析记录
+
+        Args:
+            topics: 题库中的全部题目（首次加载时需要）
+        """
+        with self._lock:
+            if not self._loaded and topics is not None:
+                started = time.perf_counter()
+                for topic in topics:
+                    self.update_reference(topic["年份"], topic["作文类型"], topic.get("参考范文", ""))
+                self._sync_analyses()
+                self._loaded = True
+                print(f"[Similarity] 索引已建立: {len(self.index)} 篇文档，"
+                      f"耗时 {(time.perf_counter() - started) * 1000:.0f}ms")
+            elif self._loaded:
+                self._sync_analyses()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def search(self, text: str, k: int = 5, kind: str = None, exclude: Iterable[str] = ()) -> List[Dict]:
+        """检索相似的参考范文/作文分析（kind 为 reference 或 analysis 时只返回该类）"""
+        return self.index.search(text, k=k, kinds=[kind] if kind else None, exclude=exclude)
+
+
+# 全局共享实例
+essay_similarity = EssaySimilarityIndex()
@@ -0,0 +1,74 @@
+"""
+请求合并（single-flight）模块
+相同请求并发到达时只向上游发起一次调用，其余调用等待并共享结果
+"""
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Call:
+    """一次进行中的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按键合并并发的相同调用（线程安全，适用于线程池中的同步调用）"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        执行调用；若相同键的调用正在进行，则等待其结果
+
+        Args:
+            key: 请求的规范化哈希
+            fn: 实际执行的调用
+
+        Returns:
+            (调用结果, 是否为共享结果)
+
+        Raises:
+            领头调用抛出的异常会同样抛给所有等待者
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """当前进行中的不同调用数量"""
+        with self._lock:
+            return len(self._calls)
+
+
+# 全局共享实例（各路由模块的AIService实例共用）
+request_coalescer = SingleFlight()
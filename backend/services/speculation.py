@@ -0,0 +1,166 @@
+"""
+预测性作文分析模块
+OCR完成后立即在后台按识别出的原文开始分析，结果按原文哈希保存；
+用户未修改原文直接提交分析时可立即取得结果，原文被修改时取消后台分析
+"""
+import contextvars
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import config
+from services.metrics import metrics
+from services.resilience import cancel_token
+
+
+def text_key(*parts: str) -> str:
+    """
+    预测分析的键：各部分文字的哈希（忽略换行符差异与首尾/行尾空白，
+    这些差异来自前端文本框，不影响分析结果）
+    """
+    normalized = []
+    for part in parts:
+        lines = (part or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        normalized.append("\n".join(line.rstrip() for line in lines).strip())
+    return hashlib.sha256("\x00".join(normalized).encode("utf-8")).hexdigest()
+
+
+class _Speculation:
+    def __init__(self, key: str, future: Future, token: threading.Event):
+        self.key = key
+        self.future = future
+        self.token = token
+        self.created = time.monotonic()
+
+
+class SpeculativeAnalyzer:
+    """后台预测分析任务的管理（线程安全）"""
+
+    def __init__(self, max_workers: int = None, ttl: float = None, max_entries: int = None):
+        """
+        Args:
+            max_workers: 同时进行的后台分析数
+            ttl: 结果保留时长（秒）
+            max_entries: 最多保留的任务数（超出时取消并丢弃最早的任务）
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.SPECULATIVE_MAX_WORKERS, thread_name_prefix="speculate"
+        )
+        self.ttl = ttl or config.SPECULATIVE_TTL_SECONDS
+        self.max_entries = max_entries or config.SPECULATIVE_MAX_ENTRIES
+        # 预测任务ID -> 任务（按创建顺序）
+        self._entries: Dict[str, _Speculation] = {}
+        self._lock = threading.Lock()
+
+    def _discard(self, speculation_id: str, reason: str):
+        """取消并移除任务（调用方持有锁）"""
+        entry = self._entries.pop(speculation_id)
+        if not entry.future.done():
+            entry.token.set()
+            entry.future.cancel()
+            metrics.increment("speculation_cancelled", reason=reason)
+
+    def _expire(self):
+        """清理过期和超出数量的任务（调用方持有锁）"""
+        now = time.monotonic()
+        for speculation_id, entry in list(self._entries.items()):
+            if now - entry.created > self.ttl:
+                self._discard(speculation_id, "expired")
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)), "evicted")
+
+    def start(self, key: str, fn: Callable[[], Dict]) -> str:
+        """
+        在后台开始一次预测分析
+
+        Args:
+            key: text_key 计算出的键
+            fn: 实际执行的分析调用
+
+        Returns:
+            预测任务ID
+        """
+        token = threading.Event()
+        context = contextvars.copy_context()
+
+        def run():
+            cancel_token.set(token)
+            return fn()
+
+        speculation_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            future = self._executor.submit(context.run, run)
+            self._entries[speculation_id] = _Speculation(key, future, token)
+        metrics.increment("speculation_started")
+        print(f"[Speculation] 已开始后台分析: {speculation_id[:8]}")
+        return speculation_id
+
+    def claim(self, key: str, speculation_id: str = None, timeout: float = None) -> Optional[Dict]:
+        """
+        取出与原文匹配的预测结果（未完成时等待）
+
+        指定了 speculation_id 但原文已被修改时，取消该任务并返回None
+
+        Args:
+            key: 本次提交的原文计算出的键
+            speculation_id: OCR接口返回的预测任务ID（为空时按键查找）
+            timeout: 最长等待秒数
+
+        Returns:
+            预测分析结果；没有可用结果时返回None
+        """
+        with self._lock:
+            self._expire()
+            if speculation_id:
+                entry = self._entries.get(speculation_id)
+                if entry is not None and entry.key != key:
+                    print(f"[Speculation] 原文已修改，取消后台分析: {speculation_id[:8]}")
+                    self._discard(speculation_id, "edited")
+                    metrics.increment("speculation_claims", outcome="edited")
+                    return None
+            else:
+                speculation_id, entry = next(
+                    ((i, e) for i, e in self._entries.items() if e.key == key), (None, None)
+                )
+            if entry is None:
+                metrics.increment("speculation_claims", outcome="miss")
+                return None
+            # 结果只用一次
+            self._entries.pop(speculation_id)
+
+        try:
+            result = entry.future.result(timeout=timeout or config.SPECULATIVE_WAIT_TIMEOUT)
+        except Exception as e:
+            print(f"[Speculation] 后台分析不可用: {e}")
+            entry.token.set()
+            metrics.increment("speculation_claims", outcome="failed")
+            return None
+        if result.get("degraded"):
+            metrics.increment("speculation_claims", outcome="degraded")
+            return None
+
+        metrics.increment("speculation_claims", outcome="hit")
+        print(f"[Speculation] 命中后台分析结果: {speculation_id[:8]}")
+        return result
+
+    def cancel(self, speculation_id: str):
+        """取消指定的预测任务（不存在时忽略）"""
+        with self._lock:
+            if speculation_id in self._entries:
+                self._discard(speculation_id, "cancelled")
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            entries = list(self._entries.values())
+        return {
+            "pending": sum(1 for e in entries if not e.future.done()),
+            "ready": sum(1 for e in entries if e.future.done())
+        }
+
+
+# 全局共享实例
+speculative_analyzer = SpeculativeAnalyzer()
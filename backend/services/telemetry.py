@@ -0,0 +1,152 @@
+"""
+上游模型调用遥测模块
+记录每次模型调用（含重试）的token用量、发送字节数、首字节时间、总耗时与结果，
+累计到直方图，并保留最近一段时间的明细用于生成滚动汇总
+"""
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+
+import config
+from services.metrics import metrics
+
+# 当前请求所属的接口（由中间件/后台任务设置，线程池调用会继承）
+current_endpoint: ContextVar[str] = ContextVar("current_endpoint", default="internal")
+
+# 调用结果
+OUTCOME_SUCCESS = "success"
+OUTCOME_ERROR = "error"
+OUTCOME_CIRCUIT_OPEN = "circuit_open"
+OUTCOME_RATE_LIMITED = "rate_limited"
+OUTCOME_CANCELLED = "cancelled"
+
+# token数直方图分桶
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class TelemetryRecorder:
+    """模型调用遥测记录"""
+
+    def __init__(self, window_seconds: int = None, max_records: int = None):
+        """
+        Args:
+            window_seconds: 滚动汇总覆盖的时间窗口（秒）
+            max_records: 最多保留的明细条数
+        """
+        self.window_seconds = window_seconds or config.TELEMETRY_WINDOW_SECONDS
+        self._records: Deque[Dict] = deque(maxlen=max_records or config.TELEMETRY_MAX_RECORDS)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        model: str,
+        outcome: str,
+        latency: float,
+        ttfb: Optional[float] = None,
+        attempts: int = 1,
+        bytes_sent: int = 0,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        endpoint: str = None
+    ):
+        """
+        记录一次模型调用（一次调用可包含多次重试）
+
+        Args:
+            model: 模型名称
+            outcome: 调用结果（success/error/circuit_open/rate_limited）
+            latency: 总耗时（秒，含重试与退避等待）
+            ttfb: 最后一次请求的首字节时间（秒）
+            attempts: 实际发出的请求次数
+            bytes_sent: 发送的请求体总字节数
+            prompt_tokens: 提示词token数（取自响应的 usage）
+            completion_tokens: 生成token数（取自响应的 usage）
+            endpoint: 所属接口，默认取当前上下文
+        """
+        endpoint = endpoint or current_endpoint.get()
+        entry = {
+            "ts": time.time(),
+            "endpoint": endpoint,
+            "model": model,
+            "outcome": outcome,
+            "latency": latency,
+            "ttfb": ttfb,
+            "attempts": attempts,
+            "bytes_sent": bytes_sent,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens
+        }
+        with self._lock:
+            self._records.append(entry)
+
+        labels = {"endpoint": endpoint, "model": model}
+        metrics.increment("ai_calls_total", outcome=outcome, **labels)
+        metrics.increment("ai_retries_total", max(attempts - 1, 0), **labels)
+        metrics.increment("ai_bytes_sent_total", bytes_sent, **labels)
+        metrics.increment("ai_prompt_tokens_total", prompt_tokens, **labels)
+        metrics.increment("ai_completion_tokens_total", completion_tokens, **labels)
+        metrics.observe("ai_call_latency_seconds", latency, **labels)
+        if ttfb is not None:
+            metrics.observe("ai_call_ttfb_seconds", ttfb, **labels)
+        if outcome == OUTCOME_SUCCESS:
+            metrics.observe("ai_call_tokens", prompt_tokens + completion_tokens, buckets=TOKEN_BUCKETS, **labels)
+
+    @staticmethod
+    def _cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """按 config.MODEL_PRICES 估算费用（元）"""
+        input_price, output_price = config.MODEL_PRICES.get(model, (0.0, 0.0))
+        return (prompt_tokens * input_price + completion_tokens * output_price) / 1000
+
+    @classmethod
+    def _aggregate(cls, records: List[Dict]) -> Dict:
+        latencies = np.array([r["latency"] for r in records])
+        ttfbs = np.array([r["ttfb"] for r in records if r["ttfb"] is not None])
+        errors = sum(1 for r in records if r["outcome"] != OUTCOME_SUCCESS)
+        prompt_tokens = sum(r["prompt_tokens"] for r in records)
+        completion_tokens = sum(r["completion_tokens"] for r in records)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "calls": len(records),
+            "errors": errors,
+            "error_rate": round(errors / len(records), 4),
+            "retries": sum(r["attempts"] - 1 for r in records),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "bytes_sent": sum(r["bytes_sent"] for r in records),
+            "cost": round(sum(cls._cost(r["model"], r["prompt_tokens"], r["completion_tokens"])
+                              for r in records), 4),
+            "latency_p50": round(float(p50), 3),
+            "latency_p95": round(float(p95), 3),
+            "latency_p99": round(float(p99), 3),
+            "ttfb_p50": round(float(np.percentile(ttfbs, 50)), 3) if len(ttfbs) else None,
+        }
+
+    def summary(self) -> Dict:
+        """
+        最近时间窗口内的滚动汇总（按接口、按模型、按接口+模型）
+        """
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            records = [r for r in self._records if r["ts"] >= cutoff]
+
+        groups: Dict[str, Dict[str, List[Dict]]] = {"by_endpoint": {}, "by_model": {}, "by_endpoint_model": {}}
+        for r in records:
+            groups["by_endpoint"].setdefault(r["endpoint"], []).append(r)
+            groups["by_model"].setdefault(r["model"], []).append(r)
+            groups["by_endpoint_model"].setdefault(f"{r['endpoint']} | {r['model']}", []).append(r)
+
+        return {
+            "window_seconds": self.window_seconds,
+            "generated_at": time.time(),
+            "total": self._aggregate(records) if records else None,
+            **{name: {key: self._aggregate(items) for key, items in group.items()}
+               for name, group in groups.items()}
+        }
+
+
+# 全局共享实例
+telemetry = TelemetryRecorder()
@@ -0,0 +1,211 @@
+"""
+题目图片资源缓存模块
+题目图片添加后基本不会变化，这里将其缩放、重新压缩并预先编码为 data URI，
+避免每次作文分析都重新读取原图并做 base64 编码
+"""
+import base64
+import hashlib
+import io
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+import config
+
+
+class TopicAssetCache:
+    """题目图片 data URI 缓存（内存 + 磁盘两级）"""
+
+    def __init__(self, cache_dir: str = None, max_edge: int = None, quality: int = None):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 磁盘缓存目录
+            max_edge: 缩放后的最长边像素
+            quality: JPEG压缩质量
+        """
+        self.cache_dir = Path(cache_dir or config.TOPIC_ASSET_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_edge = max_edge or config.TOPIC_IMAGE_MAX_EDGE
+        self.quality = quality or config.TOPIC_IMAGE_QUALITY
+        # 解析后的绝对路径 -> (文件签名, data URI)
+        self._memory: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def resolve_path(image_path: str) -> Optional[Path]:
+        """
+        解析题目图片路径
+        数据库中保存的是 data/topics/xxx.jpg 形式的相对路径，
+        依次尝试当前目录、数据根目录和程序目录
+        """
+        if not image_path:
+            return None
+        path = Path(image_path)
+        candidates = [path]
+        if not path.is_absolute():
+            candidates.append(config.get_data_root_dir() / path)
+            candidates.append(config.BASE_DIR / path)
+        for candidate in candidates:
+            if candidate.exists() and candidate.is_file():
+                return candidate.resolve()
+        return None
+
+    @staticmethod
+    def _signature(path: Path) -> Tuple[int, int]:
+        """文件签名（修改时间 + 大小），文件变化后缓存自动失效"""
+        stat = path.stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _path_key(path: Path) -> str:
+        return hashlib.sha1(str(path).encode('utf-8')).hexdigest()[:16]
+
+    def _cache_file(self, path: Path, signature: Tuple[int, int]) -> Path:
+        """磁盘缓存文件名：路径哈希_签名哈希（便于按路径批量失效）"""
+        sig_key = hashlib.sha1(
+            f"{signature[0]}:{signature[1]}:{self.max_edge}:{self.quality}".encode('utf-8')
+        ).hexdigest()[:16]
+        return self.cache_dir / f"{self._path_key(path)}_{sig_key}.txt"
+
+    def _encode(self, path: Path) -> str:
+        """缩放、转为RGB并重新压缩为JPEG，返回 data URI"""
+        with Image.open(path) as img:
+            # JPEG 可在解码阶段直接降采样，大图时明显更快
+            img.draft('RGB', (self.max_edge, self.max_edge))
+            img = ImageOps.exif_transpose(img)
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+            img.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=self.quality, optimize=True)
+
+        encoded = base64.b64encode(buffer.getvalue()).decode('utf-8')
+        return f"data:image/jpeg;base64,{encoded}"
+
+    def build(self, image_path: str) -> Optional[str]:
+        """
+        构建（或重建）题目图片缓存
+
+        Args:
+            image_path: 题目图片路径
+
+        Returns:
+            预编码的 data URI，图片不存在时返回None
+        """
+        path = self.resolve_path(image_path)
+        if path is None:
+            return None
+
+        self.invalidate(str(path))
+        signature = self._signature(path)
+        data_uri = self._encode(path)
+
+        cache_file = self._cache_file(path, signature)
+        cache_file.write_text(data_uri, encoding='utf-8')
+        with self._lock:
+            self._memory[str(path)] = (signature, data_uri)
+
+        print(f"[Topic Cache] 已缓存题目图片: {path.name} "
+              f"({path.stat().st_size} -> {len(data_uri)} 字节)")
+        return data_uri
+
+    def get_data_uri(self, image_path: str) -> Optional[str]:
+        """
+        获取题目图片的 data URI，缓存缺失或文件已变化时自动重建
+
+        Args:
+            image_path: 题目图片路径
+
+        Returns:
+            data URI，图片不存在时返回None
+        """
+        path = self.resolve_path(image_path)
+        if path is None:
+            return None
+
+        signature = self._signature(path)
+        with self._lock:
+            cached = self._memory.get(str(path))
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        cache_file = self._cache_file(path, signature)
+        if cache_file.exists():
+            data_uri = cache_file.read_text(encoding='utf-8')
+            with self._lock:
+                self._memory[str(path)] = (signature, data_uri)
+            # 同一路径下签名不同的旧缓存已不会再命中
+            self._remove_files(self.cache_dir.glob(f"{self._path_key(path)}_*.txt"), keep=cache_file)
+            return data_uri
+
+        return self.build(str(path))
+
+    def invalidate(self, image_path: str):
+        """
+        使指定题目图片的缓存失效
+
+        Args:
+            image_path: 题目图片路径
+        """
+        path = self.resolve_path(image_path)
+        if path is None:
+            path = Path(image_path).resolve()
+
+        with self._lock:
+            self._memory.pop(str(path), None)
+
+        self._remove_files(self.cache_dir.glob(f"{self._path_key(path)}_*.txt"))
+
+    def prune(self, image_paths: List[str]) -> int:
+        """
+        清理磁盘缓存：只保留当前题目图片（路径与文件签名均一致）对应的缓存文件，
+        已删除、已替换或已不在题库中的图片的缓存一并删除
+
+        Args:
+            image_paths: 题库中全部题目图片路径
+
+        Returns:
+            删除的缓存文件数
+        """
+        current = set()
+        for image_path in image_paths:
+            path = self.resolve_path(image_path)
+            if path is not None:
+                current.add(self._cache_file(path, self._signature(path)).name)
+
+        with self._lock:
+            self._memory = {
+                key: value for key, value in self._memory.items()
+                if self._cache_file(Path(key), value[0]).name in current
+            }
+
+        stale = [f for f in self.cache_dir.glob("*.txt") if f.name not in current]
+        removed = self._remove_files(stale)
+        if removed:
+            print(f"[Topic Cache] 已清理过期的题目图片缓存: {removed} 个")
+        return removed
+
+    @staticmethod
+    def _remove_files(files, keep: Path = None) -> int:
+        """删除缓存文件（跳过 keep），返回删除的数量"""
+        removed = 0
+        for cache_file in files:
+            if cache_file == keep:
+                continue
+            try:
+                cache_file.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"[Topic Cache] 清理缓存失败: {e}")
+        return removed
+
+
+# 全局共享实例（题目上传接口与AI服务共用同一份缓存）
+topic_asset_cache = TopicAssetCache()
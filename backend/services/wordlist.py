@@ -0,0 +1,443 @@
+"""
+作文检查与作文指标使用的词表
+COMMON_WORDS：常用及考研英语词汇（原形为主，外加不规则变化形式），与题库参考范文中的词汇一起构成拼写检查词典；
+规则的复数、过去式、进行时等变化由拼写检查模块按词形规则识别，这里不必列出
+BASIC_WORDS：基础高频词，用于统计作文中的高级词汇比例
+"""
+
+COMMON_WORDS = """
+a abandon abide abilities ability able ably abnormal aboard abolish abortion about above abroad abrupt absence
+absent absolute absolutely absorb abstain abstract absurd abundance abundant abuse academic academy accelerate
+accent accept acceptable acceptance access accessible accessory accident acclaim accommodate accommodation
+accompany accomplish accord according account accountable accountant accumulate accuracy accurate accusation
+accuse accustom ache achieve achievement acid acknowledge acquaint acquaintance acquire acquisition acre
+across act action activate active activist activity actor actual actually acute adapt adaptation adaptive add
+addict addicted addiction addictive addition additional address adequate adhere adjacent adjective adjust
+adjustment administer administration admiration admire admission admit adolescence adolescent adopt adorable
+adore adult advance advanced advantage adventure adversary adverse adversity advertise advertisement advice
+advise advocate aesthetic affair affect affection affectionate affiliate affirm affluent afford afraid after
+afternoon afterwards again against age aged agency agenda agent aggravate aggression aggressive agile ago
+agony agree agreement agricultural agriculture ahead aid aim air airline airport aisle alarm album alcohol
+alert alien align alike alive all allergic alleviate alliance allocate allow allowance ally almost alone along
+alongside already also alter alternative although altitude altogether aluminum always am amateur amaze amazed
+amazing ambassador ambiguous ambition ambitious ambulance amend amiable among amount ample amplify amuse an
+analogy analyse analyses analysis analyst analyze ancestor anchor ancient and angel anger angle angry animal
+ankle anniversary announce announcement annoy annoyed annual anonymous another answer anticipate antique
+anxiety anxious anxiously any anybody anyhow anyone anything anyway anywhere apart apartment apologize apology
+apparatus apparent apparently appeal appear appearance appendix appetite applaud applause apple appliance
+applicable applicant application apply appoint appointment appraise appreciate appreciation apprentice
+approach appropriate approval approve approximate approximately april apt aptitude arbitrary arch architect
+architecture are area aren't arena argue argument arise arisen arithmetic arm armed army arose around arouse
+arrange arrangement arrest arrival arrive arrogant arrow art artery article articulate artificial artist
+artistic as ascend ascertain ash ashamed aside ask asleep aspect aspiration aspire assault assemble assembly
+assert assertive assess assessment asset assign assignment assimilate assist assistance assistant associate
+association assume assumption assurance assure astonish astonishing astronaut astronomy at ate athlete
+athletic atmosphere atom attach attack attain attainment attempt attend attendance attendant attention attic
+attitude attorney attract attraction attractive attribute auction audience audio auditorium august aunt
+authentic author authority authorize automatic autonomous autonomy autumn auxiliary avail available avenue
+average aviation avoid await awake award aware awareness away awful awkward awoke awoken axis baby bachelor
+back background backward bacteria bad badge badly bag baggage bake bakery balance bald ball ballet ballot
+bamboo ban banana band bandage bank bankrupt banner banquet bar bare barely bargain bark barn barrel barren
+barrier base basic basically basin basis basket basketball bat batch bath bathroom battery battle bay be beach
+beam bean bear beard beast beat beaten beautiful beauty became because become bed bedroom been before began
+beggar begin beginning begun behalf behave behavior behaviour beheld behind being belief believe bell belly
+belong beloved below belt bench bend beneath beneficial beneficiary benefit benevolent bent berry beside
+besides best bet betray better between beverage beyond bias biased bible bicycle bid big bike bilingual bill
+billion bind biography biological biology bird birth birthday bit bitten bitter black blade blame blank
+blanket blast blaze bleed blend bless blessing blew blind blink bliss block blood blossom blouse blow blown
+blue blunt blur blush board boast boat bodily body boil bold bolt bomb bond bonus book boom boost boot booth
+border bore bored boredom boring born borne borrow bosom boss both bother bottle bottom bought bounce bound
+boundary bow bowl box boy brain brake branch brand brass brave bravery bread breadth break breakdown breakfast
+breakthrough breath breathe bred breed breeze bribe brick bride bridge brief bright brilliant bring brisk
+broad broadcast brochure broke broken broom brother brought brow brown bruise brush bubble bucket bud budget
+build building built bulb bulk bull bullet bully bump bunch bundle burden burn burnt burst bury bus bush
+business busy but butter butterfly button buy by bye cabin cabinet cable cafe cafeteria cage cake calcium
+calculate calculation calculator calendar call caller calm calorie came camera camp campaign campus can can't
+canal cancel cancer candidate candle candy cane cannon canoe canteen canvas cap capable capacity capital
+capsule captain caption captive capture car carbohydrate carbon card care career careful carefully careless
+carpet carriage carrot carry cart cartoon carve case cash cast casual casualty cat catalogue catastrophe catch
+category cater cattle caught cause caution cautious cave cease ceiling celebrate celebration celebrity cell
+cement cemetery censor census center central centre century ceramic cereal ceremony certain certainly
+certainty certificate chain chair chairman challenge challenging champion chance change channel chaos chaotic
+chap chapel chapter character characteristic characterize charge charity charm charming chart chase chat cheap
+cheat check cheek cheer cheerful cheese chef chemical chemistry chess chew chicken chid chief child childhood
+children chin china chinese chip choice choose chop chorus chose chosen chronic church cigarette cinema circle
+circuit circular circulate circulation circumstance cite citizen city civic civil civilian civilization clad
+claim clarify clarity clash clasp class classic classical classify classmate classroom clause clay clean clear
+clearly clerk clever cliche click client cliff climate climb clinic clinical clip clock clockwise close
+closely closet cloth clothe clothes clothing cloud club clue clumsy clung cluster clutch coach coal coast coat
+code coffee coherent cohesion coin coincide coincidence cold collaborate collaboration collaborative collapse
+collar colleague collect collection collective college collide collision colonial colony color colour column
+columnist combat combination combine come comedy comet comfort comfortable command commemorate commence
+commend comment commentary commerce commercial commission commit commitment committee commodity common
+commonly communicate communication community commute commuter compact companion company comparable comparative
+compare comparison compass compassion compatible compel compensate compensation compete competence competent
+competition competitive compile complain complaint complement complete completely complex complexity
+compliance complicated compliment comply component compose composer composition compound comprehend
+comprehension comprehensive comprise compromise compulsory compute computer conceal concede conceive
+concentrate concentration concept concern concerned concert concession concise conclude conclusion condemn
+condense condition conditional condolence conduct conference confess confession confidence confident
+configuration confine confirm conflict confront confuse confused confusion congratulate congratulation
+congress conjunction connect connection conquer conquest conscience conscientious conscious consensus consent
+consequence consequently conservation conservative consider considerable considerate consideration consist
+consistent consolidate conspicuous constant constantly constituent constitute constitution constrain
+constraint construct construction consult consultant consume consumer consumption contact contain contaminate
+contamination contemporary contempt contend content contented contest context continent continual continue
+continuous contract contradict contradiction contrary contrast contribute contribution contrive control
+controversial controversy convene convenience convenient convention conventional converge conversation
+conversion convert convey convict conviction convince cook cooker cool cooperate cooperation cooperative
+coordinate cope copper copy copyright cord cordial core corner corporate corporation corps correct correctly
+correspond correspondent corridor corrupt corruption cosmetic cost cottage cotton cough could couldn't council
+counsel counselor count counter countless country countryside couple courage courageous course court courteous
+courtesy cousin cover coverage cow coward crack craft crane crash crawl crazy create creation creative
+creativity creature credible credit creditor creep crept crew cricket crime criminal cripple crises crisis
+crisp criteria criterion critic critical criticism criticize crop cross crow crowd crowded crown crucial crude
+cruel cruelty cruise crush crust cry crystal cube cucumber cue cuisine cultivate cultivation cultural culture
+cunning cup cupboard cure curiosity curious curl current currently curriculum curse curtain curve cushion
+custom customer cut cute cycle daily dairy dam damage damp dance danger dangerous dare dark dash data date
+daughter dawn day daylight dazzle dead deadline deadly deaf deal dealt dean dear death debate debris debt
+decade decay deceive december decent decide decision deck declaration declare decline decorate decoration
+decrease dedicate dedication deduce deem deep deeply defeat defect defective defence defend defendant defender
+defense deficiency deficit define definite definitely definition deflect deform defy degrade degree delay
+delegate delegation deliberate deliberately deliberation delicate delicious delight delighted deliver delivery
+demand democracy democratic demonstrate demonstration denial denote denounce dense density dental deny depart
+department departure depend dependent depict deploy deposit depress depressed deprive depth deputy derive
+descend descendant descent describe description desert deserted deserve design designate desire desk despair
+desperate desperately despise despite destination destiny destroy destruction destructive detach detail detect
+detective detention deter deteriorate deterioration determination determine develop development device devil
+devise devote devoted devotion diagnose diagnosis diagram dial dialogue diameter diamond diary dictate
+dictionary did didn't die diet differ difference different differentiate difficult difficulty dig digest
+digital dignify dignity dilemma diligence diligent dimension diminish dine dinner dip diploma diplomat
+diplomatic direct direction directly director dirty disability disable disabled disadvantage disadvantaged
+disagree disappear disappoint disappointed disappointment disaster disastrous discard discern discharge
+discipline disclose disclosure discount discourage discourse discover discovery discreet discriminate
+discrimination discuss discussion disease disguise disgust dish dislike dismay dismiss disorder disperse
+displace display disposal dispose dispute disregard disrupt dissolve distance distant distinct distinction
+distinctive distinguish distinguished distort distract distraction distress distribute distribution district
+disturb disturbance ditch dive diverse diversify diversity divert divide dividend divine division divorce
+dizzy do dock doctor doctrine document documentary does doesn't dog dollar dome domestic dominant dominate
+don't donate donation done donor doom door dormitory dose dot double doubt doubtful dough dove down download
+downstairs downtown dozen draft drag dragon drain drama dramatic dramatically drank drastic draw drawback
+drawer drawn dread dreadful dream dreamt dress drew drift drill drink drip drive driven driver drop drove
+drown drowsy drug drum drunk dry dual dubious duck due dug dull dumb dump durable duration during dusk dust
+duty dwarf dwell dwelling dwelt dye dynamic each eager eagle ear early earn earnest earnings earth earthquake
+ease easily east easy easygoing eat eaten ebb eccentric echo eclipse ecological ecology economic economical
+economics economy edge edible edit edition editor editorial educate education educational effect effective
+effectively effectiveness efficiency efficient effort egg eight either elaborate elastic elbow elder elderly
+eldest elect election electric electricity electronic elegant element elementary elevate elevator eleven
+eligible eliminate eloquent else elsewhere email embark embarrass embassy embody embrace embryo emerge
+emergency emigrate eminent emission emit emotion emotional empathy emperor emphasis emphasize empire empirical
+employ employee employer employment empower empty enable enclose enclosure encounter encourage encouragement
+encyclopedia end endanger endangered endeavor endeavour ending endless endow endurance endure enemy energetic
+energy enforce enforcement engage engagement engine engineer engineering english enhance enjoy enjoyable
+enlarge enlighten enormous enough enquire enrich enrol enroll enrollment ensue ensure entail enter enterprise
+enterprising entertain entertainment enthusiasm enthusiast enthusiastic entire entirely entitle entity
+entrance entrepreneur entry envelope envious environment environmental envy epidemic episode equal equality
+equally equation equator equip equipment equivalent era erase erect erode erosion errand error erupt escalate
+escape escort especially essay essence essential establish estate esteem estimate etc eternal ethic ethical
+ethics ethnic evacuate evaluate evaluation evaporate even evening event eventually ever every everybody
+everyday everyone everything everywhere evidence evident evil evoke evolution evolve exact exactly exaggerate
+exaggeration exam examination examine example exceed excel excellent except exception excess excessive
+exchange excite excited excitement exciting exclaim exclude exclusive exclusively excuse execute executive
+exempt exercise exert exhaust exhausted exhausting exhibit exhibition exile exist existence exit exotic expand
+expect expectation expedition expel expenditure expense expensive experience experiment expert expertise
+expire explain explanation explicit explode exploit exploration explore explosion explosive export expose
+exposure express expression exquisite extend extension extensive extent extinct extinction extra extract
+extracurricular extraordinary extravagant extreme extremely exude eye fabric fabulous face facet facilitate
+facility fact factor factory fade fail failure faint fair fairly fairy faith faithful fake fall fallen false
+falsehood falter fame familiar family famous fan fancy fantastic far farm farmer fascinate fascinating fashion
+fashionable fast fasten fat fatal fate father fatigue faucet fault favor favorite favour favourite fear
+feasible feast feather feature february fed federal fee feeble feed feedback feel feeling feet fell fellow
+fellowship felt female fence ferry fertile fertilizer festival feudal fever few fiber fibre fiction field
+fierce fifteen fifth fifty fight figure file filial fill film filter final finally finance financial find
+finding fine finger finish finite fire fireworks firm firmly first firstly fish fist fit five fix flag flame
+flare flash flask flat flatter flavor flavour flaw fled flee fleet flesh flew flexibility flexible flight flip
+float flock flood floor flourish flow flower flown fluctuate fluency fluent fluid flung flush fly foam focus
+foe fog foil fold folk folklore follow following fond food foot football for forbade forbid forbidden force
+forecast forehead foreign foreigner foresaw foresee forest foretold forever forgave forge forget forgetful
+forgive forgiven forgot forgotten fork form formal format formation former formula formulate forsook fort
+forthcoming fortunate fortunately fortune forum forward fossil foster fought foul found foundation four fourth
+fraction fracture fragile fragment fragrance fragrant frame framework franchise frank fraud free freedom
+freely freeze freight frequency frequent frequently fresh friction friday fridge friend friendly friendship
+frighten from front frontier frost frown froze frozen frugal fruit frustrate frustrated frustrating
+frustration fry fuel fulfil fulfill fulfillment fulfilment full fully fume fun function functional fund
+fundamental fundamentally funeral funny fur furious furnish furniture further furthermore fury fuse fusion
+fuss futile future gadget gain gallery gallon gamble game gang gap garage garbage garden garment gas gasp gate
+gather gauge gave gaze gear geese gene general generally generate generation generosity generous genetic
+genius genre gentle gentleman genuine geographical geography geology geometry germ gesture get ghost giant
+gift gigantic giggle girl give given glad glamour glance glare glass gleam glimpse glitter global
+globalization globe gloom gloomy glorious glory glove glow glue go goal goat god gold golden gone good goodbye
+goodness goods goodwill gorgeous gossip got gotten govern government gown grab grace graceful gracious grade
+gradually graduate graduation grain gram grammar grammatical grand grandfather grandmother grandparent grant
+grape graph graphic grasp grateful gratitude grave gravity gray graze grease great greatly greed greedy green
+greet greeting grew grey grief grieve grim grin grind grinded grip groan grocery gross ground group grow grown
+growth guarantee guard guardian guess guest guidance guide guideline guilt guilty guitar gulf gum gun gust gut
+gym habit habitat habitual had hadn't hail hair hairdresser half hall halt halves hamburger hammer hand
+handful handicap handkerchief handle handsome handwriting handy hang happen happily happiness happy harbor
+harbour hard hardly hardship hardware harm harmful harmonious harmony harness harsh harvest has hasn't haste
+hasty hat hatch hate hatred haunt have haven't hay hazard hazardous he head headline headmaster headquarters
+heal health healthy heap hear heard heart heat heavy heel height held hell hello helmet help helpful
+hemisphere hence her herb herd here heritage hero herself hesitate hesitation hi hid hidden hide hierarchy
+high highlight highly highway hike hill him himself hinder hint hip hire his historic historical history hit
+hobby hold holiday hollow holy home homeland homeless hometown homework honest honesty honey honor honorable
+honour hook hope hopeful hopefully hopeless horizon horizontal horn horrible horror horse hose hospitable
+hospital hospitality host hostile hostility hot hotel hour house household housework how however hug huge hum
+human humanity humble humid humidity humiliate humor humour hundred hung hunger hungry hunt hunter hurricane
+hurry hurt husband hut hydrogen hygiene hypothesis hysterical i ice icon idea ideal identify identity ideology
+idiom idle idol if ignorance ignorant ignore ill illegal illness illuminate illusion illustrate illustration
+image imagination imagine imitate imitation immediate immediately immense immerse immigrant immigration immune
+impact imperative imperial implement implication implicit imply import importance important impose impossible
+impress impression impressive imprison improve improvement impulse in inability inaccurate incentive inch
+incident incline include including inclusive income incompatible incorporate increase increasingly incredible
+incredibly incur indeed indefinitely independence independent index indicate indication indicator indifferent
+indignant indispensable individual individually indoor induce indulge industrial industrious industry
+inequality inevitable inevitably infant infect infection infer inferior infinite inflation inflict influence
+influential influx inform informal information informative infrastructure ingenious ingredient inhabit
+inhabitant inherent inherit inheritance inhibit initial initially initiate initiative inject injection injure
+injury injustice ink inland innate inner innocence innocent innovate innovation innovative input inquire
+inquiry inquisitive insane insect insert inside insight insist insistence inspect inspection inspector
+inspiration inspire instability install installation instance instant instead instinct institute institution
+instruct instruction instructive instructor instrument insufficient insult insurance insure intact integral
+integrate integrity intellect intellectual intelligence intelligent intend intense intensive intent intention
+interact interaction interest interested interesting interface interfere interference interim interior
+intermediate internal international internet interpret interpretation interrupt interval intervene
+intervention interview intimate into intricate intrinsic introduce introduction intrude intuition invade
+invaluable invariably invasion invent invention inventory inverse invest investigate investigation investment
+invisible invitation invite invoice involve involvement iron ironic irony irrational irregular irrelevant
+irresponsible irrigation irritate is island isn't isolate isolated isolation issue it item itinerary its
+itself ivory jacket jam january jar jaw jealous jealousy jeans jet jewel jewelry job join joint joke journal
+journey joy joyful judge judgement judgment july jump june jungle junior jury just justice justify juvenile
+keen keep kept kettle key keyboard kick kid kidney kill kind kindness king kingdom kit kitchen kite knee knelt
+knew knife knit knives knock knot know knowledge known lab label labor laboratory labour lack lad ladder lady
+laid lain lake lamb lame lamp land landlord landmark landscape lane language lap laptop large largely laser
+last late lately later lateral latest latitude latter laugh launch laundry lavish law lawn lawyer lay layer
+layout lazy lead leader leadership leaf leaflet league leak lean leant leap leapt learn learner learning
+learnt lease least leather leave leaves lecture led left leg legacy legal legend legislation legitimate
+leisure lemon lend length lens lent less lesson lest let letter level liability liable liberal liberate
+liberation liberty librarian library licence license lick lie life lifelong lifestyle lifetime lift light like
+likelihood likely likewise limb limit limitation limited line linger linguistic link lip liquid list listen
+lit literacy literal literally literary literature litter little live lively liver lives living load loan
+lobby lobster local locate location locomotive lodge lofty logic logical lonely long longevity longing look
+loom loose lorry lose loss lost lot lottery loud lounge love lovely lover low lower loyal loyalty luck lucky
+lump lunch lung luxurious luxury lyric machine mad made magazine magic magnet magnetic magnificent magnify
+maid mail main mainly maintain maintenance majestic major majority make makeup male mall mammal manage
+management manager manifest manipulate mankind manner manual manufacture manufacturer manuscript many map
+marathon march margin marine mark market marriage married marry marvel marvellous marvelous masculine mask
+mass massive master masterpiece match mate material maternal mathematical mathematics maths matter mature
+maturity maxim maximum may maybe mayor me meadow meal mean meaning meaningful means meant meantime meanwhile
+measure measurement meat mechanic mechanical mechanism medal media mediate medical medicine meditate medium
+meet meeting melody melt member membership memorable memorial memorize memory men menace mental mentally
+mention menu mercy merely merge merit merry mess message messy met metal metaphor meter method metre
+metropolitan mice microscope microwave middle midnight might mighty migrate migration mild mile mileage
+milestone military milk mill million mind mine mineral miniature minimize minimum minister ministry minor
+minority minus minute miracle mirror mischief miserable misery mislaid mislead misled miss missile mission
+mist mistake mistaken mistook misunderstand misunderstanding mix mixture moan mob mobile mock mode model
+moderate modern modernization modernize modest modify moist moisture mold molecule moment momentum monarch
+monday money monitor monopoly monotonous monster month monument mood moon moral morale more moreover morning
+mortal mortgage mosquito moss most mostly mother motion motivate motivated motivation motive motor motorist
+mould mount mountain mourn mouse moustache mouth move movement movie much muddy mug multiple multiply
+municipal murder muscle museum mushroom music musical must mustn't mutual my myself mysterious myth nail naive
+naked name nap narrative narrow nasty nation national native natural naturally nature navigate navy near
+nearby nearly nearsighted neat necessarily necessary necessity neck need needle negative neglect negotiate
+negotiation neighbor neighborhood neighbour neighbourhood neither nephew nerve nervous nest net network
+neutral never nevertheless new news newspaper next nice nickname niece night nightmare nine no noble nobody
+nod noise noisy nominate none nonetheless nonsense noodle nor norm normal normally north nose not notable note
+notebook nothing notice notify notion notorious nourish nourishment novel novelty november novice now nowadays
+nowhere nuclear nuisance numb number numerous nurse nursing nurture nut nutrient nutrition nutritious oak oar
+oath obedience obedient obey object objection objective obligation oblige obscure observation observe observer
+obsess obsession obsolete obstacle obstinate obtain obvious obviously occasion occasionally occupation
+occupational occupy occur occurrence ocean october odd odor odour of off offence offend offensive offer office
+officer official offspring often oil ok okay old olympic omit on once one onion online only onto open opening
+opera operate operation opinion opponent opportunity oppose opposite oppress optimism optimist optimistic
+option or oral orange orbit orchestra ordeal order ordinary organ organic organisation organise organization
+organize organizer orient orientation origin original originate ornament orphan other otherwise ought our ours
+ourselves out outbreak outcome outdid outdoor outfit outgoing outgrew outlet outline outlook output outrageous
+outset outside outstanding outward oval oven over overall overcame overcome overdo overflow overhead overhear
+overheard overlap overlook overnight oversaw overseas oversee overtake overthrew overthrow overtime overtook
+overwhelm overwhelming owe owl own owner ox oxygen pace pack package pad paddle page paid pail pain painful
+paint painting pair palace pan panda panel panic paper parachute parade paradise paradox paragraph parallel
+paralyze parcel pardon parent park parliament part partial partially participant participate participation
+particle particular particularly partly partner party pass passage passenger passer passion passionate passive
+passport past pastime pasture patch patent path pathetic patience patient patriotic patrol patron pattern pave
+pavement paw pay peace peaceful peach peak peanut pear pearl peasant pebble peculiar pedestrian peel peer pen
+penalty penetrate peninsula pension people pepper per perceive percent percentage perception perfect perfectly
+perform performance perhaps period perish permanent permanently permission permit perpetual perseverance
+persevere persist persistence persistent person personal personality personally personnel perspective persuade
+pessimistic pest pet petition petrol petroleum petty pharmacy phase phenomena phenomenon philosopher
+philosophy phone photo photograph photographer phrase physical physically physician physicist physics piano
+pick picture piece pierce pig pigeon pile pilgrim pill pillar pillow pilot pinch pine pink pint pioneer pipe
+pirate pistol pit pitch pitiful pity place plague plain plan plane planet plant plastic plateau platform
+plausible play player plea plead pleasant please pleased pleasure pledge plenty plight plot plough plow plug
+plum plumber plunge plus pocket poem poet poetry point pointless poison poisonous police policy polish polite
+political politics pollutant pollute pollution ponder pony pool poor pop popular popularity population porch
+pork port portable porter portfolio portion portrait portray pose position positive possess possibility
+possible possibly post poster postpone posture pot potato potential pottery poultry pound pour poverty powder
+power powerful practical practice practise practitioner prairie praise precaution precede precedent precious
+precise precisely precision predator predecessor predict predominant prefer preference pregnancy pregnant
+prejudice preliminary premier premise premium preparation prepare prescribe prescription presence present
+presentation preservation preserve preside president press pressure prestige presumably presume pretend pretty
+prevail prevalent prevent prevention previous previously prey price pride priest primarily primary prime
+primitive prince princess principal principle print prior priority prison privacy private privilege prize
+probably probe problem procedure proceed proceeding process proclaim produce producer product production
+productive productivity profession professional professor profile profit profound program programme progress
+prohibit project prolong prominent promise promising promote promotion prompt prone pronounce pronunciation
+proof propaganda propel proper properly property prophet proportion proposal propose prose prosecute prospect
+prospective prosper prosperity prosperous protect protection protein protest protocol prototype proud prove
+proved proven proverb provide provided province provision provoke prudent psychiatrist psychological
+psychology pub public publication publicity publish pudding pull pulse pump punctual punish punishment pupil
+puppet puppy purchase pure purify purpose purse pursue pursuit push put puzzle puzzled quake qualification
+qualified qualify quality quantify quantity quarrel quarter queen query quest question questionable
+questionnaire queue quick quickly quiet quietly quit quite quiz quota quotation quote rabbit race racial
+racism rack radar radiation radical radio rag rage raid rail railway rain rainbow raise rally ran ranch random
+rang range rank rape rapid rapidly rare rarely rarity rash rat rate rather ratio rational rattle raw ray razor
+reach react reaction read reader readily reading ready real realise realistic reality realize really realm
+reap rear reason reasonable rebel rebellion rebuilt recall recede receipt receive receiver recent recently
+reception recession recipe recipient reciprocal recite reckless reckon reclaim recognise recognition recognize
+recommend recommendation reconcile record recover recovery recreation recruit rectangle recur recycle red
+reduce reduction redundant reef refer reference refine reflect reflection reform refresh refrigerator refugee
+refund refusal refuse regard regarding regardless regime region regional register regret regular regularly
+regulation rehearsal rehearse reign reinforce reject rejoice relate relation relationship relative relatively
+relax relaxation relay release relevance relevant reliable reliance relic relief relieve religion religious
+relish reluctance reluctant rely remain remainder remark remarkable remedy remember remind remnant remote
+remove renaissance render renew renewable renovate renown renowned rent repaid repair repeat repetition
+repetitive replace reply report represent representative reproduce reptile republic reputable reputation
+request require requirement rescue research researcher resemble resent reservation reserve reservoir residence
+resident resign resignation resist resistance resistant resolute resolution resolve resort resource respect
+respective respectively respond respondent response responsibility responsible rest restaurant restless
+restoration restore restraint restrict result resume retail retain retire retirement retold retreat retrieve
+return reunion reveal revenge revenue reverse review revise revive revolution revolve reward rewrote rhyme
+rhythm rib ribbon rice rich ridden riddle ride ridge ridiculous rifle right rigid rigorous ring riot rip ripe
+ripple rise risen risk rival river road roar roast rob robber robbery robe robot robust rock rocket rod rode
+role romance romantic roof room root rope rose rot rotate rotten rough round route routine row rub rubber
+rubbish rude rug ruin rule rumor rumour run rung rural rush rust rustic sack sacred sacrifice sad saddle safe
+safety sage said sail saint sake salad salary sale salesman salmon salon salt salute salvation same sample
+sanction sand sandwich sane sang sanitation sank sat satellite satire satisfaction satisfactory satisfied
+satisfy saturday sauce saucer sausage savage save saving saw say says scale scan scandal scar scarce scarcely
+scarcity scare scarf scatter scenario scene scenery scenic scent sceptical schedule scheme scholar scholarship
+school science scientific scientist scissors scold scope score scorn scramble scrap scratch scream screen
+screw script scrutiny sculpture sea seal seam search seaside season seat second secondary secondly secrecy
+secret secretary sect section sector secular secure security sediment see seed seek seem seen segment seize
+seldom select selection self selfish sell selves semester semiconductor seminar senate senator send senior
+sensation sense sensible sensitive sent sentence sentiment sentimental separate september sequence serene
+serial series serious seriously sermon servant serve service session set setting settle seven several severe
+sew sewage shabby shadow shake shaken shall shallow shame shape share shark sharp shatter shave she shed sheep
+sheet shelf shell shelter shepherd shield shift shine ship shirk shirt shiver shock shoe shone shook shoot
+shop shopping short shortage shortcoming shortcut shortly shot should shoulder shouldn't shout shove shovel
+show showed shower shown shrank shrink shrug shut shuttle shy sibling sick side sigh sight sign signal
+significance significant significantly silent silk silly similar similarly simple simply sin since sincere
+sincerely sincerity sing singer single sip siren sister sit site situation six size skeleton skeptical sketch
+ski skill skilled skim skin skip skirt skull sky slain slam slap slaughter slave slavery sleep sleeve slender
+slept slice slid slide slight slightly slim slip slipper slogan slope slot slow slowly slum slump slung sly
+small smart smash smell smile smoke smooth snack snake snap sneak sneeze sniff snow so soak soap soar sob
+sober soccer sociable social socialism society sock sofa soft software soil solar sold soldier solemn solid
+solidarity solitary solitude solo soluble solution solve some somebody somehow someone something sometimes
+somewhat somewhere son song soon sophisticated sophomore sorrow sorry sort sought soul sound soup sour source
+south souvenir sovereign sow space spacecraft spaceship spade span spare spark sparkle sparrow spatial speak
+speaker spear special specialist specific specifically specimen spectacle spectacular spectator spectrum
+speculate sped speech speed spelt spend spent sphere spice spicy spider spill spilt spin spine spiral spirit
+spiritual spit splash splendid split spoil spoke spoken spokesman sponge sponsor spontaneous spoon sport
+sportsman spot spouse sprain sprang spray spread spring sprinkle sprout sprung spun spur spy squad square
+squeeze squirrel stab stable stack stadium staff stage stain stair stake stale stall stamp stance stand
+standard stank star start starve state statement static station stationery statistic statistics statue status
+stay steady steak steal steam steel steep steer stem step stereotype stick still stimulate sting stir stitch
+stock stocking stole stolen stomach stone stood stool stop store storm story stove straight straightforward
+strain strand strange stranger strap strategy straw strawberry stray streak streamline street strength
+strengthen stress stretch strict stride strike string strip strode stroke stroll strong strongly strove struck
+structure struggle stubborn stuck student studio study stuff stumble stun stung stunk stupid sturdy style
+subconscious subject subjective submarine submerge submit subordinate subscribe subscription subsequent
+subsequently subsidy substance substantial substitute subtle subtract suburb suburban subway succeed success
+successful successfully such suck sudden suddenly suffer suffice sufficient suffocate sugar suggest suggestion
+suicide suit suitable suitcase suite sum summary summer summit summon sun sunday sung sunk sunny super superb
+superficial superior supermarket superstition supervise supervision supervisor supplement supply support
+supporter suppose suppress supreme sure surely surface surgeon surgery surpass surplus surprise surprised
+surprising surrender surround surrounding survey survive suspect suspend suspicion suspicious sustain
+sustainability sustainable swallow swam swamp swan swarm sway swear sweat sweep sweet swell swept swift swim
+swing switch sword swore sworn swum swung syllable symbol symmetry sympathetic sympathy symphony symptom
+syndrome synthesis synthetic system table tablet tackle tactic tag tail tailor take taken talent talented talk
+tall tame tan tangible tank tap tape target tariff task taste taught tax taxi tea teach teacher teaching team
+tear tease technical technique technological technology tedious teenager teeth telephone telescope television
+tell temper temperament temperature temple tempo temporary tempt temptation ten tenant tend tendency tender
+tennis tense tension tent term terminal terminate terrace terrible terrific terrify territory terror terrorism
+terrorist test text textbook textile texture than thank thankful thankfully that the theater theatre theft
+their theirs them theme themselves then theory there thereafter thereby therefore thermometer these theses
+thesis they thick thief thigh thin thing think thinking third thirst thirsty thirty this thorn thorough those
+though thought thousand thread threat threaten three threw thrill thriller thrive throat throne through
+throughout throw thrown thrust thumb thunder thursday thus tick ticket tide tidy tie tight tile till timber
+time timetable timid tin tiny tip tire tired tissue title to toast tobacco today toe together toilet told
+tolerate toll tomato tomb tomorrow ton tone tongue tonight too took tool tooth top topic torch tore torment
+torn tornado torture toss total totally touch tough tour tourism tourist toward towards tower town toxic toy
+trace track trade trademark tradition traditional traffic tragedy tragic trail train training trait traitor
+tram tranquil transaction transcend transcript transfer transform transit transition translate translation
+translator transmission transmit transparent transplant transport transportation trap trash travel tray tread
+treasure treat treatment treaty tree tremble tremendous trench trend trial tribe tribute trick trifle trigger
+trim trip triple triumph trivial trod troop tropical trouble trousers truck true truly trumpet trunk trust
+truth try tuck tuesday tuition tumble tumor tumour tune tunnel turbulent turkey turn turtle tutor tutorial
+twelve twenty twice twin twist two type typhoon typical typically typist tyranny tyre ugly ultimate ultimately
+ultimatum umbrella unable unanimous uncle uncover under undergo undergone undergraduate underground underline
+underlying undermine underneath understand understandable understanding understood undertake undertaken
+undertook underwent undid undoubtedly unemployed unemployment unexpected unfair unfold unfortunate
+unfortunately uniform unify union unique unit unite united unity universal universe university unknown unless
+unlike unlikely unprecedented until unusual unveil up upbringing update upgrade upheld uphold upon upper
+upright uproar upset upstairs upward urban urge urgency urgent us usage use used useful useless user usual
+usually utensil utility utilize utmost utter vacant vacation vacuum vague vain valid valley valuable value van
+vanish vanity vapor vapour variable variation variety various vary vase vast vegetable vegetarian vehicle veil
+vein velocity vendor venture venue verb verbal verdict verify versatile verse version vertical very vessel
+veteran veto via vibrate vice vicious victim victory video view viewpoint vigorous villa village villain
+vinegar violate violation violence violent violin virgin virtual virtue virus visa visible vision visit
+visitor visual vital vitamin vivid vocabulary vocal vocation voice volcano voltage volume voluntary volunteer
+vote vow vowel voyage vulgar vulnerable wag wage wagon waist wait waiter wake walk wall wallet wander want war
+ward wardrobe warehouse warfare warm warmly warn warning warrant warrior wary was wash washroom wasn't waste
+wasteful watch watchful water waterproof wave wax way we weak weakness wealth wealthy weapon wear weary
+weather weave web website wed wedding wednesday weed week weekday weekend weekly weigh weight welcome welfare
+well wellbeing went were weren't west western wet whale what whatever wheat wheel when whenever where whereas
+wherever whether which while whip whisper whistle white who whole wholesome whom whose why wicked wide widely
+widen widespread widow width wife wild wilderness will willing willpower win wind window wine winner winter
+wisdom wise wisely wish wit with withdraw withdrew wither withheld withhold within without withstand withstood
+witness witty wives woke wolf woman women won won't wonder wonderful wood woollen word wore work worker
+workforce workload workout workplace workshop world worldwide worn worry worse worship worst worth worthwhile
+worthy would wouldn't wound wove woven wrap wreck wrestle wrinkle wrist write writer writing written wrong
+wrote wrung yacht yard yawn yeah year yearn yellow yes yesterday yet yield yoga yogurt you young youngster
+your yours yourself yourselves youth zeal zealous zebra zero zinc zip zone zoo zoom
+"""
+
+# 基础高频词（作文指标中“高级词汇”指不在此表中的实词；规则变化形式按原形判断）
+BASIC_WORDS = """
+a able about above across act add afraid after afternoon again against age ago agree air all allow almost alone
+along already also always am among an and angry animal another answer any anyone anything appear apple are area
+arm around arrive art as ask at aunt away baby back bad bag ball bank be beautiful because become bed before
+begin behind believe below best better between big bike bird birthday bit black blue boat body book born both
+bottle box boy bread break breakfast bring brother brown build bus business busy but buy by cake call can car
+card care careful carry case cat catch cause center certain chair chance change cheap check child children
+china chinese choose city class classmate clean clear clock close clothes cloud cold college color colour come
+common company computer cook cool corner cost could country course cousin cover cry cup cut dad dance dangerous
+dark daughter day dead dear decide deep desk die different difficult dinner do doctor dog dollar door down draw
+dream dress drink drive drop dry during each ear early earth east easy eat egg eight either else end english
+enjoy enough enter even evening ever every everyone everything exam example excited exciting excuse eye face
+fact fall family famous far farm fast fat father favorite favourite feel few field fight fill film find fine
+finish fire first fish five floor flower fly follow food foot football for foreign forget four free fresh
+friend friendly from front fruit full fun funny future game garden get gift girl give glad glass go good
+grade grandfather grandmother grass great green ground group grow guess hair half hand happen happy hard has
+hat have he head health healthy hear heart heavy hello help her here high hill him his history hit hobby hold
+holiday home homework hope horse hospital hot hotel hour house how however hundred hungry hurry hurt husband i
+ice idea if ill important in interest interested interesting into is it its job join just keep key kid kill
+kind king kitchen know lake land language large last late later laugh learn least leave left leg lesson let
+letter library lie life light like line list listen little live long look lose lot loud love low lucky lunch
+machine make man many map mark market may me meal mean meat meet meeting member message middle might mile milk
+mind minute miss mistake modern mom moment money month moon more morning most mother mountain mouth move movie
+much music must my name nature near need never new news newspaper next nice night nine no nobody noise north
+not note nothing notice now number of off office often oh old on once one only open or orange order other our
+out outside over own page paint paper parent park part party pass past pay pen pencil people person phone
+photo pick picture piece place plan plant play player please point police poor popular possible post problem
+program put question quick quiet quite rain read ready real really reason red remember rest restaurant return
+rich ride right river road room round rule run sad safe same save say school science sea season seat second
+see sell send sentence serious set seven several shall she ship shirt shop short should show sick side simple
+since sing sister sit six size skill sky sleep slow small smile snow so some someone something sometimes son
+song soon sorry sound south speak special spend sport spring stand star start station stay still stop story
+street strong student study subject such summer sun sure swim table take talk tall taste tea teach teacher team
+tell ten test than thank that the their them then there these they thing think third this those though three
+through time tired to today together tomorrow too top town toy traffic train travel tree trip true try turn
+twelve twenty two under understand until up us use useful usually very visit voice wait walk wall want war
+warm wash watch water way we wear weather week weekend welcome well west what when where which while white who
+whole why wife will win wind window winter wish with without woman wonderful word work worker world worry
+would write wrong yard year yellow yes yesterday yet you young your
+"""
@@ -0,0 +1,157 @@
+"""
+作文本地检查基准测试
+
+用题库中的参考范文作为样例作文：
+1. 词典只使用基础词表和一半范文，另一半范文作为测试集（避免被测文本本身在词典中）
+2. 统计干净范文上的误报数（并入建议的结果，超过上限时以非零状态退出），
+   以及随机注入拼写错误后的检出率和纠正准确率
+3. 用一组带有典型语法错误的句子统计规则检查的检出率
+4. 统计每篇作文的检查耗时、索引构建耗时与大小，以及去掉拼写字段后提示词缩短的长度
+
+用法（在 backend 目录下执行）：
+    python tools/bench_essay_checker.py [--file data/essays.xlsx] [--typos 5] [--max-false-positives 0.2]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import prompts  # noqa: E402
+from services.ai_service import _without_spelling_field  # noqa: E402
+from services.essay_checker import EssayChecker, _TOKEN_PATTERN  # noqa: E402
+
+# (含语法错误的句子, 期望的修正)
+GRAMMAR_SAMPLES = [
+    ("He have many friends in the city.", "He has"),
+    ("She like reading books after class.", "she likes"),
+    ("They was very excited about the trip.", "They were"),
+    ("I is a second-year student.", "I am"),
+    ("We must to protect the environment.", "must protect"),
+    ("Everyone are welcome to join us.", "Everyone is"),
+    ("It is an useful skill for students.", "a useful"),
+    ("I bought a orange yesterday.", "an orange"),
+    ("The the young generation should read more.", "The"),
+    ("We need more informations about the lecture.", "information"),
+    ("It is more better to start early.", "better"),
+    ("Let us discuss about the plan.", "discuss"),
+    ("Although he was tired, but he kept working.", "Although he was tired, he kept working"),
+    ("People is paying more attention to health.", "People are"),
+    ("This can helps us understand the world.", "can help"),
+]
+# 正确的句子（不应报告任何问题）
+CLEAN_SAMPLES = [
+    "Let it go and make it work.",
+    "If he were here, he would help us.",
+    "I suggest that he go to the library.",
+    "Can he come to the party tomorrow?",
+    "The number of people is increasing.",
+    "It is a university with a long history.",
+    "An hour later we reached an honest agreement.",
+]
+
+
+def corrupt(word: str, rng: random.Random) -> str:
+    """对词做一次随机编辑（删除、插入、替换或相邻换位）"""
+    i = rng.randrange(1, len(word) - 1)
+    letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+    op = rng.choice(("delete", "insert", "replace", "swap"))
+    if op == "delete":
+        return word[:i] + word[i + 1:]
+    if op == "insert":
+        return word[:i] + letter + word[i:]
+    if op == "replace":
+        return word[:i] + letter + word[i + 1:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作文本地检查基准测试")
+    parser.add_argument("--file", default="data/essays.xlsx", help="题库文件（使用其中的参考范文）")
+    parser.add_argument("--typos", type=int, default=5, help="每篇作文注入的拼写错误数")
+    parser.add_argument("--max-false-positives", type=float, default=0.2,
+                        help="干净范文平均每篇允许的误报数（超过时退出码为1）")
+    args = parser.parse_args()
+
+    references = [r for r in pd.read_excel(args.file)["参考范文"].tolist() if isinstance(r, str) and r.strip()]
+    train, test = references[::2], references[1::2]
+    print(f"样例作文 {len(references)} 篇：{len(train)} 篇用于词典，{len(test)} 篇用于测试")
+
+    checker = EssayChecker()
+    started = time.perf_counter()
+    checker.load(train)
+    print(f"  词典构建耗时 {(time.perf_counter() - started) * 1000:.0f}ms，"
+          f"纠错索引 {len(checker.index)} 词 / {checker.index.nbytes // 1024}KB")
+
+    rng = random.Random(7)
+    timings, false_positives, possible, injected, detected, corrected, flagged_only = [], 0, 0, 0, 0, 0, 0
+    for essay in test:
+        started = time.perf_counter()
+        clean = checker.check(essay)
+        timings.append((time.perf_counter() - started) * 1000)
+        false_positives += len(clean["spelling_errors"]) + len(clean["grammar_errors"])
+        possible += len(clean["possible_spelling_errors"])
+
+        # 只替换句中的小写已知词，保证注入的是拼写错误而不是专有名词
+        words = [m.group(0) for m in _TOKEN_PATTERN.finditer(essay)
+                 if m.group(0).islower() and len(m.group(0)) >= 5 and checker.is_known(m.group(0))]
+        typos = {}
+        for word in rng.sample(sorted(set(words)), min(args.typos, len(set(words)))):
+            wrong = corrupt(word, rng)
+            if not checker.is_known(wrong):
+                typos[wrong] = word
+        text = essay
+        for wrong, word in typos.items():
+            text = text.replace(word, wrong, 1)
+        started = time.perf_counter()
+        result = checker.check(text)
+        timings.append((time.perf_counter() - started) * 1000)
+        found = dict(item.split(" -> ", 1) for item in result["spelling_errors"])
+        flagged = dict(item.split(" -> ", 1) for item in result["possible_spelling_errors"])
+        injected += len(typos)
+        flagged_only += sum(1 for wrong in typos if wrong in flagged)
+        detected += sum(1 for wrong in typos if wrong in found)
+        corrected += sum(1 for wrong, word in typos.items() if found.get(wrong) == word)
+
+    p50, p95 = np.percentile(timings, [50, 95])
+    print("-" * 40)
+    print(f"每篇检查耗时: p50 {p50:.2f}ms，p95 {p95:.2f}ms，最长 {max(timings):.2f}ms")
+    print(f"干净范文误报: {false_positives} 处 / {len(test)} 篇（另有 {possible} 处仅标注为可能的拼写错误）")
+    print(f"注入拼写错误 {injected} 处：检出 {detected} 处（{detected / max(injected, 1):.0%}），"
+          f"纠正正确 {corrected} 处（{corrected / max(injected, 1):.0%}），"
+          f"另有 {flagged_only} 处标注为可能的拼写错误")
+
+    hits = 0
+    for sentence, expected in GRAMMAR_SAMPLES:
+        found = checker.check(sentence)["grammar_errors"]
+        if any(expected.lower() in item.split(" -> ", 1)[1].lower() for item in found):
+            hits += 1
+        else:
+            print(f"  [未检出] {sentence} {found}")
+    print(f"语法规则检出: {hits}/{len(GRAMMAR_SAMPLES)}")
+    noisy = [(s, checker.check(s)["grammar_errors"]) for s in CLEAN_SAMPLES]
+    for sentence, found in noisy:
+        if found:
+            print(f"  [误报] {sentence} {found}")
+    print(f"正确句子误报: {sum(1 for _, found in noisy if found)}/{len(CLEAN_SAMPLES)}")
+
+    print("-" * 40)
+    for name in ("SMALL_ESSAY_OPTIMIZATION_PROMPT", "LARGE_ESSAY_OPTIMIZATION_PROMPT", "ESSAY_OPTIMIZATION_PROMPT"):
+        template = getattr(prompts, name)
+        print(f"{name}: {len(template)} 字 -> 去掉拼写字段 {len(_without_spelling_field(template))} 字")
+    print("（去掉拼写字段后模型不再输出拼写错误列表，节省的主要是输出 token）")
+
+    limit = args.max_false_positives * len(test)
+    if false_positives > limit:
+        print("-" * 40)
+        print(f"干净范文误报 {false_positives} 处，超过上限 {limit:.1f} 处（每篇 {args.max_false_positives}）")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
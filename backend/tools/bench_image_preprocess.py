@@ -0,0 +1,111 @@
+"""
+作文图片预处理基准测试
+
+统计每张样例图片预处理前后的体积（含base64膨胀后的请求体积）与耗时；
+加上 --ocr 参数时，还会分别用原图和预处理后的图片调用OCR，对比识别耗时。
+
+用法（在 backend 目录下执行）：
+    python tools/bench_image_preprocess.py [图片或目录 ...] [--ocr] [--format WEBP]
+默认使用 data/topics 下的图片作为样例。
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.image_service import ImageService  # noqa: E402
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.bmp'}
+
+
+def collect_images(inputs):
+    """收集待测试的图片路径"""
+    images = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            images.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES))
+        elif path.is_file():
+            images.append(path)
+    return images
+
+
+def b64_size(n: int) -> int:
+    """base64编码后的字节数"""
+    return (n + 2) // 3 * 4
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作文图片预处理基准测试")
+    parser.add_argument('inputs', nargs='*', default=['data/topics'], help="图片文件或目录")
+    parser.add_argument('--ocr', action='store_true', help="同时对比OCR耗时（需要配置API密钥或本地模拟服务）")
+    parser.add_argument('--format', default=None, help="输出格式：JPEG 或 WEBP")
+    parser.add_argument('--max-edge', type=int, default=None, help="最长边像素")
+    parser.add_argument('--target-kb', type=int, default=None, help="目标大小（KB）")
+    args = parser.parse_args()
+
+    images = collect_images(args.inputs)
+    if not images:
+        print("未找到样例图片")
+        return
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_preprocess_"))
+    service = ImageService(
+        upload_dir=str(work_dir),
+        max_edge=args.max_edge,
+        output_format=args.format,
+        target_bytes=args.target_kb * 1024 if args.target_kb else None
+    )
+    ai_service = None
+    if args.ocr:
+        from services.ai_service import AIService
+        ai_service = AIService()
+
+    total_before = total_after = 0
+    total_ocr_before = total_ocr_after = 0.0
+    print(f"{'图片':<44}{'原始KB':>10}{'处理后KB':>10}{'节省':>8}{'耗时ms':>9}"
+          + (f"{'OCR原图s':>10}{'OCR处理后s':>12}" if args.ocr else ""))
+
+    try:
+        for image in images:
+            copy_path = work_dir / image.name
+            shutil.copy2(image, copy_path)
+
+            start = time.perf_counter()
+            processed = service.preprocess_image(str(copy_path))
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            before = b64_size(copy_path.stat().st_size)
+            after = b64_size(Path(processed).stat().st_size)
+            total_before += before
+            total_after += after
+            line = (f"{image.name[:43]:<44}{before / 1024:>10.0f}{after / 1024:>10.0f}"
+                    f"{(1 - after / before) * 100:>7.0f}%{elapsed_ms:>9.0f}")
+
+            if ai_service:
+                start = time.perf_counter()
+                ai_service.image_to_text(str(copy_path))
+                ocr_before = time.perf_counter() - start
+                start = time.perf_counter()
+                ai_service.image_to_text(processed)
+                ocr_after = time.perf_counter() - start
+                total_ocr_before += ocr_before
+                total_ocr_after += ocr_after
+                line += f"{ocr_before:>10.2f}{ocr_after:>12.2f}"
+            print(line)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("-" * 81)
+    print(f"共 {len(images)} 张，请求体积（base64后）: {total_before / 1024:.0f}KB -> "
+          f"{total_after / 1024:.0f}KB，节省 {(1 - total_after / total_before) * 100:.1f}%")
+    if ai_service:
+        print(f"OCR总耗时: {total_ocr_before:.2f}s -> {total_ocr_after:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
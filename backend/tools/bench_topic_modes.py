@@ -0,0 +1,131 @@
+"""
+作文分析题目模式基准测试
+
+对比作文分析发送题目图片（image 模式）与发送添加题目时提取的题目文字（text 模式）：
+1. 每次分析的请求体大小与 prompt token 数（取自模型返回的 usage，模拟服务中图片按 28x28 像素块计）
+2. 每次分析的端到端延迟（模拟服务的延迟 = 固定延迟 + 每千 prompt token 的预填充耗时）
+
+默认在进程内启动模拟大模型服务（使用临时数据目录），题目图片为按考试题目版式生成的
+1600x1100 图片；--real 时使用已配置的真实接口，可用 --topic-image 指定真实题目图片。
+
+用法（在 backend 目录下执行）：
+    python tools/bench_topic_modes.py --runs 10 --latency 1.0 --prefill-latency 0.3
+    python tools/bench_topic_modes.py --real --topic-image data/topics/xxx.jpg --runs 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.mock_llm_server import MockLLMServer, MockSettings, SAMPLE_OCR_TEXT, SAMPLE_TOPIC_TEXT  # noqa: E402
+
+REFERENCE_ESSAY = """Dear Sir or Madam,
+
+I am writing to apply for the volunteer position at the upcoming international conference.
+As a second-year English major, I have a good command of English and have served as a volunteer guide twice.
+I would be grateful if you could consider my application.
+
+Yours sincerely,
+Li Ming"""
+
+
+def _topic_image(path: Path):
+    """生成一张考试题目版式的图片（白底印刷文字，与真实题目图片尺寸相当）"""
+    image = Image.new("RGB", (1600, 1100), "white")
+    draw = ImageDraw.Draw(image)
+    lines = ["Part A", "Directions:"] + SAMPLE_TOPIC_TEXT.splitlines()[1:]
+    for index, line in enumerate(lines):
+        draw.text((80, 80 + index * 60), line, fill="black")
+    image.save(path, "JPEG", quality=90)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作文分析题目模式基准测试")
+    parser.add_argument("--runs", type=int, default=10, help="每种模式的分析次数")
+    parser.add_argument("--latency", type=float, default=1.0, help="模拟服务的固定延迟（秒）")
+    parser.add_argument("--prefill-latency", type=float, default=0.3,
+                        help="模拟服务每千个 prompt token 增加的延迟（秒）")
+    parser.add_argument("--real", action="store_true", help="使用已配置的真实接口而不是模拟服务")
+    parser.add_argument("--topic-image", help="题目图片路径（默认生成）")
+    args = parser.parse_args()
+
+    # 必须在导入 config 之前设置数据目录
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_topic_"))
+    os.environ["STUDY_HELPER_DATA_ROOT"] = str(work_dir)
+    import config
+    from services.ai_service import AIService
+    from services.telemetry import telemetry, current_endpoint
+
+    mock = None
+    if not args.real:
+        mock = MockLLMServer(settings=MockSettings(
+            latency=args.latency, prefill_latency=args.prefill_latency
+        )).start()
+        config.MODELSCOPE_API_KEY = "mock-key"
+        config.MODELSCOPE_API_BASE = f"{mock.base_url}/chat/completions"
+        config.RATE_LIMITS = {}
+
+    topic_path = work_dir / "topic.jpg"
+    if args.topic_image:
+        shutil.copy(args.topic_image, topic_path)
+    else:
+        _topic_image(topic_path)
+
+    service = AIService()
+    current_endpoint.set("extract")
+    started = time.perf_counter()
+    extraction = service.extract_topic_text(str(topic_path))
+    if extraction["degraded"]:
+        print(f"题目文字提取失败: {extraction['error']}")
+        sys.exit(1)
+    print(f"题目文字提取（添加题目时一次）: {(time.perf_counter() - started) * 1000:.0f}ms，"
+          f"{len(extraction['text'])} 字符")
+
+    latencies = {}
+    for mode in ("image", "text"):
+        current_endpoint.set(mode)
+        latencies[mode] = []
+        for index in range(args.runs):
+            started = time.perf_counter()
+            result = service.optimize_essay(
+                topic_image_path=str(topic_path),
+                reference=REFERENCE_ESSAY,
+                original=f"{SAMPLE_OCR_TEXT}\n#{mode}{index}",
+                essay_type="小作文",
+                topic_text=extraction["text"],
+                topic_mode=mode
+            )
+            latencies[mode].append(time.perf_counter() - started)
+            if result.get("degraded") or result.get("topic_mode") != mode:
+                print(f"[{mode}] 第 {index + 1} 次分析异常: {result.get('error')}")
+
+    summary = telemetry.summary()["by_endpoint"]
+    print("-" * 60)
+    print(f"{'模式':<8}{'请求体/次':>12}{'prompt token/次':>18}{'p50延迟':>10}{'p95延迟':>10}")
+    rows = {}
+    for mode in ("image", "text"):
+        stats = summary[mode]
+        p50, p95 = np.percentile(latencies[mode], [50, 95])
+        rows[mode] = (stats["bytes_sent"] / stats["calls"], stats["prompt_tokens"] / stats["calls"], p50)
+        print(f"{mode:<8}{rows[mode][0] / 1024:>10.1f}KB{rows[mode][1]:>18.0f}{p50:>9.2f}s{p95:>9.2f}s")
+    image, text = rows["image"], rows["text"]
+    print("-" * 60)
+    print(f"text 模式：请求体减少 {1 - text[0] / image[0]:.0%}，prompt token 减少 {image[1] - text[1]:.0f}"
+          f"（{1 - text[1] / image[1]:.0%}），p50 延迟减少 {image[2] - text[2]:.2f}s")
+    if mock is not None:
+        print(f"（模拟服务：固定延迟 {args.latency}s + 每千 prompt token {args.prefill_latency}s；"
+              f"真实延迟请用 --real 测量）")
+        mock.stop()
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
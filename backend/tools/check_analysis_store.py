@@ -0,0 +1,131 @@
+"""
+作文分析结果表检查
+
+1. 分析结果渲染为 Markdown 报告后能按原样解析回来（旧版报告导入依赖这一点）
+2. 旧版报告目录只在首次使用时导入一次
+3. 按年份、作文类型、分数范围筛选与分页的结果正确
+4. 上万条记录时历史查询和读取单条记录的耗时（使用临时数据库和临时报告目录）
+
+用法（在 backend 目录下执行）：
+    python tools/check_analysis_store.py --records 10000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+
+failures = []
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def sample_record(rng: random.Random, created_at: float) -> dict:
+    essay_type = rng.choice(("小作文", "大作文"))
+    return {
+        "year": rng.randint(2010, 2025),
+        "essay_type": essay_type,
+        "score_level": rng.choice(("第二档", "第三档", "第四档")),
+        "score_points": rng.randint(0, 10 if essay_type == "小作文" else 20),
+        "topic": "Directions: write a letter to your friend.",
+        "reference_essay": "Dear Jim,\n\nI am writing to invite you to our party.",
+        "original_text": "Dear Jim,\n\nI want invite you to our party. It will be fun.",
+        "optimized_text": "Dear Jim,\n\nI am writing to invite you to our party.",
+        "suggestions": {
+            "topic_compliance": ["基本切题"],
+            "spelling_errors": [],
+            "grammar_errors": ["want invite -> want to invite"],
+            "word_optimization": ["fun -> enjoyable"],
+            "sentence_optimization": [],
+            "structure_optimization": "结尾可增加期待回复",
+        },
+        "model": "Qwen/Qwen3-VL-30B-A3B-Thinking",
+        "topic_mode": "text",
+        "timings": {"analysis_seconds": round(rng.uniform(20, 60), 2)},
+        "created_at": created_at,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作文分析结果表检查")
+    parser.add_argument("--records", type=int, default=10000, help="计时使用的记录数")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="check_analyses_"))
+    config.DATABASE_PATH = work_dir / "analyses.db"
+    from services.analysis_report import parse_analysis_markdown  # noqa: E402
+    from services.analysis_store import EssayAnalysisStore  # noqa: E402
+
+    rng = random.Random(3)
+    analyses_dir = work_dir / "essays"
+    legacy = EssayAnalysisStore(analyses_dir=analyses_dir)
+    record = legacy.save({**sample_record(rng, 1700000000.0), "score_points": 14})
+    _, path = legacy.export_markdown(record, write=True)
+    parsed = parse_analysis_markdown(path)
+    check("Markdown 报告可解析回原记录", all([
+        parsed["points"] == 14, parsed["score_level"] == record["score_level"],
+        parsed["topic"] == record["topic"], parsed["reference_essay"] == record["reference_essay"],
+        parsed["original_text"] == record["original_text"], parsed["suggestions"] == record["suggestions"],
+        parsed["generated_at"] == record["created_at"],
+    ]))
+
+    # 换一个数据库模拟旧版：目录中只有 Markdown 报告
+    config.DATABASE_PATH = work_dir / "fresh.db"
+    store = EssayAnalysisStore(analyses_dir=analyses_dir)
+    imported = store.ensure_imported()
+    check("旧版报告首次使用时导入一次", imported == 1 and store.ensure_imported() == 0
+          and store.query()[1] == 1)
+
+    started_at = time.time() - args.records * 60
+    rows = [sample_record(rng, started_at + i * 60) for i in range(args.records)]
+    started = time.perf_counter()
+    for row in rows:
+        store.save(row)
+    print(f"  写入 {args.records} 条记录耗时 {time.perf_counter() - started:.1f}s")
+
+    expected = [r for r in rows if r["essay_type"] == "大作文" and 12 <= r["score_points"] <= 16]
+    items, total = store.query(essay_type="大作文", min_points=12, max_points=16, page=2, page_size=20)
+    newest = sorted(expected, key=lambda r: -r["created_at"])[20:40]
+    check("筛选与分页", total == len(expected)
+          and [i["created_at"] for i in items] == [r["created_at"] for r in newest],
+          f"共 {total} 条")
+    items, total = store.query(year=2020, essay_type="小作文")
+    check("按年份和作文类型筛选", total == sum(1 for r in rows if r["year"] == 2020 and r["essay_type"] == "小作文"))
+
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        store.query(year=rng.randint(2010, 2025), essay_type=rng.choice(("小作文", "大作文")),
+                    min_points=rng.randint(0, 10), page=rng.randint(1, 3), page_size=20)
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    check("历史查询 p95 在 20ms 以内", p95 < 20, f"p50 {p50:.2f}ms，p95 {p95:.2f}ms")
+
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        store.get(rng.randint(1, args.records))
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    check("读取单条分析 p95 在 5ms 以内", p95 < 5, f"p50 {p50:.2f}ms，p95 {p95:.2f}ms")
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+对话答案缓存检查
+
+1. 同一问题的不同写法（空白、标点、全半角、大小写）命中缓存
+2. 只差数字、正负号或比较符号的问题不命中（包括规范化后完全相同的情况）
+
+用法（在 backend 目录下执行）：
+    python tools/check_answer_cache.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.answer_cache import AnswerCache  # noqa: E402
+
+failures = []
+
+SCOPE = "model:check"
+
+# (已缓存的问题, 新问题)：应命中
+SAME = [
+    ("求 e^{-2t}u(t) 的拉普拉斯变换", "求e^{-2t}u(t)的拉普拉斯变换？"),
+    ("什么是马克思主义的基本立场？", "什么是马克思主义的基本立场"),
+    ("How do I use the present perfect tense?", "how do i use the present perfect tense"),
+    ("ｘ＞０时函数单调递增吗", "x>0时函数单调递增吗"),
+]
+
+# (已缓存的问题, 新问题)：答案不同，不应命中
+DIFFERENT = [
+    ("求 e^{2t}u(t) 的拉普拉斯变换", "求 e^{-2t}u(t) 的拉普拉斯变换"),
+    ("x<0 时 f(x)=x^3 的单调性", "x>0 时 f(x)=x^3 的单调性"),
+    ("求 e^{-2t}u(t) 的拉普拉斯变换", "求 e^{-5t}u(t) 的拉普拉斯变换"),
+    ("计算 3 + 5 × 2 的结果", "计算 3 - 5 × 2 的结果"),
+]
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def main():
+    for cached, question in SAME:
+        cache = AnswerCache(threshold=0.8, ttl=3600, max_entries=100)
+        cache.put(cached, "answer", SCOPE)
+        hit = cache.get(question, SCOPE)
+        check(f"命中: {question}", hit is not None, f"相似度 {hit['similarity']}" if hit else "未命中")
+
+    for cached, question in DIFFERENT:
+        cache = AnswerCache(threshold=0.8, ttl=3600, max_entries=100)
+        cache.put(cached, "answer", SCOPE)
+        hit = cache.get(question, SCOPE)
+        check(f"不命中: {question}", hit is None,
+              f"错误命中 {hit['question']}（相似度 {hit['similarity']}）" if hit else "")
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
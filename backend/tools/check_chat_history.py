@@ -0,0 +1,145 @@
+"""
+聊天记录目录检查
+
+1. 保存时登记的目录记录与从 Markdown 文件解析出的一致（消息数、第一条用户消息、图片数量与大小）
+2. 启动对齐只重新读取新增或修改时间变化的文件，图片目录有变化时更新图片大小，删除的文件移出目录
+3. 游标分页按保存时间从新到旧、不重复不遗漏，无效游标报错
+4. 上千份聊天记录时对齐与分页的耗时（使用临时数据库和临时目录）
+
+用法（在 backend 目录下执行）：
+    python tools/check_chat_history.py --chats 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+
+failures = []
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def write_chat(chat_dir: Path, name: str, messages, images: int = 1) -> Path:
+    """按 /chat/save 的格式写一份聊天记录（第一条消息附带图片）"""
+    assets = chat_dir / f"{name}.assets"
+    content = "# 学习助手对话记录\n\n**保存时间**: 2025-05-01 10:00:00\n\n---\n\n"
+    for index, message in enumerate(messages):
+        role_name = "👤 用户" if message["role"] == "user" else "🤖 AI助手"
+        content += f"## {role_name}\n\n"
+        if index == 0:
+            for number in range(1, images + 1):
+                assets.mkdir(parents=True, exist_ok=True)
+                (assets / f"image_{number}.png").write_bytes(b"\x89PNG" + b"\0" * 1020)
+                content += f"![图片](./{name}.assets/image_{number}.png)\n\n"
+        content += f"{message['content']}\n\n---\n\n"
+    content += "*该对话记录由Study Helper自动生成*\n"
+    path = chat_dir / f"{name}.md"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="聊天记录目录检查")
+    parser.add_argument("--chats", type=int, default=2000, help="计时使用的聊天记录数")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="check_chat_history_"))
+    config.DATABASE_PATH = work_dir / "chat.db"
+    from services.chat_history import ChatHistoryCatalog  # noqa: E402
+    from services.database import get_connection  # noqa: E402
+
+    chat_dir = work_dir / "chat_history"
+    chat_dir.mkdir()
+    rng = random.Random(7)
+    messages = [
+        {"role": "user", "content": "这道极限题怎么做？\n\n- 第一步\n- 第二步"},
+        {"role": "assistant", "content": "先用洛必达法则。\n\n---\n\n再化简。"},
+        {"role": "user", "content": "谢谢"},
+    ]
+    saved = write_chat(chat_dir, "chat_history_20250301_080000", messages, images=2)
+    catalog = ChatHistoryCatalog(chat_dir=chat_dir)
+    entry = catalog.record_save(saved, messages)
+    check("保存时登记", entry["message_count"] == 3 and entry["asset_count"] == 2 and entry["asset_bytes"] == 2048
+          and entry["first_user_message"] == messages[0]["content"], str(entry))
+
+    fresh = ChatHistoryCatalog(chat_dir=chat_dir)
+    # 清空目录表，模拟升级前只有 Markdown 文件
+    with get_connection() as conn:
+        conn.execute("DELETE FROM chat_histories")
+    fresh.sync()
+    items, _ = fresh.page()
+    check("从文件解析与保存时登记一致", items == [{k: entry[k] for k in items[0]}] if items else False,
+          str(items))
+
+    for index in range(args.chats):
+        write_chat(chat_dir, f"chat_history_2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}_{index:06d}",
+                   [{"role": "user", "content": f"问题 {index}"}, {"role": "assistant", "content": "回答"}],
+                   images=rng.randint(0, 2))
+    started = time.perf_counter()
+    changes = catalog.sync()
+    check("首次对齐登记全部文件", changes["updated"] == args.chats, f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    started = time.perf_counter()
+    changes = catalog.sync()
+    check("无变化时不读取文件", changes == {"updated": 0, "removed": 0, "failed": 0},
+          f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    (chat_dir / "chat_history_20250301_080000.assets" / "image_3.png").write_bytes(b"\0" * 4096)
+    os.utime(chat_dir / "chat_history_20250301_080000.assets", (time.time() + 5, time.time() + 5))
+    victim = sorted(chat_dir.glob("chat_history_2025*_000001.md"))[0]
+    victim.unlink()
+    changes = catalog.sync()
+    items, _ = catalog.page(limit=args.chats + 10)
+    target = next(i for i in items if i["filename"] == "chat_history_20250301_080000.md")
+    check("只更新变化的记录", changes == {"updated": 1, "removed": 1, "failed": 0}
+          and target["asset_bytes"] == 2048 + 4096, str(changes))
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        items, cursor = catalog.page(cursor, limit=37)
+        seen.extend(items)
+        pages += 1
+        if cursor is None:
+            break
+    order = [(i["saved_at"], i["filename"]) for i in seen]
+    check("游标分页不重复不遗漏", len(seen) == len(set(i["filename"] for i in seen)) == args.chats
+          and order == sorted(order, reverse=True), f"{pages} 页")
+    try:
+        catalog.page("not-a-cursor")
+        check("无效游标报错", False)
+    except ValueError:
+        check("无效游标报错", True)
+
+    timings = []
+    cursors = [None]
+    for _ in range(200):
+        started = time.perf_counter()
+        _, cursor = catalog.page(rng.choice(cursors), limit=20)
+        timings.append((time.perf_counter() - started) * 1000)
+        if cursor:
+            cursors.append(cursor)
+    p50, p95 = np.percentile(timings, [50, 95])
+    check("分页查询 p95 在 10ms 以内", p95 < 10, f"p50 {p50:.2f}ms，p95 {p95:.2f}ms")
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+作文写作指标检查
+
+1. 用人工计算过的短文验证各项指标
+2. 批量提取与逐篇提取的结果一致
+3. 数千篇分析（原文、优化后各一篇，用题库参考范文随机抽取）一次提取的耗时
+4. 指标表的写入、补算与趋势查询（使用临时数据库和临时报告目录）
+
+用法（在 backend 目录下执行）：
+    python tools/check_essay_metrics.py --analyses 2000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+
+failures = []
+
+SAMPLE = """Dear Jim,
+
+I am writing to invite you to our party. However, it will be held outside.
+In addition, we will have music and food. Finally, please reply soon!"""
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作文写作指标检查")
+    parser.add_argument("--analyses", type=int, default=2000, help="计时使用的分析篇数")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="check_metrics_"))
+    config.DATABASE_PATH = work_dir / "metrics.db"
+    from services.analysis_store import EssayAnalysisStore  # noqa: E402
+    from services.essay_metrics import EssayMetricsStore, FEATURES, extract_features  # noqa: E402
+
+    features = extract_features([SAMPLE, "", None])
+    sample = {name: features[name][0] for name in FEATURES}
+    # 词: Dear Jim (2) / I am ... party (9) / However ... outside (6) / In addition ... food (8) / Finally ... soon (4)
+    check("词数与句数", sample["word_count"] == 29 and sample["sentence_count"] == 5,
+          f"{sample['word_count']:.0f} 词，{sample['sentence_count']:.0f} 句")
+    check("平均句长", abs(sample["mean_sentence_length"] - 5.8) < 1e-9, f"{sample['mean_sentence_length']:.2f}")
+    check("连接词", sample["connective_count"] == 3 and sample["distinct_connectives"] == 3,
+          f"{sample['connective_count']:.0f} 次")
+    check("空文本全部为0", all(features[name][1] == 0 and features[name][2] == 0 for name in FEATURES))
+
+    references = [r for r in pd.read_excel("data/essays.xlsx")["参考范文"].tolist() if isinstance(r, str)]
+    rng = random.Random(1)
+    essays = [rng.choice(references) for _ in range(args.analyses * 2)]
+
+    batch = extract_features(essays[:50])
+    single = [extract_features([essay]) for essay in essays[:50]]
+    check("批量与逐篇结果一致", all(
+        np.allclose(batch[name], [s[name][0] for s in single]) for name in FEATURES
+    ))
+
+    started = time.perf_counter()
+    extract_features(essays)
+    elapsed = time.perf_counter() - started
+    words = sum(len(e.split()) for e in essays)
+    check(f"{args.analyses} 篇分析（{len(essays)} 篇文本）一次提取在1秒内", elapsed < 1.0, f"{elapsed * 1000:.0f}ms，约 {words} 词")
+
+    analyses_dir = work_dir / "essays"
+    analyses_dir.mkdir()
+    for i in range(3):
+        (analyses_dir / f"essay_analysis_2020_2026010{i + 1}_120000.md").write_text(
+            f"**年份**: 2020\n**作文类型**: 小作文\n\n**评分**: {6 + i}分 (第三档)\n"
+            f"**生成时间**: 2026-01-0{i + 1} 12:00:00\n\n### 原文\n\n```\n{references[i]}\n```\n\n"
+            f"### 优化后\n\n```\n{references[i + 1]}\n```\n",
+            encoding="utf-8"
+        )
+    store = EssayMetricsStore(store=EssayAnalysisStore(analyses_dir=analyses_dir))
+    check("补算已有报告（旧版报告先导入分析结果表）", store.sync() == 3 and store.sync() == 0)
+    store.record("new.md", SAMPLE, SAMPLE, year=2021, essay_type="大作文", created_at=time.time())
+    rows = store.history("original")
+    check("按时间排序的记录", len(rows) == 4 and rows[-1]["source"] == "new.md" and rows[0]["points"] == 6)
+    trend = store.trend(["word_count", "type_token_ratio"], window=2)
+    check("趋势与滑动平均", len(trend["dates"]) == 4
+          and trend["moving_average"]["word_count"][-1] == (rows[-1]["word_count"] + rows[-2]["word_count"]) / 2,
+          f"summary {trend['summary']['word_count']}")
+    check("按作文类型筛选", len(store.history("optimized", essay_type="小作文")) == 3)
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
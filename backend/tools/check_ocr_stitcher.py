@@ -0,0 +1,60 @@
+"""
+分段OCR拼接检查
+
+1. 同一页相邻两段在接缝处的重复文字只保留一份（含下一段开头被切断的半行残片）
+2. 重复短语不在接缝处时不视为重叠，两段内容都完整保留
+3. 不同页之间直接换行拼接，不去重
+
+用法（在 backend 目录下执行）：
+    python tools/check_ocr_stitcher.py
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.ocr_stitcher import merge_overlap, stitch_ocr_texts  # noqa: E402
+
+failures = []
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def main():
+    upper = "Dear Jim,\nI am writing to invite you to our party next\nweek. It will be held in"
+    lower = "eld in\nweek. It will be held in the school hall on Friday."
+    merged = merge_overlap(upper, lower)
+    check("接缝处的重叠只保留一份",
+          merged == "Dear Jim,\nI am writing to invite you to our party next\nweek. It will be held in the school hall on Friday.",
+          repr(merged))
+
+    page1 = ("First, we should protect the environment. It is important for all of us to do our part "
+             "in daily life and reduce waste every day.")
+    page2 = "Secondly, it is important for all of us to save water and electricity."
+    merged = merge_overlap(page1, page2)
+    check("重复短语不在接缝处时完整保留", merged == f"{page1}\n{page2}", repr(merged))
+
+    page3 = "part in daily life and reduce waste every day. Finally, let us act now."
+    stitched = stitch_ocr_texts([page1, page3], [0, 1])
+    check("不同页之间不去重", stitched == f"{page1}\n{page3}", repr(stitched))
+
+    stitched = stitch_ocr_texts([upper, lower, page2], [0, 0, 1])
+    check("同页去重、跨页换行",
+          stitched == "Dear Jim,\nI am writing to invite you to our party next\n"
+                      f"week. It will be held in the school hall on Friday.\n{page2}",
+          repr(stitched))
+    check("空段不产生多余空行", stitch_ocr_texts(["", page2, ""], [0, 1, 2]) == page2)
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
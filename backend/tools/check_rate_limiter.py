@@ -0,0 +1,95 @@
+"""
+上游限流与优先级调度检查
+
+在进程内启动本地模拟服务，用低额度令牌桶模拟服务商限流，验证：
+1. 请求频率不超过配置的额度
+2. 批量任务排满队列时，交互对话的排队时间仍然很短
+3. 批量请求等待足够久后会被放行（不会饿死）
+
+用法（在 backend 目录下执行）：
+    python tools/check_rate_limiter.py
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+from services.ai_service import AIService  # noqa: E402
+from services.rate_limiter import (  # noqa: E402
+    rate_limiters, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+)
+from tools.mock_llm_server import MockLLMServer  # noqa: E402
+
+failures = []
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def main():
+    server = MockLLMServer().start()
+    server.settings.latency = 0.05
+
+    config.MODELSCOPE_API_KEY = "mock-key"
+    config.MODELSCOPE_API_BASE = f"{server.base_url}/chat/completions"
+    config.RATE_LIMITS = {"modelscope": {"requests_per_second": 5, "burst": 1}}
+    config.MODEL_RATE_LIMITS = {}
+    config.RATE_LIMIT_AGING_SECONDS = 10
+    rate_limiters.reset()
+
+    batch_service = AIService(priority=PRIORITY_BATCH)
+    chat_service = AIService(priority=PRIORITY_INTERACTIVE)
+
+    batch_latencies = []
+    chat_latencies = []
+
+    def run(service, latencies, index):
+        start = time.perf_counter()
+        # 消息各不相同，避免被请求合并
+        service.chat(f"question {index}")
+        latencies.append(time.perf_counter() - start)
+
+    try:
+        start = time.perf_counter()
+        threads = [threading.Thread(target=run, args=(batch_service, batch_latencies, i)) for i in range(20)]
+        for t in threads:
+            t.start()
+        time.sleep(0.5)
+
+        # 批量请求排满队列后发起交互请求
+        for i in range(3):
+            run(chat_service, chat_latencies, 100 + i)
+            time.sleep(0.3)
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        total = 23
+        expected_min = (total - 1) / 5
+        check("请求频率不超过额度", elapsed >= expected_min * 0.9,
+              f"{total} 个请求耗时 {elapsed:.2f}s（理论下限 {expected_min:.2f}s）")
+        worst_chat = max(chat_latencies)
+        check("批量任务排队时交互请求不受影响", worst_chat < 0.5,
+              f"交互请求最长 {worst_chat:.2f}s，批量请求最长 {max(batch_latencies):.2f}s")
+        check("批量请求全部完成", len(batch_latencies) == 20)
+
+        snapshot = rate_limiters.snapshot()["modelscope"]["priorities"]
+        print(f"  排队统计: {snapshot}")
+    finally:
+        server.stop()
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
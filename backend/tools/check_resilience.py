@@ -0,0 +1,152 @@
+"""
+AIService 容错逻辑检查
+
+在进程内启动本地模拟服务，注入 429/5xx 错误与延迟，验证：
+1. 可重试错误会自动重试并最终成功
+2. 主模型持续失败时熔断，并降级到备用模型
+3. 所有模型都不可用时返回 degraded 标记而不是占位内容
+4. 超时会被重试
+5. 其他请求异常（如地址无效）同样降级，半开探测期间出现时不会让熔断器一直拒绝调用
+
+用法（在 backend 目录下执行）：
+    python tools/check_resilience.py
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+import config  # noqa: E402
+from services.ai_service import AIService  # noqa: E402
+from services.resilience import circuit_breakers  # noqa: E402
+from tools.mock_llm_server import MockLLMServer, MockSettings  # noqa: E402
+
+failures = []
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def reset(settings: MockSettings, **kwargs):
+    """重置模拟服务参数与熔断状态"""
+    settings.error_rate = kwargs.get("error_rate", 0.0)
+    settings.error_codes = kwargs.get("error_codes", [429, 500, 503])
+    settings.latency = kwargs.get("latency", 0.0)
+    settings.fail_models = set(kwargs.get("fail_models", ()))
+    settings.requests_by_model.clear()
+    circuit_breakers.reset()
+
+
+def main():
+    server = MockLLMServer().start()
+    settings = server.settings
+
+    # 指向模拟服务，并缩短等待时间
+    config.MODELSCOPE_API_KEY = "mock-key"
+    config.DASHSCOPE_API_KEY = "mock-key"
+    config.MODELSCOPE_API_BASE = f"{server.base_url}/chat/completions"
+    config.DASHSCOPE_API_BASE = server.base_url
+    config.AI_RETRY_BASE_DELAY = 0.01
+    config.AI_RETRY_MAX_DELAY = 0.05
+    config.AI_MAX_RETRIES = 3
+    config.CIRCUIT_FAILURE_THRESHOLD = 2
+    config.CIRCUIT_RECOVERY_TIMEOUT = 0.5
+    config.RATE_LIMITS = {}
+
+    service = AIService()
+    image_path = Path(tempfile.mkdtemp()) / "essay.jpg"
+    Image.new("RGB", (64, 64), "white").save(image_path)
+
+    try:
+        # 1. 间歇性 503：重试后成功
+        reset(settings, error_rate=0.5, error_codes=[503])
+        results = [service.image_to_text(str(image_path)) for _ in range(10)]
+        ok = sum(not r["degraded"] for r in results)
+        check("间歇性503重试后成功", ok >= 9, f"{ok}/10 成功")
+
+        # 2. 429 带 Retry-After
+        reset(settings, error_rate=0.5, error_codes=[429])
+        result = service.optimize_essay("", "reference", "my essay", "小作文")
+        check("429限流重试后成功", not result["degraded"], f"model={result['model']}")
+
+        # 3. 主模型持续失败：降级到 OCR_MODEL，且熔断后不再请求主模型
+        reset(settings, fail_models=[config.VISION_MODEL])
+        first = service.image_to_text(str(image_path))
+        check("主模型失败时降级", first["model"] == config.OCR_MODEL and not first["degraded"],
+              f"model={first['model']}")
+        for _ in range(3):
+            service.image_to_text(str(image_path))
+        vision_calls = settings.requests_by_model.get(config.VISION_MODEL, 0)
+        expected_max = (config.AI_MAX_RETRIES + 1) * config.CIRCUIT_FAILURE_THRESHOLD
+        check("熔断后跳过主模型", vision_calls <= expected_max,
+              f"主模型共请求 {vision_calls} 次（上限 {expected_max}）")
+
+        # 4. 冷却后半开探测，主模型恢复即切回
+        settings.fail_models.clear()
+        time.sleep(config.CIRCUIT_RECOVERY_TIMEOUT + 0.1)
+        recovered = service.image_to_text(str(image_path))
+        check("熔断冷却后恢复主模型", recovered["model"] == config.VISION_MODEL, f"model={recovered['model']}")
+
+        # 5. 作文优化降级到纯文本模型
+        reset(settings, fail_models=[config.VISION_MODEL, config.OCR_MODEL])
+        result = service.optimize_essay("", "reference", "my essay", "小作文")
+        check("作文优化降级到纯文本模型", result["model"] == config.OPTIMIZE_MODEL and not result["degraded"],
+              f"model={result['model']}")
+
+        # 6. 全部失败：返回 degraded 而不是占位内容
+        reset(settings, error_rate=1.0, error_codes=[500])
+        ocr = service.image_to_text(str(image_path))
+        check("OCR全部失败时标记degraded", ocr["degraded"] and ocr["text"] == "", ocr["error"] or "")
+        result = service.optimize_essay("", "reference", "my essay", "小作文")
+        check("优化全部失败时标记degraded",
+              result["degraded"] and result["optimized_text"] == "" and result["original_text"] == "my essay")
+
+        # 7. 超时重试
+        reset(settings, latency=0.3)
+        config.AI_REQUEST_TIMEOUT = 0.1
+        config.AI_MAX_RETRIES = 1
+        start = time.perf_counter()
+        ocr = service.image_to_text(str(image_path))
+        elapsed = time.perf_counter() - start
+        calls = sum(settings.requests_by_model.values())
+        check("超时后重试并标记degraded", ocr["degraded"] and calls == 4,
+              f"共请求 {calls} 次，耗时 {elapsed:.2f}s")
+
+        # 8. 半开探测时出现超时、连接错误以外的请求异常（无效地址）
+        reset(settings, fail_models=[config.VISION_MODEL])
+        config.AI_REQUEST_TIMEOUT = 5
+        for _ in range(config.CIRCUIT_FAILURE_THRESHOLD):
+            service.image_to_text(str(image_path))
+        time.sleep(config.CIRCUIT_RECOVERY_TIMEOUT + 0.1)
+        settings.fail_models.clear()
+        broken = AIService()
+        broken.api_url = "http://"
+        try:
+            ocr = broken.image_to_text(str(image_path))
+            check("无效地址时降级而不是抛出异常", ocr["degraded"] or ocr["model"] != config.VISION_MODEL,
+                  ocr["error"] or f"model={ocr['model']}")
+        except Exception as e:
+            check("无效地址时降级而不是抛出异常", False, f"{type(e).__name__}: {e}")
+        time.sleep(config.CIRCUIT_RECOVERY_TIMEOUT + 0.1)
+        recovered = service.image_to_text(str(image_path))
+        check("请求异常后熔断器仍能恢复", recovered["model"] == config.VISION_MODEL,
+              f"model={recovered['model']}，熔断器状态 {circuit_breakers.get(config.VISION_MODEL).state}")
+    finally:
+        server.stop()
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
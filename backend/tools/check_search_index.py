@@ -0,0 +1,135 @@
+"""
+全文检索索引检查
+
+1. 中文按相邻两字、英文按单词切分
+2. 启动同步只重新读取修改时间变化的聊天记录，删除的记录移出索引，作文分析按记录ID增量同步
+3. 中英文查询的排序与命中片段
+4. 数百份聊天记录（每份带图片目录）时的检索耗时（使用临时数据库和临时目录）
+
+用法（在 backend 目录下执行）：
+    python tools/check_search_index.py --chats 500
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+
+failures = []
+
+TOPICS = [
+    ("定积分的几何意义是什么？", "定积分表示曲线与坐标轴围成的面积，可以用分割、近似、求和、取极限理解。"),
+    ("How do I use the present perfect tense?", "Use have or has with the past participle for actions linked to now."),
+    ("线性代数里特征值怎么求？", "先写出特征多项式 det(A - λI) = 0，再解方程得到特征值。"),
+    ("考研英语小作文书信格式", "称呼、正文、结束语和署名都要完整，正文第一段说明写信目的。"),
+    ("极限的等价无穷小替换", "乘除因子可以直接替换，加减运算中替换要小心，必要时用泰勒展开。"),
+]
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def write_chat(chat_dir: Path, name: str, rng: random.Random, question: str = None, answer: str = None):
+    """按 /chat/save 的格式写一份聊天记录（附带一个图片目录）"""
+    assets = chat_dir / f"{name}.assets"
+    assets.mkdir(parents=True, exist_ok=True)
+    (assets / "image_1.png").write_bytes(os.urandom(2048))
+    content = "# 学习助手对话记录\n\n**保存时间**: 2025-05-01 10:00:00\n\n---\n\n"
+    for index in range(rng.randint(2, 6)):
+        q, a = (question, answer) if index == 0 and question else rng.choice(TOPICS)
+        content += f"## 👤 用户\n\n![图片](./{name}.assets/image_1.png)\n\n{q}\n\n---\n\n"
+        content += f"## 🤖 AI助手\n\n{a}\n\n---\n\n"
+    content += "*该对话记录由Study Helper自动生成*\n"
+    path = chat_dir / f"{name}.md"
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全文检索索引检查")
+    parser.add_argument("--chats", type=int, default=500, help="计时使用的聊天记录数")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="check_search_"))
+    config.DATABASE_PATH = work_dir / "search.db"
+    from services.analysis_store import EssayAnalysisStore  # noqa: E402
+    from services.search_index import SearchIndex, tokenize  # noqa: E402
+
+    check("中文按相邻两字切分", tokenize("定积分") == ["定积", "积分"])
+    check("英文按单词切分并转小写", tokenize("Present Perfect, a test") == ["present", "perfect", "test"])
+    check("单独的汉字保留", tokenize("求 x 的值") == ["求", "的值"])
+
+    rng = random.Random(5)
+    chat_dir = work_dir / "chat_history"
+    chat_dir.mkdir()
+    for index in range(args.chats):
+        write_chat(chat_dir, f"chat_history_20250101_{index:06d}", rng)
+    target = write_chat(chat_dir, "chat_history_20250102_000000", rng,
+                        "拉格朗日中值定理的证明思路", "构造辅助函数后应用罗尔定理即可。")
+
+    store = EssayAnalysisStore(analyses_dir=work_dir / "essays")
+    store.save({
+        "year": 2023, "essay_type": "小作文", "score_level": "第三档", "score_points": 6,
+        "topic": "Write a letter to apologize for missing a meeting.",
+        "original_text": "Dear Tom, I am sorry I can not attend the meeting.",
+        "optimized_text": "Dear Tom, I sincerely apologize for missing the meeting.",
+        "suggestions": {"grammar_errors": ["can not -> cannot"], "word_optimization": ["sorry -> apologize"]},
+    })
+
+    index = SearchIndex(chat_dir=chat_dir, store=store)
+    started = time.perf_counter()
+    changes = index.sync()
+    check("首次同步索引全部记录", changes == {"chat_indexed": args.chats + 1, "chat_removed": 0, "essay_indexed": 1},
+          f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    results = index.search("拉格朗日中值定理")
+    check("中文查询排序", bool(results) and results[0]["source"] == target.name
+          and "拉格朗日" in results[0]["snippet"], results[0]["snippet"] if results else "无结果")
+    results = index.search("apologize meeting", kind="essay")
+    check("英文查询与类型筛选", len(results) == 1 and results[0]["analysis_id"] == 1
+          and results[0]["title"] == "2023年小作文分析（6分）", str(results[:1]))
+    check("标题为第一条用户消息", index.search("罗尔定理")[0]["title"] == "拉格朗日中值定理的证明思路")
+
+    started = time.perf_counter()
+    changes = index.sync()
+    check("无变化时不重新读取", changes == {"chat_indexed": 0, "chat_removed": 0, "essay_indexed": 0},
+          f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    write_chat(chat_dir, target.stem, rng, "柯西中值定理的推广", "把两个函数同时代入即可。")
+    os.utime(target, (time.time() + 5, time.time() + 5))
+    (chat_dir / "chat_history_20250101_000000.md").unlink()
+    store.save({"year": 2024, "essay_type": "大作文", "score_points": 12, "original_text": "Teamwork matters."})
+    changes = index.sync()
+    check("只重建变化的记录", changes == {"chat_indexed": 1, "chat_removed": 1, "essay_indexed": 1}, str(changes))
+    check("修改后的内容可检索", index.search("柯西")[0]["source"] == target.name
+          and not index.search("拉格朗日"))
+
+    queries = ["定积分 面积", "特征值", "present perfect", "等价无穷小 泰勒", "书信格式", "past participle"]
+    timings = []
+    for _ in range(200):
+        started = time.perf_counter()
+        index.search(rng.choice(queries))
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    check(f"{args.chats} 份聊天记录检索 p95 在 50ms 以内", p95 < 50, f"p50 {p50:.2f}ms，p95 {p95:.2f}ms")
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+作文相似度索引检查
+
+用随机生成的英文短文验证 TF-IDF 索引：
+1. 与查询共享主题词的文档排在前面，删除/替换后的文档不再出现
+2. 数千篇文档时单次查询耗时在毫秒级
+3. 新增文档后的首次查询（需重建倒排数组）耗时
+
+用法（在 backend 目录下执行）：
+    python tools/check_similarity_index.py --docs 5000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services.similarity_index import TfidfIndex  # noqa: E402
+
+failures = []
+
+TOPICS = {
+    "environment": "pollution climate recycling energy carbon forest protect planet green",
+    "education": "teacher school exam homework classroom student knowledge university lecture",
+    "technology": "internet smartphone computer digital online artificial intelligence software robot",
+    "health": "exercise diet sleep hospital doctor fitness medicine stress mental",
+}
+FILLER = ("people think important society modern life change young generation many believe "
+          "however therefore furthermore example reason result opinion").split()
+
+
+def check(name: str, condition: bool, detail: str = ""):
+    print(f"[{'PASS' if condition else 'FAIL'}] {name}" + (f" - {detail}" if detail else ""))
+    if not condition:
+        failures.append(name)
+
+
+def make_essay(rng: random.Random, topic: str, length: int = 150) -> str:
+    words = TOPICS[topic].split()
+    return " ".join(rng.choice(words) if rng.random() < 0.3 else rng.choice(FILLER) for _ in range(length))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="作文相似度索引检查")
+    parser.add_argument("--docs", type=int, default=5000, help="索引的文档数")
+    parser.add_argument("--queries", type=int, default=200, help="计时的查询次数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    index = TfidfIndex()
+    topics = list(TOPICS)
+
+    started = time.perf_counter()
+    for i in range(args.docs):
+        topic = topics[i % len(topics)]
+        index.add(f"doc{i}", make_essay(rng, topic), {"kind": "analysis", "topic": topic})
+    add_ms = (time.perf_counter() - started) * 1000
+    print(f"  添加 {args.docs} 篇文档耗时 {add_ms:.0f}ms")
+
+    started = time.perf_counter()
+    index.search("warmup", k=1)
+    rebuild_ms = (time.perf_counter() - started) * 1000
+    print(f"  首次查询（含重建）耗时 {rebuild_ms:.1f}ms")
+
+    results = index.search(make_essay(rng, "education", 80), k=10)
+    check("相同主题的文档排在前面", all(r["topic"] == "education" for r in results),
+          f"前10名主题: {sorted({r['topic'] for r in results})}")
+
+    index.remove(results[0]["id"])
+    index.add(results[1]["id"], make_essay(rng, "health"), {"kind": "analysis", "topic": "health"})
+    after = index.search(make_essay(rng, "education", 80), k=10)
+    check("删除和替换的文档不再命中", results[0]["id"] not in {r["id"] for r in after}
+          and all(r["topic"] == "education" for r in after))
+
+    queries = [make_essay(rng, rng.choice(topics), 120) for _ in range(args.queries)]
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, k=5)
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p95 = np.percentile(timings, [50, 95])
+    check(f"{args.docs} 篇文档查询耗时在毫秒级", p95 < 50, f"p50 {p50:.2f}ms，p95 {p95:.2f}ms")
+
+    print("-" * 40)
+    if failures:
+        print(f"{len(failures)} 项检查失败")
+        sys.exit(1)
+    print("全部检查通过")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+AI 接口压测脚本
+
+按指定并发向 /chat、/essays/ocr、/essays/analyze 发送请求，统计
+p50/p95/p99 延迟与吞吐量。默认在进程内启动模拟大模型服务和后端
+（使用临时数据目录，不影响本地数据），也可以用 --target 压测已运行的后端。
+
+用法（在 backend 目录下执行）：
+    python tools/load_test.py --concurrency 8 --requests 40 --latency 0.5 --latency-dist lognormal
+    python tools/load_test.py --target http://127.0.0.1:8000 --endpoints chat --concurrency 4
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools.mock_llm_server import (  # noqa: E402
+    LATENCY_DISTRIBUTIONS, MockLLMServer, MockSettings, SAMPLE_OCR_TEXT
+)
+
+ENDPOINTS = ("chat", "ocr", "analyze")
+TOPIC_YEAR = 2099
+TOPIC_TYPE = "小作文"
+REFERENCE_ESSAY = "Dear Sir or Madam, I am writing to apply for the position..."
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _sample_image(text: str = SAMPLE_OCR_TEXT) -> bytes:
+    """生成一张带文字的测试图片"""
+    image = Image.new("RGB", (1200, 900), "white")
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(text.splitlines()):
+        draw.text((40, 40 + index * 40), line, fill="black")
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def start_local_backend(args) -> str:
+    """在进程内启动模拟服务与后端，返回后端地址"""
+    mock = MockLLMServer(settings=MockSettings(
+        error_rate=args.error_rate,
+        latency=args.latency,
+        latency_dist=args.latency_dist,
+        latency_spread=args.latency_spread
+    )).start()
+
+    # 必须在导入 config 之前设置数据目录
+    os.environ["STUDY_HELPER_DATA_ROOT"] = tempfile.mkdtemp(prefix="study-helper-load-")
+
+    import uvicorn
+    import config
+
+    config.MODELSCOPE_API_KEY = "mock-key"
+    config.DASHSCOPE_API_KEY = "mock-key"
+    config.MODELSCOPE_API_BASE = f"{mock.base_url}/chat/completions"
+    config.DASHSCOPE_API_BASE = mock.base_url
+    if args.no_rate_limit:
+        config.RATE_LIMITS = {}
+
+    from main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    print(f"[Load Test] 模拟服务: {mock.base_url}，后端: http://127.0.0.1:{port}")
+    return f"http://127.0.0.1:{port}"
+
+
+def seed_topic(base_url: str):
+    """添加压测使用的题目（已存在时忽略错误）"""
+    response = requests.post(
+        f"{base_url}/api/v1/essays/topics",
+        data={"year": TOPIC_YEAR, "essay_type": TOPIC_TYPE, "reference": REFERENCE_ESSAY},
+        files={"topic_image": ("topic.jpg", _sample_image("Directions: write a letter"), "image/jpeg")},
+        timeout=30
+    )
+    if response.status_code != 200:
+        print(f"[Load Test] 添加题目失败: {response.status_code} {response.text[:200]}")
+
+
+def make_request(base_url: str, endpoint: str, index: int, image_bytes: bytes, topic: dict) -> int:
+    """发送一次请求，返回HTTP状态码"""
+    if endpoint == "chat":
+        # 每个请求的问题不同，避免被请求合并
+        response = requests.post(
+            f"{base_url}/api/v1/chat",
+            data={"message": f"请解释傅里叶变换的时移性质（#{index}）"},
+            timeout=300
+        )
+    elif endpoint == "ocr":
+        response = requests.post(
+            f"{base_url}/api/v1/essays/ocr",
+            data={"year": TOPIC_YEAR, "essay_type": TOPIC_TYPE},
+            files={"image": (f"essay_{index}.jpg", image_bytes, "image/jpeg")},
+            timeout=300
+        )
+    else:
+        response = requests.post(
+            f"{base_url}/api/v1/essays/analyze",
+            json={
+                "year": TOPIC_YEAR,
+                "essay_type": TOPIC_TYPE,
+                "original_text": f"{SAMPLE_OCR_TEXT}\n#{index}",
+                "topic_image_path": topic.get("题目图片路径", ""),
+                "reference_essay": topic.get("参考范文", REFERENCE_ESSAY)
+            },
+            timeout=300
+        )
+    return response.status_code
+
+
+def run_endpoint(base_url: str, endpoint: str, total: int, concurrency: int,
+                 image_bytes: bytes, topic: dict) -> dict:
+    """以固定并发压测单个接口"""
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(index: int):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            status = make_request(base_url, endpoint, index, image_bytes, topic)
+        except requests.RequestException:
+            status = 0
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, range(total)))
+    duration = time.perf_counter() - start
+
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "endpoint": endpoint,
+        "requests": total,
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 2),
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "max_ms": round(float(values.max()), 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI 接口压测")
+    parser.add_argument("--target", default="", help="已运行的后端地址；为空时在进程内启动模拟环境")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="压测的接口，逗号分隔")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发数")
+    parser.add_argument("--requests", type=int, default=40, help="每个接口的请求数")
+    parser.add_argument("--image", default="", help="OCR 使用的作文图片（默认自动生成）")
+    parser.add_argument("--json", default="", help="将结果另存为JSON文件")
+    mock_group = parser.add_argument_group("模拟服务参数（仅进程内模式）")
+    mock_group.add_argument("--latency", type=float, default=0.3, help="平均延迟（秒）")
+    mock_group.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    mock_group.add_argument("--latency-spread", type=float, default=0.5)
+    mock_group.add_argument("--error-rate", type=float, default=0.0)
+    mock_group.add_argument("--no-rate-limit", action="store_true", help="关闭上游限流，只测后端自身开销")
+    args = parser.parse_args()
+
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        parser.error(f"未知的接口: {', '.join(unknown)}")
+
+    base_url = args.target.rstrip("/") or start_local_backend(args)
+    image_bytes = Path(args.image).read_bytes() if args.image else _sample_image()
+
+    topic = {}
+    if {"ocr", "analyze"} & set(endpoints):
+        if not args.target:
+            seed_topic(base_url)
+        response = requests.get(f"{base_url}/api/v1/essays/topics/{TOPIC_YEAR}/{TOPIC_TYPE}", timeout=30)
+        if response.status_code == 200:
+            topic = response.json()
+        else:
+            print(f"[Load Test] 未找到 {TOPIC_YEAR}年{TOPIC_TYPE} 题目，OCR/分析请求将失败")
+
+    results = []
+    for endpoint in endpoints:
+        print(f"[Load Test] 压测 {endpoint}：{args.requests} 个请求，并发 {args.concurrency}")
+        results.append(run_endpoint(base_url, endpoint, args.requests, args.concurrency, image_bytes, topic))
+
+    print()
+    header = f"{'接口':<10}{'请求':>6}{'失败':>6}{'吞吐(rps)':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['endpoint']:<10}{r['requests']:>6}{r['errors']:>6}{r['throughput_rps']:>12}"
+              f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已保存: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""
+本地模拟大模型服务（OpenAI 兼容 /chat/completions 接口）
+
+用于在没有真实密钥和网络的情况下测试和压测 AIService，支持：
+- 按比例注入 429/5xx 错误，以及让指定模型始终失败
+- 延迟分布：fixed / uniform / normal / lognormal，可按模型单独设置平均延迟
+- 流式输出（"stream": true 时按 SSE 分块返回）
+- 针对 OCR、题目文字提取、作文优化（JSON）、结构校验的固定回复
+- 用量统计中的图片按 28x28 像素块计 token（与 Qwen-VL 系列一致），可按 prompt token 数模拟预填充耗时
+
+用法（在 backend 目录下执行）：
+    python tools/mock_llm_server.py --port 8100 --error-rate 0.3 --latency 0.5 --latency-dist lognormal
+然后通过环境变量把后端指向它：
+    MODELSCOPE_API_BASE=http://127.0.0.1:8100/v1/chat/completions
+    DASHSCOPE_API_BASE=http://127.0.0.1:8100/v1
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SAMPLE_OCR_TEXT = """Dear Sir or Madam,
+
+I am writting to apply for the volunteer position in the international conference.
+I have good english and I am very interested in different culture.
+
+Yours sincerely,
+Li Ming"""
+
+SAMPLE_TOPIC_TEXT = """Directions:
+Suppose you are invited to volunteer at an international conference held in your city. Write an email to the organizing committee to
+1) apply for the position, and
+2) introduce your qualifications.
+You should write about 100 words on the ANSWER SHEET.
+Do not use your own name. Use "Li Ming" instead."""
+
+SAMPLE_ESSAY_RESULT = {
+    "original_text": SAMPLE_OCR_TEXT,
+    "score": {"level": "第三档", "points": 6},
+    "optimized_text": "Dear Sir or Madam,\n\nI am writing to apply for the volunteer position...",
+    "suggestions": {
+        "topic_compliance": ["基本完成申请信任务，但缺少个人优势的具体说明"],
+        "spelling_errors": ["writting -> writing"],
+        "grammar_errors": ["different culture -> different cultures"],
+        "word_optimization": ["good english -> a good command of English"],
+        "sentence_optimization": ["可使用定语从句介绍自身经历"],
+        "structure_optimization": ["结尾应增加期待回复的礼貌用语"]
+    }
+}
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+class MockSettings:
+    """模拟服务的运行参数（可在运行中修改）"""
+
+    def __init__(self, error_rate: float = 0.0, error_codes=(429, 500, 503),
+                 latency: float = 0.0, fail_models=(), latency_dist: str = "fixed",
+                 latency_spread: float = 0.0, model_latency: dict = None,
+                 stream_chunk_size: int = 20, stream_chunk_delay: float = 0.0,
+                 prefill_latency: float = 0.0):
+        """
+        Args:
+            error_rate: 随机注入错误的比例
+            error_codes: 注入的错误状态码
+            latency: 平均（lognormal 为中位数）首字节延迟（秒）
+            fail_models: 始终返回500的模型
+            latency_dist: 延迟分布
+            latency_spread: 分布宽度：uniform 为半宽（秒），normal 为标准差（秒），
+                            lognormal 为对数标准差（无量纲，越大长尾越明显）
+            model_latency: 按模型覆盖平均延迟 {模型名: 秒}
+            stream_chunk_size: 流式输出每块的字符数
+            stream_chunk_delay: 流式输出块间延迟（秒）
+            prefill_latency: 每千个 prompt token 额外增加的延迟（秒），模拟输入越长首字节越慢
+        """
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.latency = latency
+        self.fail_models = set(fail_models)
+        self.latency_dist = latency_dist
+        self.latency_spread = latency_spread
+        self.model_latency = dict(model_latency or {})
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_chunk_delay = stream_chunk_delay
+        self.prefill_latency = prefill_latency
+        self.lock = threading.Lock()
+        self.requests_by_model = {}
+
+    def record(self, model: str):
+        with self.lock:
+            self.requests_by_model[model] = self.requests_by_model.get(model, 0) + 1
+
+    def sample_latency(self, model: str = "") -> float:
+        """按配置的分布采样一次延迟"""
+        base = self.model_latency.get(model, self.latency)
+        if base <= 0:
+            return 0.0
+        spread = self.latency_spread
+        if self.latency_dist == "uniform":
+            value = random.uniform(base - spread, base + spread)
+        elif self.latency_dist == "normal":
+            value = random.gauss(base, spread)
+        elif self.latency_dist == "lognormal":
+            value = base * random.lognormvariate(0, spread)
+        else:
+            value = base
+        return max(value, 0.0)
+
+
+def _message_text(messages) -> str:
+    """拼接所有消息中的文本部分"""
+    parts = []
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, list):
+            parts.extend(p.get("text", "") for p in content if p.get("type") == "text")
+        elif isinstance(content, str):
+            parts.append(content)
+    return "\n".join(parts)
+
+
+def _has_image(messages) -> bool:
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, list) and any(p.get("type") == "image_url" for p in content):
+            return True
+    return False
+
+
+def _image_tokens(messages) -> int:
+    """按图片尺寸估算视觉 token：每 28x28 像素一个 token，另加起止标记"""
+    from PIL import Image
+
+    tokens = 0
+    for msg in messages:
+        content = msg.get("content")
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            url = (part.get("image_url") or {}).get("url", "") if part.get("type") == "image_url" else ""
+            if not url.startswith("data:"):
+                continue
+            try:
+                with Image.open(io.BytesIO(base64.b64decode(url.split(",", 1)[1]))) as image:
+                    width, height = image.size
+            except Exception:
+                continue
+            tokens += math.ceil(width / 28) * math.ceil(height / 28) + 2
+    return tokens
+
+
+def build_reply(messages) -> str:
+    """根据请求内容生成合理的模拟回复"""
+    text = _message_text(messages)
+    if "JSON" in text and ("优化" in text or "original_text" in text):
+        return json.dumps(SAMPLE_ESSAY_RESULT, ensure_ascii=False)
+    if _has_image(messages) and "作文题目的图片" in text:
+        return SAMPLE_TOPIC_TEXT
+    if _has_image(messages):
+        return SAMPLE_OCR_TEXT
+    if "YES" in text and "NO" in text:
+        return "YES"
+    return f"这是模拟回复，收到 {len(text)} 个字符的问题。"
+
+
+def make_handler(settings: MockSettings):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):  # noqa: A002 - 覆盖基类方法
+            pass
+
+        def _send_json(self, status: int, body: dict, headers=None):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": "not found"})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            model = payload.get("model", "")
+            messages = payload.get("messages", [])
+            settings.record(model)
+
+            prompt_tokens = len(_message_text(messages)) // 2 + _image_tokens(messages)
+            delay = settings.sample_latency(model) + settings.prefill_latency * prompt_tokens / 1000
+            if delay:
+                time.sleep(delay)
+
+            if model in settings.fail_models:
+                self._send_json(500, {"error": f"model {model} unavailable"})
+                return
+            if settings.error_rate and random.random() < settings.error_rate:
+                status = random.choice(settings.error_codes)
+                headers = {"Retry-After": "0"} if status == 429 else None
+                self._send_json(status, {"error": "injected error"}, headers)
+                return
+
+            content = build_reply(messages)
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 2,
+                "total_tokens": prompt_tokens + len(content) // 2
+            }
+            if payload.get("stream"):
+                include_usage = (payload.get("stream_options") or {}).get("include_usage", False)
+                self._send_stream(model, content, usage if include_usage else None)
+                return
+
+            self._send_json(200, {
+                "id": f"mock-{time.time_ns()}",
+                "object": "chat.completion",
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+        def _send_stream(self, model: str, content: str, usage: dict = None):
+            """按 OpenAI 流式格式分块返回（Server-Sent Events）"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+            completion_id = f"mock-{time.time_ns()}"
+
+            def send_chunk(body: dict):
+                self.wfile.write(f"data: {json.dumps(body, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            size = max(settings.stream_chunk_size, 1)
+            pieces = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+            for index, piece in enumerate(pieces):
+                if index and settings.stream_chunk_delay:
+                    time.sleep(settings.stream_chunk_delay)
+                delta = {"content": piece}
+                if index == 0:
+                    delta["role"] = "assistant"
+                send_chunk({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None}]
+                })
+            send_chunk({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            })
+            if usage:
+                send_chunk({
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "model": model,
+                    "choices": [],
+                    "usage": usage
+                })
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+
+    return Handler
+
+
+class MockLLMServer:
+    """在后台线程中运行的模拟服务，便于脚本内启动和关闭"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, settings: MockSettings = None):
+        self.settings = settings or MockSettings()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.settings))
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟大模型服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="随机注入错误的比例（0-1）")
+    parser.add_argument("--error-codes", default="429,500,503", help="注入的错误状态码")
+    parser.add_argument("--latency", type=float, default=0.0, help="平均延迟（秒，lognormal 为中位数）")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed", help="延迟分布")
+    parser.add_argument("--latency-spread", type=float, default=0.0,
+                        help="分布宽度（uniform 半宽/normal 标准差/lognormal 对数标准差）")
+    parser.add_argument("--model-latency", default="",
+                        help="按模型设置平均延迟，格式: 模型=秒,模型=秒")
+    parser.add_argument("--fail-models", default="", help="始终返回500的模型，逗号分隔")
+    parser.add_argument("--stream-chunk-size", type=int, default=20, help="流式输出每块字符数")
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.0, help="流式输出块间延迟（秒）")
+    parser.add_argument("--prefill-latency", type=float, default=0.0, help="每千个 prompt token 增加的延迟（秒）")
+    args = parser.parse_args()
+
+    model_latency = {}
+    for item in args.model_latency.split(","):
+        if "=" in item:
+            name, value = item.rsplit("=", 1)
+            model_latency[name.strip()] = float(value)
+
+    settings = MockSettings(
+        error_rate=args.error_rate,
+        error_codes=[int(c) for c in args.error_codes.split(",") if c],
+        latency=args.latency,
+        fail_models=[m for m in args.fail_models.split(",") if m],
+        latency_dist=args.latency_dist,
+        latency_spread=args.latency_spread,
+        model_latency=model_latency,
+        stream_chunk_size=args.stream_chunk_size,
+        stream_chunk_delay=args.stream_chunk_delay,
+        prefill_latency=args.prefill_latency
+    )
+    server = MockLLMServer(args.host, args.port, settings)
+    print(f"模拟服务已启动: {server.base_url}/chat/completions")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ interface Message {
   role: 'user' | 'assistant';
   content: string;
   image_url?: string;
+  image_ids?: string[];
 }
 
 function ChatWindow() {
@@ -21,6 +22,8 @@ function ChatWindow() {
   const [isLoading, setIsLoading] = useState(false);
   const [uploadedImage, setUploadedImage] = useState<File | null>(null);
   const [previewImage, setPreviewImage] = useState<string | null>(null);
+  // 服务端会话ID：历史保存在后端，每轮只发送新消息
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const fileInputRef = useRef<HTMLInputElement>(null);
 
@@ -86,21 +89,23 @@ function ChatWindow() {
     setIsLoading(true);
 
     try {
+      // 首次发送时创建服务端会话
+      let currentSessionId = sessionId;
+      if (!currentSessionId) {
+        const sessionResponse = await axios.post('http://127.0.0.1:8000/api/v1/chat/sessions');
+        currentSessionId = sessionResponse.data.session_id as string;
+        setSessionId(currentSessionId);
+      }
+
       // 构建FormData
       const formData = new FormData();
       formData.append('message', userMessage.content);
+      formData.append('session_id', currentSessionId);
       
       if (uploadedImage) {
         formData.append('image', uploadedImage);
       }
 
-      // 添加历史记录（只发送纯文本部分）
-      const historyForAPI = messages.map(msg => ({
-        role: msg.role,
-        content: msg.content
-      }));
-      formData.append('history', JSON.stringify(historyForAPI));
-
       const response = await axios.post('http://127.0.0.1:8000/api/v1/chat', formData, {
         headers: {
           'Content-Type': 'multipart/form-data',
@@ -112,7 +117,14 @@ function ChatWindow() {
         content: response.data.response
       };
 
-      setMessages(prev => [...prev, aiMessage]);
+      // 图片已存入服务端图片存储，之后以图片ID引用，不再保留 base64 预览
+      const imageIds: string[] = response.data.image_ids || [];
+      setMessages(prev => [
+        ...prev.map(m => m === userMessage && imageIds.length > 0
+          ? { ...m, image_url: `http://127.0.0.1:8000/api/v1/chat/images/${imageIds[0]}`, image_ids: imageIds }
+          : m),
+        aiMessage
+      ]);
 
       // 清除图片
       removeImage();
@@ -137,9 +149,10 @@ function ChatWindow() {
     }
 
     try {
-      const response = await axios.post('http://127.0.0.1:8000/api/v1/chat/save', {
-        messages: messages
-      });
+      // 有服务端会话时由后端直接导出，无需再上传历史和图片
+      const response = sessionId
+        ? await axios.post(`http://127.0.0.1:8000/api/v1/chat/sessions/${sessionId}/save`)
+        : await axios.post('http://127.0.0.1:8000/api/v1/chat/save', { messages: messages });
 
       antdMessage.success(`聊天记录已保存: ${response.data.filename}`);
     } catch (error) {
@@ -157,6 +170,7 @@ function ChatWindow() {
       cancelText: '取消',
       onOk: () => {
         setMessages([]);
+        setSessionId(null);
         antdMessage.success('聊天记录已清空');
       }
     });
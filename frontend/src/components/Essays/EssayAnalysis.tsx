@@ -22,11 +22,15 @@ const EssayAnalysis: React.FC<EssayAnalysisProps> = ({ data, year, essayType })
         original_text: data.original_text,
         optimized_text: data.optimized_text,
         score: data.score,
-        suggestions: data.suggestions
+        suggestions: data.suggestions,
+        model: data.model,
+        topic_mode: data.topic_mode,
+        elapsed: data.elapsed,
+        local_check: data.local_check
       };
       
       await essaysAPI.saveAnalysis(year, saveData);
-      message.success('分析报告已保存为Markdown文件');
+      message.success('分析结果已保存，并导出为Markdown文件');
     } catch (error) {
       message.error('保存失败');
     }
@@ -156,6 +160,19 @@ const EssayAnalysis: React.FC<EssayAnalysisProps> = ({ data, year, essayType })
         ) : (
           <Text type="success">无拼写错误 ✓</Text>
         )}
+        {data.local_check?.possible_spelling_errors?.length ? (
+          <div style={{ marginTop: 8 }}>
+            <Text type="secondary">本地词典未收录的词（可能是拼写错误，也可能是较少见的正确单词，仅供参考）：</Text>
+            <List
+              dataSource={data.local_check.possible_spelling_errors}
+              renderItem={(item) => (
+                <List.Item style={{ borderBottom: 'none', padding: '4px 0' }}>
+                  <Text type="secondary" style={{ display: 'block', lineHeight: '1.8' }}>• {item}</Text>
+                </List.Item>
+              )}
+            />
+          </div>
+        ) : null}
         <Divider />
 
         <Title level={5}>3. 语法错误</Title>
@@ -82,7 +82,8 @@ const EssayUpload: React.FC<EssayUploadProps> = ({ onAnalysisComplete, onOcrComp
         essay_type: values.essay_type,
         original_text: ocrResponse.data.original_text,
         topic_image_path: ocrResponse.data.topic_image_path,
-        reference_essay: ocrResponse.data.reference_essay
+        reference_essay: ocrResponse.data.reference_essay,
+        speculation_id: ocrResponse.data.speculation_id
       };
 
       console.log('开始优化分析...');
@@ -4,12 +4,16 @@ import type {
   ScoreCreateRequest,
   ChartDataResponse,
   EssayAnalysisResponse,
+  EssayGradeResponse,
+  EssayHistoryItem,
   DailyTasksResponse,
   TaskCreateRequest,
   StudyRecordCreateRequest,
   ChartDataPoint,
   ChatRequest,
   ChatResponse,
+  ChatHistoryItem,
+  SearchHit,
 } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000/api/v1';
@@ -66,6 +70,13 @@ export const essaysAPI = {
   deleteTopic: (year: number, essayType: string) =>
     apiClient.delete(`/essays/topics/${year}/${essayType}`),
 
+  // 修改题目文字；不传 text 时从题目图片重新提取
+  updateTopicText: (year: number, essayType: string, text?: string) =>
+    apiClient.put<{ message: string; topic_text: string }>(
+      `/essays/topics/${year}/${essayType}/text`,
+      text === undefined ? {} : { text }
+    ),
+
   // 第一步：OCR识别作文图片
   ocrEssay: (formData: FormData) =>
     apiClient.post('/essays/ocr', formData, {
@@ -82,10 +93,55 @@ export const essaysAPI = {
       },
     }),
 
+  // 一次性批改（识别 + 分析）；题目放在查询参数中，服务端可在上传期间预取题目图片
+  gradeEssay: (year: number, essayType: string, formData: FormData) =>
+    apiClient.post<EssayGradeResponse>('/essays/grade', formData, {
+      params: { year, essay_type: essayType },
+      headers: {
+        'Content-Type': 'multipart/form-data',
+      },
+    }),
+
   saveAnalysis: (year: number, data: any) =>
     apiClient.post('/essays/save', { year, data }),
+
+  // 已保存的分析结果（按年份、作文类型、分数范围筛选，分页）
+  getHistory: (params: {
+    year?: number;
+    essay_type?: string;
+    min_score?: number;
+    max_score?: number;
+    page?: number;
+    page_size?: number;
+  }) =>
+    apiClient.get<{ total: number; page: number; page_size: number; data: EssayHistoryItem[] }>(
+      '/essays/history',
+      { params }
+    ),
+
+  getHistoryDetail: (id: number) => apiClient.get(`/essays/history/${id}`),
+
+  // 导出已保存的分析结果（markdown 报告或 json 完整记录）
+  exportAnalysis: (id: number, format: 'markdown' | 'json' = 'markdown') =>
+    apiClient.get(`/essays/history/${id}/export`, { params: { format }, responseType: 'blob' }),
+
+  // 写作指标随时间的变化（metrics 为逗号分隔的指标名）
+  getWritingTrend: (params: {
+    metrics?: string;
+    text_kind?: 'original' | 'optimized';
+    essay_type?: string;
+    window?: number;
+  }) => apiClient.get<WritingTrend>('/essays/metrics/trend', { params }),
 };
 
+// 写作指标趋势
+export interface WritingTrend {
+  dates: string[];
+  series: Record<string, number[]>;
+  moving_average: Record<string, number[]>;
+  summary: Record<string, { first: number; last: number; mean: number; change: number } | null>;
+}
+
 // ==================== 每日任务API ====================
 export const tasksAPI = {
   getTasksByDate: (date: string) =>
@@ -110,8 +166,42 @@ export const tasksAPI = {
 // ==================== 通用AI API ====================
 export const aiAPI = {
   chat: (data: ChatRequest) => apiClient.post<ChatResponse>('/chat', data),
+
+  // 已保存的聊天记录（按保存时间从新到旧，cursor 为上一页返回的 next_cursor）
+  getChatHistory: (cursor?: string, limit = 20) =>
+    apiClient.get<{ items: ChatHistoryItem[]; next_cursor: string | null }>('/chat/history', {
+      params: { cursor, limit },
+    }),
 };
 
+// ==================== 全文检索API ====================
+export const searchAPI = {
+  // 检索已保存的聊天记录和作文分析（kind 为空时检索全部）
+  search: (q: string, kind?: 'chat' | 'essay', limit = 10) =>
+    apiClient.get<{
+      query: string;
+      total: number;
+      elapsed_ms: number;
+      results: SearchHit[];
+    }>('/search', { params: { q, kind, limit } }),
+};
+
+// 模型调用汇总统计
+export interface AICallSummary {
+  calls: number;
+  errors: number;
+  error_rate: number;
+  retries: number;
+  prompt_tokens: number;
+  completion_tokens: number;
+  bytes_sent: number;
+  cost: number;
+  latency_p50: number;
+  latency_p95: number;
+  latency_p99: number;
+  ttfb_p50: number | null;
+}
+
 // ==================== 系统配置API ====================
 export const systemAPI = {
   // 获取系统状态
@@ -145,6 +235,17 @@ export const systemAPI = {
     });
   },
 
+  // 模型调用遥测（最近一段时间的滚动汇总）
+  getTelemetry: () =>
+    apiClient.get<{
+      window_seconds: number;
+      generated_at: number;
+      total: AICallSummary | null;
+      by_endpoint: Record<string, AICallSummary>;
+      by_model: Record<string, AICallSummary>;
+      by_endpoint_model: Record<string, AICallSummary>;
+    }>('/system/telemetry'),
+
   // 清理临时文件
   cleanupTemp: () =>
     apiClient.delete<{
@@ -54,6 +54,51 @@ export interface EssayAnalysisResponse {
     sentence_optimization: string[];
     structure_optimization: string | string[];  // 可以是字符串或数组
   };
+  topic_mode?: 'text' | 'image';  // 分析时发送的是题目文字还是题目图片
+  model?: string;  // 实际使用的模型
+  elapsed?: number;  // 模型分析耗时（秒）
+  local_check?: {  // 本地拼写/语法检查并入的条数、耗时与未并入的可能拼写错误
+    elapsed_ms: number;
+    spelling_errors: number;
+    grammar_errors: number;
+    possible_spelling_errors?: string[];  // 没有把握的拼写错误（未并入建议，界面单独标注）
+  };
+}
+
+// 已保存的分析结果摘要
+export interface EssayHistoryItem {
+  id: number;
+  source: string;
+  year?: number;
+  essay_type?: string;
+  score_level?: string;
+  score_points?: number;
+  model?: string;
+  topic_mode?: 'text' | 'image';
+  created_at: number;
+}
+
+// 全文检索结果（聊天记录或作文分析）
+export interface SearchHit {
+  kind: 'chat' | 'essay';
+  source: string;
+  analysis_id?: number;
+  title: string;
+  snippet: string;
+  matched_terms: string[];
+  score: number;
+  created_at: number;
+}
+
+export interface EssayGradeResponse extends EssayAnalysisResponse {
+  essay_image_path: string;
+  grading: {
+    mode: 'fused' | 'two_stage';  // 一次性多模态调用 / 回退到两步流程
+    fallback_reason: string | null;
+    elapsed: number;
+    two_stage_baseline: number | null;
+    latency_saved: number | null;  // 相比两步流程节省的秒数
+  };
 }
 
 // ==================== 每日任务模块 ====================
@@ -104,3 +149,13 @@ export interface ChatRequest {
 export interface ChatResponse {
   response: string;
 }
+
+// 已保存的聊天记录（目录信息）
+export interface ChatHistoryItem {
+  filename: string;
+  saved_at: number;
+  message_count: number;
+  first_user_message: string;
+  asset_count: number;
+  asset_bytes: number;
+}